@@ -0,0 +1,13 @@
+-- Migration 008: Deferred malware scan stage
+-- Created: 2026-10-18
+-- Reference: INTAKE_GATEWAY_PLAN Section 8, TECH_DECISIONS #32
+--
+-- With CLAMAV_DEFER_SCAN enabled, intake stores the file and a receipt with
+-- scan_result = 'pending'; the scan worker settles it to clean/quarantined/skipped.
+
+ALTER TABLE intake_receipts DROP CONSTRAINT IF EXISTS intake_receipts_scan_result_check;
+ALTER TABLE intake_receipts ADD CONSTRAINT intake_receipts_scan_result_check
+    CHECK (scan_result IN ('clean', 'quarantined', 'skipped', 'pending'));
+
+CREATE INDEX IF NOT EXISTS idx_intake_receipts_pending_scan
+ON intake_receipts (tenant_id, file_id) WHERE scan_result = 'pending';
@@ -0,0 +1,13 @@
+-- Migration 009: Deduplicated video frame runs
+-- Created: 2026-10-18
+-- Reference: Enhancement #9 PRD
+--
+-- The video processor collapses runs of near-identical sampled frames (dHash)
+-- into one representative; store the time range and how many samples it covers.
+
+ALTER TABLE video_frames ADD COLUMN IF NOT EXISTS timestamp_end_sec FLOAT;
+ALTER TABLE video_frames ADD COLUMN IF NOT EXISTS frame_count INT NOT NULL DEFAULT 1;
+
+UPDATE video_frames SET timestamp_end_sec = timestamp_sec WHERE timestamp_end_sec IS NULL;
+
+COMMENT ON COLUMN video_frames.timestamp_end_sec IS 'Last sampled timestamp of the deduplicated run starting at timestamp_sec';
@@ -0,0 +1,13 @@
+-- Migration 010: Time-bounded transcript chunks
+-- Created: 2026-10-18
+-- Reference: Enhancement #9 PRD
+--
+-- Audio and video transcripts are stored as one chunk per speech segment (after
+-- voice activity detection) instead of one chunk per file; keep each segment's
+-- position on the recording timeline.
+
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS start_sec FLOAT;
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS end_sec FLOAT;
+
+COMMENT ON COLUMN chunks.start_sec IS 'Start of a transcript segment in seconds (NULL for non-temporal chunks)';
+COMMENT ON COLUMN chunks.end_sec IS 'End of a transcript segment in seconds (NULL for non-temporal chunks)';
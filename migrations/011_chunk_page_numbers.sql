@@ -0,0 +1,10 @@
+-- Migration 011: Page numbers on OCR chunks
+-- Created: 2026-10-18
+-- Reference: Enhancement #9 PRD
+--
+-- Multi-page TIFF scans are OCR'd page by page; each page is stored as its own
+-- image_text chunk carrying its 1-based page number.
+
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS page_number INT;
+
+COMMENT ON COLUMN chunks.page_number IS '1-based page of the source image/scan (NULL when not paged)';
@@ -0,0 +1,29 @@
+-- Migration 012: pgvector ANN indexes and tenant filtering on chunks
+-- Created: 2026-10-18
+-- Reference: Enhancement #9 PRD
+--
+-- chunks.embedding (768d text) and image_embeddings.embedding (512d CLIP) are
+-- searched in Postgres by pipeline.pgvector_store. Without an ANN index every
+-- query is a sequential scan. These are the default HNSW indexes (cosine,
+-- m = 16, ef_construction = 64, pgvector >= 0.5); rebuild them as IVFFlat, with
+-- other parameters, or over halfvec with scripts/pgvector_indexes.py.
+--
+-- tenant_id is copied onto chunks so the tenant filter of an ANN query does
+-- not need a join to documents.
+
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS tenant_id TEXT;
+
+UPDATE chunks c
+SET tenant_id = d.tenant_id
+FROM documents d
+WHERE c.document_id = d.id AND c.tenant_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_chunks_tenant_id ON chunks (tenant_id);
+
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_hnsw
+    ON chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX IF NOT EXISTS idx_image_embeddings_embedding_hnsw
+    ON image_embeddings USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+COMMENT ON COLUMN chunks.tenant_id IS 'Owning tenant (copied from documents) for filtered ANN search';
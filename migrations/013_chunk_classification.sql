@@ -0,0 +1,15 @@
+-- Migration 013: classification on chunks for pgvector filtering
+-- Created: 2026-10-19
+-- Reference: Enhancement #9 PRD
+--
+-- The embedding worker now writes text chunks to Postgres as well as Qdrant, so
+-- tenants on vector_backend = "pgvector" see the same documents. The chunk's
+-- policy classification is copied here so the serving layer's classification
+-- filter works on that backend too; it is NULL for multimodal chunks, which
+-- carry no classification in Qdrant either.
+
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS classification TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_chunks_tenant_classification ON chunks (tenant_id, classification);
+
+COMMENT ON COLUMN chunks.classification IS 'Policy classification of a text chunk (serving filter on the pgvector backend)';
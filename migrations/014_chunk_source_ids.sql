@@ -0,0 +1,16 @@
+-- Migration 014: the chunk id the rest of the platform knows, for pgvector results
+-- Created: 2026-10-19
+-- Reference: Enhancement #9 PRD
+--
+-- chunks.chunk_id is a UUID, but the embedding worker's text chunks are keyed
+-- chk_<hex> in Qdrant, retrieval proofs and dedup references (parsing/stages.py).
+-- Their rows store the uuid5 mapping in chunk_id and the original id here, and
+-- the pgvector backend returns and filters on COALESCE(source_chunk_id, chunk_id)
+-- so both backends report the same chunk_id. NULL when chunk_id is the id in use.
+
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS source_chunk_id TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_chunks_tenant_source_chunk_id
+    ON chunks (tenant_id, source_chunk_id) WHERE source_chunk_id IS NOT NULL;
+
+COMMENT ON COLUMN chunks.source_chunk_id IS 'Chunk id used in Qdrant payloads when it is not a UUID (e.g. chk_<hex>)';
@@ -21,12 +21,13 @@ def _get_auth_bypass() -> bool:
     return os.getenv("FROSTBYTE_AUTH_BYPASS", "false").lower() in ("true", "1", "yes")
 
 
-async def get_tenant_from_token(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+def _tenant_from_credentials(
+    credentials: HTTPAuthorizationCredentials | None,
+    required_scope: str,
 ) -> str | None:
     """
     Extract tenant_id from JWT. Returns None if bypass enabled and no token.
-    Raises 401 if token invalid/expired, 403 if scope insufficient.
+    Raises 401 if token invalid/expired, 403 if required_scope is missing.
     """
     if _get_auth_bypass():
         if not credentials:
@@ -53,10 +54,10 @@ async def get_tenant_from_token(
         scopes = payload.get("scope", "")
         if isinstance(scopes, str):
             scopes = scopes.split() if scopes else []
-        if "ingest" not in scopes and "ingest" not in str(payload.get("scopes", [])):
+        if required_scope not in scopes and required_scope not in str(payload.get("scopes", [])):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail={"code": "INSUFFICIENT_PERMISSIONS", "message": "Token requires ingest scope"},
+                detail={"code": "INSUFFICIENT_PERMISSIONS", "message": f"Token requires {required_scope} scope"},
             )
         return tenant_id or None
     except ExpiredSignatureError:
@@ -71,6 +72,20 @@ async def get_tenant_from_token(
         )
 
 
+async def get_tenant_from_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+) -> str | None:
+    """Tenant from a JWT with the ingest scope (intake routes)."""
+    return _tenant_from_credentials(credentials, "ingest")
+
+
+async def get_query_tenant_from_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+) -> str | None:
+    """Tenant from a JWT with the query scope (serving routes). Per SERVING_LAYER_PLAN Section 8."""
+    return _tenant_from_credentials(credentials, "query")
+
+
 def require_tenant_or_bypass(
     path_tenant_id: str,
     token_tenant_id: str | None,
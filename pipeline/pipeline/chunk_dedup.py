@@ -0,0 +1,296 @@
+"""
+Near-duplicate chunk suppression before embedding (MinHash + LSH in Redis).
+Reference: EMBEDDING_INDEXING_PLAN.
+
+Signature blocks, disclaimers and templated clauses recur across hundreds of a
+tenant's documents with small edits. Each chunk gets a MinHash signature over
+word shingles; LSH bands of the signature are kept per tenant in Redis, so
+candidates are found with one pipelined round trip and verified by estimated
+Jaccard similarity against CHUNK_DEDUP_THRESHOLD (0.8: one changed word in a
+chunk of 30+ words changes 3 shingles of 3 words each, leaving it at ~0.85). A
+chunk that matches an indexed (canonical) chunk is not embedded:
+
+- reference (default): no Qdrant point is written; the chunk is recorded in
+  tenant:{id}:dedup:refs as a pointer to its canonical chunk
+- reuse: the canonical chunk's vector is copied into a point with the chunk's
+  own payload (saves embedding calls, not storage)
+
+Chunks shorter than CHUNK_DEDUP_MIN_WORDS are always embedded.
+
+classify() runs under a short per-tenant lock and claims the new canonical
+chunks (indexes them as pending) before returning, so two jobs carrying the
+same boilerplate at once embed it once: the second sees the first's claim.
+commit() confirms the claims once the vectors are stored; release() drops them
+when the job fails, and a claim older than CHUNK_DEDUP_CLAIM_TTL_SEC (a crashed
+worker) is ignored. A duplicate of a claim that is later released points at a
+chunk that is not stored until the claiming document is retried.
+
+Redis layout per tenant:
+    tenant:{id}:dedup:band:{i}:{hash}  SET of canonical chunk_ids
+    tenant:{id}:dedup:sig              HASH chunk_id -> signature bytes
+    tenant:{id}:dedup:refs             HASH chunk_id -> {canonical, doc_id, similarity}
+    tenant:{id}:dedup:pending          HASH chunk_id -> claim time (canonical not yet stored)
+    tenant:{id}:dedup:lock             held while a job classifies and claims
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Collection
+
+import numpy as np
+import redis.asyncio as redis
+
+CHUNK_DEDUP_ENABLED = os.getenv("CHUNK_DEDUP_ENABLED", "true").lower() in ("true", "1", "yes")
+CHUNK_DEDUP_MODE = os.getenv("CHUNK_DEDUP_MODE", "reference")
+CHUNK_DEDUP_THRESHOLD = float(os.getenv("CHUNK_DEDUP_THRESHOLD", "0.8"))
+CHUNK_DEDUP_NUM_PERM = int(os.getenv("CHUNK_DEDUP_NUM_PERM", "128"))
+CHUNK_DEDUP_BANDS = int(os.getenv("CHUNK_DEDUP_BANDS", "32"))
+CHUNK_DEDUP_SHINGLE_WORDS = int(os.getenv("CHUNK_DEDUP_SHINGLE_WORDS", "3"))
+CHUNK_DEDUP_MIN_WORDS = int(os.getenv("CHUNK_DEDUP_MIN_WORDS", "8"))
+# A canonical chunk claimed this long ago and never committed is treated as absent
+CHUNK_DEDUP_CLAIM_TTL_SEC = float(os.getenv("CHUNK_DEDUP_CLAIM_TTL_SEC", "900"))
+# Classify lock: held for one Redis round trip or two; waiters give up (and may embed twice) after
+CHUNK_DEDUP_LOCK_SEC = 5.0
+
+_MERSENNE_61 = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+# Fixed seed: signatures are persisted and must stay comparable across processes
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=CHUNK_DEDUP_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=CHUNK_DEDUP_NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str, k: int = CHUNK_DEDUP_SHINGLE_WORDS) -> set[str]:
+    """Lower-cased word k-grams; case, punctuation and whitespace edits do not change them."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def minhash(text: str) -> np.ndarray | None:
+    """MinHash signature (uint32, CHUNK_DEDUP_NUM_PERM values), or None for an empty text."""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+    # (a * h + b) mod p fits in uint64: a, b, h < 2^32
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_61 & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def band_keys(tenant_id: str, signature: np.ndarray, bands: int = CHUNK_DEDUP_BANDS) -> list[str]:
+    """Redis keys of the signature's LSH bands."""
+    rows = len(signature) // bands
+    return [
+        f"tenant:{tenant_id}:dedup:band:{i}:"
+        + hashlib.blake2b(signature[i * rows:(i + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for i in range(bands)
+    ]
+
+
+@dataclass
+class DedupPlan:
+    """Outcome of classify(): per chunk, the canonical chunk it duplicates (or None)."""
+
+    chunk_ids: list[str]
+    canonical: list[str | None]
+    similarity: list[float]
+    signatures: list[np.ndarray | None] = field(repr=False)
+    # Canonical chunks this plan newly claimed (not already committed by an earlier job)
+    claimed: list[str] = field(default_factory=list)
+
+    @property
+    def duplicates(self) -> int:
+        return sum(c is not None for c in self.canonical)
+
+    def external_canonicals(self) -> list[str]:
+        """Canonical chunk_ids that are not part of this batch (their vectors are in Qdrant)."""
+        own = set(self.chunk_ids)
+        return sorted({c for c in self.canonical if c is not None and c not in own})
+
+    def to_embed(self, mode: str, stored: Collection[str] = ()) -> list[int]:
+        """
+        Indexes of the chunks that need an embedding call: the canonical ones and, in
+        reuse mode, duplicates whose canonical is neither in this batch nor in stored.
+        """
+        own = set(self.chunk_ids)
+        return [
+            i for i, c in enumerate(self.canonical)
+            if c is None or (mode == "reuse" and c not in own and c not in stored)
+        ]
+
+    def reuse_vectors(self, vectors: dict[int, np.ndarray], stored: dict[str, np.ndarray]) -> None:
+        """Reuse mode: give each duplicate without a vector a copy of its canonical chunk's vector."""
+        by_chunk = {self.chunk_ids[i]: v for i, v in vectors.items()}
+        for i, c in enumerate(self.canonical):
+            if c is not None and i not in vectors:
+                vectors[i] = by_chunk[c] if c in by_chunk else stored[c]
+
+
+class NearDuplicateIndex:
+    """Per-tenant MinHash LSH index of canonical chunks."""
+
+    def __init__(self, r: redis.Redis, tenant_id: str, threshold: float = CHUNK_DEDUP_THRESHOLD) -> None:
+        self.r = r
+        self.tenant_id = tenant_id
+        self.threshold = threshold
+        self._sig_key = f"tenant:{tenant_id}:dedup:sig"
+        self._refs_key = f"tenant:{tenant_id}:dedup:refs"
+        self._pending_key = f"tenant:{tenant_id}:dedup:pending"
+        self._lock_key = f"tenant:{tenant_id}:dedup:lock"
+
+    @asynccontextmanager
+    async def _locked(self):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + CHUNK_DEDUP_LOCK_SEC
+        held = False
+        while not held:
+            held = bool(await self.r.set(self._lock_key, token, nx=True, px=int(CHUNK_DEDUP_LOCK_SEC * 1000)))
+            if held or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.01)
+        try:
+            yield
+        finally:
+            if held and await self.r.get(self._lock_key) in (token, token.encode()):
+                await self.r.delete(self._lock_key)
+
+    async def classify(self, chunk_ids: list[str], texts: list[str]) -> DedupPlan:
+        """
+        Match each chunk against the index and against earlier chunks of the same
+        batch, and claim the new canonical chunks. Call commit() once they are
+        stored, or release() if the job fails.
+        """
+        async with self._locked():
+            plan = await self._classify(chunk_ids, texts)
+            await self._claim(plan)
+        return plan
+
+    async def _classify(self, chunk_ids: list[str], texts: list[str]) -> DedupPlan:
+        signatures = [
+            minhash(t) if len(_WORD.findall(t)) >= CHUNK_DEDUP_MIN_WORDS else None for t in texts
+        ]
+        keyed = [(i, band_keys(self.tenant_id, s)) for i, s in enumerate(signatures) if s is not None]
+        candidates: dict[int, set[str]] = {}
+        if keyed:
+            pipe = self.r.pipeline(transaction=False)
+            for _i, keys in keyed:
+                for key in keys:
+                    pipe.smembers(key)
+            members = await pipe.execute()
+            for n, (i, keys) in enumerate(keyed):
+                found = set().union(*members[n * len(keys):(n + 1) * len(keys)])
+                candidates[i] = {m.decode() if isinstance(m, bytes) else m for m in found}
+
+        wanted = sorted({c for cs in candidates.values() for c in cs})
+        known: dict[str, np.ndarray] = {}
+        if wanted:
+            pipe = self.r.pipeline(transaction=False)
+            pipe.hmget(self._sig_key, wanted)
+            pipe.hmget(self._pending_key, wanted)
+            raw, claimed = await pipe.execute()
+            stale = time.time() - CHUNK_DEDUP_CLAIM_TTL_SEC
+            known = {
+                cid: np.frombuffer(b, dtype=np.uint32)
+                for cid, b, at in zip(wanted, raw, claimed)
+                if b and (at is None or float(at) > stale)
+            }
+            committed = {cid for cid, b, at in zip(wanted, raw, claimed) if b and at is None}
+        else:
+            committed = set()
+
+        canonical: list[str | None] = [None] * len(texts)
+        similarity = [0.0] * len(texts)
+        batch_canonicals: list[int] = []
+        for i, sig in enumerate(signatures):
+            if sig is None:
+                continue
+            best, best_score = None, 0.0
+            for cid in candidates.get(i, ()):
+                if cid in known and cid != chunk_ids[i]:
+                    score = jaccard(sig, known[cid])
+                    if score > best_score:
+                        best, best_score = cid, score
+            for j in batch_canonicals:
+                score = jaccard(sig, signatures[j])
+                if score > best_score:
+                    best, best_score = chunk_ids[j], score
+            if best is not None and best_score >= self.threshold:
+                canonical[i], similarity[i] = best, best_score
+            else:
+                batch_canonicals.append(i)
+        return DedupPlan(
+            chunk_ids=list(chunk_ids),
+            canonical=canonical,
+            similarity=similarity,
+            signatures=signatures,
+            claimed=[chunk_ids[i] for i in batch_canonicals if chunk_ids[i] not in committed],
+        )
+
+    @staticmethod
+    def _claimed(plan: DedupPlan) -> list[tuple[str, np.ndarray]]:
+        claimed = set(plan.claimed)
+        return [(c, sig) for c, sig in zip(plan.chunk_ids, plan.signatures) if c in claimed and sig is not None]
+
+    async def _claim(self, plan: DedupPlan) -> None:
+        """Index the plan's new canonical chunks as pending, visible to the next classify()."""
+        claimed = self._claimed(plan)
+        if not claimed:
+            return
+        pipe = self.r.pipeline(transaction=False)
+        for chunk_id, sig in claimed:
+            for key in band_keys(self.tenant_id, sig):
+                pipe.sadd(key, chunk_id)
+        now = str(time.time())
+        pipe.hset(self._sig_key, mapping={chunk_id: sig.tobytes() for chunk_id, sig in claimed})
+        pipe.hset(self._pending_key, mapping={chunk_id: now for chunk_id, _ in claimed})
+        await pipe.execute()
+
+    async def commit(self, plan: DedupPlan, doc_id: str) -> None:
+        """Confirm the plan's claims (their chunks are stored) and record its duplicate references."""
+        refs = {
+            chunk_id: json.dumps({"canonical": canon, "doc_id": doc_id, "similarity": round(score, 3)})
+            for chunk_id, canon, score, sig in zip(plan.chunk_ids, plan.canonical, plan.similarity, plan.signatures)
+            if canon is not None and sig is not None
+        }
+        if not plan.claimed and not refs:
+            return
+        pipe = self.r.pipeline(transaction=False)
+        if plan.claimed:
+            pipe.hdel(self._pending_key, *plan.claimed)
+        if refs:
+            pipe.hset(self._refs_key, mapping=refs)
+        await pipe.execute()
+
+    async def release(self, plan: DedupPlan) -> None:
+        """Drop the plan's claims (the job failed before storing its canonical chunks)."""
+        claimed = self._claimed(plan)
+        if not claimed:
+            return
+        pipe = self.r.pipeline(transaction=False)
+        for chunk_id, sig in claimed:
+            for key in band_keys(self.tenant_id, sig):
+                pipe.srem(key, chunk_id)
+        pipe.hdel(self._sig_key, *plan.claimed)
+        pipe.hdel(self._pending_key, *plan.claimed)
+        await pipe.execute()
@@ -1,54 +1,338 @@
 """
 ClamAV malware scanning via clamd socket per TECH_DECISIONS #32.
 Falls back to 'clean' when ClamAV unavailable (dev mode).
+
+Scans go over a bounded pool of clamd IDSESSION connections (CLAMAV_POOL_SIZE),
+content is streamed with INSTREAM in fixed-size blocks, and verdicts are cached
+by (sha256, signature database version) so re-uploads are not rescanned.
 """
 from __future__ import annotations
 
-import io
+import asyncio
+import hashlib
 import os
+import queue
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
-_clamd = None
+CLAMAV_SOCKET = os.getenv("CLAMAV_SOCKET", "/var/run/clamav/clamd.sock")
+CLAMAV_HOST = os.getenv("CLAMAV_HOST", "localhost")
+CLAMAV_PORT = int(os.getenv("CLAMAV_PORT", "3310"))
+CLAMAV_POOL_SIZE = int(os.getenv("CLAMAV_POOL_SIZE", "4"))
+CLAMAV_STREAM_BLOCK_SIZE = int(os.getenv("CLAMAV_STREAM_BLOCK_SIZE", str(64 * 1024)))
+CLAMAV_TIMEOUT_SEC = float(os.getenv("CLAMAV_TIMEOUT_SEC", "60"))
+CLAMAV_VERDICT_CACHE_SIZE = int(os.getenv("CLAMAV_VERDICT_CACHE_SIZE", "10000"))
+CLAMAV_DEFER_SCAN = os.getenv("CLAMAV_DEFER_SCAN", "false").lower() in ("true", "1", "yes")
 
+# clamd drops IDSESSION connections after IdleTimeout (default 30s); recycle before that.
+_IDLE_RECYCLE_SEC = 25.0
+_VERSION_TTL_SEC = 300.0
+_RETRY_UNAVAILABLE_SEC = 30.0
 
-def _get_clamd():
-    global _clamd
-    if _clamd is not None:
-        return _clamd
-    try:
-        import clamd
 
-        sock = os.getenv("CLAMAV_SOCKET", "/var/run/clamav/clamd.sock")
-        host = os.getenv("CLAMAV_HOST", "localhost")
-        port = int(os.getenv("CLAMAV_PORT", "3310"))
+class ClamdError(Exception):
+    """Raised when clamd returns an error or the connection breaks mid-command."""
+
 
-        if sock and os.path.exists(sock):
-            cd = clamd.ClamdUnixSocket(socket_path=sock)
+class _ClamdConnection:
+    """One clamd connection held open in IDSESSION mode."""
+
+    def __init__(self) -> None:
+        if CLAMAV_SOCKET and os.path.exists(CLAMAV_SOCKET):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(CLAMAV_TIMEOUT_SEC)
+            sock.connect(CLAMAV_SOCKET)
         else:
-            cd = clamd.ClamdNetworkSocket(host=host, port=port)
-        cd.ping()
-        _clamd = cd
-        return cd
-    except Exception:
-        _clamd = False
+            sock = socket.create_connection((CLAMAV_HOST, CLAMAV_PORT), timeout=CLAMAV_TIMEOUT_SEC)
+        self._sock = sock
+        self._buf = b""
+        self.last_used = time.monotonic()
+        self._sock.sendall(b"zIDSESSION\0")
+
+    def _recv_reply(self) -> str:
+        while b"\0" not in self._buf:
+            data = self._sock.recv(4096)
+            if not data:
+                raise ClamdError("clamd closed the connection")
+            self._buf += data
+        reply, _, self._buf = self._buf.partition(b"\0")
+        text = reply.decode("utf-8", errors="replace")
+        # IDSESSION replies are prefixed with the request id: "<id>: <reply>"
+        _, sep, rest = text.partition(": ")
+        return rest if sep else text
+
+    def command(self, name: str) -> str:
+        self._sock.sendall(b"z" + name.encode("ascii") + b"\0")
+        reply = self._recv_reply()
+        self.last_used = time.monotonic()
+        return reply
+
+    def instream(self, blocks: Iterable[bytes | memoryview]) -> str:
+        self._sock.sendall(b"zINSTREAM\0")
+        for block in blocks:
+            if not block:
+                continue
+            self._sock.sendall(struct.pack("!L", len(block)))
+            self._sock.sendall(block)
+        self._sock.sendall(struct.pack("!L", 0))
+        reply = self._recv_reply()
+        self.last_used = time.monotonic()
+        return reply
+
+    def close(self) -> None:
+        try:
+            self._sock.sendall(b"zEND\0")
+        except OSError:
+            pass
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class _ClamdPool:
+    """Bounded pool of clamd connections; connections are opened lazily up to size."""
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue[_ClamdConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _checkout(self) -> _ClamdConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return _ClamdConnection()
+            if time.monotonic() - conn.last_used < _IDLE_RECYCLE_SEC:
+                return conn
+            conn.close()
+
+    def run(self, fn, retry: bool = True):
+        """Run fn(conn) on a pooled connection, retrying once on a stale connection."""
+        if not self._slots.acquire(timeout=CLAMAV_TIMEOUT_SEC):
+            raise ClamdError("Timed out waiting for a clamd connection")
+        try:
+            attempts = 2 if retry else 1
+            for attempt in range(1, attempts + 1):
+                conn = self._checkout()
+                try:
+                    result = fn(conn)
+                except (OSError, ClamdError):
+                    conn.close()
+                    if attempt == attempts:
+                        raise
+                    continue
+                self._idle.put(conn)
+                return result
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _VerdictCache:
+    """LRU of (sha256, signature version) -> (result, threat_name)."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], tuple[str, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> tuple[str, str | None] | None:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+            return hit
+
+    def put(self, key: tuple[str, str], verdict: tuple[str, str | None]) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+
+_pool: _ClamdPool | None = None
+_pool_lock = threading.Lock()
+_unavailable_until = 0.0
+_db_version: str | None = None
+_db_version_checked = 0.0
+_verdicts = _VerdictCache(CLAMAV_VERDICT_CACHE_SIZE)
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_pool() -> _ClamdPool | None:
+    """Return the connection pool, or None while ClamAV is unreachable."""
+    global _pool, _unavailable_until
+    if _pool is not None:
+        return _pool
+    if time.monotonic() < _unavailable_until:
         return None
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
+        pool = _ClamdPool(CLAMAV_POOL_SIZE)
+        try:
+            if pool.run(lambda c: c.command("PING")) != "PONG":
+                raise ClamdError("Unexpected PING reply")
+        except Exception:
+            pool.close()
+            _unavailable_until = time.monotonic() + _RETRY_UNAVAILABLE_SEC
+            return None
+        _pool = pool
+        return pool
+
+
+def _version_fresh(now: float) -> bool:
+    return _db_version is not None and now - _db_version_checked < _VERSION_TTL_SEC
 
 
-def scan_bytes(content: bytes) -> tuple[str, str | None]:
+def signature_version() -> str | None:
     """
-    Scan content via clamd instream.
-    Returns (result, threat_name). result is 'clean' or 'infected'.
-    When ClamAV unavailable, returns ('clean', None).
+    Signature database version from clamd VERSION ("ClamAV 1.0.5/27210/<date>" -> "27210").
+    Cached for _VERSION_TTL_SEC; None when ClamAV is unavailable or the refresh fails,
+    so no verdict is read or cached under a version that may be out of date.
     """
-    cd = _get_clamd()
-    if cd is None:
+    global _db_version, _db_version_checked
+    now = time.monotonic()
+    if _version_fresh(now):
+        return _db_version
+    pool = _get_pool()
+    if pool is None:
+        return None
+    try:
+        reply = pool.run(lambda c: c.command("VERSION"))
+    except Exception:
+        return None
+    parts = reply.split("/")
+    _db_version = parts[1] if len(parts) >= 2 else reply
+    _db_version_checked = now
+    return _db_version
+
+
+def _parse_reply(reply: str) -> tuple[str, str | None]:
+    """Map an INSTREAM reply ('stream: OK', 'stream: Eicar FOUND') to (result, threat)."""
+    body = reply[len("stream: "):] if reply.startswith("stream: ") else reply
+    if body.endswith(" FOUND"):
+        return "infected", body[: -len(" FOUND")]
+    if body == "OK":
         return "clean", None
+    raise ClamdError(body)
 
-    try:
-        buf = io.BytesIO(content)
-        result = cd.instream(buf)
-        stream_val = result.get("stream")
-        if isinstance(stream_val, tuple) and len(stream_val) >= 2 and stream_val[0] == "FOUND":
-            return "infected", str(stream_val[1])
+
+def iter_blocks(content: bytes, block_size: int = CLAMAV_STREAM_BLOCK_SIZE) -> Iterator[memoryview]:
+    """Yield zero-copy block views over content for INSTREAM."""
+    view = memoryview(content)
+    for start in range(0, len(view), block_size):
+        yield view[start:start + block_size]
+
+
+def _scan(
+    make_blocks,
+    sha256: str | None,
+    retry: bool,
+) -> tuple[str, str | None]:
+    pool = _get_pool()
+    if pool is None:
         return "clean", None
+
+    version = signature_version()
+    if sha256 and version is not None:
+        cached = _verdicts.get((sha256.lower(), version))
+        if cached is not None:
+            return cached
+
+    hasher = None if sha256 else hashlib.sha256()
+
+    def _instream(conn: _ClamdConnection) -> str:
+        blocks = make_blocks()
+        if hasher is not None:
+            blocks = _hashed(blocks, hasher)
+        return conn.instream(blocks)
+
+    try:
+        verdict = _parse_reply(pool.run(_instream, retry=retry))
     except Exception:
-        return "skipped", None  # Service unavailable
+        return "skipped", None  # Service unavailable or scan error
+
+    if version is not None:
+        digest = sha256.lower() if sha256 else hasher.hexdigest()
+        _verdicts.put((digest, version), verdict)
+    return verdict
+
+
+def _hashed(blocks: Iterable[bytes | memoryview], hasher) -> Iterator[bytes | memoryview]:
+    for block in blocks:
+        hasher.update(block)
+        yield block
+
+
+def scan_stream(
+    blocks: Iterable[bytes | memoryview],
+    sha256: str | None = None,
+) -> tuple[str, str | None]:
+    """
+    Scan a stream of blocks via clamd INSTREAM without assembling the whole file.
+    If sha256 is given, a cached verdict for the current signature version is returned
+    without scanning. Returns (result, threat_name); result is 'clean', 'infected'
+    or 'skipped' (scan error). When ClamAV unavailable, returns ('clean', None).
+    """
+    # The blocks can only be consumed once, so a broken connection is not retried.
+    return _scan(lambda: blocks, sha256, retry=False)
+
+
+def scan_bytes(content: bytes, sha256: str | None = None) -> tuple[str, str | None]:
+    """
+    Scan in-memory content via clamd INSTREAM, streamed in blocks.
+    Returns (result, threat_name). result is 'clean' or 'infected'.
+    When ClamAV unavailable, returns ('clean', None).
+    """
+    if sha256 is None:
+        sha256 = hashlib.sha256(content).hexdigest()
+    return _scan(lambda: iter_blocks(content), sha256, retry=True)
+
+
+def cached_verdict(sha256: str) -> tuple[str, str | None] | None:
+    """
+    Return a cached verdict for sha256 under the current signature version, if any.
+    Does no I/O: once the version is older than _VERSION_TTL_SEC this is a miss and
+    the scan (on the executor) refreshes it first.
+    """
+    if not _version_fresh(time.monotonic()):
+        return None
+    return _verdicts.get((sha256.lower(), _db_version))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=CLAMAV_POOL_SIZE, thread_name_prefix="clamav")
+    return _executor
+
+
+async def scan_bytes_async(content: bytes, sha256: str | None = None) -> tuple[str, str | None]:
+    """
+    Async scan on a dedicated executor sized to the connection pool.
+    Cached verdicts are answered on the event loop without a thread hop.
+    """
+    if sha256 is None:
+        sha256 = hashlib.sha256(content).hexdigest()
+    cached = cached_verdict(sha256)
+    if cached is not None:
+        return cached
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), scan_bytes, content, sha256)
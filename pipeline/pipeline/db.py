@@ -65,12 +65,29 @@ async def load_tenant_config(tenant_id: str) -> dict[str, Any]:
     )
     if row is None:
         raise TenantNotFoundError(tenant_id)
+    config = row["config"]
+    if isinstance(config, str):  # jsonb without a type codec on the pool
+        config = json.loads(config)
     return {
-        "config": dict(row["config"]) if row["config"] else {},
+        "config": dict(config) if config else {},
         "config_version": row["config_version"],
     }
 
 
+async def update_tenant_config(tenant_id: str, changes: dict[str, Any]) -> None:
+    """Merge changes into the tenant's config and bump config_version."""
+    pool = _get_pool()
+    await pool.execute(
+        """
+        UPDATE tenants
+        SET config = COALESCE(config, '{}'::jsonb) || $2::jsonb, config_version = config_version + 1
+        WHERE tenant_id = $1
+        """,
+        tenant_id,
+        json.dumps(changes),
+    )
+
+
 async def fetch_document(document_id: uuid.UUID) -> dict | None:
     """Fetch document by id. Returns None if not found."""
     try:
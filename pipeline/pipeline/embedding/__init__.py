@@ -0,0 +1,173 @@
+"""
+Text embedding service for multimodal pipeline.
+Uses FROSTBYTE_EMBEDDING_ENDPOINT (OpenRouter-compatible) or Nomic local.
+Reference: EMBEDDING_INDEXING_PLAN, TECH_DECISIONS (768d).
+
+Backend selection (FROSTBYTE_EMBEDDING_BACKEND):
+- auto (default): local in FROSTBYTE_MODE=offline, http in online mode
+- http:  http_backend, the OpenRouter-compatible endpoint
+- local: local_backend, in-process sentence-transformers / ONNX Runtime
+
+All calls go through one EmbeddingBatcher per process (batcher.py), which merges
+texts from concurrent callers into a single backend request.
+
+Results are float32 NumPy matrices (pipeline.vectors), L2-normalized once here.
+
+Backend failures raise EmbeddingUnavailableError (and a wrong dimension raises
+ValueError) instead of returning zero vectors, so nothing unusable is indexed;
+workers defer and requeue the job. Errors a retry cannot fix are raised as they
+are: a request the endpoint rejected (httpx.HTTPStatusError, 4xx other than 408
+and 429) and configuration errors (ValueError, ImportError of a missing local
+backend). Only empty texts map to a zero vector.
+"""
+from __future__ import annotations
+
+import os
+from typing import Literal
+
+import httpx
+import numpy as np
+
+from .. import vectors as vec
+from . import http_backend, local_backend
+from .batcher import EmbeddingBatcher
+from .http_backend import EMBEDDING_ENDPOINT, EmbeddingUnavailableError
+
+EMBEDDING_DIM = 768
+EMBEDDING_BACKEND = os.getenv("FROSTBYTE_EMBEDDING_BACKEND", "auto").lower()
+
+InputType = Literal["document", "query"]
+
+_backend: str | None = None
+_batcher: EmbeddingBatcher | None = None
+
+
+def get_backend() -> str:
+    """Resolve the embedding backend ('http' or 'local') once per process."""
+    global _backend
+    if _backend is None:
+        if EMBEDDING_BACKEND in ("http", "local"):
+            _backend = EMBEDDING_BACKEND
+        elif EMBEDDING_BACKEND == "auto":
+            from ..config import PlatformConfig
+
+            try:
+                mode = PlatformConfig.from_env().mode
+            except ValueError:
+                mode = os.getenv("FROSTBYTE_MODE", "offline").lower()
+            _backend = "local" if mode == "offline" else "http"
+        else:
+            raise ValueError(
+                f"FROSTBYTE_EMBEDDING_BACKEND must be 'auto', 'http' or 'local', got {EMBEDDING_BACKEND!r}"
+            )
+    return _backend
+
+
+def _permanent(e: Exception) -> bool:
+    """A failure that retrying later cannot fix: a rejected request or a configuration error."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return 400 <= e.response.status_code < 500 and e.response.status_code not in (408, 429)
+    return isinstance(e, (ValueError, ImportError))
+
+
+async def _embed_batch(texts: list[str], input_type: InputType) -> np.ndarray:
+    if get_backend() == "local":
+        return await local_backend.embed(texts, EMBEDDING_DIM, input_type)
+    return await http_backend.embed(texts, EMBEDDING_DIM)
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """Process-wide micro-batcher in front of the selected backend."""
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbeddingBatcher(lambda texts, input_type: _embed_batch(texts, input_type))
+    return _batcher
+
+
+async def get_text_embeddings(
+    texts: list[str],
+    document_id: str | None = None,
+    tenant_id: str | None = None,
+    input_type: InputType = "document",
+) -> np.ndarray:
+    """
+    Get 768-d embeddings for a batch of texts as a float32 (len(texts), 768) matrix,
+    in input order. The texts share a backend call with whatever other callers submit
+    in the same batching window. Empty texts get a zero vector without being sent.
+    Raises EmbeddingUnavailableError if the backend cannot serve (retry later),
+    ValueError on a dimension mismatch or a bad setting, and the endpoint's
+    httpx.HTTPStatusError when it rejects the request.
+    """
+    from ..events import publish_async
+
+    vectors = vec.zeros(len(texts), EMBEDDING_DIM)
+    todo = [i for i, t in enumerate(texts) if t and t.strip()]
+    if not todo:
+        return vectors
+
+    await publish_async(
+        "EMBED",
+        f"Starting embedding for {len(todo)} text(s) via {get_backend()} backend",
+        "info",
+        document_id=document_id,
+        tenant_id=tenant_id,
+    )
+
+    try:
+        embedded = await get_batcher().embed([texts[i] for i in todo], input_type)
+    except Exception as e:
+        # Emit error event
+        await publish_async(
+            "EMBED",
+            f"Embedding failed: {e}",
+            "error",
+            document_id=document_id,
+            tenant_id=tenant_id,
+        )
+        if isinstance(e, EmbeddingUnavailableError) or _permanent(e):
+            raise
+        raise EmbeddingUnavailableError(str(e)) from e
+
+    try:
+        embedded = vec.as_matrix(embedded, EMBEDDING_DIM)
+        if len(embedded) != len(todo):
+            raise ValueError(f"Backend returned {len(embedded)} vectors for {len(todo)} texts")
+    except ValueError as e:
+        await publish_async("EMBED", f"Dimension mismatch: {e}", "error", document_id=document_id, tenant_id=tenant_id)
+        raise
+
+    vectors[todo] = embedded
+    vec.normalize(vectors)
+    # Emit success event
+    await publish_async(
+        "EMBED",
+        f"Generated {len(todo)} x {EMBEDDING_DIM}d embedding(s)",
+        "success",
+        document_id=document_id,
+        tenant_id=tenant_id,
+    )
+    return vectors
+
+
+async def get_text_embedding(
+    text: str,
+    document_id: str | None = None,
+    tenant_id: str | None = None,
+    input_type: InputType = "document",
+) -> np.ndarray:
+    """
+    Get 768-d float32 embedding for text. Calls OpenRouter-compatible API or the local model.
+    Raises EmbeddingUnavailableError when no backend can serve.
+    """
+    return (await get_text_embeddings([text], document_id, tenant_id, input_type))[0]
+
+
+__all__ = [
+    "EMBEDDING_DIM",
+    "EMBEDDING_ENDPOINT",
+    "EmbeddingUnavailableError",
+    "get_backend",
+    "get_batcher",
+    "get_text_embedding",
+    "get_text_embeddings",
+]
@@ -0,0 +1,152 @@
+"""
+Cross-caller embedding micro-batcher.
+
+Embedding jobs, multimodal OCR/transcript text and the collections query route
+each submit a handful of texts and await a future. A collector gathers requests
+for EMBEDDING_BATCH_WINDOW_MS, or until EMBEDDING_BATCH_MAX_ITEMS texts or
+EMBEDDING_BATCH_MAX_TOKENS (estimated) are queued, then sends one backend call
+per input type (documents and queries are prefixed differently by the local
+model) and hands each caller its slice of the result. A caller's list larger
+than the budget (a whole document's chunks) is split into sub-requests of at
+most max_items texts / max_tokens, so no backend call exceeds the budget, and
+its results are reassembled in order. Dispatches run as tasks, so the next batch
+is collected while the previous one is in flight; at low load a request only
+waits the few-millisecond window.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .. import vectors as vec
+
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "64"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "16000"))
+
+EmbedFn = Callable[[list[str], str], Awaitable[np.ndarray]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for the batch budget."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class _Request:
+    input_type: str
+    texts: list[str]
+    tokens: int
+    future: asyncio.Future = field(repr=False)
+
+
+class EmbeddingBatcher:
+    """Micro-batching front for an embedding backend, bound to the running event loop."""
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_items: int = EMBEDDING_BATCH_MAX_ITEMS,
+        max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    ) -> None:
+        self.embed_fn = embed_fn
+        self.window = window_ms / 1000.0
+        self.max_items = max(1, max_items)
+        self.max_tokens = max(1, max_tokens)
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._collector: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: set[asyncio.Task] = set()
+        # A request that would have overflowed the previous batch starts the next one
+        self._carry: _Request | None = None
+
+    def _ensure_collector(self) -> asyncio.Queue[_Request]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+        return self._queue
+
+    def split(self, texts: list[str]) -> list[tuple[list[str], int]]:
+        """(texts, tokens) parts within the item and token budget; a text over the token budget goes alone."""
+        parts: list[tuple[list[str], int]] = []
+        current: list[str] = []
+        tokens = 0
+        for text in texts:
+            n = estimate_tokens(text)
+            if current and (len(current) >= self.max_items or tokens + n > self.max_tokens):
+                parts.append((current, tokens))
+                current, tokens = [], 0
+            current.append(text)
+            tokens += n
+        parts.append((current, tokens))
+        return parts
+
+    async def embed(self, texts: list[str], input_type: str = "document") -> np.ndarray:
+        """Embed texts as part of the next batch(es); results are a float32 matrix in input order."""
+        if not texts:
+            return vec.zeros(0, 0)
+        queue = self._ensure_collector()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for part, tokens in self.split(list(texts)):
+            future = loop.create_future()
+            futures.append(future)
+            await queue.put(_Request(input_type=input_type, texts=part, tokens=tokens, future=future))
+        results = await asyncio.gather(*futures)
+        if len(results) == 1:
+            return results[0]
+        # Short responses stay short; the caller checks the count
+        parts = [vec.as_matrix(r) for r in results if len(r)]
+        return np.concatenate(parts) if parts else results[0]
+
+    async def _collect(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            first, self._carry = self._carry or await self._queue.get(), None
+            batch = [first]
+            items, tokens = len(first.texts), first.tokens
+            deadline = loop.time() + self.window
+            while items < self.max_items and tokens < self.max_tokens:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    req = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if items + len(req.texts) > self.max_items or tokens + req.tokens > self.max_tokens:
+                    self._carry = req
+                    break
+                batch.append(req)
+                items += len(req.texts)
+                tokens += req.tokens
+            for input_type in {r.input_type for r in batch}:
+                group = [r for r in batch if r.input_type == input_type]
+                task = loop.create_task(self._dispatch(group, input_type))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, group: list[_Request], input_type: str) -> None:
+        texts = [t for r in group for t in r.texts]
+        try:
+            vectors = await self.embed_fn(texts, input_type)
+        except Exception as e:
+            for r in group:
+                if not r.future.done():
+                    r.future.set_exception(e)
+            return
+        # A short response leaves short slices; callers check the count per request
+        offset = 0
+        for r in group:
+            n = len(r.texts)
+            if not r.future.done():
+                r.future.set_result(vectors[offset:offset + n])
+            offset += n
@@ -0,0 +1,178 @@
+"""
+HTTP embedding backend: OpenRouter-compatible /v1/embeddings endpoints.
+Reference: EMBEDDING_INDEXING_PLAN, TECH_DECISIONS (768d).
+
+Several endpoints can be configured (FROSTBYTE_EMBEDDING_ENDPOINTS, comma
+separated; defaults to FROSTBYTE_EMBEDDING_ENDPOINT). Each request goes to the
+healthy endpoint with the lowest latency (EWMA of successful calls) and fails
+over to the next one on a timeout, connection error, 429 or 5xx. Every endpoint
+has a circuit breaker: EMBEDDING_BREAKER_FAILURES consecutive failures open it
+for EMBEDDING_BREAKER_COOLDOWN_SEC, after which a single probe request is let
+through (half-open). Timeouts are short so a dead endpoint costs seconds, not
+the old 30 s per chunk. When no endpoint can serve, EmbeddingUnavailableError is
+raised so callers defer the job instead of writing placeholder vectors.
+
+Vectors are requested as base64 float32 (FROSTBYTE_EMBEDDING_ENCODING=base64) and
+decoded straight into a float32 matrix; set it to "float" for endpoints that only
+return JSON number lists.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import httpx
+import numpy as np
+
+from ..vectors import decode_embeddings
+
+EMBEDDING_ENDPOINT = os.getenv("FROSTBYTE_EMBEDDING_ENDPOINT", "http://localhost:8080/v1/embeddings")
+EMBEDDING_ENDPOINTS = [
+    u.strip() for u in os.getenv("FROSTBYTE_EMBEDDING_ENDPOINTS", EMBEDDING_ENDPOINT).split(",") if u.strip()
+]
+EMBEDDING_MODEL = os.getenv("FROSTBYTE_EMBEDDING_MODEL", "openai/text-embedding-3-small")
+EMBEDDING_ENCODING = os.getenv("FROSTBYTE_EMBEDDING_ENCODING", "base64")
+EMBEDDING_CONNECT_TIMEOUT_SEC = float(os.getenv("FROSTBYTE_EMBEDDING_CONNECT_TIMEOUT_SEC", "2"))
+EMBEDDING_HTTP_TIMEOUT_SEC = float(os.getenv("FROSTBYTE_EMBEDDING_TIMEOUT_SEC", "10"))
+EMBEDDING_BREAKER_FAILURES = int(os.getenv("EMBEDDING_BREAKER_FAILURES", "3"))
+EMBEDDING_BREAKER_COOLDOWN_SEC = float(os.getenv("EMBEDDING_BREAKER_COOLDOWN_SEC", "30"))
+EMBEDDING_LATENCY_ALPHA = 0.2
+
+
+class EmbeddingUnavailableError(Exception):
+    """Raised when no embedding backend can serve the request right now; retry later."""
+
+
+@dataclass
+class EndpointState:
+    """Latency and circuit-breaker state of one endpoint."""
+
+    url: str
+    latency: float | None = None
+    failures: int = 0
+    opened_at: float | None = None
+    probing: bool = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+
+class EndpointRouter:
+    """Least-latency endpoint selection with a per-endpoint circuit breaker."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        failure_threshold: int = EMBEDDING_BREAKER_FAILURES,
+        cooldown_sec: float = EMBEDDING_BREAKER_COOLDOWN_SEC,
+        alpha: float = EMBEDDING_LATENCY_ALPHA,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.endpoints = [EndpointState(url=u) for u in urls]
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_sec = cooldown_sec
+        self.alpha = alpha
+        self._clock = clock
+
+    def candidates(self) -> list[EndpointState]:
+        """
+        Endpoints to try, best first: closed breakers by EWMA latency (unmeasured
+        first), then at most one half-open probe per cooled-down endpoint.
+        """
+        now = self._clock()
+        closed = [e for e in self.endpoints if not e.is_open]
+        closed.sort(key=lambda e: e.latency or 0.0)
+        probes = [
+            e for e in self.endpoints
+            if e.is_open and not e.probing and now - e.opened_at >= self.cooldown_sec
+        ]
+        return closed + probes
+
+    def begin(self, endpoint: EndpointState) -> None:
+        if endpoint.is_open:
+            endpoint.probing = True
+
+    def record_success(self, endpoint: EndpointState, elapsed: float) -> None:
+        if endpoint.latency is None:
+            endpoint.latency = elapsed
+        else:
+            endpoint.latency = self.alpha * elapsed + (1 - self.alpha) * endpoint.latency
+        endpoint.failures = 0
+        endpoint.opened_at = None
+        endpoint.probing = False
+
+    def record_failure(self, endpoint: EndpointState) -> None:
+        endpoint.failures += 1
+        # A failed half-open probe re-opens immediately
+        if endpoint.probing or endpoint.failures >= self.failure_threshold:
+            endpoint.opened_at = self._clock()
+        endpoint.probing = False
+
+
+router = EndpointRouter(EMBEDDING_ENDPOINTS)
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Keep-alive client for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(EMBEDDING_HTTP_TIMEOUT_SEC, connect=EMBEDDING_CONNECT_TIMEOUT_SEC)
+        )
+        _client_loop = loop
+    return _client
+
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return isinstance(e, (httpx.TransportError, ValueError))
+
+
+async def _post(url: str, texts: list[str], dim: int) -> np.ndarray:
+    r = await _get_client().post(
+        url,
+        json={
+            "model": EMBEDDING_MODEL,
+            "input": texts,
+            "dimensions": dim,
+            "encoding_format": EMBEDDING_ENCODING,
+        },
+    )
+    r.raise_for_status()
+    # Providers may return items out of order; "index" is authoritative when present
+    return decode_embeddings(r.json().get("data", []))
+
+
+async def embed(texts: list[str], dim: int) -> np.ndarray:
+    """
+    Embed a batch of texts in one request, failing over across endpoints.
+    Returns a float32 (len(texts), dim) matrix in input order. Raises EmbeddingUnavailableError when every
+    endpoint is failing or has its breaker open; non-retryable 4xx errors propagate.
+    """
+    last_error: Exception | None = None
+    for endpoint in router.candidates():
+        router.begin(endpoint)
+        start = time.monotonic()
+        try:
+            vectors = await _post(endpoint.url, texts, dim)
+        except Exception as e:
+            if not _retryable(e):
+                endpoint.probing = False
+                raise
+            router.record_failure(endpoint)
+            last_error = e
+            continue
+        router.record_success(endpoint, time.monotonic() - start)
+        return vectors
+    if last_error is None:
+        raise EmbeddingUnavailableError("All embedding endpoints have an open circuit breaker")
+    raise EmbeddingUnavailableError(f"All embedding endpoints failed: {last_error}") from last_error
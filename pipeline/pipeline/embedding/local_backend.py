@@ -0,0 +1,110 @@
+"""
+Local embedding backend for offline (air-gapped) deployments.
+Reference: TECH_DECISIONS (Nomic embed-text, 768d).
+
+The model (NOMIC_MODEL_PATH: a local directory or hub id, default
+nomic-embed-text-v1.5) is loaded once in-process with sentence-transformers, on
+the torch or ONNX Runtime engine (EMBEDDING_LOCAL_ENGINE). Inference runs on a
+single dedicated thread so the event loop never blocks; torch/ORT intra-op
+threads are capped with EMBEDDING_LOCAL_THREADS. EMBEDDING_LOCAL_INT8=true uses
+int8 weights: dynamic quantization of the Linear layers on torch, or the
+quantized ONNX export. Nomic models expect task prefixes; documents and queries
+get different ones.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+import numpy as np
+
+EMBEDDING_LOCAL_MODEL = os.getenv("NOMIC_MODEL_PATH", "nomic-ai/nomic-embed-text-v1.5")
+EMBEDDING_LOCAL_ENGINE = os.getenv("EMBEDDING_LOCAL_ENGINE", "torch")
+EMBEDDING_LOCAL_THREADS = int(os.getenv("EMBEDDING_LOCAL_THREADS", "0"))
+EMBEDDING_LOCAL_BATCH_SIZE = int(os.getenv("EMBEDDING_LOCAL_BATCH_SIZE", "32"))
+EMBEDDING_LOCAL_INT8 = os.getenv("EMBEDDING_LOCAL_INT8", "false").lower() in ("true", "1", "yes")
+EMBEDDING_LOCAL_ONNX_FILE = os.getenv("EMBEDDING_LOCAL_ONNX_FILE", "onnx/model_quantized.onnx")
+EMBEDDING_LOCAL_DOC_PREFIX = os.getenv("EMBEDDING_LOCAL_DOC_PREFIX", "search_document: ")
+EMBEDDING_LOCAL_QUERY_PREFIX = os.getenv("EMBEDDING_LOCAL_QUERY_PREFIX", "search_query: ")
+
+_model = None
+_executor: ThreadPoolExecutor | None = None
+
+
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+
+    if EMBEDDING_LOCAL_THREADS > 0:
+        import torch
+
+        torch.set_num_threads(EMBEDDING_LOCAL_THREADS)
+
+    if EMBEDDING_LOCAL_ENGINE == "onnx":
+        model_kwargs = {}
+        if EMBEDDING_LOCAL_THREADS > 0:
+            import onnxruntime
+
+            opts = onnxruntime.SessionOptions()
+            opts.intra_op_num_threads = EMBEDDING_LOCAL_THREADS
+            opts.inter_op_num_threads = 1
+            model_kwargs["session_options"] = opts
+        if EMBEDDING_LOCAL_INT8:
+            model_kwargs["file_name"] = EMBEDDING_LOCAL_ONNX_FILE
+        return SentenceTransformer(
+            EMBEDDING_LOCAL_MODEL,
+            backend="onnx",
+            trust_remote_code=True,
+            model_kwargs=model_kwargs,
+        )
+    if EMBEDDING_LOCAL_ENGINE != "torch":
+        raise ValueError(f"EMBEDDING_LOCAL_ENGINE must be 'torch' or 'onnx', got {EMBEDDING_LOCAL_ENGINE!r}")
+
+    model = SentenceTransformer(EMBEDDING_LOCAL_MODEL, device="cpu", trust_remote_code=True)
+    if EMBEDDING_LOCAL_INT8:
+        import torch
+
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def _get_model():
+    """Load once; only ever called on the inference thread."""
+    global _model
+    if _model is None:
+        _model = _load_model()
+    return _model
+
+
+def _encode(texts: list[str], dim: int) -> np.ndarray:
+    vectors = _get_model().encode(
+        texts,
+        batch_size=EMBEDDING_LOCAL_BATCH_SIZE,
+        convert_to_numpy=True,
+    )
+    # Matryoshka truncation; the caller normalizes the truncated rows once
+    return np.ascontiguousarray(vectors[:, :dim], dtype=np.float32)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-local")
+    return _executor
+
+
+async def embed(
+    texts: list[str],
+    dim: int,
+    input_type: Literal["document", "query"] = "document",
+) -> np.ndarray:
+    """Embed a batch of texts on the inference thread. Returns a float32 matrix in input order."""
+    prefix = EMBEDDING_LOCAL_QUERY_PREFIX if input_type == "query" else EMBEDDING_LOCAL_DOC_PREFIX
+    prefixed = [prefix + t for t in texts]
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), _encode, prefixed, dim)
+
+
+async def preload() -> None:
+    """Load the model ahead of the first request."""
+    await asyncio.get_running_loop().run_in_executor(_get_executor(), _get_model)
@@ -53,7 +53,7 @@ class IntakeReceipt(BaseModel):
     mime_type: str
     size_bytes: int
     sha256: str
-    scan_result: Literal["clean", "quarantined", "skipped"]
+    scan_result: Literal["clean", "quarantined", "skipped", "pending"]
     received_at: datetime
     storage_path: str
     status: Literal["accepted", "rejected", "quarantined"]
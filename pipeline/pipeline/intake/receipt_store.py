@@ -67,3 +67,26 @@ async def load_receipt(tenant_id: str, receipt_id: str) -> IntakeReceipt | None:
         storage_path=row["storage_path"],
         status=row["status"],
     )
+
+
+async def update_scan_result(
+    tenant_id: str,
+    receipt_id: str,
+    scan_result: str,
+    status: str,
+) -> None:
+    """Settle a receipt left 'pending' by the deferred malware scan stage."""
+    from .. import db
+
+    pool = db._get_pool()
+    await pool.execute(
+        """
+        UPDATE intake_receipts
+        SET scan_result = $3, status = $4
+        WHERE tenant_id = $1 AND receipt_id = $2 AND scan_result = 'pending'
+        """,
+        tenant_id,
+        receipt_id,
+        scan_result,
+        status,
+    )
@@ -3,7 +3,6 @@ Intake gateway API routes per INTAKE_GATEWAY_PLAN Section 3.
 """
 from __future__ import annotations
 
-import asyncio
 import uuid
 from datetime import datetime, timezone
 from typing import Annotated
@@ -12,9 +11,14 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, s
 from fastapi.responses import JSONResponse
 
 from .. import auth, ratelimit
-from ..clamav_client import scan_bytes
+from ..clamav_client import CLAMAV_DEFER_SCAN, scan_bytes_async
 from ..parse_enqueue import enqueue_parse
+from ..scan_enqueue import enqueue_scan
 from ..events import publish_async
+from ..serving.access import TIER_WARMUP_RETRY_AFTER_SEC
+from ..storage.tiering import CollectionArchivedError
+from ..vector_import import VectorImportError, VectorImportUnavailableError, import_vectors
+from ..vector_store import VectorStoreError
 from . import receipt_store
 from . import service
 from .models import (
@@ -53,10 +57,9 @@ async def _get_tenant_config(tenant_id: str) -> dict:
         return {"config": {}, "config_version": 1}
 
 
-async def _malware_scan(content: bytes) -> tuple[str, str | None]:
-    """ClamAV instream scan. Returns (scan_result, threat_name)."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, scan_bytes, content)
+async def _malware_scan(content: bytes, sha256: str | None = None) -> tuple[str, str | None]:
+    """ClamAV instream scan (pooled, verdict-cached). Returns (scan_result, threat_name)."""
+    return await scan_bytes_async(content, sha256)
 
 
 @router.post("/{tenant_id}/batch")
@@ -157,6 +160,7 @@ async def post_batch(
         enqueue_parse_fn=enqueue_parse,
         get_tenant_config_fn=_get_tenant_config,
         malware_scan_fn=_malware_scan,
+        enqueue_scan_fn=enqueue_scan if CLAMAV_DEFER_SCAN else None,
     )
 
     # Emit completion event
@@ -230,3 +234,45 @@ async def get_receipt(
         raise HTTPException(status_code=404, detail={"code": "RESOURCE_NOT_FOUND", "message": "Receipt not found"})
 
     return {"success": True, "data": receipt.model_dump(mode="json")}
+
+
+@router.post("/{tenant_id}/vectors")
+async def post_vectors(
+    tenant_id: str,
+    file: UploadFile = File(..., description="Parquet or Arrow IPC file: chunk_id, doc_id, vector, payload"),
+    token_tenant_id: Annotated[str | None, Depends(auth.get_tenant_from_token)] = None,
+):
+    """
+    Bulk import of precomputed embeddings (pipeline.vector_import), bypassing parse and
+    embed. The upload is spooled to a temporary file and streamed in record batches
+    into Qdrant and Postgres; batches commit as they go, so an error reports rows_imported.
+    """
+    resolved_tenant_id = auth.require_tenant_or_bypass(tenant_id, token_tenant_id)
+    await ratelimit.check_rate_limit(resolved_tenant_id, limit=10, window_sec=60)
+    filename = file.filename or "vector-import"
+    try:
+        result = await import_vectors(file.file, tenant_id=resolved_tenant_id, filename=filename)
+    except VectorImportUnavailableError as e:
+        raise HTTPException(status_code=503, detail={"code": "VECTOR_IMPORT_UNAVAILABLE", "message": str(e)})
+    except VectorImportError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "VECTOR_IMPORT_INVALID", "message": str(e), "rows_imported": e.rows_imported},
+        )
+    except CollectionArchivedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"code": "COLLECTION_WARMING", "message": str(e)},
+            headers={"Retry-After": str(TIER_WARMUP_RETRY_AFTER_SEC)},
+        )
+    except VectorStoreError as e:
+        raise HTTPException(status_code=503, detail={"code": "VECTOR_STORE_UNAVAILABLE", "message": str(e)})
+
+    await _emit_audit(resolved_tenant_id, "VECTORS_IMPORTED", filename, result.as_dict())
+    await publish_async(
+        "INTAKE",
+        f"Imported {result.rows} vectors from {filename}",
+        "success",
+        tenant_id=resolved_tenant_id,
+    )
+    return {"success": True, "data": result.as_dict()}
@@ -31,9 +31,12 @@ async def process_batch(
     enqueue_parse_fn,
     get_tenant_config_fn,
     malware_scan_fn,
+    enqueue_scan_fn=None,
 ) -> BatchReceiptResponse:
     """
     Process batch: validate each file, store accepted, emit audit, enqueue parse jobs.
+    When enqueue_scan_fn is given, the malware scan is deferred: files are stored with
+    scan_result 'pending' and a scan job is enqueued instead of a parse job.
     """
     receipts: list[ReceiptEntry] = []
     rejected: list[RejectedFile] = []
@@ -109,8 +112,13 @@ async def process_batch(
             )
             continue
 
-        # Malware scan (optional)
-        scan_result, threat = await malware_scan_fn(content)
+        sha256 = validation.compute_sha256(content)
+
+        # Malware scan (optional; deferred to the scan worker when enqueue_scan_fn is set)
+        if enqueue_scan_fn is not None:
+            scan_result, threat = "pending", None
+        else:
+            scan_result, threat = await malware_scan_fn(content, sha256)
         if scan_result == "infected":
             quarantined.append(QuarantinedFile(
                 file_id=mf.file_id,
@@ -127,7 +135,6 @@ async def process_batch(
             continue
 
         # Store in MinIO
-        sha256 = validation.compute_sha256(content)
         storage_path = f"raw/{tenant_id}/{mf.file_id}/{sha256}"
         await s3_put_fn(storage_path, content)
 
@@ -151,6 +158,19 @@ async def process_batch(
         receipts.append(ReceiptEntry(receipt_id=receipt_id, file_id=mf.file_id, status="accepted"))
         accepted += 1
 
+        if scan_result == "pending":
+            # DOCUMENT_INGESTED and the parse job follow once the scan worker clears the file
+            await enqueue_scan_fn(
+                receipt_id=receipt_id,
+                file_id=mf.file_id,
+                batch_id=batch_id,
+                sha256=sha256,
+                storage_path=storage_path,
+                tenant_id=tenant_id,
+                mime_type=sniffed,
+            )
+            continue
+
         await emit_audit_fn(
             tenant_id=tenant_id,
             event_type="DOCUMENT_INGESTED",
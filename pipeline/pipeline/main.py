@@ -4,7 +4,7 @@ Intake -> parse (stub) -> store metadata + vectors.
 Single-tenant, local Docker. Per docs/product/PRD.md and docs/reference/TECH_DECISIONS.md.
 Multi-modal support: images, audio, video (Enhancement #9).
 """
-import base64
+import asyncio
 import json
 import logging
 import os
@@ -17,20 +17,27 @@ import httpx
 import redis.asyncio as redis
 from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
 
-from . import db
+from . import db, metrics
 from .config import PlatformConfig
 from .events import publish_async, publish_unimplemented_stages
 from .intake.routes import router as intake_router
-from .multimodal import detect_modality
+from .multimodal import detect_modality, transcription
+from .multimodal.config import WHISPER_PRELOAD
+from .multimodal_enqueue import enqueue_multimodal
 from .routes.auth_routes import router as auth_router
 from .routes.collections import router as collections_router
 from .routes.tenant_schemas import router as tenant_schemas_router
+from .serving.access import TIER_WARMUP_RETRY_AFTER_SEC
+from .serving.cache import _get_redis, bump_collection_versions
+from .serving.routes import router as serving_router
+from .storage.index_profiles import get_profile
+from .storage.tiering import CollectionArchivedError, check_writable
+from .vector_store import store_embeddings
 
 # Config from env
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://localhost:9000")
@@ -75,10 +82,7 @@ def get_qdrant():
         try:
             _qdrant.get_collection(coll)
         except Exception:
-            _qdrant.create_collection(
-                collection_name=coll,
-                vectors_config=VectorParams(size=768, distance=Distance.COSINE),
-            )
+            _qdrant.create_collection(collection_name=coll, **get_profile().collection_kwargs(768))
     return _qdrant
 
 
@@ -96,7 +100,11 @@ async def lifespan(app: FastAPI):
         await db.init_db(cfg.control_db_url)
     except Exception as e:
         logging.getLogger("uvicorn.error").warning("Control-plane DB init skipped: %s", e)
+    if WHISPER_PRELOAD:
+        # Warm the transcription pool in the background; the first audio query won't pay model load
+        asyncio.create_task(transcription.preload())
     yield
+    transcription.shutdown()
     try:
         await db.close_db()
     except Exception:
@@ -118,6 +126,7 @@ app.include_router(auth_router)
 app.include_router(intake_router)
 app.include_router(collections_router)
 app.include_router(tenant_schemas_router)
+app.include_router(serving_router)
 
 
 def _check_service(name: str, url: str) -> bool:
@@ -197,6 +206,12 @@ async def health():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat() + "Z"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Process metrics (query cache hit ratio and latency savings) in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 REDIS_URL = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 
 
@@ -257,18 +272,13 @@ async def intake(
             s3 = get_s3()
             s3.put_object(Bucket=BUCKET, Key=key, Body=contents)
             await publish_async("INTAKE", f"Stored to MinIO: {key}", "success", document_id=str(doc_id), tenant_id=tenant_id)
-            r = redis.from_url(REDIS_URL)
-            await r.rpush(
-                "multimodal:jobs",
-                json.dumps({
-                    "job_id": str(uuid.uuid4()),
-                    "document_id": str(doc_id),
-                    "tenant_id": tenant_id,
-                    "filename": filename,
-                    "content": base64.b64encode(contents).decode("ascii"),
-                }),
+            await enqueue_multimodal(
+                document_id=str(doc_id),
+                tenant_id=tenant_id,
+                filename=filename,
+                modality=modality,
+                content=contents,
             )
-            await r.aclose()
             await publish_async("INTAKE", f"Multimodal job queued: {modality} worker will process {filename}", "info", document_id=str(doc_id), tenant_id=tenant_id)
             now = datetime.utcnow().isoformat() + "Z"
             _docs[str(doc_id)] = {
@@ -292,7 +302,16 @@ async def intake(
                 raise HTTPException(status_code=503, detail="Documents table not ready; run migration 007")
             raise
 
-    # Text path: existing flow
+    # Text path: existing flow. Archived collections (storage tiering) are restored first
+    r = _get_redis()
+    try:
+        await check_writable(r, tenant_id)
+    except CollectionArchivedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"code": "COLLECTION_WARMING", "message": str(e)},
+            headers={"Retry-After": str(TIER_WARMUP_RETRY_AFTER_SEC)},
+        )
     doc_id = str(uuid.uuid4())
     key = f"{tenant_id}/{doc_id}/{filename}"
     s3 = get_s3()
@@ -307,27 +326,13 @@ async def intake(
     vector = [0.0] * 768
     await publish_async("EMBED", f"Generated 768d stub embedding for {filename}", "info", document_id=doc_id, tenant_id=tenant_id)
 
-    # Store vector in Qdrant
-    qdrant = get_qdrant()
-    coll = f"tenant_{tenant_id}"
-    try:
-        qdrant.get_collection(coll)
-    except Exception:
-        qdrant.create_collection(
-            collection_name=coll,
-            vectors_config=VectorParams(size=768, distance=Distance.COSINE),
-        )
-    qdrant.upsert(
-        collection_name=coll,
-        points=[
-            PointStruct(
-                id=hash(doc_id) % (2**63),
-                vector=vector,
-                payload={"doc_id": doc_id, "tenant_id": tenant_id, "preview": text[:200]},
-            )
-        ],
+    # Store vector in Qdrant: the tenant's placement, payload indexes, and cached results invalidated
+    collections = await store_embeddings(
+        tenant_id=tenant_id,
+        points=[(doc_id, vector, {"doc_id": doc_id, "modality": "text", "preview": text[:200]})],
     )
-    await publish_async("VECTOR", f"Upserted to Qdrant collection {coll}", "success", document_id=doc_id, tenant_id=tenant_id)
+    await bump_collection_versions(r, tenant_id, collections)
+    await publish_async("VECTOR", f"Upserted to Qdrant collection {collections[0]}", "success", document_id=doc_id, tenant_id=tenant_id)
 
     # Store metadata (in-memory for 1hr; replace with PostgreSQL)
     _docs[doc_id] = {
@@ -0,0 +1,83 @@
+"""
+Process-local counters and gauges, exposed in Prometheus text format on GET /metrics.
+
+Kept dependency-free: values live in this process only (each API worker reports its
+own), which is what a Prometheus scrape per instance expects. Queue workers, which
+have no API, expose the same text on their own port with serve().
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+_lock = threading.Lock()
+_help: dict[str, tuple[str, str]] = {}
+_values: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+_started = time.time()
+
+
+def describe(name: str, kind: str, help_text: str) -> None:
+    """Register a metric's TYPE (counter or gauge) and HELP line."""
+    with _lock:
+        _help[name] = (kind, help_text)
+        _values.setdefault(name, {})
+
+
+def _labels(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels: str) -> None:
+    with _lock:
+        series = _values.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    with _lock:
+        _values.setdefault(name, {})[_labels(labels)] = value
+
+
+def value(name: str, **labels: str) -> float:
+    with _lock:
+        return _values.get(name, {}).get(_labels(labels), 0.0)
+
+
+def render() -> str:
+    """Prometheus text exposition format 0.0.4."""
+    lines = [
+        "# TYPE frostbyte_process_uptime_seconds gauge",
+        f"frostbyte_process_uptime_seconds {time.time() - _started:.3f}",
+    ]
+    with _lock:
+        for name in sorted(_values):
+            kind, help_text = _help.get(name, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, v in sorted(_values[name].items()):
+                label_str = ",".join(f'{k}="{val}"' for k, val in labels)
+                lines.append(f"{name}{{{label_str}}} {v:g}" if label_str else f"{name} {v:g}")
+    return "\n".join(lines) + "\n"
+
+
+async def serve(port: int, host: str = "0.0.0.0") -> asyncio.AbstractServer:
+    """Minimal HTTP endpoint answering every request with render() (for worker processes)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
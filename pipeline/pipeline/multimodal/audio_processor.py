@@ -1,6 +1,9 @@
 """
 Audio processing: transcription via Whisper.
 Reference: Enhancement #9 PRD.
+
+Whisper runs on the transcription pool (see transcription.py), never in this process.
+Silence is dropped first and each speech segment becomes its own timed chunk.
 """
 from __future__ import annotations
 
@@ -8,34 +11,22 @@ import os
 import tempfile
 from pathlib import Path
 
-import whisper
-
-from .config import WHISPER_MODEL
-
-_whisper_model = None
-
-
-def _get_whisper_model():
-    global _whisper_model
-    if _whisper_model is None:
-        _whisper_model = whisper.load_model(WHISPER_MODEL)
-    return _whisper_model
+from .transcription import transcribe_segmented
 
 
 async def process_audio(content: bytes, filename: str) -> dict:
     """
-    Transcribe audio with Whisper. Returns {transcript, modality}.
+    Transcribe audio with Whisper. Returns {transcript, segments, modality};
+    segments are [{start, end, text}] in seconds, bounded by VAD_MAX_SEGMENT_SEC.
     """
     with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix or "") as tmp:
         tmp.write(content)
         tmp_path = tmp.name
     try:
-        model = _get_whisper_model()
-        result = model.transcribe(tmp_path)
-        transcript = result.get("text", "")
+        result = await transcribe_segmented(tmp_path)
     finally:
         try:
             os.unlink(tmp_path)
         except OSError:
             pass
-    return {"transcript": transcript, "modality": "audio"}
+    return {"transcript": result["text"], "segments": result["segments"], "modality": "audio"}
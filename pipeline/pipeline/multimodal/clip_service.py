@@ -0,0 +1,136 @@
+"""
+CLIP encoding service: batched, off-loop inference for images and query text.
+Reference: Enhancement #9 PRD.
+
+Callers (image/video processors, the collections query route) submit images or
+texts and await a future. A collector gathers requests for CLIP_BATCH_WINDOW_MS
+or until CLIP_BATCH_SIZE items are queued, then runs one SentenceTransformer.encode
+call over the whole batch on a dedicated inference thread, so the model's batch
+dimension is used and the event loop never blocks on inference.
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import numpy as np
+
+from .config import CLIP_BATCH_SIZE, CLIP_BATCH_WINDOW_MS, CLIP_MODEL_NAME, CLIP_NUM_THREADS
+
+_model = None
+
+
+def _get_model():
+    """Load CLIP once; only ever called on the inference thread."""
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+
+        if CLIP_NUM_THREADS > 0:
+            import torch
+
+            torch.set_num_threads(CLIP_NUM_THREADS)
+        _model = SentenceTransformer(CLIP_MODEL_NAME)
+    return _model
+
+
+def _encode(items: list[Any]) -> np.ndarray:
+    return _get_model().encode(items, batch_size=CLIP_BATCH_SIZE, convert_to_numpy=True)
+
+
+@dataclass
+class _Request:
+    kind: Literal["image", "text"]
+    items: list[Any]
+    future: asyncio.Future = field(repr=False)
+
+
+class ClipEncoder:
+    """Micro-batching CLIP encoder bound to the running event loop."""
+
+    def __init__(self, batch_size: int = CLIP_BATCH_SIZE, window_ms: float = CLIP_BATCH_WINDOW_MS) -> None:
+        self.batch_size = max(1, batch_size)
+        self.window = window_ms / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clip")
+        self._queue: asyncio.Queue[_Request] | None = None
+        self._collector: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_collector(self) -> asyncio.Queue[_Request]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+        return self._queue
+
+    async def _submit(self, kind: Literal["image", "text"], items: list[Any]) -> np.ndarray:
+        if not items:
+            return np.zeros((0, 0), dtype=np.float32)
+        queue = self._ensure_collector()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put(_Request(kind=kind, items=list(items), future=future))
+        return await future
+
+    async def _collect(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].items)
+            deadline = loop.time() + self.window
+            while size < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    req = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(req)
+                size += len(req.items)
+            for kind in ("image", "text"):
+                group = [r for r in batch if r.kind == kind]
+                if group:
+                    await self._dispatch(group)
+
+    async def _dispatch(self, group: list[_Request]) -> None:
+        items = [item for r in group for item in r.items]
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, _encode, items)
+        except Exception as e:
+            for r in group:
+                if not r.future.done():
+                    r.future.set_exception(e)
+            return
+        offset = 0
+        for r in group:
+            n = len(r.items)
+            if not r.future.done():
+                r.future.set_result(vectors[offset:offset + n])
+            offset += n
+
+    async def encode_images(self, images: list[Any]) -> np.ndarray:
+        """Encode PIL images; returns float32 array of shape (len(images), 512)."""
+        return await self._submit("image", images)
+
+    async def encode_image(self, image: Any) -> np.ndarray:
+        """Encode one PIL image; returns a 512-d float32 vector."""
+        return (await self.encode_images([image]))[0]
+
+    async def encode_texts(self, texts: list[str]) -> np.ndarray:
+        """Encode texts with the CLIP text tower (same space as images)."""
+        return await self._submit("text", texts)
+
+
+_encoder: ClipEncoder | None = None
+
+
+def get_clip_encoder() -> ClipEncoder:
+    """Process-wide CLIP encoder (one model, one inference thread)."""
+    global _encoder
+    if _encoder is None:
+        _encoder = ClipEncoder()
+    return _encoder
@@ -10,3 +10,62 @@ TESSERACT_CMD = os.getenv("TESSERACT_CMD", "/usr/bin/tesseract")
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
 CLIP_MODEL_NAME = os.getenv("CLIP_MODEL_NAME", "sentence-transformers/clip-ViT-B-32")
 FFMPEG_PATH = os.getenv("FFMPEG_PATH", "/usr/bin/ffmpeg")
+FFPROBE_PATH = os.getenv("FFPROBE_PATH", "/usr/bin/ffprobe")
+
+# Video frame sampling: "fps" (fixed rate), "keyframes" (I-frames only) or "scene" (scene changes)
+FRAME_SAMPLING_POLICY = os.getenv("FRAME_SAMPLING_POLICY", "fps")
+FRAME_SAMPLE_FPS = float(os.getenv("FRAME_SAMPLE_FPS", "1.0"))
+FRAME_SCENE_THRESHOLD = float(os.getenv("FRAME_SCENE_THRESHOLD", "0.3"))
+FRAME_MAX_SAMPLES = int(os.getenv("FRAME_MAX_SAMPLES", "0"))  # 0 = no cap
+# Sampling intervals at or above this many seconds seek instead of stepping through frames;
+# the 1.0 default sends the default 1 fps rate down the seek path
+FRAME_SEEK_MIN_INTERVAL_SEC = float(os.getenv("FRAME_SEEK_MIN_INTERVAL_SEC", "1.0"))
+
+# Perceptual-hash (dHash) frame dedup: frames within this Hamming distance of the
+# current run's representative are collapsed into it
+FRAME_DEDUP_ENABLED = os.getenv("FRAME_DEDUP_ENABLED", "true").lower() in ("true", "1", "yes")
+FRAME_DEDUP_MAX_DISTANCE = int(os.getenv("FRAME_DEDUP_MAX_DISTANCE", "5"))
+
+# CLIP encoding service: micro-batch window and max batch on the dedicated inference thread
+CLIP_BATCH_SIZE = int(os.getenv("CLIP_BATCH_SIZE", "32"))
+CLIP_BATCH_WINDOW_MS = float(os.getenv("CLIP_BATCH_WINDOW_MS", "10"))
+CLIP_NUM_THREADS = int(os.getenv("CLIP_NUM_THREADS", "0"))  # 0 = torch default
+
+# Whisper transcription pool: worker processes (model loaded once each), in-flight cap,
+# max media duration, API query timeout and transcript cache size
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "2"))
+WHISPER_MAX_CONCURRENCY = int(os.getenv("WHISPER_MAX_CONCURRENCY", str(WHISPER_WORKERS)))
+WHISPER_MAX_DURATION_SEC = float(os.getenv("WHISPER_MAX_DURATION_SEC", "14400"))
+WHISPER_QUERY_TIMEOUT_SEC = float(os.getenv("WHISPER_QUERY_TIMEOUT_SEC", "30"))
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() in ("true", "1", "yes")
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "256"))
+
+# Voice activity detection before transcription: energy | webrtc (needs webrtcvad),
+# frame size, speech threshold, padding/merging, and max segment length sent to Whisper
+VAD_BACKEND = os.getenv("VAD_BACKEND", "energy")
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_ENERGY_THRESHOLD_DB = float(os.getenv("VAD_ENERGY_THRESHOLD_DB", "-50"))
+VAD_DYNAMIC_RANGE_DB = float(os.getenv("VAD_DYNAMIC_RANGE_DB", "35"))
+VAD_WEBRTC_AGGRESSIVENESS = int(os.getenv("VAD_WEBRTC_AGGRESSIVENESS", "2"))
+VAD_PAD_MS = int(os.getenv("VAD_PAD_MS", "200"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+VAD_MAX_SEGMENT_SEC = float(os.getenv("VAD_MAX_SEGMENT_SEC", "30"))
+VAD_STREAM_BLOCK_SEC = float(os.getenv("VAD_STREAM_BLOCK_SEC", "10"))
+
+# Video engine: frame analysis split into time segments across a process pool;
+# frames are shipped back at CLIP input resolution (short side, px)
+VIDEO_SEGMENT_SEC = float(os.getenv("VIDEO_SEGMENT_SEC", "120"))
+VIDEO_SEGMENT_WORKERS = int(os.getenv("VIDEO_SEGMENT_WORKERS", str(os.cpu_count() or 1)))
+VIDEO_CLIP_IMAGE_SIZE = int(os.getenv("VIDEO_CLIP_IMAGE_SIZE", "224"))
+
+# OCR subsystem: bounded tesseract process pool, DPI normalization, tiling of huge pages
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_DEFAULT_DPI = int(os.getenv("OCR_DEFAULT_DPI", "300"))
+OCR_TILE_MAX_PIXELS = int(os.getenv("OCR_TILE_MAX_PIXELS", str(20_000_000)))
+OCR_TILE_HEIGHT = int(os.getenv("OCR_TILE_HEIGHT", "2048"))
+OCR_TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", "64"))
+# Pages above this many pixels are rejected undecoded (Pillow's own error threshold,
+# which it only applies to the first frame of a file)
+OCR_MAX_PAGE_PIXELS = int(os.getenv("OCR_MAX_PAGE_PIXELS", str(2 * 89_478_485)))
@@ -0,0 +1,75 @@
+"""
+Perceptual-hash deduplication of sampled video frames.
+Reference: Enhancement #9 PRD.
+
+Screen recordings and slide decks repeat the same picture for minutes. Each
+sampled frame gets a 64-bit dHash; consecutive frames within
+FRAME_DEDUP_MAX_DISTANCE bits of the current run's first frame are folded into
+that run, so OCR, CLIP and storage run once per distinct picture together with
+the time range it was on screen.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import Image
+
+from .config import FRAME_DEDUP_ENABLED, FRAME_DEDUP_MAX_DISTANCE
+
+if TYPE_CHECKING:
+    from .frame_sampler import SampledFrame
+
+
+@dataclass(frozen=True)
+class FrameRun:
+    """A run of near-identical frames, represented by its first frame."""
+
+    start: float
+    end: float
+    image: np.ndarray
+    phash: int
+    frame_count: int
+
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """Difference hash: sign of horizontal gradients on a (hash_size+1) x hash_size grayscale thumbnail."""
+    thumb = Image.fromarray(image).convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    px = np.asarray(thumb, dtype=np.int16)
+    bits = (px[:, 1:] > px[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def collapse_runs(
+    frames: Iterable[SampledFrame],
+    max_distance: int = FRAME_DEDUP_MAX_DISTANCE,
+    enabled: bool = FRAME_DEDUP_ENABLED,
+) -> Iterator[FrameRun]:
+    """
+    Fold consecutive near-identical frames into runs, streaming in timestamp order.
+    With dedup disabled every frame is its own run.
+    """
+    current: FrameRun | None = None
+    for frame in frames:
+        h = dhash(frame.image)
+        if enabled and current is not None and hamming(h, current.phash) <= max_distance:
+            current = FrameRun(
+                start=current.start,
+                end=frame.timestamp,
+                image=current.image,
+                phash=current.phash,
+                frame_count=current.frame_count + 1,
+            )
+            continue
+        if current is not None:
+            yield current
+        current = FrameRun(start=frame.timestamp, end=frame.timestamp, image=frame.image, phash=h, frame_count=1)
+    if current is not None:
+        yield current
@@ -0,0 +1,199 @@
+"""
+Video frame sampling without decoding every frame into Python.
+Reference: Enhancement #9 PRD.
+
+Policies (FRAME_SAMPLING_POLICY):
+- fps:       fixed rate (FRAME_SAMPLE_FPS). Sparse rates seek straight to each
+             timestamp; dense rates step with grab() and only retrieve() the
+             frames that are kept, so skipped frames are never colour-converted
+             or copied into numpy.
+- keyframes: I-frames only. ffprobe lists keyframe timestamps with
+             -skip_frame nokey, then each keyframe is read by seeking, so decode
+             work is one keyframe per sample.
+- scene:     frames where ffmpeg's scene score exceeds FRAME_SCENE_THRESHOLD;
+             scoring runs natively in ffmpeg, then the chosen frames are read by seeking.
+
+All policies accept a [start, end) window so a long video can be sampled in
+independent time segments (see video_engine); fixed-rate timestamps stay on the
+same global grid whichever segment produces them.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import cv2
+import ffmpeg
+import numpy as np
+
+from .config import (
+    FFPROBE_PATH,
+    FRAME_MAX_SAMPLES,
+    FRAME_SAMPLE_FPS,
+    FRAME_SAMPLING_POLICY,
+    FRAME_SCENE_THRESHOLD,
+    FRAME_SEEK_MIN_INTERVAL_SEC,
+)
+
+SAMPLING_POLICIES = ("fps", "keyframes", "scene")
+
+
+@dataclass(frozen=True)
+class SampledFrame:
+    """One sampled video frame: timestamp in seconds and an RGB uint8 array (H, W, 3)."""
+
+    timestamp: float
+    image: np.ndarray
+
+
+def _to_rgb(frame: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def _read_at(cap: cv2.VideoCapture, timestamp: float) -> np.ndarray | None:
+    cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000.0)
+    ok, frame = cap.read()
+    return _to_rgb(frame) if ok else None
+
+
+def _frame_times(probe: dict) -> list[float]:
+    times: list[float] = []
+    for f in probe.get("frames", []):
+        t = f.get("pts_time") or f.get("best_effort_timestamp_time")
+        if t not in (None, "N/A"):
+            times.append(float(t))
+    return sorted(times)
+
+
+def _in_window(times: list[float], start: float, end: float | None) -> list[float]:
+    return [t for t in times if t >= start and (end is None or t < end)]
+
+
+def _keyframe_times(video_path: str, start: float = 0.0, end: float | None = None) -> list[float]:
+    """Keyframe timestamps; ffprobe decodes only keyframes with -skip_frame nokey."""
+    options = {}
+    if start > 0 or end is not None:
+        options["read_intervals"] = f"{start}%{end}" if end is not None else f"{start}%"
+    probe = ffmpeg.probe(
+        video_path,
+        cmd=FFPROBE_PATH,
+        select_streams="v:0",
+        skip_frame="nokey",
+        show_entries="frame=pts_time,best_effort_timestamp_time",
+        **options,
+    )
+    return _in_window(_frame_times(probe), start, end)
+
+
+def _escape_filter_path(path: str) -> str:
+    for ch in ("\\", ":", "'", ",", ";", "[", "]"):
+        path = path.replace(ch, "\\" + ch)
+    return path
+
+
+def _scene_change_times(
+    video_path: str,
+    threshold: float,
+    start: float = 0.0,
+    end: float | None = None,
+) -> list[float]:
+    """Timestamps of frames whose scene score exceeds threshold (window start always kept)."""
+    graph = f"movie={_escape_filter_path(video_path)}"
+    if start > 0:
+        graph += f":seek_point={start}"
+    if end is not None:
+        graph += f",trim=end={end}"
+    graph += f",select=gt(scene\\,{threshold})"
+    probe = ffmpeg.probe(graph, cmd=FFPROBE_PATH, f="lavfi", show_entries="frame=pts_time")
+    times = _in_window(_frame_times(probe), start, end)
+    if not times or times[0] > start:
+        times.insert(0, start)
+    return times
+
+
+def _sample_at(cap: cv2.VideoCapture, times: list[float]) -> Iterator[SampledFrame]:
+    for t in times:
+        image = _read_at(cap, t)
+        if image is not None:
+            yield SampledFrame(timestamp=t, image=image)
+
+
+def _sample_fixed_fps(
+    cap: cv2.VideoCapture,
+    fps: float,
+    start: float = 0.0,
+    end: float | None = None,
+) -> Iterator[SampledFrame]:
+    native_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+    interval = 1.0 / fps
+    first = math.ceil(start / interval - 1e-9)
+
+    if native_fps <= 0:
+        # Unknown frame rate: fall back to seeking by time until reads fail
+        i = first
+        while end is None or i * interval < end:
+            image = _read_at(cap, i * interval)
+            if image is None:
+                return
+            yield SampledFrame(timestamp=i * interval, image=image)
+            i += 1
+        return
+
+    if interval >= FRAME_SEEK_MIN_INTERVAL_SEC and frame_count > 0:
+        duration = frame_count / native_fps
+        stop = min(duration, end) if end is not None else duration
+        n = int(stop // interval) + 1
+        yield from _sample_at(cap, [i * interval for i in range(first, n) if i * interval < stop])
+        return
+
+    step = interval * native_fps
+    index = 0
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_MSEC, start * 1000.0)
+        index = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    next_index = math.ceil(index / step - 1e-9) * step
+    while cap.grab():
+        if end is not None and index / native_fps >= end:
+            break
+        if index >= next_index:
+            ok, frame = cap.retrieve()
+            if ok:
+                yield SampledFrame(timestamp=index / native_fps, image=_to_rgb(frame))
+            next_index += step
+        index += 1
+
+
+def sample_frames(
+    video_path: str,
+    policy: str = FRAME_SAMPLING_POLICY,
+    fps: float = FRAME_SAMPLE_FPS,
+    scene_threshold: float = FRAME_SCENE_THRESHOLD,
+    max_samples: int = FRAME_MAX_SAMPLES,
+    start: float = 0.0,
+    end: float | None = None,
+) -> Iterator[SampledFrame]:
+    """
+    Yield sampled frames from a local video file in timestamp order, limited to
+    the [start, end) window in seconds. Raises ValueError for an unknown policy.
+    """
+    if policy not in SAMPLING_POLICIES:
+        raise ValueError(f"Unknown frame sampling policy {policy!r}; expected one of {SAMPLING_POLICIES}")
+    if fps <= 0:
+        raise ValueError(f"fps must be positive, got {fps}")
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if policy == "keyframes":
+            frames = _sample_at(cap, _keyframe_times(video_path, start, end))
+        elif policy == "scene":
+            frames = _sample_at(cap, _scene_change_times(video_path, scene_threshold, start, end))
+        else:
+            frames = _sample_fixed_fps(cap, fps, start, end)
+        if max_samples > 0:
+            frames = itertools.islice(frames, max_samples)
+        yield from frames
+    finally:
+        cap.release()
@@ -6,25 +6,27 @@ from __future__ import annotations
 
 import io
 
-import pytesseract
 from PIL import Image
-from sentence_transformers import SentenceTransformer
 
-from .config import CLIP_MODEL_NAME, TESSERACT_CMD
+from .clip_service import get_clip_encoder
+from .config import OCR_MAX_PAGE_PIXELS
+from .ocr import ocr_document
 from ..events import publish_async
 
-# Configure Tesseract path
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+# CLIP resizes to 224px anyway; decode large scans no bigger than this for it
+_CLIP_DECODE_MAX = 1024
 
-# Lazy-load CLIP model
-_clip_model: SentenceTransformer | None = None
 
-
-def _get_clip_model() -> SentenceTransformer:
-    global _clip_model
-    if _clip_model is None:
-        _clip_model = SentenceTransformer(CLIP_MODEL_NAME)
-    return _clip_model
+def _clip_image(content: bytes) -> Image.Image | None:
+    """First page decoded for CLIP, or None when it is too large to decode."""
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if image.width * image.height > OCR_MAX_PAGE_PIXELS:
+                return None
+            image.thumbnail((_CLIP_DECODE_MAX, _CLIP_DECODE_MAX))
+            return image.convert("RGB")
+    except Image.DecompressionBombError:
+        return None
 
 
 async def process_image(
@@ -35,7 +37,9 @@ async def process_image(
 ) -> dict:
     """
     Extract OCR text and CLIP embedding from image.
-    Returns: {ocr_text, embedding, modality}
+    Returns: {ocr_text, pages, embedding, modality}; pages is [{page, text}] with one
+    entry per page of a multi-page TIFF (1-based). CLIP embeds the first page;
+    embedding is None when that page is rejected as too large to decode.
     """
     await publish_async(
         "MULTIMODAL",
@@ -46,7 +50,7 @@ async def process_image(
     )
     
     try:
-        image = Image.open(io.BytesIO(content)).convert("RGB")
+        image = _clip_image(content)
         
         # OCR
         await publish_async(
@@ -56,7 +60,17 @@ async def process_image(
             document_id=document_id,
             tenant_id=tenant_id,
         )
-        ocr_text = pytesseract.image_to_string(image)
+        pages = await ocr_document(content, filename)
+        ocr_text = "\n\n".join(p["text"] for p in pages)
+        rejected = [p["page"] for p in pages if p.get("rejected")]
+        if rejected:
+            await publish_async(
+                "MULTIMODAL",
+                f"Skipped {len(rejected)} page(s) of {filename} too large to decode: {rejected}",
+                "warning",
+                document_id=document_id,
+                tenant_id=tenant_id,
+            )
         
         # CLIP embedding
         await publish_async(
@@ -66,12 +80,12 @@ async def process_image(
             document_id=document_id,
             tenant_id=tenant_id,
         )
-        clip = _get_clip_model()
-        embedding = clip.encode(image).tolist()
+        embedding = await get_clip_encoder().encode_image(image) if image is not None else None
         
         await publish_async(
             "MULTIMODAL",
-            f"Image processing complete: {len(ocr_text)} chars OCR, {len(embedding)}d embedding",
+            f"Image processing complete: {len(ocr_text)} chars OCR, "
+            f"{f'{len(embedding)}d' if embedding is not None else 'no'} embedding",
             "success",
             document_id=document_id,
             tenant_id=tenant_id,
@@ -79,6 +93,7 @@ async def process_image(
         
         return {
             "ocr_text": ocr_text,
+            "pages": pages,
             "embedding": embedding,
             "modality": "image",
         }
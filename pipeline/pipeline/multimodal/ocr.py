@@ -0,0 +1,185 @@
+"""
+OCR subsystem: Tesseract on a bounded process pool.
+Reference: Enhancement #9 PRD.
+
+The uploaded file is written to disk once and pool processes open it themselves,
+one page per job, so a multi-page TIFF is never held in memory as a whole and
+every page becomes its own result. Before OCR each page is converted to
+grayscale and scaled to OCR_TARGET_DPI (600-dpi scans are halved). Pages that
+are still larger than OCR_TILE_MAX_PIXELS are OCR'd as overlapping horizontal
+bands of OCR_TILE_HEIGHT rows so tesseract's working set stays bounded.
+
+Banding does not bound decoding: Pillow decodes a page whole (JPEG draft mode
+aside), so decode memory is capped by rejecting pages over OCR_MAX_PAGE_PIXELS
+before any pixel is read. A rejected page yields no text and is reported as
+rejected instead of failing the document.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from .config import (
+    OCR_DEFAULT_DPI,
+    OCR_MAX_PAGE_PIXELS,
+    OCR_MAX_WORKERS,
+    OCR_TARGET_DPI,
+    OCR_TILE_HEIGHT,
+    OCR_TILE_MAX_PIXELS,
+    OCR_TILE_OVERLAP,
+    TESSERACT_CMD,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+
+
+# -- Pool process side --
+
+def _init_worker() -> None:
+    import pytesseract
+
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+
+def normalize_page(image: Image.Image, target_dpi: int = OCR_TARGET_DPI) -> Image.Image:
+    """Grayscale and downscale to target_dpi (pages at or below it are left as is)."""
+    dpi = image.info.get("dpi") or (OCR_DEFAULT_DPI, OCR_DEFAULT_DPI)
+    source_dpi = float(dpi[0]) or OCR_DEFAULT_DPI
+    scale = target_dpi / source_dpi
+    target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if scale < 1.0:
+        image.draft("L", target)  # JPEG decodes straight at reduced scale
+    if image.mode != "L":
+        image = image.convert("L")
+    if scale < 1.0 and image.width > target[0]:
+        image = image.resize(target, Image.LANCZOS)
+    return image
+
+
+def band_boxes(
+    width: int,
+    height: int,
+    band_height: int = OCR_TILE_HEIGHT,
+    overlap: int = OCR_TILE_OVERLAP,
+) -> list[tuple[int, int, int, int]]:
+    """Full-width crop boxes of band_height rows, consecutive bands overlapping by overlap rows."""
+    step = max(1, band_height - overlap)
+    boxes = []
+    top = 0
+    while True:
+        bottom = min(height, top + band_height)
+        boxes.append((0, top, width, bottom))
+        if bottom >= height:
+            return boxes
+        top += step
+
+
+def _join_bands(texts: list[str]) -> str:
+    """Concatenate band texts, dropping a line repeated across the overlap."""
+    lines: list[str] = []
+    for text in texts:
+        band = [ln for ln in text.splitlines() if ln.strip()]
+        if lines and band and band[0].strip() == lines[-1].strip():
+            band = band[1:]
+        lines.extend(band)
+    return "\n".join(lines)
+
+
+def _ocr(image: Image.Image) -> str:
+    import pytesseract
+
+    return pytesseract.image_to_string(image, config=f"--dpi {OCR_TARGET_DPI}")
+
+
+def ocr_page(path: str, page: int) -> str | None:
+    """
+    OCR one page (0-based) of an image file. Runs in a pool process. Returns None
+    for a page too large to decode (OCR_MAX_PAGE_PIXELS or Pillow's bomb check).
+    """
+    try:
+        with Image.open(path) as src:
+            src.seek(page)
+            if src.width * src.height > OCR_MAX_PAGE_PIXELS:
+                raise Image.DecompressionBombError(f"{src.width}x{src.height} pixels")
+            image = normalize_page(src)
+    except Image.DecompressionBombError as e:
+        logger.warning("Rejected page %d of %s, too large to decode: %s", page + 1, path, e)
+        return None
+    with image:
+        if image.width * image.height <= OCR_TILE_MAX_PIXELS:
+            return _ocr(image)
+        return _join_bands([_ocr(image.crop(box)) for box in band_boxes(image.width, image.height)])
+
+
+# -- Caller side --
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, OCR_MAX_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def page_count(path: str) -> int:
+    """Number of frames/pages without decoding any pixel data."""
+    try:
+        with Image.open(path) as image:
+            return getattr(image, "n_frames", 1)
+    except Image.DecompressionBombError:
+        # The first page alone is over the limit; ocr_page rejects it
+        return 1
+
+
+async def ocr_pages(content: bytes, filename: str) -> AsyncIterator[tuple[int, str | None]]:
+    """
+    Yield (page_number, text) for every page of an image file, 1-based, in order;
+    text is None for a page rejected as too large to decode.
+    At most OCR_MAX_WORKERS pages are in flight; later pages are submitted as
+    earlier ones are consumed.
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix or "") as tmp:
+        tmp.write(content)
+        path = tmp.name
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    in_flight: list[asyncio.Future] = []
+    try:
+        pages = await asyncio.to_thread(page_count, path)
+        next_page = 0
+        for page in range(pages):
+            while next_page < pages and len(in_flight) < max(1, OCR_MAX_WORKERS):
+                in_flight.append(loop.run_in_executor(executor, ocr_page, path, next_page))
+                next_page += 1
+            text = await in_flight.pop(0)
+            yield page + 1, text
+    finally:
+        for job in in_flight:
+            job.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+async def ocr_document(content: bytes, filename: str) -> list[dict]:
+    """OCR every page; returns [{page, text}], with rejected: True (and no text) on rejected pages."""
+    return [
+        {"page": page, "text": text} if text is not None else {"page": page, "text": "", "rejected": True}
+        async for page, text in ocr_pages(content, filename)
+    ]
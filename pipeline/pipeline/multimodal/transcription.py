@@ -0,0 +1,267 @@
+"""
+Whisper transcription executor: a process pool that keeps the model loaded.
+Reference: Enhancement #9 PRD.
+
+Each pool process loads WHISPER_MODEL once in its initializer; callers hand over
+a local file path and await the result, so long recordings never run on the API
+event loop. In-flight jobs are capped at WHISPER_MAX_CONCURRENCY and media longer
+than WHISPER_MAX_DURATION_SEC is refused before any decoding. A job whose caller
+times out keeps its slot until the pool process finishes it, so timeouts cannot
+queue more work onto busy processes than the cap allows. API-side query
+transcripts are cached by content hash.
+
+transcribe_segmented() drops silence first (see vad.py) and transcribes the
+bounded speech segments in parallel across the pool, stitching timestamps back
+onto the original timeline.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import ffmpeg
+import numpy as np
+
+from . import vad
+from .config import (
+    FFPROBE_PATH,
+    TRANSCRIPT_CACHE_SIZE,
+    WHISPER_MAX_CONCURRENCY,
+    WHISPER_MAX_DURATION_SEC,
+    WHISPER_MODEL,
+    WHISPER_WORKERS,
+)
+
+
+class TranscriptionError(Exception):
+    """Raised when media cannot be transcribed (too long, undecodable, timed out)."""
+
+
+class TranscriptionTooLong(TranscriptionError):
+    """Raised when media exceeds WHISPER_MAX_DURATION_SEC."""
+
+
+# -- Pool process side --
+
+_worker_model = None
+
+
+def _init_worker(model_name: str) -> None:
+    global _worker_model
+    import whisper
+
+    _worker_model = whisper.load_model(model_name)
+
+
+def _ping() -> bool:
+    return _worker_model is not None
+
+
+def _transcribe_in_worker(audio: str | np.ndarray) -> dict:
+    """Transcribe a file path or float32 16 kHz samples."""
+    result = _worker_model.transcribe(audio)
+    return {
+        "text": result.get("text", ""),
+        "language": result.get("language"),
+        "segments": [
+            {"start": float(s["start"]), "end": float(s["end"]), "text": s["text"]}
+            for s in result.get("segments", [])
+        ],
+    }
+
+
+# -- API / worker side --
+
+_executor: ProcessPoolExecutor | None = None
+_slots: asyncio.Semaphore | None = None
+_slots_loop: asyncio.AbstractEventLoop | None = None
+_cache: OrderedDict[str, dict] = OrderedDict()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, WHISPER_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(WHISPER_MODEL,),
+        )
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(max(1, WHISPER_MAX_CONCURRENCY))
+        _slots_loop = loop
+    return _slots
+
+
+async def preload() -> None:
+    """Start every pool process and wait until each has loaded the model."""
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    await asyncio.gather(*(
+        loop.run_in_executor(executor, _ping) for _ in range(max(1, WHISPER_WORKERS))
+    ))
+
+
+def shutdown() -> None:
+    """Stop the pool processes."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def media_duration(path: str) -> float | None:
+    """Container duration in seconds via ffprobe, or None if unknown."""
+    try:
+        info = ffmpeg.probe(path, cmd=FFPROBE_PATH)
+    except ffmpeg.Error as e:
+        raise TranscriptionError(f"Cannot probe media: {e}") from e
+    duration = info.get("format", {}).get("duration")
+    return float(duration) if duration not in (None, "N/A") else None
+
+
+def extract_audio_track(video_path: str, audio_path: str) -> None:
+    """Decode the audio track to 16 kHz mono PCM WAV (what Whisper resamples to anyway)."""
+    (
+        ffmpeg.input(video_path)
+        .output(audio_path, acodec="pcm_s16le", ac=1, ar=16000)
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def _check_duration(duration: float | None) -> None:
+    if duration is not None and duration > WHISPER_MAX_DURATION_SEC:
+        raise TranscriptionTooLong(
+            f"Media is {duration:.0f}s, limit is {WHISPER_MAX_DURATION_SEC:.0f}s"
+        )
+
+
+async def _run_on_pool(audio: str | np.ndarray, segment: vad.SpeechSegment | None = None) -> dict:
+    """Run one job once a slot is free; a segment of audio samples is sliced only then."""
+    loop = asyncio.get_running_loop()
+    slots = _get_slots()
+    await slots.acquire()
+    try:
+        if segment is not None:
+            audio = vad.slice_samples(audio, segment)
+        future = loop.run_in_executor(_get_executor(), _transcribe_in_worker, audio)
+    except BaseException:
+        slots.release()
+        raise
+
+    def _done(f: asyncio.Future) -> None:
+        # Released when the pool process is done, not when the caller stops waiting
+        slots.release()
+        if not f.cancelled():
+            f.exception()
+
+    future.add_done_callback(_done)
+    return await asyncio.shield(future)
+
+
+async def _with_timeout(coro, timeout: float | None):
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        raise TranscriptionError(f"Transcription timed out after {timeout}s") from None
+
+
+async def transcribe_file(path: str, timeout: float | None = None) -> dict:
+    """
+    Transcribe a local audio file on the pool. Returns {text, language, segments}.
+    Raises TranscriptionTooLong over the duration limit, TranscriptionError on timeout.
+    A timed-out job keeps its pool process and concurrency slot until Whisper finishes.
+    """
+    _check_duration(await asyncio.to_thread(media_duration, path))
+    return await _with_timeout(_run_on_pool(path), timeout)
+
+
+async def transcribe_segmented(path: str, timeout: float | None = None) -> dict:
+    """
+    Transcribe only the speech in a local audio file, one pool job per VAD segment.
+    Returns {text, language, segments}; each segment is {start, end, text} on the
+    original timeline and at most VAD_MAX_SEGMENT_SEC long. Silent segments are dropped.
+    """
+    _check_duration(await asyncio.to_thread(media_duration, path))
+    samples, speech = await asyncio.to_thread(vad.decode_speech, path)
+
+    async def _one(seg: vad.SpeechSegment) -> dict:
+        return await _run_on_pool(samples, seg)
+
+    results = await _with_timeout(asyncio.gather(*(_one(seg) for seg in speech)), timeout)
+
+    segments: list[dict] = []
+    language = None
+    for seg, result in zip(speech, results):
+        text = result["text"].strip()
+        language = language or result.get("language")
+        if text:
+            segments.append({"start": seg.start, "end": seg.end, "text": text})
+    return {
+        "text": " ".join(s["text"] for s in segments),
+        "language": language,
+        "segments": segments,
+    }
+
+
+def _cache_get(key: str) -> dict | None:
+    hit = _cache.get(key)
+    if hit is not None:
+        _cache.move_to_end(key)
+    return hit
+
+
+def _cache_put(key: str, value: dict) -> None:
+    if TRANSCRIPT_CACHE_SIZE <= 0:
+        return
+    _cache[key] = value
+    _cache.move_to_end(key)
+    while len(_cache) > TRANSCRIPT_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def transcribe_bytes_cached(
+    content: bytes,
+    filename: str,
+    timeout: float | None = None,
+    video: bool = False,
+) -> dict:
+    """
+    Transcribe uploaded audio (or the audio track of a video) with a result cache
+    keyed by the content's sha256 and the model name. For API query paths.
+    """
+    key = f"{WHISPER_MODEL}:{hashlib.sha256(content).hexdigest()}"
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    suffix = Path(filename).suffix or (".mp4" if video else "")
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(content)
+        media_path = tmp.name
+    audio_path = media_path + ".wav" if video else media_path
+    try:
+        if video:
+            await asyncio.to_thread(extract_audio_track, media_path, audio_path)
+        result = await transcribe_file(audio_path, timeout=timeout)
+    finally:
+        for p in {media_path, audio_path}:
+            try:
+                os.unlink(p)
+            except OSError:
+                pass
+    _cache_put(key, result)
+    return result
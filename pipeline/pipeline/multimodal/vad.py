@@ -0,0 +1,208 @@
+"""
+Voice activity detection and speech segmentation ahead of Whisper.
+Reference: Enhancement #9 PRD.
+
+Audio is decoded once to 16 kHz mono PCM. Each VAD_FRAME_MS frame is classified
+as speech or silence (frame energy, or webrtcvad when VAD_BACKEND=webrtc), speech
+runs are padded and merged across short pauses, and the result is cut into
+segments no longer than VAD_MAX_SEGMENT_SEC so each Whisper call is bounded.
+
+Files are decoded as a stream of VAD_STREAM_BLOCK_SEC blocks: frames are scored
+block by block and the PCM is spooled to a temporary file that segments are later
+sliced from, so memory stays flat however long the recording is.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+from .config import (
+    VAD_BACKEND,
+    VAD_DYNAMIC_RANGE_DB,
+    VAD_ENERGY_THRESHOLD_DB,
+    VAD_FRAME_MS,
+    VAD_MAX_SEGMENT_SEC,
+    VAD_MIN_SILENCE_MS,
+    VAD_MIN_SPEECH_MS,
+    VAD_PAD_MS,
+    VAD_STREAM_BLOCK_SEC,
+    VAD_WEBRTC_AGGRESSIVENESS,
+)
+
+SAMPLE_RATE = 16000
+
+
+@dataclass(frozen=True)
+class SpeechSegment:
+    """A span of speech in seconds from the start of the recording."""
+
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def iter_pcm(path: str, block_sec: float = VAD_STREAM_BLOCK_SEC) -> Iterator[np.ndarray]:
+    """Decode any ffmpeg-readable file to 16 kHz mono int16 samples, one block at a time."""
+    import ffmpeg
+
+    block_bytes = max(1, int(block_sec * SAMPLE_RATE)) * 2
+    proc = (
+        ffmpeg.input(path)
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+        .global_args("-nostdin", "-loglevel", "error")
+        .run_async(pipe_stdout=True)
+    )
+    try:
+        while chunk := proc.stdout.read(block_bytes):
+            yield np.frombuffer(chunk[: len(chunk) // 2 * 2], dtype=np.int16)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    if proc.returncode:
+        raise ffmpeg.Error("ffmpeg", None, None)
+
+
+def _frames(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    n = len(samples) // frame_len
+    return samples[: n * frame_len].reshape(n, frame_len)
+
+
+def _frame_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    frames = _frames(samples, frame_len).astype(np.float32) / 32768.0
+    if len(frames) == 0:
+        return np.zeros(0, dtype=np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _energy_threshold(db: np.ndarray) -> np.ndarray:
+    # Relative to the loudest frame of the whole recording, so levels are kept until the end
+    if len(db) == 0:
+        return np.zeros(0, dtype=bool)
+    threshold = max(VAD_ENERGY_THRESHOLD_DB, float(db.max()) - VAD_DYNAMIC_RANGE_DB)
+    return db > threshold
+
+
+class _FrameScorer:
+    """Scores whole frames of int16 blocks fed in order; a partial frame is carried to the next block."""
+
+    def __init__(self, frame_ms: int = VAD_FRAME_MS, backend: str = VAD_BACKEND) -> None:
+        if backend not in ("energy", "webrtc"):
+            raise ValueError(f"Unknown VAD backend {backend!r}; expected 'energy' or 'webrtc'")
+        self.frame_len = SAMPLE_RATE * frame_ms // 1000
+        self.backend = backend
+        self._vad = None
+        if backend == "webrtc":
+            import webrtcvad
+
+            self._vad = webrtcvad.Vad(VAD_WEBRTC_AGGRESSIVENESS)
+        self._carry = np.zeros(0, dtype=np.int16)
+        self._scores: list[np.ndarray] = []
+
+    def feed(self, block: np.ndarray) -> None:
+        samples = np.concatenate((self._carry, block)) if len(self._carry) else block
+        whole = len(samples) // self.frame_len * self.frame_len
+        self._carry = samples[whole:].copy()
+        if not whole:
+            return
+        if self._vad is not None:
+            frames = _frames(samples[:whole], self.frame_len)
+            self._scores.append(
+                np.array([self._vad.is_speech(f.tobytes(), SAMPLE_RATE) for f in frames], dtype=bool)
+            )
+        else:
+            self._scores.append(_frame_db(samples[:whole], self.frame_len))
+
+    def flags(self) -> np.ndarray:
+        if self._vad is not None:
+            return np.concatenate(self._scores) if self._scores else np.zeros(0, dtype=bool)
+        return _energy_threshold(np.concatenate(self._scores) if self._scores else np.zeros(0, dtype=np.float32))
+
+
+def speech_flags(samples: np.ndarray, frame_ms: int = VAD_FRAME_MS, backend: str = VAD_BACKEND) -> np.ndarray:
+    """Per-frame speech/silence decision for int16 samples at 16 kHz."""
+    scorer = _FrameScorer(frame_ms, backend)
+    scorer.feed(samples)
+    return scorer.flags()
+
+
+def _runs(flags: np.ndarray) -> list[tuple[int, int]]:
+    """[start, end) frame index pairs of consecutive True values."""
+    if len(flags) == 0:
+        return []
+    padded = np.concatenate(([False], flags, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+def speech_regions(
+    flags: np.ndarray,
+    frame_ms: int = VAD_FRAME_MS,
+    pad_ms: int = VAD_PAD_MS,
+    min_silence_ms: int = VAD_MIN_SILENCE_MS,
+    min_speech_ms: int = VAD_MIN_SPEECH_MS,
+) -> list[SpeechSegment]:
+    """Turn frame flags into padded speech regions, merging pauses shorter than min_silence_ms."""
+    frame = frame_ms / 1000.0
+    total = len(flags) * frame
+    pad = pad_ms / 1000.0
+    regions: list[list[float]] = []
+    for a, b in _runs(flags):
+        start, end = max(0.0, a * frame - pad), min(total, b * frame + pad)
+        if regions and start - regions[-1][1] < min_silence_ms / 1000.0:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+    min_speech = min_speech_ms / 1000.0
+    return [SpeechSegment(s, e) for s, e in regions if e - s >= min_speech]
+
+
+def bound_segments(regions: list[SpeechSegment], max_sec: float = VAD_MAX_SEGMENT_SEC) -> list[SpeechSegment]:
+    """Split regions longer than max_sec into equal parts no longer than max_sec."""
+    out: list[SpeechSegment] = []
+    for r in regions:
+        parts = max(1, int(np.ceil(r.duration / max_sec)))
+        step = r.duration / parts
+        out.extend(SpeechSegment(r.start + i * step, r.start + (i + 1) * step) for i in range(parts))
+    return out
+
+
+def segment_speech(samples: np.ndarray) -> list[SpeechSegment]:
+    """Speech segments of int16 16 kHz samples, each at most VAD_MAX_SEGMENT_SEC long."""
+    return bound_segments(speech_regions(speech_flags(samples)))
+
+
+def decode_speech(path: str) -> tuple[np.ndarray, list[SpeechSegment]]:
+    """
+    Stream-decode path and return (samples, segments). samples is a read-only memory
+    map of the spooled int16 PCM for slice_samples(); the spool file is unlinked once
+    mapped, so it disappears with the last reference.
+    """
+    scorer = _FrameScorer()
+    fd, spool = tempfile.mkstemp(suffix=".pcm")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for block in iter_pcm(path):
+                scorer.feed(block)
+                f.write(block.tobytes())
+        samples = (
+            np.memmap(spool, dtype=np.int16, mode="r")
+            if os.path.getsize(spool) else np.zeros(0, dtype=np.int16)
+        )
+    finally:
+        os.unlink(spool)
+    return samples, bound_segments(speech_regions(scorer.flags()))
+
+
+def slice_samples(samples: np.ndarray, segment: SpeechSegment) -> np.ndarray:
+    """Float32 samples in [-1, 1] for one segment, as Whisper expects."""
+    a = int(segment.start * SAMPLE_RATE)
+    b = int(segment.end * SAMPLE_RATE)
+    return samples[a:b].astype(np.float32) / 32768.0
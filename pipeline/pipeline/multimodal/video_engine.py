@@ -0,0 +1,144 @@
+"""
+Video engine: frame analysis in parallel time segments.
+Reference: Enhancement #9 PRD.
+
+The video is cut into VIDEO_SEGMENT_SEC windows on its local path. Each window
+is sampled, deduplicated and OCR'd in its own pool process (seeking straight to
+the window start), and the process returns frame runs with a CLIP-sized copy
+of the representative picture. Windows are consumed in timestamp order and runs
+that continue across a window boundary are joined again, so the output matches
+a single sequential pass.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import (
+    FRAME_DEDUP_ENABLED,
+    FRAME_DEDUP_MAX_DISTANCE,
+    FRAME_MAX_SAMPLES,
+    TESSERACT_CMD,
+    VIDEO_CLIP_IMAGE_SIZE,
+    VIDEO_SEGMENT_SEC,
+    VIDEO_SEGMENT_WORKERS,
+)
+from .frame_dedup import hamming
+
+_executor: ProcessPoolExecutor | None = None
+
+
+# -- Pool process side --
+
+def _init_worker() -> None:
+    import cv2
+    import pytesseract
+
+    # One decode/OCR thread per process; parallelism comes from the pool
+    cv2.setNumThreads(1)
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+
+def _clip_sized(image: np.ndarray, size: int) -> np.ndarray:
+    """Downscale so the short side is size px (what CLIP preprocessing does anyway)."""
+    from PIL import Image
+
+    h, w = image.shape[:2]
+    scale = size / min(h, w)
+    if scale >= 1.0:
+        return image
+    pil = Image.fromarray(image).resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.BICUBIC)
+    return np.asarray(pil)
+
+
+def analyze_segment(video_path: str, start: float, end: float | None, max_samples: int) -> list[dict]:
+    """Sample, dedup and OCR one [start, end) window. Runs in a pool process."""
+    import pytesseract
+    from PIL import Image
+
+    from .frame_dedup import collapse_runs
+    from .frame_sampler import sample_frames
+
+    runs = []
+    for run in collapse_runs(sample_frames(video_path, max_samples=max_samples, start=start, end=end)):
+        runs.append({
+            "timestamp": run.start,
+            "timestamp_end": run.end,
+            "frame_count": run.frame_count,
+            "ocr_text": pytesseract.image_to_string(Image.fromarray(run.image)),
+            "phash": run.phash,
+            "image": _clip_sized(run.image, VIDEO_CLIP_IMAGE_SIZE),
+        })
+    return runs
+
+
+# -- Parent side --
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, VIDEO_SEGMENT_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def segment_windows(duration: float | None, segment_sec: float = VIDEO_SEGMENT_SEC) -> list[tuple[float, float | None]]:
+    """[start, end) windows covering the video; the last one is open-ended."""
+    if not duration or duration <= segment_sec:
+        return [(0.0, None)]
+    n = math.ceil(duration / segment_sec)
+    return [(i * segment_sec, (i + 1) * segment_sec if i < n - 1 else None) for i in range(n)]
+
+
+def join_boundary(
+    previous: dict,
+    following: dict,
+    max_distance: int = FRAME_DEDUP_MAX_DISTANCE,
+    enabled: bool = FRAME_DEDUP_ENABLED,
+) -> bool:
+    """Fold following into previous when a run was split by a window boundary."""
+    if not enabled or hamming(previous["phash"], following["phash"]) > max_distance:
+        return False
+    previous["timestamp_end"] = following["timestamp_end"]
+    previous["frame_count"] += following["frame_count"]
+    return True
+
+
+async def analyze_video(video_path: str, duration: float | None) -> AsyncIterator[dict]:
+    """
+    Yield frame runs in timestamp order while later windows are still being analyzed.
+    Each run is {timestamp, timestamp_end, frame_count, ocr_text, phash, image}.
+    A run is yielded once the next run is known, so boundary joins are final.
+    FRAME_MAX_SAMPLES is split evenly across windows.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    windows = segment_windows(duration)
+    per_window = math.ceil(FRAME_MAX_SAMPLES / len(windows)) if FRAME_MAX_SAMPLES > 0 else 0
+    jobs = [
+        loop.run_in_executor(executor, analyze_segment, video_path, start, end, per_window)
+        for start, end in windows
+    ]
+    held: dict | None = None
+    try:
+        for job in jobs:
+            runs = await job
+            if held is not None and runs and join_boundary(held, runs[0]):
+                runs = runs[1:]
+            for run in runs:
+                if held is not None:
+                    yield held
+                held = run
+        if held is not None:
+            yield held
+    finally:
+        for job in jobs:
+            job.cancel()
@@ -4,27 +4,41 @@ Reference: Enhancement #9 PRD.
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import tempfile
 from pathlib import Path
 
-import cv2
-import ffmpeg
-import pytesseract
 from PIL import Image
-from sentence_transformers import SentenceTransformer
 
-from .audio_processor import _get_whisper_model
-from .config import TESSERACT_CMD
-from .image_processor import _get_clip_model
+from .clip_service import get_clip_encoder
+from .config import CLIP_BATCH_SIZE
+from .transcription import TranscriptionError, extract_audio_track, media_duration, transcribe_segmented
+from .video_engine import analyze_video
 
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+async def _transcribe_track(video_path: str) -> dict:
+    audio_path = video_path + ".wav"
+    try:
+        await asyncio.to_thread(extract_audio_track, video_path, audio_path)
+        return await transcribe_segmented(audio_path)
+    finally:
+        if os.path.exists(audio_path):
+            try:
+                os.unlink(audio_path)
+            except OSError:
+                pass
 
 
 async def process_video(content: bytes, filename: str) -> dict:
     """
-    Extract audio transcript and frame OCR+CLIP. Returns {transcript, frames, modality}.
-    Frames at 1 fps.
+    Extract audio transcript and frame OCR+CLIP. Returns {transcript, transcript_segments, frames, modality}.
+    The audio track transcribes on the Whisper pool while frame analysis runs in
+    parallel time segments on the video engine pool (see video_engine); CLIP then
+    encodes the merged runs in batches as they arrive in timestamp order.
+    Frames are chosen by the configured sampling policy (default 1 fps); see frame_sampler.
+    Runs of near-identical frames are collapsed first, so each entry in frames covers
+    [timestamp, timestamp_end] and OCR/CLIP run once per distinct picture.
     """
     ext = Path(filename).suffix or ".mp4"
     with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
@@ -33,47 +47,47 @@ async def process_video(content: bytes, filename: str) -> dict:
 
     frames_data: list[dict] = []
     transcript = ""
+    transcript_segments: list[dict] = []
 
     try:
-        # 1. Extract audio and transcribe
-        audio_path = video_path + ".wav"
         try:
-            (ffmpeg.input(video_path).output(audio_path, acodec="pcm_s16le", ar=16000).overwrite_output().run(quiet=True))
-            whisper_model = _get_whisper_model()
-            audio_result = whisper_model.transcribe(audio_path)
-            transcript = audio_result.get("text", "")
-        except Exception:
-            pass
-        finally:
-            if os.path.exists(audio_path):
-                try:
-                    os.unlink(audio_path)
-                except OSError:
-                    pass
+            duration = await asyncio.to_thread(media_duration, video_path)
+        except TranscriptionError:
+            duration = None  # Unknown length: analyze as one window
+        audio_task = asyncio.create_task(_transcribe_track(video_path))
 
-        # 2. Extract frames at 1 fps
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS) or 1.0
-        frame_interval = max(1, int(fps))
-        frame_count = 0
-        clip_model: SentenceTransformer = _get_clip_model()
+        encoder = get_clip_encoder()
+        pending: list[dict] = []
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            if frame_count % frame_interval == 0:
-                timestamp = float(frame_count) / fps
-                pil_img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                frame_text = pytesseract.image_to_string(pil_img)
-                embedding = clip_model.encode(pil_img).tolist()
+        async def _flush() -> None:
+            vectors = await encoder.encode_images([Image.fromarray(run["image"]) for run in pending])
+            for run, vec in zip(pending, vectors):
                 frames_data.append({
-                    "timestamp": timestamp,
-                    "ocr_text": frame_text,
-                    "embedding": embedding,
+                    "timestamp": run["timestamp"],
+                    "timestamp_end": run["timestamp_end"],
+                    "frame_count": run["frame_count"],
+                    "ocr_text": run["ocr_text"],
+                    "embedding": vec,
                 })
-            frame_count += 1
-        cap.release()
+            pending.clear()
+
+        try:
+            async for run in analyze_video(video_path, duration):
+                pending.append(run)
+                if len(pending) >= CLIP_BATCH_SIZE:
+                    await _flush()
+            if pending:
+                await _flush()
+        except BaseException:
+            audio_task.cancel()
+            raise
+
+        try:
+            audio_result = await audio_task
+            transcript = audio_result["text"]
+            transcript_segments = audio_result["segments"]
+        except Exception:
+            pass
     finally:
         try:
             os.unlink(video_path)
@@ -82,6 +96,7 @@ async def process_video(content: bytes, filename: str) -> dict:
 
     return {
         "transcript": transcript,
+        "transcript_segments": transcript_segments,
         "frames": frames_data,
         "modality": "video",
     }
@@ -0,0 +1,62 @@
+"""
+Redis multimodal job enqueue, one queue per tenant and modality.
+Key: tenant:{tenant_id}:queue:multimodal:{modality} (modality: image | audio | video).
+Payload: job_id, document_id, tenant_id, filename, content (base64).
+The multimodal worker runs a separate lane per modality over these queues.
+Every tenant ID that has been enqueued is added to the set QUEUE_TENANTS_KEY, so
+the worker also serves tenants that are not ACTIVE in the registry (e.g. "default").
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import uuid
+
+MULTIMODAL_LANES = ("image", "audio", "video")
+LEGACY_QUEUE = "multimodal:jobs"
+QUEUE_TENANTS_KEY = "multimodal:tenants"
+
+
+def queue_key(tenant_id: str, modality: str) -> str:
+    return f"tenant:{tenant_id}:queue:multimodal:{modality}"
+
+
+def _get_redis():
+    import redis
+
+    url = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return redis.from_url(url)
+
+
+async def enqueue_multimodal(
+    *,
+    document_id: str,
+    tenant_id: str,
+    filename: str,
+    modality: str,
+    content: bytes,
+) -> str:
+    """Push a multimodal job to its tenant/modality queue. Returns the job_id."""
+    import asyncio
+
+    if modality not in MULTIMODAL_LANES:
+        raise ValueError(f"Not a multimodal modality: {modality!r}")
+    job_id = str(uuid.uuid4())
+    payload = {
+        "job_id": job_id,
+        "document_id": document_id,
+        "tenant_id": tenant_id,
+        "filename": filename,
+        "content": base64.b64encode(content).decode("ascii"),
+    }
+
+    def _push():
+        r = _get_redis()
+        pipe = r.pipeline()
+        pipe.lpush(queue_key(tenant_id, modality), json.dumps(payload))
+        pipe.sadd(QUEUE_TENANTS_KEY, tenant_id)
+        pipe.execute()
+
+    await asyncio.get_event_loop().run_in_executor(None, _push)
+    return job_id
@@ -1,6 +1,7 @@
 """
-Rate limiting per INTAKE_GATEWAY_PLAN Section 2.1.
-Redis key: tenant:{tenant_id}:ratelimit:ingest. 100 req/min per tenant.
+Rate limiting per INTAKE_GATEWAY_PLAN Section 2.1 and SERVING_LAYER_PLAN Section 8.
+Redis key: tenant:{tenant_id}:ratelimit:{bucket}. Ingest: 100 req/min per tenant;
+query: 1000 req/min per tenant.
 """
 from __future__ import annotations
 
@@ -24,12 +25,13 @@ async def check_rate_limit(
     tenant_id: str,
     limit: int = 100,
     window_sec: int = 60,
+    bucket: str = "ingest",
 ) -> None:
     """
     Increment and check rate limit. Raises 429 if exceeded.
     Uses Redis INCR + EXPIRE for sliding window.
     """
-    key = f"tenant:{tenant_id}:ratelimit:ingest"
+    key = f"tenant:{tenant_id}:ratelimit:{bucket}"
 
     def _check() -> bool:
         r = _get_redis()
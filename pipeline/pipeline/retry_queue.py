@@ -0,0 +1,75 @@
+"""
+Delayed retry and dead-letter helpers for Redis job queues.
+Reference: EMBEDDING_INDEXING_PLAN Section 8 (retry policy).
+
+A job that cannot run right now (e.g. every embedding endpoint is down) is
+deferred: its attempt counter is bumped and it is parked in the sorted set
+{queue}:delayed, scored by the time it becomes due (backoff 10s, 60s, 300s).
+Workers call promote_due() before popping, which moves due jobs back onto the
+consuming end of the queue. After RETRY_BACKOFF_SEC is exhausted the job goes
+to the {queue}:dlq list instead.
+
+A caller can defer on a separate schedule and counter (e.g. waiting out a
+collection warm-up, pipeline.storage.tiering), so waits of that kind do not
+spend the failure budget.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Sequence
+
+import redis.asyncio as redis
+
+RETRY_BACKOFF_SEC = (10, 60, 300)
+PROMOTE_BATCH = 100
+
+
+def delayed_key(queue_key: str) -> str:
+    return f"{queue_key}:delayed"
+
+
+def dlq_key(queue_key: str) -> str:
+    return f"{queue_key}:dlq"
+
+
+async def defer(
+    r: redis.Redis,
+    queue_key: str,
+    payload: dict[str, Any],
+    *,
+    backoff: Sequence[float] = RETRY_BACKOFF_SEC,
+    counter: str = "attempts",
+) -> bool:
+    """
+    Schedule payload for another attempt on queue_key, counted in payload[counter]
+    against its own backoff schedule. Returns False (and does nothing) when that
+    budget is spent; the caller should dead_letter() it.
+    """
+    attempts = int(payload.get(counter, 0))
+    if attempts >= len(backoff):
+        return False
+    due = time.time() + backoff[attempts]
+    await r.zadd(delayed_key(queue_key), {json.dumps({**payload, counter: attempts + 1}): due})
+    return True
+
+
+async def dead_letter(r: redis.Redis, queue_key: str, payload: dict[str, Any], reason: str) -> None:
+    """Park a job that will not be retried on {queue_key}:dlq for inspection or replay."""
+    await r.lpush(dlq_key(queue_key), json.dumps({**payload, "error": reason, "failed_at": time.time()}))
+
+
+async def promote_due(r: redis.Redis, queue_keys: list[str]) -> int:
+    """Move deferred jobs whose backoff has elapsed back onto their queues. Returns the count."""
+    moved = 0
+    now = time.time()
+    for key in queue_keys:
+        delayed = delayed_key(key)
+        due = await r.zrangebyscore(delayed, "-inf", now, start=0, num=PROMOTE_BATCH)
+        for member in due:
+            # ZREM decides ownership when several workers promote the same key
+            if await r.zrem(delayed, member):
+                # RPUSH: BRPOP consumes from the right, so retries run next
+                await r.rpush(key, member)
+                moved += 1
+    return moved
@@ -35,7 +35,7 @@ class TokenResponse(BaseModel):
 async def exchange_token(req: TokenRequest):
     """
     Exchange API key for JWT. Requires FROSTBYTE_ADMIN_API_KEY to be set.
-    Returns JWT with scope admin, ingest for admin dashboard access.
+    Returns JWT with scope admin, ingest, query for admin dashboard access.
     """
     admin_key = _get_admin_api_key()
     if not admin_key:
@@ -61,7 +61,7 @@ async def exchange_token(req: TokenRequest):
     exp = now + timedelta(seconds=3600)
     payload = {
         "sub": "admin",
-        "scope": "admin ingest",
+        "scope": "admin ingest query",
         "iat": int(now.timestamp()),
         "exp": int(exp.timestamp()),
     }
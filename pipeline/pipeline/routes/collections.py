@@ -7,86 +7,126 @@ from __future__ import annotations
 import io
 import json
 import os
-import tempfile
-from pathlib import Path
 from typing import Any
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 
-from ..embedding import get_text_embedding
+from ..embedding import EmbeddingUnavailableError
 from ..multimodal import detect_modality
-from ..multimodal.audio_processor import _get_whisper_model
-from ..multimodal.image_processor import _get_clip_model
-from ..vector_store import search_qdrant
+from ..multimodal.clip_service import get_clip_encoder
+from ..multimodal.config import WHISPER_QUERY_TIMEOUT_SEC
+from ..multimodal.transcription import (
+    TranscriptionError,
+    TranscriptionTooLong,
+    transcribe_bytes_cached,
+)
+from ..serving.access import CollectionWarmingError, record_access
+from ..serving.fusion import COLLECTION_DIMS, COLLECTION_SUFFIXES, FusedHit, fan_out, multimodal_search
+from ..vector_store import VectorStoreError, result_dict
+from ..vectors import as_vector
 
 router = APIRouter(prefix="/api/v1/collections", tags=["collections"])
 TENANT_DEFAULT = os.getenv("TENANT_DEFAULT", "default")
 
+# {name} selects which of the tenant's collections a query runs against
+COLLECTION_SCOPES: dict[str, tuple[str, ...]] = {
+    "text": ("text",),
+    "images": ("images",),
+    "default": ("text", "images"),
+    "all": ("text", "images"),
+}
+
+
+def _result(hit: FusedHit) -> dict[str, Any]:
+    """openapi QueryResponse item plus the fusion score and per-collection ranks."""
+    return {
+        **result_dict(hit.payload, hit.score),
+        "fusion_score": hit.fusion_score,
+        "sources": {kind: {"rank": rank, "score": score} for kind, (rank, score) in hit.sources.items()},
+    }
+
+
+def _vector_kind(vector: Any, kinds: tuple[str, ...]) -> str:
+    """Which collection a raw query vector belongs to, by dimension."""
+    try:
+        v = as_vector(vector)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="vector must be a JSON array of floats")
+    for kind in kinds:
+        if v.shape[0] == COLLECTION_DIMS[kind]:
+            return kind
+    dims = ", ".join(f"{COLLECTION_DIMS[k]} ({k})" for k in kinds)
+    raise HTTPException(status_code=400, detail=f"vector has {v.shape[0]} dims; this collection expects {dims}")
+
 
 @router.post("/{name}/query")
 async def query_collection(
     name: str,
     vector: str | None = Form(None, description="JSON array of floats, e.g. [0.1, 0.2, ...]"),
+    query_text: str | None = Form(None),
     query_file: UploadFile | None = File(None),
     top_k: int = Form(10),
     tenant_id: str = Form(default=TENANT_DEFAULT),
 ) -> dict[str, Any]:
     """
-    Query collection by vector or by file (image/audio/video).
-    If query_file provided, derive vector from it (CLIP for image, Whisper+embed for audio/video).
+    Query a tenant's collections by text, vector or file (image/audio/video).
+    name is "text" (tenant_{id}), "images" (tenant_{id}_images) or "default"/"all"
+    (both, searched concurrently and merged with reciprocal-rank fusion).
+    Text and audio/video transcripts are embedded with the text model and the CLIP
+    text encoder; an image query file is CLIP-encoded and searches images only.
     """
+    kinds = COLLECTION_SCOPES.get(name)
+    if kinds is None:
+        raise HTTPException(status_code=404, detail=f"Unknown collection {name!r}; use one of {sorted(COLLECTION_SCOPES)}")
+
+    vectors: dict[str, Any] | None = None
     if query_file is not None:
         content = await query_file.read()
         filename = query_file.filename or "query"
         modality = detect_modality(filename)
         if modality == "image":
+            if "images" not in kinds:
+                raise HTTPException(status_code=400, detail="Image queries search the images collection")
             from PIL import Image
             image = Image.open(io.BytesIO(content)).convert("RGB")
-            clip = _get_clip_model()
-            vector = clip.encode(image).tolist()
-        elif modality == "audio":
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix or "") as tmp:
-                tmp.write(content)
-                tmp_path = tmp.name
+            vectors = {"images": await get_clip_encoder().encode_image(image)}
+        elif modality in ("audio", "video"):
             try:
-                model = _get_whisper_model()
-                result = model.transcribe(tmp_path)
-                transcript = result.get("text", "")
-                vector = await get_text_embedding(transcript)
-            finally:
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
-        elif modality == "video":
-            import ffmpeg
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix or ".mp4") as tmp:
-                tmp.write(content)
-                video_path = tmp.name
-            audio_path = video_path + ".wav"
-            try:
-                (ffmpeg.input(video_path).output(audio_path, acodec="pcm_s16le", ar=16000).overwrite_output().run(quiet=True))
-                model = _get_whisper_model()
-                result = model.transcribe(audio_path)
-                transcript = result.get("text", "")
-                vector = await get_text_embedding(transcript)
-            finally:
-                for p in (video_path, audio_path):
-                    if os.path.exists(p):
-                        try:
-                            os.unlink(p)
-                        except OSError:
-                            pass
+                result = await transcribe_bytes_cached(
+                    content,
+                    filename,
+                    timeout=WHISPER_QUERY_TIMEOUT_SEC,
+                    video=modality == "video",
+                )
+            except TranscriptionTooLong as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            except TranscriptionError as e:
+                raise HTTPException(status_code=504, detail=str(e))
+            query_text = result["text"]
         else:
             raise HTTPException(status_code=400, detail="Unsupported query file type; use image, audio, or video")
     elif vector is not None:
         try:
-            vector = json.loads(vector)
+            parsed = json.loads(vector)
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="vector must be a valid JSON array")
+        vectors = {_vector_kind(parsed, kinds): parsed}
 
-    if vector is None:
-        raise HTTPException(status_code=400, detail="Either vector or query_file must be provided")
+    if vectors is None and not query_text:
+        raise HTTPException(status_code=400, detail="One of query_text, vector or query_file must be provided")
 
-    results = await search_qdrant(tenant_id=tenant_id, vector=vector, top_k=top_k)
-    return {"results": results}
+    searched = vectors.keys() if vectors is not None else kinds
+    try:
+        await record_access(tenant_id, [f"tenant_{tenant_id}{COLLECTION_SUFFIXES[k]}" for k in searched])
+    except CollectionWarmingError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    try:
+        if vectors is not None:
+            hits = await fan_out(tenant_id, vectors, top_k)
+        else:
+            hits = await multimodal_search(tenant_id, query_text, top_k, kinds=kinds)
+    except EmbeddingUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except VectorStoreError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"results": [_result(h) for h in hits]}
@@ -0,0 +1,46 @@
+"""
+Redis malware-scan job enqueue for the deferred scan stage (CLAMAV_DEFER_SCAN).
+Key: tenant:{tenant_id}:queue:scan. Payload mirrors the parse job plus receipt_id.
+"""
+from __future__ import annotations
+
+import json
+import os
+
+
+def _get_redis():
+    import redis
+
+    url = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return redis.from_url(url)
+
+
+async def enqueue_scan(
+    *,
+    receipt_id: str,
+    file_id: str,
+    batch_id: str,
+    sha256: str,
+    storage_path: str,
+    tenant_id: str,
+    mime_type: str | None = None,
+) -> None:
+    """Push scan job to Redis list. The scan worker enqueues parse once the file is clean."""
+    import asyncio
+
+    payload = {
+        "receipt_id": receipt_id,
+        "file_id": file_id,
+        "batch_id": batch_id,
+        "sha256": sha256,
+        "storage_path": storage_path,
+        "tenant_id": tenant_id,
+        "mime_type": mime_type,
+    }
+
+    def _push():
+        r = _get_redis()
+        key = f"tenant:{tenant_id}:queue:scan"
+        r.lpush(key, json.dumps(payload))
+
+    await asyncio.get_event_loop().run_in_executor(None, _push)
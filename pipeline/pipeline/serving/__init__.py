@@ -0,0 +1,12 @@
+"""
+Serving layer (RAG retrieval API) per docs/design/SERVING_LAYER_PLAN.md.
+"""
+from .models import PageRange, RetrievalProof, RetrievedChunk, SearchFilters, SearchRequest
+
+__all__ = [
+    "PageRange",
+    "RetrievalProof",
+    "RetrievedChunk",
+    "SearchFilters",
+    "SearchRequest",
+]
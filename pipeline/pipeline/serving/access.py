@@ -0,0 +1,96 @@
+"""
+Per-collection access tracking for storage tiering (pipeline.storage.tiering).
+
+Each search that reaches Qdrant records, in one Redis round trip, the time of the
+query (qdrant:collections:last_access) and a count per UTC hour for every
+collection it reads, and reads back their tiers. The tiering worker demotes idle
+collections from these; here, traffic on a demoted collection queues its warm-up.
+A query on an archived collection raises CollectionWarmingError, which the routes
+turn into 503 COLLECTION_WARMING with Retry-After. Redis errors never fail a query:
+the collections are assumed hot.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+from .. import metrics
+from ..storage.tiering import (
+    DISK,
+    HITS_TTL_SEC,
+    LAST_ACCESS_KEY,
+    TIER_PROMOTE_QUERIES_PER_HOUR,
+    UNAVAILABLE,
+    hits_key,
+    request_warmup,
+    tier_key,
+)
+
+logger = logging.getLogger(__name__)
+
+TIERING_ENABLED = os.getenv("FROSTBYTE_TIERING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Retry-After on a query that hit an archived collection (restores take a snapshot upload)
+TIER_WARMUP_RETRY_AFTER_SEC = int(os.getenv("FROSTBYTE_TIER_WARMUP_RETRY_AFTER_SEC", "30"))
+
+metrics.describe("frostbyte_collection_queries_total", "counter", "Serving queries per collection tier (hot, disk, archived).")
+metrics.describe("frostbyte_collection_warmups_requested_total", "counter", "Warm-ups queued by query traffic, by tier.")
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis.asyncio as redis
+
+        url = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        _redis_client = redis.from_url(url)
+    return _redis_client
+
+
+class CollectionWarmingError(Exception):
+    """The query needs an archived collection that is being restored."""
+
+    retry_after = TIER_WARMUP_RETRY_AFTER_SEC
+
+
+async def record_access(tenant_id: str, collections: list[str], r=None) -> dict[str, str]:
+    """
+    Record a query on the tenant's collections and return their tiers. Queues the
+    warm-up of archived collections (raising CollectionWarmingError) and of disk
+    collections back at TIER_PROMOTE_QUERIES_PER_HOUR.
+    """
+    if not TIERING_ENABLED or not collections:
+        return {}
+    r = r if r is not None else _get_redis()
+    now = time.time()
+    try:
+        pipe = r.pipeline()
+        pipe.zadd(LAST_ACCESS_KEY, {c: now for c in collections})
+        for c in collections:
+            pipe.incr(hits_key(tenant_id, c))
+            pipe.expire(hits_key(tenant_id, c), HITS_TTL_SEC)
+        pipe.mget([tier_key(tenant_id, c) for c in collections])
+        results = await pipe.execute()
+        counts = results[1:-1:2]
+        tiers = {
+            c: (t.decode() if isinstance(t, bytes) else t) or "hot"
+            for c, t in zip(collections, results[-1])
+        }
+        warming = []
+        for c, count in zip(collections, counts):
+            tier = tiers[c]
+            metrics.inc("frostbyte_collection_queries_total", tier=tier)
+            if tier in UNAVAILABLE:
+                warming.append(c)
+            elif not (tier == DISK and int(count) >= TIER_PROMOTE_QUERIES_PER_HOUR):
+                continue
+            if await request_warmup(r, tenant_id, c):
+                metrics.inc("frostbyte_collection_warmups_requested_total", tier=tier)
+    except Exception as e:
+        logger.warning("Access tracking unavailable: %s", e)
+        return {}
+    if warming:
+        raise CollectionWarmingError(f"Collections {', '.join(warming)} are being restored from archive")
+    return tiers
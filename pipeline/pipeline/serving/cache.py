@@ -0,0 +1,215 @@
+"""
+Query-result cache for the serving layer (SERVING_LAYER_PLAN Section 8).
+
+Two tiers in Redis, both scoped by the current versions of the collections a query reads:
+  exact     tenant:{id}:qcache:{sha256(collections, versions, filters, top_k, normalized query)}
+  semantic  tenant:{id}:qcache:sem:{sha256(collections, versions, filters, top_k)}, a capped
+            list of (query vector, result) entries; a later query whose vector is within
+            QUERY_CACHE_SEMANTIC_THRESHOLD cosine of a stored one gets that result (opt-in)
+
+Workers INCR tenant:{id}:collection:{name}:version after every upsert
+(bump_collection_versions), so entries computed against older collection contents
+are never read again and age out by TTL. Redis errors degrade to a miss; the cache
+never fails a query.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import unicodedata
+from typing import Any
+
+import numpy as np
+
+from .. import metrics
+from .. import vectors as vec
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_ENABLED = os.getenv("FROSTBYTE_QUERY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_CACHE_TTL_SEC = int(os.getenv("FROSTBYTE_QUERY_CACHE_TTL_SEC", "300"))
+QUERY_CACHE_SEMANTIC_ENABLED = os.getenv("FROSTBYTE_QUERY_CACHE_SEMANTIC", "false").lower() in ("1", "true", "yes")
+QUERY_CACHE_SEMANTIC_THRESHOLD = float(os.getenv("FROSTBYTE_QUERY_CACHE_SEMANTIC_THRESHOLD", "0.97"))
+QUERY_CACHE_SEMANTIC_MAX_ENTRIES = int(os.getenv("FROSTBYTE_QUERY_CACHE_SEMANTIC_MAX_ENTRIES", "256"))
+# Smoothing for the uncached-latency estimate that hit savings are measured against
+_MISS_LATENCY_ALPHA = 0.1
+
+metrics.describe("frostbyte_query_cache_requests_total", "counter", "Serving queries by cache outcome (exact, semantic, miss).")
+metrics.describe("frostbyte_query_cache_hit_ratio", "gauge", "Share of serving queries answered from the cache.")
+metrics.describe("frostbyte_query_cache_saved_seconds_total", "counter", "Estimated query latency avoided by cache hits.")
+metrics.describe("frostbyte_query_uncached_latency_seconds", "gauge", "Moving average of serving latency on a cache miss.")
+
+_redis_client = None
+_miss_latency: float | None = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis.asyncio as redis
+
+        url = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        _redis_client = redis.from_url(url)
+    return _redis_client
+
+
+def version_key(tenant_id: str, collection: str) -> str:
+    return f"tenant:{tenant_id}:collection:{collection}:version"
+
+
+async def bump_collection_versions(r, tenant_id: str, collections: list[str]) -> None:
+    """Invalidate cached results for the given collections (called by writers after an upsert)."""
+    if not collections:
+        return
+    pipe = r.pipeline()
+    for coll in collections:
+        pipe.incr(version_key(tenant_id, coll))
+    await pipe.execute()
+
+
+def normalize_query(text: str) -> str:
+    """Case, Unicode form and whitespace do not change the retrieval result."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def pack_entry(vector: np.ndarray, result: list[dict[str, Any]]) -> bytes:
+    """Semantic-tier entry: little-endian dim, float32 vector, JSON result."""
+    v = vec.as_vector(vector)
+    return struct.pack("<I", v.shape[0]) + v.astype("<f4").tobytes() + json.dumps(result).encode()
+
+
+def unpack_entry(raw: bytes) -> tuple[np.ndarray, bytes]:
+    (dim,) = struct.unpack_from("<I", raw)
+    end = 4 + 4 * dim
+    return np.frombuffer(raw, dtype="<f4", count=dim, offset=4), raw[end:]
+
+
+def best_match(query: np.ndarray, stored: np.ndarray, threshold: float) -> int | None:
+    """Row of stored (unit vectors) most similar to query, if at least threshold cosine."""
+    if not len(stored):
+        return None
+    sims = stored @ vec.normalize(vec.as_vector(query).copy())
+    i = int(np.argmax(sims))
+    return i if sims[i] >= threshold else None
+
+
+class QueryCache:
+    """
+    Cache lookups for one serving query. Call get_exact, then (after embedding)
+    get_semantic, then put on a miss; observe() records the outcome and latency.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        collections: list[str],
+        filters: dict[str, Any],
+        top_k: int,
+        r=None,
+    ) -> None:
+        self.tenant_id = tenant_id
+        self.collections = sorted(collections)
+        self.filters = filters
+        self.top_k = top_k
+        self.enabled = QUERY_CACHE_ENABLED
+        self.outcome = "miss"
+        self._r = r
+        self._scope: str | None = None
+
+    @property
+    def r(self):
+        if self._r is None:
+            self._r = _get_redis()
+        return self._r
+
+    async def _scope_digest(self) -> str:
+        """Digest of everything but the query; changes whenever a collection version does."""
+        if self._scope is None:
+            versions = await self.r.mget([version_key(self.tenant_id, c) for c in self.collections])
+            self._scope = _digest(self.collections, [int(v or 0) for v in versions], self.filters, self.top_k)
+        return self._scope
+
+    def _exact_key(self, scope: str, query: str) -> str:
+        return f"tenant:{self.tenant_id}:qcache:{_digest(scope, normalize_query(query))}"
+
+    def _semantic_key(self, scope: str) -> str:
+        return f"tenant:{self.tenant_id}:qcache:sem:{scope}"
+
+    def _disable(self, e: Exception) -> None:
+        logger.warning("Query cache unavailable, bypassing: %s", e)
+        self.enabled = False
+
+    async def get_exact(self, query: str) -> list[dict[str, Any]] | None:
+        if not self.enabled:
+            return None
+        try:
+            raw = await self.r.get(self._exact_key(await self._scope_digest(), query))
+        except Exception as e:
+            self._disable(e)
+            return None
+        if raw is None:
+            return None
+        self.outcome = "exact"
+        return json.loads(raw)
+
+    async def get_semantic(self, query: str, vector: np.ndarray | None) -> list[dict[str, Any]] | None:
+        if not (self.enabled and QUERY_CACHE_SEMANTIC_ENABLED) or vector is None:
+            return None
+        try:
+            scope = await self._scope_digest()
+            entries = await self.r.lrange(self._semantic_key(scope), 0, -1)
+            candidates = [(v, res) for v, res in map(unpack_entry, entries) if v.shape[0] == vector.shape[0]]
+            if not candidates:
+                return None
+            i = best_match(vector, np.stack([v for v, _ in candidates]), QUERY_CACHE_SEMANTIC_THRESHOLD)
+            if i is None:
+                return None
+            result = candidates[i][1]
+            # Next time this exact query skips the embedding call too
+            await self.r.set(self._exact_key(scope, query), result, ex=QUERY_CACHE_TTL_SEC)
+        except Exception as e:
+            self._disable(e)
+            return None
+        self.outcome = "semantic"
+        return json.loads(result)
+
+    async def put(self, query: str, vector: np.ndarray | None, result: list[dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+        try:
+            scope = await self._scope_digest()
+            pipe = self.r.pipeline()
+            pipe.set(self._exact_key(scope, query), json.dumps(result), ex=QUERY_CACHE_TTL_SEC)
+            if QUERY_CACHE_SEMANTIC_ENABLED and vector is not None:
+                key = self._semantic_key(scope)
+                pipe.lpush(key, pack_entry(vec.normalize(vec.as_vector(vector).copy()), result))
+                pipe.ltrim(key, 0, QUERY_CACHE_SEMANTIC_MAX_ENTRIES - 1)
+                pipe.expire(key, QUERY_CACHE_TTL_SEC)
+            await pipe.execute()
+        except Exception as e:
+            self._disable(e)
+
+    def observe(self, elapsed_sec: float) -> None:
+        """Record the outcome; hits are credited with the average miss latency they avoided."""
+        global _miss_latency
+        if not self.enabled and self.outcome == "miss":
+            return
+        metrics.inc("frostbyte_query_cache_requests_total", result=self.outcome)
+        if self.outcome == "miss":
+            _miss_latency = elapsed_sec if _miss_latency is None else (
+                _MISS_LATENCY_ALPHA * elapsed_sec + (1 - _MISS_LATENCY_ALPHA) * _miss_latency
+            )
+            metrics.set_gauge("frostbyte_query_uncached_latency_seconds", _miss_latency)
+        elif _miss_latency is not None:
+            metrics.inc("frostbyte_query_cache_saved_seconds_total", max(0.0, _miss_latency - elapsed_sec))
+        hits = sum(metrics.value("frostbyte_query_cache_requests_total", result=o) for o in ("exact", "semantic"))
+        total = hits + metrics.value("frostbyte_query_cache_requests_total", result="miss")
+        metrics.set_gauge("frostbyte_query_cache_hit_ratio", hits / total)
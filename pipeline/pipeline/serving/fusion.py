@@ -0,0 +1,195 @@
+"""
+Multimodal query engine: parallel fan-out over a tenant's collections with
+reciprocal-rank fusion.
+
+A tenant's vectors live in two spaces: text chunks in tenant_{id} (768d text
+model) and images / video frames in tenant_{id}_images (512d CLIP). A text
+query is embedded with both the text model and the CLIP text tower
+concurrently, both collections are searched concurrently on the async Qdrant
+client, and the ranked lists are merged with RRF: score(d) = sum 1 / (k + rank).
+Cosine scores from different models are not comparable, ranks are. End-to-end
+latency is that of the slowest branch, not the sum.
+
+With backend "pgvector" the same searches run in Postgres (pipeline.pgvector_store)
+over the chunk and image embeddings the multimodal worker stores there.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from qdrant_client.models import Filter, ScoredPoint, SearchParams
+
+from ..embedding import get_text_embedding
+from ..pgvector_store import search_pgvector
+from ..vector_store import IMAGE_DIM, TEXT_DIM, search_tenant
+from .two_stage import two_stage_search
+
+logger = logging.getLogger(__name__)
+
+RRF_K = int(os.getenv("FROSTBYTE_RRF_K", "60"))
+# Each branch returns this many times top_k candidates, so fusion has depth to work with
+FUSION_DEPTH = int(os.getenv("FROSTBYTE_FUSION_DEPTH", "2"))
+# qdrant | pgvector; tenants override with config vector_backend
+VECTOR_BACKEND = os.getenv("FROSTBYTE_VECTOR_BACKEND", "qdrant")
+VECTOR_BACKENDS = ("qdrant", "pgvector")
+
+COLLECTION_SUFFIXES = {"text": "", "images": "_images"}
+COLLECTION_DIMS = {"text": TEXT_DIM, "images": IMAGE_DIM}
+
+
+@dataclass
+class FusedHit:
+    """One fused result; sources maps collection kind -> (rank, cosine score) in that branch."""
+
+    key: str
+    payload: dict[str, Any]
+    fusion_score: float
+    sources: dict[str, tuple[int, float]] = field(default_factory=dict)
+
+    @property
+    def score(self) -> float:
+        """Best raw similarity across branches."""
+        return max(s for _rank, s in self.sources.values())
+
+
+def _hit_key(hit: ScoredPoint) -> str:
+    payload = hit.payload or {}
+    return str(payload.get("chunk_id") or hit.id)
+
+
+def reciprocal_rank_fusion(
+    ranked: dict[str, list[ScoredPoint]],
+    k: int = RRF_K,
+    top_k: int | None = None,
+) -> list[FusedHit]:
+    """Merge ranked hit lists (best first) by reciprocal rank; ties keep first-seen order."""
+    fused: dict[str, FusedHit] = {}
+    for source, hits in ranked.items():
+        for rank, hit in enumerate(hits, start=1):
+            key = _hit_key(hit)
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = FusedHit(key=key, payload=dict(hit.payload or {}), fusion_score=0.0)
+            entry.fusion_score += 1.0 / (k + rank)
+            entry.sources[source] = (rank, hit.score)
+    merged = sorted(fused.values(), key=lambda h: h.fusion_score, reverse=True)
+    return merged[:top_k] if top_k is not None else merged
+
+
+async def _clip_text_vector(text: str) -> np.ndarray | None:
+    from ..multimodal.clip_service import get_clip_encoder
+
+    try:
+        return (await get_clip_encoder().encode_texts([text]))[0]
+    except Exception as e:
+        # No CLIP model (e.g. offline without weights): text collection only
+        logger.warning("CLIP text encoding unavailable, searching text only: %s", e)
+        return None
+
+
+async def _none() -> None:
+    return None
+
+
+async def embed_query(
+    text: str,
+    tenant_id: str | None = None,
+    kinds: tuple[str, ...] = ("text", "images"),
+) -> dict[str, np.ndarray]:
+    """Text-model and/or CLIP-text embeddings of a query, computed concurrently."""
+    text_vec, clip_vec = await asyncio.gather(
+        get_text_embedding(text, tenant_id=tenant_id, input_type="query") if "text" in kinds else _none(),
+        _clip_text_vector(text) if "images" in kinds else _none(),
+    )
+    vectors = {}
+    if text_vec is not None:
+        vectors["text"] = text_vec
+    if clip_vec is not None:
+        vectors["images"] = clip_vec
+    return vectors
+
+
+def _search_kind(
+    tenant_id: str,
+    kind: str,
+    vector: np.ndarray,
+    top_k: int,
+    query_filter: Filter | None,
+    payload_fields: list[str] | bool,
+    doc_candidates: int,
+    doc_filter: Filter | None,
+    search_params: SearchParams | None,
+    backend: str = "qdrant",
+):
+    if backend == "pgvector":
+        return search_pgvector(
+            tenant_id=tenant_id,
+            kind=kind,
+            vector=vector,
+            top_k=top_k,
+            query_filter=query_filter,
+            payload_fields=payload_fields,
+            ef_search=search_params.hnsw_ef if search_params is not None else None,
+        )
+    if kind == "text" and doc_candidates > 0:
+        return two_stage_search(
+            tenant_id, vector, top_k, doc_candidates,
+            doc_filter=doc_filter, chunk_filter=query_filter, payload_fields=payload_fields,
+            search_params=search_params,
+        )
+    return search_tenant(
+        tenant_id=tenant_id,
+        suffix=COLLECTION_SUFFIXES[kind],
+        vector=vector,
+        top_k=top_k,
+        query_filter=query_filter,
+        payload_fields=payload_fields,
+        search_params=search_params,
+    )
+
+
+async def fan_out(
+    tenant_id: str,
+    vectors: dict[str, np.ndarray],
+    top_k: int,
+    query_filter: Filter | None = None,
+    payload_fields: list[str] | bool = True,
+    doc_candidates: int = 0,
+    doc_filter: Filter | None = None,
+    search_params: SearchParams | None = None,
+    backend: str = "qdrant",
+) -> list[FusedHit]:
+    """
+    Search each collection kind in vectors concurrently and fuse the results.
+    With doc_candidates > 0 the text branch is two-stage (serving.two_stage, Qdrant
+    only); search_params is the tenant's index profile at query time (its hnsw_ef
+    is pgvector's ef_search).
+    """
+    kinds = list(vectors)
+    depth = top_k * FUSION_DEPTH if len(kinds) > 1 else top_k
+    results = await asyncio.gather(*(
+        _search_kind(
+            tenant_id, kind, vectors[kind], depth, query_filter, payload_fields,
+            doc_candidates, doc_filter, search_params, backend,
+        )
+        for kind in kinds
+    ))
+    return reciprocal_rank_fusion(dict(zip(kinds, results)), top_k=top_k)
+
+
+async def multimodal_search(
+    tenant_id: str,
+    query_text: str,
+    top_k: int,
+    query_filter: Filter | None = None,
+    payload_fields: list[str] | bool = True,
+    kinds: tuple[str, ...] = ("text", "images"),
+) -> list[FusedHit]:
+    """Embed query_text for every requested collection kind, fan out, fuse."""
+    vectors = await embed_query(query_text, tenant_id=tenant_id, kinds=kinds)
+    return await fan_out(tenant_id, vectors, top_k, query_filter, payload_fields)
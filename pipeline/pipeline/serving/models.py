@@ -0,0 +1,60 @@
+"""
+Serving layer Pydantic models per SERVING_LAYER_PLAN Sections 6 and 8.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class PageRange(BaseModel):
+    """Inclusive page range; either end may be open."""
+
+    start: int | None = Field(default=None, ge=0)
+    end: int | None = Field(default=None, ge=0)
+
+
+class SearchFilters(BaseModel):
+    """Metadata filters, evaluated inside Qdrant on indexed payload fields."""
+
+    classification: str | list[str] | None = None
+    doc_ids: list[str] | None = None
+    page_range: PageRange | None = None
+    modality: str | list[str] | None = None
+
+
+class SearchRequest(BaseModel):
+    """POST /api/v1/query/{tenant_id}/search body."""
+
+    query_text: str = Field(min_length=1)
+    top_k: int = Field(default=5, ge=1, le=50)
+    filters: SearchFilters = Field(default_factory=SearchFilters)
+    # Also search tenant_{id}_images via the CLIP text encoder and fuse by rank
+    include_images: bool = False
+    # Two-stage search over the top-M document centroids; None = tenant default, 0 = single stage
+    doc_candidates: int | None = Field(default=None, ge=0, le=1000)
+
+
+class RetrievedChunk(BaseModel):
+    """One hit of the retrieval proof; fields come from the projected Qdrant payload."""
+
+    chunk_id: str
+    doc_id: str | None = None
+    page: int | None = None
+    classification: str | None = None
+    modality: str | None = None
+    start: float | None = None
+    end: float | None = None
+    similarity_score: float
+    fusion_score: float | None = None
+
+
+class RetrievalProof(BaseModel):
+    """Retrieval proof object (SERVING_LAYER_PLAN Section 6)."""
+
+    query_id: str
+    tenant_id: str
+    chunks: list[RetrievedChunk]
+    timestamp: datetime
+    generation: dict | None = None
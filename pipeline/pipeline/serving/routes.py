@@ -0,0 +1,209 @@
+"""
+Serving layer API routes per SERVING_LAYER_PLAN Section 8.
+POST /api/v1/query/{tenant_id}/search
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from qdrant_client.models import SearchParams
+
+from .. import auth, ratelimit
+from ..embedding import EmbeddingUnavailableError
+from ..pgvector_store import UnsupportedFilterError
+from ..storage.index_profiles import profile_for_config
+from ..vector_store import DOCS_SUFFIX, VectorStoreError, payload_filter
+from .access import CollectionWarmingError, record_access
+from .cache import QueryCache
+from .fusion import COLLECTION_SUFFIXES, VECTOR_BACKEND, VECTOR_BACKENDS, embed_query, fan_out
+from .models import RetrievalProof, RetrievedChunk, SearchRequest
+from .two_stage import TWO_STAGE_DOC_CANDIDATES
+
+router = APIRouter(prefix="/api/v1/query", tags=["serving"])
+
+QUERY_RATE_LIMIT = int(os.getenv("FROSTBYTE_QUERY_RATE_LIMIT", "1000"))
+TOP_K_MAX = 50
+# Only what the retrieval proof needs comes back from Qdrant
+PAYLOAD_FIELDS = ["chunk_id", "doc_id", "page", "classification", "modality", "start", "end"]
+
+
+async def _record_cached_access(tenant_id: str, collections: list[str]) -> None:
+    """A cache hit still counts as traffic for tiering; it is answered even if a collection is archived."""
+    try:
+        await record_access(tenant_id, collections)
+    except CollectionWarmingError:
+        pass
+
+
+async def _emit_audit(tenant_id: str, event_type: str, resource_id: str, details: dict) -> None:
+    """Emit audit event via foundation layer. Details never carry query text or chunk content."""
+    try:
+        from .. import db
+        await db.emit_audit_event(
+            event_id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            event_type=event_type,
+            resource_type="query",
+            resource_id=resource_id,
+            details=details,
+        )
+    except Exception:
+        pass
+
+
+async def _tenant_retrieval_config(tenant_id: str) -> dict:
+    """
+    Tenant state check (SERVING_LAYER_PLAN Section 2, step 3) and its retrieval settings
+    (retrieval_top_k_max, retrieval_doc_candidates). Falls back to defaults when the
+    control-plane DB is unavailable.
+    """
+    from .. import db
+
+    try:
+        tenant = await db.load_tenant_config(tenant_id)
+    except db.TenantNotFoundError:
+        raise HTTPException(
+            status_code=403,
+            detail={"code": "TENANT_SUSPENDED", "message": "Tenant is not ACTIVE"},
+        )
+    except Exception:
+        return {}
+    return tenant["config"]
+
+
+def _search_params(tenant_config: dict) -> SearchParams | None:
+    """hnsw_ef and quantization rescoring of the tenant's index profile (unknown names: Qdrant defaults)."""
+    try:
+        return profile_for_config(tenant_config).search_params()
+    except ValueError:
+        return None
+
+
+@router.post("/{tenant_id}/search", response_model=RetrievalProof)
+async def search(
+    tenant_id: str,
+    body: SearchRequest,
+    token_tenant_id: Annotated[str | None, Depends(auth.get_query_tenant_from_token)] = None,
+) -> RetrievalProof:
+    """
+    Embed the query, run ANN search on tenant_{id} with the filters pushed down into
+    Qdrant, and return the retrieval proof. Per SERVING_LAYER_PLAN Sections 2-4.
+    With include_images, tenant_{id}_images is searched concurrently and the two
+    result lists are merged by reciprocal rank (serving.fusion). Results are cached
+    per collection version (serving.cache); a hit skips embedding and search. With
+    doc_candidates (request or tenant retrieval_doc_candidates) the text search is
+    two-stage: top documents by centroid first, then their chunks (serving.two_stage).
+    Searches, cache hits included, are recorded per collection for storage tiering
+    (serving.access); a query on an archived collection queues its restore and, unless
+    it is answered from the cache, gets 503 COLLECTION_WARMING.
+    Tenants with config vector_backend "pgvector" are searched in Postgres instead.
+    """
+    resolved_tenant_id = auth.require_tenant_or_bypass(tenant_id, token_tenant_id)
+    tenant_config = await _tenant_retrieval_config(resolved_tenant_id)
+    top_k = min(body.top_k, int(tenant_config.get("retrieval_top_k_max", TOP_K_MAX)))
+    doc_candidates = body.doc_candidates
+    if doc_candidates is None:
+        doc_candidates = int(tenant_config.get("retrieval_doc_candidates", TWO_STAGE_DOC_CANDIDATES))
+    backend = tenant_config.get("vector_backend", VECTOR_BACKEND)
+    if backend not in VECTOR_BACKENDS:
+        backend = VECTOR_BACKEND
+    if backend == "pgvector":
+        # Document centroids live in Qdrant only
+        doc_candidates = 0
+    await ratelimit.check_rate_limit(resolved_tenant_id, limit=QUERY_RATE_LIMIT, window_sec=60, bucket="query")
+
+    f = body.filters
+    query_filter = payload_filter(
+        doc_ids=f.doc_ids,
+        classification=f.classification,
+        modality=f.modality,
+        page_from=f.page_range.start if f.page_range else None,
+        page_to=f.page_range.end if f.page_range else None,
+    )
+    # Document-level filter for two-stage stage 1 (page and modality are chunk fields)
+    doc_filter = payload_filter(doc_ids=f.doc_ids, classification=f.classification)
+    kinds = ("text", "images") if body.include_images else ("text",)
+    collections = [f"tenant_{resolved_tenant_id}{COLLECTION_SUFFIXES[k]}" for k in kinds]
+    if doc_candidates:
+        collections.append(f"tenant_{resolved_tenant_id}{DOCS_SUFFIX}")
+    cache = QueryCache(
+        resolved_tenant_id,
+        collections=collections,
+        filters={**f.model_dump(mode="json"), "doc_candidates": doc_candidates, "backend": backend},
+        top_k=top_k,
+    )
+    started = time.perf_counter()
+    cached = await cache.get_exact(body.query_text)
+    if cached is None:
+        try:
+            vectors = await embed_query(body.query_text, tenant_id=resolved_tenant_id, kinds=kinds)
+            cached = await cache.get_semantic(body.query_text, vectors.get("text"))
+            if cached is None:
+                if backend == "qdrant":
+                    await record_access(resolved_tenant_id, collections)
+                hits = await fan_out(
+                    resolved_tenant_id,
+                    vectors,
+                    top_k,
+                    query_filter,
+                    PAYLOAD_FIELDS,
+                    doc_candidates=doc_candidates,
+                    doc_filter=doc_filter,
+                    search_params=_search_params(tenant_config),
+                    backend=backend,
+                )
+        except EmbeddingUnavailableError as e:
+            raise HTTPException(status_code=503, detail={"code": "EMBEDDING_UNAVAILABLE", "message": str(e)})
+        except CollectionWarmingError as e:
+            raise HTTPException(
+                status_code=503,
+                detail={"code": "COLLECTION_WARMING", "message": str(e)},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail={"code": "EMBEDDING_DIMENSION_MISMATCH", "message": str(e)})
+        except UnsupportedFilterError as e:
+            raise HTTPException(status_code=400, detail={"code": "UNSUPPORTED_FILTER", "message": str(e)})
+        except VectorStoreError as e:
+            raise HTTPException(status_code=503, detail={"code": "VECTOR_STORE_UNAVAILABLE", "message": str(e)})
+
+    if cached is not None:
+        if backend == "qdrant":
+            await _record_cached_access(resolved_tenant_id, collections)
+        chunks = [RetrievedChunk.model_validate(c) for c in cached]
+    else:
+        chunks = [
+            RetrievedChunk(
+                similarity_score=h.score,
+                fusion_score=h.fusion_score if len(kinds) > 1 else None,
+                **{k: h.payload.get(k) for k in PAYLOAD_FIELDS},
+            )
+            for h in hits
+            if h.payload.get("chunk_id")
+        ]
+        await cache.put(body.query_text, vectors.get("text"), [c.model_dump(mode="json") for c in chunks])
+    cache.observe(time.perf_counter() - started)
+
+    query_id = str(uuid.uuid4())
+    await _emit_audit(
+        tenant_id=resolved_tenant_id,
+        event_type="RETRIEVAL_EXECUTED",
+        resource_id=query_id,
+        details={
+            "chunk_count": len(chunks),
+            "chunk_ids": [c.chunk_id for c in chunks],
+            "top_k": top_k,
+            "cache": cache.outcome,
+        },
+    )
+    return RetrievalProof(
+        query_id=query_id,
+        tenant_id=resolved_tenant_id,
+        chunks=chunks,
+        timestamp=datetime.now(timezone.utc),
+    )
@@ -0,0 +1,64 @@
+"""
+Two-stage (coarse-to-fine) chunk retrieval over document centroids.
+
+The embedding worker keeps one point per document in tenant_{id}_docs: the unit
+mean of its chunk vectors, with doc_id and the chunk classifications as payload.
+Stage 1 searches that collection for the top doc_candidates (M) documents;
+stage 2 runs the chunk search on tenant_{id} restricted to those doc_ids, a
+keyword filter on the indexed doc_id field. Cost scales with M and the chunks
+of M documents instead of the tenant's whole chunk collection; recall against
+the single-stage search is measured per tenant with scripts/bench_two_stage.py.
+"""
+from __future__ import annotations
+
+import os
+
+import numpy as np
+from qdrant_client.models import Filter, ScoredPoint, SearchParams
+
+from ..vector_store import DOCS_SUFFIX, payload_filter, search_tenant
+
+# Default M; 0 keeps single-stage search. Tenants override with config retrieval_doc_candidates.
+TWO_STAGE_DOC_CANDIDATES = int(os.getenv("FROSTBYTE_TWO_STAGE_DOC_CANDIDATES", "0"))
+
+
+async def two_stage_search(
+    tenant_id: str,
+    vector: np.ndarray,
+    top_k: int,
+    doc_candidates: int,
+    doc_filter: Filter | None = None,
+    chunk_filter: Filter | None = None,
+    payload_fields: list[str] | bool = True,
+    exact: bool = False,
+    search_params: SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    Chunk hits from the top doc_candidates documents. doc_filter applies to the
+    document points (doc_id, classification); chunk_filter to the chunk search.
+    Tenants without a document collection yet get the single-stage search.
+    """
+    docs = await search_tenant(
+        tenant_id=tenant_id,
+        suffix=DOCS_SUFFIX,
+        vector=vector,
+        top_k=doc_candidates,
+        query_filter=doc_filter,
+        payload_fields=["doc_id"],
+        exact=exact,
+        search_params=search_params,
+    )
+    doc_ids = [h.payload["doc_id"] for h in docs if h.payload and h.payload.get("doc_id")]
+    if doc_ids:
+        restrict = payload_filter(doc_ids=doc_ids)
+        chunk_filter = Filter(must=[restrict, chunk_filter]) if chunk_filter is not None else restrict
+    return await search_tenant(
+        tenant_id=tenant_id,
+        suffix="",
+        vector=vector,
+        top_k=top_k,
+        query_filter=chunk_filter,
+        payload_fields=payload_fields,
+        exact=exact,
+        search_params=search_params,
+    )
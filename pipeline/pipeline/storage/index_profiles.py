@@ -0,0 +1,161 @@
+"""
+Named Qdrant index profiles per tenant (tenant config key index_profile).
+
+A profile fixes how a tenant's collections trade recall, latency and memory:
+HNSW graph degree (m) and build beam (ef_construct), scalar int8 quantization
+(quantized vectors in RAM, search rescored against the originals), whether the
+original vectors and the HNSW graph live on disk (memmap) instead of RAM, and
+the optimizer thresholds. Provisioning creates collections with the profile;
+scripts/reprofile_collections.py applies a profile to existing collections.
+
+  latency   m=32, ef_construct=256, int8 in RAM, everything in RAM
+  balanced  m=16, ef_construct=128, int8 in RAM, originals in RAM (default)
+  memory    m=16, ef_construct=100, int8 in RAM, originals and graph on disk
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from qdrant_client.models import (
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    SearchParams,
+    VectorParams,
+)
+
+DEFAULT_INDEX_PROFILE = os.getenv("FROSTBYTE_INDEX_PROFILE", "balanced")
+
+
+@dataclass(frozen=True)
+class IndexProfile:
+    name: str
+    hnsw_m: int
+    ef_construct: int
+    int8_quantization: bool
+    vectors_on_disk: bool
+    hnsw_on_disk: bool
+    # Optimizer thresholds in KB of vectors per segment (Qdrant units)
+    indexing_threshold_kb: int
+    memmap_threshold_kb: int | None
+    default_segment_number: int
+    # Search time: HNSW beam and how many extra quantized candidates are rescored
+    search_ef: int
+    oversampling: float
+
+    def hnsw_config(self) -> dict[str, Any]:
+        return {"m": self.hnsw_m, "ef_construct": self.ef_construct, "on_disk": self.hnsw_on_disk}
+
+    def optimizers_config(self) -> dict[str, Any]:
+        config = {
+            "indexing_threshold": self.indexing_threshold_kb,
+            "default_segment_number": self.default_segment_number,
+        }
+        if self.memmap_threshold_kb is not None:
+            config["memmap_threshold"] = self.memmap_threshold_kb
+        return config
+
+    def quantization_config(self) -> dict[str, Any] | None:
+        if not self.int8_quantization:
+            return None
+        return {"scalar": {"type": "int8", "quantile": 0.99, "always_ram": True}}
+
+    def create_body(self, size: int, distance: str = "Cosine") -> dict[str, Any]:
+        """PUT /collections/{name} body (REST, as used by the provisioner)."""
+        body: dict[str, Any] = {
+            "vectors": {"size": size, "distance": distance, "on_disk": self.vectors_on_disk},
+            "hnsw_config": self.hnsw_config(),
+            "optimizers_config": self.optimizers_config(),
+        }
+        if self.int8_quantization:
+            body["quantization_config"] = self.quantization_config()
+        return body
+
+    def update_body(self) -> dict[str, Any]:
+        """PATCH /collections/{name} body that moves an existing collection to this profile."""
+        return {
+            # "" is the collection's unnamed (default) vector
+            "vectors": {"": {"on_disk": self.vectors_on_disk}},
+            "hnsw_config": self.hnsw_config(),
+            "optimizers_config": self.optimizers_config(),
+            "quantization_config": self.quantization_config() or "Disabled",
+        }
+
+    def collection_kwargs(self, size: int, distance: Distance = Distance.COSINE) -> dict[str, Any]:
+        """QdrantClient.create_collection keyword arguments (lazy creation in vector_store, main)."""
+        quantization = self.quantization_config()
+        return {
+            "vectors_config": VectorParams(size=size, distance=distance, on_disk=self.vectors_on_disk),
+            "hnsw_config": HnswConfigDiff(**self.hnsw_config()),
+            "optimizers_config": OptimizersConfigDiff(**self.optimizers_config()),
+            "quantization_config": ScalarQuantization.model_validate(quantization) if quantization else None,
+        }
+
+    def search_params(self) -> SearchParams:
+        if not self.int8_quantization:
+            return SearchParams(hnsw_ef=self.search_ef)
+        return SearchParams(
+            hnsw_ef=self.search_ef,
+            quantization=QuantizationSearchParams(rescore=True, oversampling=self.oversampling),
+        )
+
+
+PROFILES: dict[str, IndexProfile] = {
+    "latency": IndexProfile(
+        name="latency",
+        hnsw_m=32,
+        ef_construct=256,
+        int8_quantization=True,
+        vectors_on_disk=False,
+        hnsw_on_disk=False,
+        indexing_threshold_kb=10_000,
+        memmap_threshold_kb=None,
+        default_segment_number=4,
+        search_ef=128,
+        oversampling=1.5,
+    ),
+    "balanced": IndexProfile(
+        name="balanced",
+        hnsw_m=16,
+        ef_construct=128,
+        int8_quantization=True,
+        vectors_on_disk=False,
+        hnsw_on_disk=False,
+        indexing_threshold_kb=20_000,
+        memmap_threshold_kb=None,
+        default_segment_number=2,
+        search_ef=64,
+        oversampling=2.0,
+    ),
+    "memory": IndexProfile(
+        name="memory",
+        hnsw_m=16,
+        ef_construct=100,
+        int8_quantization=True,
+        vectors_on_disk=True,
+        hnsw_on_disk=True,
+        indexing_threshold_kb=20_000,
+        memmap_threshold_kb=20_000,
+        default_segment_number=2,
+        search_ef=64,
+        oversampling=3.0,
+    ),
+}
+
+
+def get_profile(name: str | None = None) -> IndexProfile:
+    """Profile by name (default FROSTBYTE_INDEX_PROFILE). Raises ValueError for unknown names."""
+    name = name or DEFAULT_INDEX_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown index profile {name!r}; expected one of {sorted(PROFILES)}") from None
+
+
+def profile_for_config(config: dict[str, Any]) -> IndexProfile:
+    """Profile named by a tenant's config (index_profile), else the default."""
+    return get_profile(config.get("index_profile"))
@@ -0,0 +1,112 @@
+"""
+pgvector ANN indexes on the Postgres embedding columns (chunks, image_embeddings).
+
+  hnsw     graph index; m (neighbours per node) and ef_construction (build beam) fix
+           recall and size, hnsw.ef_search sets the query beam. Good recall without
+           training; build is slower and the index larger.
+  ivfflat  k-means lists; lists is fixed at build time (rows / 1000 by default, so
+           build it after the data is loaded) and ivfflat.probes sets how many lists
+           a query scans.
+
+halfvec indexes the column cast to halfvec(dim): the index, the part that has to stay
+in memory, takes half the space, at a small precision cost. The column itself stays
+vector(dim). Queries must use the same expression, so pgvector_store reads the same
+PGVECTOR_HALFVEC setting. Migration 012 creates the default HNSW indexes;
+scripts/pgvector_indexes.py rebuilds them with other settings.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+PGVECTOR_INDEX_METHOD = os.getenv("PGVECTOR_INDEX_METHOD", "hnsw")
+PGVECTOR_HALFVEC = os.getenv("PGVECTOR_HALFVEC", "false").lower() in ("1", "true", "yes")
+PGVECTOR_HNSW_M = int(os.getenv("PGVECTOR_HNSW_M", "16"))
+PGVECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv("PGVECTOR_HNSW_EF_CONSTRUCTION", "64"))
+# 0: rows / 1000 (at least 10) when the index is built
+PGVECTOR_IVFFLAT_LISTS = int(os.getenv("PGVECTOR_IVFFLAT_LISTS", "0"))
+INDEX_METHODS = ("hnsw", "ivfflat")
+
+
+@dataclass(frozen=True)
+class VectorColumn:
+    table: str
+    column: str
+    dim: int
+
+    def expression(self, halfvec: bool = PGVECTOR_HALFVEC, alias: str | None = None) -> str:
+        """Indexed (and queried) expression: the column, or its halfvec cast."""
+        column = f"{alias}.{self.column}" if alias else self.column
+        return f"({column}::halfvec({self.dim}))" if halfvec else column
+
+    def index_name(self, method: str, halfvec: bool = PGVECTOR_HALFVEC) -> str:
+        return f"idx_{self.table}_{self.column}_{method}{'_half' if halfvec else ''}"
+
+
+VECTOR_COLUMNS = {
+    "text": VectorColumn("chunks", "embedding", 768),
+    "images": VectorColumn("image_embeddings", "embedding", 512),
+}
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector's guidance for up to ~1M rows."""
+    return max(10, rows // 1000)
+
+
+def create_index_sql(
+    col: VectorColumn,
+    method: str = PGVECTOR_INDEX_METHOD,
+    halfvec: bool = PGVECTOR_HALFVEC,
+    m: int = PGVECTOR_HNSW_M,
+    ef_construction: int = PGVECTOR_HNSW_EF_CONSTRUCTION,
+    lists: int = 100,
+) -> str:
+    """CREATE INDEX CONCURRENTLY statement (cosine distance) for one vector column."""
+    if method not in INDEX_METHODS:
+        raise ValueError(f"Unknown pgvector index method {method!r}; expected one of {INDEX_METHODS}")
+    opclass = "halfvec_cosine_ops" if halfvec else "vector_cosine_ops"
+    options = f"m = {int(m)}, ef_construction = {int(ef_construction)}" if method == "hnsw" else f"lists = {int(lists)}"
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {col.index_name(method, halfvec)} "
+        f"ON {col.table} USING {method} ({col.expression(halfvec)} {opclass}) WITH ({options})"
+    )
+
+
+async def vector_indexes(conn, col: VectorColumn) -> list[str]:
+    """Names of the existing ANN (hnsw/ivfflat) indexes on a vector column's table."""
+    rows = await conn.fetch(
+        """
+        SELECT i.relname FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        JOIN pg_am a ON a.oid = i.relam
+        WHERE t.relname = $1 AND a.amname = ANY($2::text[])
+        """,
+        col.table,
+        list(INDEX_METHODS),
+    )
+    return [r["relname"] for r in rows]
+
+
+async def rebuild_index(
+    conn,
+    col: VectorColumn,
+    method: str = PGVECTOR_INDEX_METHOD,
+    halfvec: bool = PGVECTOR_HALFVEC,
+    m: int = PGVECTOR_HNSW_M,
+    ef_construction: int = PGVECTOR_HNSW_EF_CONSTRUCTION,
+    lists: int | None = None,
+) -> str:
+    """
+    Build the requested index concurrently (reads and writes continue), then drop the
+    column's other ANN indexes. Returns the index name. conn must not be in a transaction.
+    """
+    if method == "ivfflat" and not lists:
+        lists = PGVECTOR_IVFFLAT_LISTS or ivfflat_lists(await conn.fetchval(f"SELECT count(*) FROM {col.table}"))
+    name = col.index_name(method, halfvec)
+    await conn.execute(create_index_sql(col, method, halfvec, m, ef_construction, lists or 100))
+    for other in await vector_indexes(conn, col):
+        if other != name:
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {other}")
+    return name
@@ -0,0 +1,188 @@
+"""
+Qdrant placement of a tenant's vectors: dedicated collections or the shared pool.
+
+  dedicated  tenant_{id}, tenant_{id}_images, tenant_{id}_docs (get_collection_name)
+  shared     tenants_shared, tenants_shared_images, tenants_shared_docs, pooled across
+             the long tail of small tenants. Points carry tenant_id, a keyword payload
+             index with is_tenant=true, so Qdrant co-locates each tenant's points and
+             builds per-tenant HNSW graphs (payload_m) instead of a global one (m=0).
+             Every read is filtered on tenant_id and checked by verify_tenant_access;
+             point IDs hash tenant_id with the chunk ID so tenants never collide.
+
+A tenant's placement is the tenant config key qdrant_placement ("dedicated" or
+"shared"; set at provisioning, default FROSTBYTE_QDRANT_PLACEMENT for tenants not
+in the registry or processes without a control DB), cached per process for
+PLACEMENT_CACHE_TTL_SEC. If the registry cannot be read the previous value is
+kept; with nothing cached PlacementUnavailableError is raised rather than
+guessing (a wrong guess would write into a collection readers never see).
+
+A shared tenant that reaches SHARED_PROMOTE_POINTS text points is promoted: its
+points are copied to dedicated collections, the config is flipped, and after one
+cache TTL (writers may still hold the old placement) the copied points are deleted
+from the pool and copy-and-delete rounds move what was written since. Each round
+deletes only the point IDs it copied, so a late write is moved by the next round
+instead of being lost. Workers check the threshold in the background after their
+writes, at most once per tenant per PLACEMENT_CACHE_TTL_SEC
+(schedule_promotion_check).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from .qdrant_provisioner import SHARED_COLLECTION, TENANT_KEY, get_collection_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLACEMENT = os.getenv("FROSTBYTE_QDRANT_PLACEMENT", "dedicated")
+PLACEMENT_CACHE_TTL_SEC = float(os.getenv("FROSTBYTE_PLACEMENT_CACHE_TTL_SEC", "60"))
+SHARED_PROMOTE_POINTS = int(os.getenv("FROSTBYTE_SHARED_PROMOTE_POINTS", "20000"))
+# Registry unreadable: keep serving the cached placement, retry this often
+PLACEMENT_RETRY_SEC = 5.0
+PROMOTE_CATCHUP_ROUNDS = 5
+
+_cache: dict[str, tuple[float, bool]] = {}
+# Last promotion check per tenant, and the checks still running (kept referenced)
+_promotion_checked: dict[str, float] = {}
+_promotion_tasks: set[asyncio.Task] = set()
+
+
+class PlacementUnavailableError(ConnectionError):
+    """The tenant's placement could not be read (control DB unreachable) and none is cached."""
+
+
+@dataclass(frozen=True)
+class Placement:
+    tenant_id: str
+    shared: bool
+
+    def collection(self, suffix: str = "") -> str:
+        """Physical collection holding this tenant's points for a collection suffix."""
+        root = SHARED_COLLECTION if self.shared else get_collection_name(self.tenant_id)
+        return f"{root}{suffix}"
+
+    def point_key(self, key: str) -> str:
+        """String hashed into the Qdrant point ID (chunk_id, or doc_id for centroids)."""
+        return f"{self.tenant_id}/{key}" if self.shared else key
+
+    def scope(self, query_filter: Filter | None = None) -> Filter | None:
+        """query_filter restricted to this tenant's points (unchanged for dedicated collections)."""
+        if not self.shared:
+            return query_filter
+        pin = FieldCondition(key=TENANT_KEY, match=MatchValue(value=self.tenant_id))
+        return Filter(must=[pin, query_filter] if query_filter is not None else [pin])
+
+
+async def _load_shared(tenant_id: str) -> bool:
+    """Registry placement of the tenant in any state; raises if the registry cannot be read."""
+    from .. import db
+
+    try:
+        pool = db._get_pool()
+    except RuntimeError:
+        # No control DB in this process: every tenant has the default placement
+        return DEFAULT_PLACEMENT == "shared"
+    placement = await pool.fetchval(
+        "SELECT config->>'qdrant_placement' FROM tenants WHERE tenant_id = $1", tenant_id
+    )
+    return (placement or DEFAULT_PLACEMENT) == "shared"
+
+
+async def get_placement(tenant_id: str) -> Placement:
+    now = time.monotonic()
+    cached = _cache.get(tenant_id)
+    if cached is None or now - cached[0] > PLACEMENT_CACHE_TTL_SEC:
+        try:
+            shared = await _load_shared(tenant_id)
+        except Exception as e:
+            if cached is None:
+                raise PlacementUnavailableError(f"Qdrant placement of tenant {tenant_id} unavailable: {e}") from e
+            logger.warning("Could not refresh the placement of tenant %s, keeping the cached one: %s", tenant_id, e)
+            _cache[tenant_id] = (now - PLACEMENT_CACHE_TTL_SEC + PLACEMENT_RETRY_SEC, cached[1])
+            return Placement(tenant_id, cached[1])
+        cached = _cache[tenant_id] = (now, shared)
+    return Placement(tenant_id, cached[1])
+
+
+async def promote(tenant_id: str, index_profile: str | None = None) -> int:
+    """
+    Move a shared tenant to dedicated collections (created with index_profile, by
+    default the tenant config's); returns points moved out of the pool.
+    """
+    from .. import db, vector_store
+
+    if index_profile is None:
+        try:
+            index_profile = (await db.load_tenant_config(tenant_id))["config"].get("index_profile")
+        except Exception:
+            pass
+    shared, dedicated = Placement(tenant_id, True), Placement(tenant_id, False)
+    copied_ids: dict[str, list] = {}
+    moved = await vector_store.copy_tenant_points(
+        shared, dedicated, index_profile=index_profile, copied_ids=copied_ids
+    )
+    await db.update_tenant_config(tenant_id, {"qdrant_placement": "dedicated"})
+    _cache[tenant_id] = (time.monotonic(), False)
+    # Other processes read the old placement until their cache entry expires
+    await asyncio.sleep(PLACEMENT_CACHE_TTL_SEC)
+    await vector_store.delete_tenant_points(shared, point_ids=copied_ids)
+    for _ in range(PROMOTE_CATCHUP_ROUNDS):
+        copied_ids: dict[str, list] = {}
+        n = await vector_store.copy_tenant_points(shared, dedicated, index_profile=index_profile, copied_ids=copied_ids)
+        if not n:
+            break
+        # Only what this round copied: a write that lands after the scroll waits for the next round
+        await vector_store.delete_tenant_points(shared, point_ids=copied_ids)
+        moved += n
+    else:
+        logger.warning("Tenant %s still had writes into the shared pool after promotion", tenant_id)
+    logger.info("Promoted tenant %s to dedicated collections (%d points)", tenant_id, moved)
+    return moved
+
+
+async def maybe_promote(r, tenant_id: str) -> bool:
+    """
+    Promote a shared tenant past SHARED_PROMOTE_POINTS. One promotion per tenant at
+    a time across workers (Redis lock tenant:{id}:qdrant:promoting).
+    """
+    placement = await get_placement(tenant_id)
+    if not placement.shared:
+        return False
+    from .. import vector_store
+
+    if await vector_store.count_tenant_points(placement) < SHARED_PROMOTE_POINTS:
+        return False
+    lock = f"tenant:{tenant_id}:qdrant:promoting"
+    if not await r.set(lock, "1", nx=True, ex=int(PLACEMENT_CACHE_TTL_SEC) + 3600):
+        return False
+    try:
+        await promote(tenant_id)
+    except Exception as e:
+        # Copies are idempotent upserts; the next check retries
+        logger.warning("Promotion of tenant %s failed: %s", tenant_id, e)
+        return False
+    finally:
+        await r.delete(lock)
+    return True
+
+
+def _promotion_done(task: asyncio.Task) -> None:
+    _promotion_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("%s failed: %s", task.get_name(), task.exception())
+
+
+def schedule_promotion_check(r, tenant_id: str) -> None:
+    """Run maybe_promote in the background, at most once per tenant per PLACEMENT_CACHE_TTL_SEC."""
+    now = time.monotonic()
+    if now - _promotion_checked.get(tenant_id, float("-inf")) < PLACEMENT_CACHE_TTL_SEC:
+        return
+    _promotion_checked[tenant_id] = now
+    task = asyncio.create_task(maybe_promote(r, tenant_id), name=f"Promotion check of tenant {tenant_id}")
+    _promotion_tasks.add(task)
+    task.add_done_callback(_promotion_done)
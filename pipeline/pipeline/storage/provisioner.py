@@ -25,6 +25,28 @@ class ProvisioningError(Exception):
     pass
 
 
+async def _set_qdrant_placement(control_db_url: str, tenant_id: str, placement: str | None) -> str:
+    """Write (or with None remove) the registry's qdrant_placement for the tenant; returns the UPDATE status."""
+    conn = await asyncpg.connect(control_db_url)
+    try:
+        if placement is None:
+            return await conn.execute(
+                "UPDATE tenants SET config = config - 'qdrant_placement' WHERE tenant_id = $1", tenant_id
+            )
+        return await conn.execute(
+            """
+            UPDATE tenants
+            SET config = COALESCE(config, '{}'::jsonb) || jsonb_build_object('qdrant_placement', $2::text),
+                config_version = config_version + 1
+            WHERE tenant_id = $1
+            """,
+            tenant_id,
+            placement,
+        )
+    finally:
+        await conn.close()
+
+
 async def provision_tenant_storage(
     *,
     tenant_id: str,
@@ -38,10 +60,15 @@ async def provision_tenant_storage(
     sops_keys_path: str,
     emit_audit_event_fn,
     use_mc_iam: bool = False,
+    index_profile: str | None = None,
+    shared_qdrant: bool = False,
 ) -> dict[str, str]:
     """
     Provision all stores for tenant. Rollback on failure. Emit TENANT_PROVISIONED after verification.
-    Per STORAGE_LAYER_PLAN Section 7.
+    index_profile is the tenant config's index_profile (storage.index_profiles); shared_qdrant places
+    the tenant in the shared collection pool (storage.placement). The placement is written to the
+    tenant's registry config (qdrant_placement), which is what writers and readers resolve, so a
+    shared tenant's registry row must exist. Per STORAGE_LAYER_PLAN Section 7.
     """
     # Step 1: Generate age key and credentials
     base = Path(sops_keys_path) / tenant_id
@@ -108,9 +135,17 @@ async def provision_tenant_storage(
             await pool.close()
 
         # Step 6: Qdrant
-        await qdrant_provisioner.provision_qdrant_collection(qdrant_url, tenant_id)
+        await qdrant_provisioner.provision_qdrant_collection(
+            qdrant_url, tenant_id, index_profile=index_profile, shared=shared_qdrant
+        )
         completed.append("qdrant")
 
+        # Step 6b: Record the placement; without it writers would fall back to the default
+        status = await _set_qdrant_placement(control_db_url, tenant_id, "shared" if shared_qdrant else "dedicated")
+        if shared_qdrant and status.split()[-1] == "0":
+            raise ProvisioningError(f"Tenant {tenant_id} is not in the registry; cannot record its Qdrant placement")
+        completed.append("placement")
+
         # Step 7: Redis
         await loop.run_in_executor(
             None,
@@ -121,8 +156,9 @@ async def provision_tenant_storage(
         completed.append("redis")
 
         # Step 8: Verification (simplified - check collection exists)
+        coll = qdrant_provisioner.SHARED_COLLECTION if shared_qdrant else get_collection_name(tenant_id)
         async with httpx.AsyncClient() as c:
-            r = await c.get(f"{qdrant_url.rstrip('/')}/collections/{get_collection_name(tenant_id)}")
+            r = await c.get(f"{qdrant_url.rstrip('/')}/collections/{coll}")
         if r.status_code != 200:
             raise ProvisioningError(f"Qdrant verification failed: {r.status_code}")
 
@@ -164,6 +200,8 @@ async def provision_tenant_storage(
                         await pool.close()
                 elif step == "qdrant":
                     await qdrant_provisioner.deprovision_qdrant_collection(qdrant_url, tenant_id)
+                elif step == "placement":
+                    await _set_qdrant_placement(control_db_url, tenant_id, None)
                 elif step == "redis":
                     loop = asyncio.get_event_loop()
                     await loop.run_in_executor(
@@ -4,9 +4,27 @@ Qdrant provisioning per STORAGE_LAYER_PLAN Section 4.
 from __future__ import annotations
 
 import httpx
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from .index_profiles import get_profile
 
 VECTOR_SIZE = 768
+IMAGE_VECTOR_SIZE = 512
 VECTOR_DISTANCE = "Cosine"
+# Collections owned by a tenant: name suffix -> vector size (text, CLIP images, document centroids)
+TENANT_COLLECTIONS = {"": VECTOR_SIZE, "_images": IMAGE_VECTOR_SIZE, "_docs": VECTOR_SIZE}
+# Shared pool for small tenants (storage.placement): one collection per suffix, partitioned by
+# the tenant_id payload key (a tenant index) with per-tenant HNSW graphs instead of a global one
+SHARED_COLLECTION = "tenants_shared"
+TENANT_KEY = "tenant_id"
+SHARED_HNSW = {"m": 0, "payload_m": 16}
+# Payload fields filtered on by the serving layer (SERVING_LAYER_PLAN Section 4)
+PAYLOAD_INDEXES = {
+    "doc_id": "keyword",
+    "classification": "keyword",
+    "modality": "keyword",
+    "page": "integer",
+}
 
 
 def get_collection_name(tenant_id: str) -> str:
@@ -14,38 +32,107 @@ def get_collection_name(tenant_id: str) -> str:
     return f"tenant_{tenant_id}"
 
 
-def verify_tenant_access(tenant_id: str, collection_name: str) -> None:
-    """Raise PermissionError if tenant cannot access collection. Per STORAGE_LAYER_PLAN 4.1."""
-    expected = get_collection_name(tenant_id)
-    if collection_name != expected:
-        raise PermissionError(f"Tenant {tenant_id} cannot access {collection_name}")
+def _pins_tenant(query_filter: Filter | None, tenant_id: str) -> bool:
+    """True if the filter's top-level must clause requires tenant_id == tenant_id."""
+    must = query_filter.must if query_filter is not None else None
+    if must is None:
+        return False
+    conditions = must if isinstance(must, list) else [must]
+    return any(
+        isinstance(c, FieldCondition)
+        and c.key == TENANT_KEY
+        and isinstance(c.match, MatchValue)
+        and c.match.value == tenant_id
+        for c in conditions
+    )
+
+
+def verify_tenant_access(tenant_id: str, collection_name: str, query_filter: Filter | None = None) -> None:
+    """
+    Raise PermissionError if tenant cannot access collection. Per STORAGE_LAYER_PLAN 4.1.
+    A tenant's own collections are accessible; a shared pool collection only through a
+    query_filter pinned to the tenant's tenant_id.
+    """
+    root = get_collection_name(tenant_id)
+    if collection_name in {f"{root}{suffix}" for suffix in TENANT_COLLECTIONS}:
+        return
+    if collection_name in {f"{SHARED_COLLECTION}{suffix}" for suffix in TENANT_COLLECTIONS}:
+        if _pins_tenant(query_filter, tenant_id):
+            return
+        raise PermissionError(f"Tenant {tenant_id} cannot access {collection_name} without a tenant filter")
+    raise PermissionError(f"Tenant {tenant_id} cannot access {collection_name}")
+
+
+def shared_create_body(size: int, index_profile: str | None = None) -> dict:
+    """PUT body for a shared pool collection: the profile with per-tenant HNSW graphs."""
+    body = get_profile(index_profile).create_body(size, VECTOR_DISTANCE)
+    body["hnsw_config"].update(SHARED_HNSW)
+    return body
 
 
 async def provision_qdrant_collection(
     qdrant_url: str,
     tenant_id: str,
+    index_profile: str | None = None,
+    shared: bool = False,
 ) -> None:
-    """Create Qdrant collection for tenant. Per STORAGE_LAYER_PLAN 4.1."""
-    coll = get_collection_name(tenant_id)
+    """
+    Create the tenant's collections (text, images, document centroids) with the
+    tenant's index profile and payload indexes. Per STORAGE_LAYER_PLAN 4.1.
+    A shared tenant gets no collections of its own; the shared pool collections
+    (with the tenant_id tenant index) are created if missing.
+    Existing collections are left as they are (reprofile with apply_index_profile);
+    index creation is idempotent, so re-provisioning adds indexes to older collections.
+    """
+    profile = get_profile(index_profile)
+    root = SHARED_COLLECTION if shared else get_collection_name(tenant_id)
+    indexes: dict[str, str | dict] = dict(PAYLOAD_INDEXES)
+    if shared:
+        indexes[TENANT_KEY] = {"type": "keyword", "is_tenant": True}
     async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.put(
-            f"{qdrant_url.rstrip('/')}/collections/{coll}",
-            json={
-                "vectors": {
-                    "size": VECTOR_SIZE,
-                    "distance": VECTOR_DISTANCE,
-                },
-            },
-        )
-        if r.status_code in (200, 201):
-            return
-        if r.status_code == 409:
-            return  # already exists
-        r.raise_for_status()
+        for suffix, size in TENANT_COLLECTIONS.items():
+            base = f"{qdrant_url.rstrip('/')}/collections/{root}{suffix}"
+            body = shared_create_body(size, index_profile) if shared else profile.create_body(size, VECTOR_DISTANCE)
+            r = await client.put(base, json=body)
+            if r.status_code not in (200, 201, 409):  # 409: already exists
+                r.raise_for_status()
+            for field_name, schema in indexes.items():
+                r = await client.put(
+                    f"{base}/index",
+                    params={"wait": "true"},
+                    json={"field_name": field_name, "field_schema": schema},
+                )
+                r.raise_for_status()
+
+
+async def apply_index_profile(qdrant_url: str, collection: str, index_profile: str | None = None) -> bool:
+    """
+    Move an existing collection to an index profile (PATCH /collections/{name}).
+    Qdrant rebuilds the HNSW graph and quantized vectors in the background.
+    Returns False if the collection does not exist.
+    """
+    profile = get_profile(index_profile)
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        r = await client.patch(f"{qdrant_url.rstrip('/')}/collections/{collection}", json=profile.update_body())
+    if r.status_code == 404:
+        return False
+    r.raise_for_status()
+    return True
 
 
 async def deprovision_qdrant_collection(qdrant_url: str, tenant_id: str) -> None:
-    """Delete Qdrant collection. Per STORAGE_LAYER_PLAN 4.3."""
-    coll = get_collection_name(tenant_id)
+    """
+    Delete the tenant's Qdrant collections and its points in the shared pool.
+    Per STORAGE_LAYER_PLAN 4.3.
+    """
+    root = get_collection_name(tenant_id)
+    base = f"{qdrant_url.rstrip('/')}/collections"
+    tenant_filter = {"must": [{"key": TENANT_KEY, "match": {"value": tenant_id}}]}
     async with httpx.AsyncClient(timeout=30.0) as client:
-        await client.delete(f"{qdrant_url.rstrip('/')}/collections/{coll}")
+        for suffix in TENANT_COLLECTIONS:
+            await client.delete(f"{base}/{root}{suffix}")
+            await client.post(
+                f"{base}/{SHARED_COLLECTION}{suffix}/points/delete",
+                params={"wait": "true"},
+                json={"filter": tenant_filter},
+            )
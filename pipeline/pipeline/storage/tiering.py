@@ -0,0 +1,251 @@
+"""
+Hot/cold tiering of dedicated tenant collections by query traffic.
+
+Every collection starts hot: whatever its index profile keeps in RAM stays there.
+The serving layer records each query against the collections it reads
+(serving.access); scripts/run_tiering_worker.py moves collections down as they go
+idle and back up when traffic returns:
+
+  hot       the tenant's index profile (no tier key)
+  disk      original vectors, HNSW graph and payload on disk (memmap); quantized
+            vectors stay in RAM, so search still works, paging in what it touches
+  archived  snapshot uploaded to the tenant's MinIO bucket and the collection
+            deleted; nothing left on the Qdrant node
+
+archiving and restoring mark a collection in transit. Queries on disk collections
+are served; once a disk collection reaches TIER_PROMOTE_QUERIES_PER_HOUR it is
+queued for warm-up. Queries on archived (or in-transit) collections cannot be
+served; the first one queues the restore and gets 503 COLLECTION_WARMING. Writers
+call check_writable first and defer their job while a collection is archived, so a
+restore never overwrites newer points.
+
+Redis keys:
+  tenant:{id}:collection:{name}:tier          tier when not hot
+  tenant:{id}:collection:{name}:snapshot      MinIO key of an archived collection
+  tenant:{id}:collection:{name}:hits:{hour}   queries per UTC hour (kept two days)
+  qdrant:collections:last_access              ZSET collection -> last query time
+  qdrant:tiering:warmup                       warm-up requests ({tenant_id, collection})
+
+Shared pool collections (storage.placement) are never tiered.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from .index_profiles import get_profile
+from .qdrant_provisioner import SHARED_COLLECTION, TENANT_COLLECTIONS, get_collection_name
+
+logger = logging.getLogger(__name__)
+
+# Idle time before a hot collection goes to disk, and before a disk collection is archived (0: never)
+TIER_DISK_AFTER_SEC = int(os.getenv("FROSTBYTE_TIER_DISK_AFTER_SEC", "3600"))
+TIER_ARCHIVE_AFTER_SEC = int(os.getenv("FROSTBYTE_TIER_ARCHIVE_AFTER_SEC", str(7 * 86400)))
+# Queries per UTC hour that bring a disk collection back to RAM
+TIER_PROMOTE_QUERIES_PER_HOUR = int(os.getenv("FROSTBYTE_TIER_PROMOTE_QUERIES_PER_HOUR", "3"))
+# Writes already past check_writable get this long to land before the snapshot is taken
+TIER_ARCHIVE_GRACE_SEC = float(os.getenv("FROSTBYTE_TIER_ARCHIVE_GRACE_SEC", "30"))
+TIER_WARMUP_LOCK_SEC = 600
+# Writers re-defer a job every TIER_WARMUP_DEFER_SEC while its collections warm up, for at
+# most TIER_WARMUP_MAX_WAIT_SEC; these waits do not count against the job's retry budget
+TIER_WARMUP_DEFER_SEC = float(os.getenv("FROSTBYTE_TIER_WARMUP_DEFER_SEC", "30"))
+TIER_WARMUP_MAX_WAIT_SEC = float(os.getenv("FROSTBYTE_TIER_WARMUP_MAX_WAIT_SEC", "3600"))
+WARMUP_BACKOFF_SEC = (TIER_WARMUP_DEFER_SEC,) * max(1, math.ceil(TIER_WARMUP_MAX_WAIT_SEC / TIER_WARMUP_DEFER_SEC))
+
+HOT, DISK, ARCHIVING, ARCHIVED, RESTORING = "hot", "disk", "archiving", "archived", "restoring"
+# Tiers whose collection cannot be searched or written
+UNAVAILABLE = frozenset({ARCHIVING, ARCHIVED, RESTORING})
+
+LAST_ACCESS_KEY = "qdrant:collections:last_access"
+WARMUP_QUEUE = "qdrant:tiering:warmup"
+SNAPSHOT_PREFIX = "qdrant-snapshots"
+HITS_TTL_SEC = 2 * 86400
+
+# PATCH /collections/{name}: everything but the quantized vectors to disk
+DISK_UPDATE_BODY = {
+    "vectors": {"": {"on_disk": True}},
+    "hnsw_config": {"on_disk": True},
+    "params": {"on_disk_payload": True},
+}
+
+
+class CollectionArchivedError(Exception):
+    """A collection is archived or in transit; retry after its warm-up."""
+
+
+def tier_key(tenant_id: str, collection: str) -> str:
+    return f"tenant:{tenant_id}:collection:{collection}:tier"
+
+
+def snapshot_key(tenant_id: str, collection: str) -> str:
+    return f"tenant:{tenant_id}:collection:{collection}:snapshot"
+
+
+def hits_key(tenant_id: str, collection: str, hour: int | None = None) -> str:
+    hour = int(time.time() // 3600) if hour is None else hour
+    return f"tenant:{tenant_id}:collection:{collection}:hits:{hour}"
+
+
+def tenant_collections(tenant_id: str) -> list[str]:
+    """The tenant's dedicated collection names (text, images, document centroids)."""
+    return [f"{get_collection_name(tenant_id)}{suffix}" for suffix in TENANT_COLLECTIONS]
+
+
+def split_collection_name(name: str) -> tuple[str, str] | None:
+    """(tenant_id, suffix) of a dedicated tenant collection; None for anything else."""
+    prefix = get_collection_name("")
+    if not name.startswith(prefix) or name.startswith(SHARED_COLLECTION):
+        return None
+    rest = name[len(prefix):]
+    # Longest suffix first: tenant_acme_docs is acme's "_docs" collection
+    for suffix in sorted(TENANT_COLLECTIONS, key=len, reverse=True):
+        if suffix and rest.endswith(suffix) and len(rest) > len(suffix):
+            return rest[: -len(suffix)], suffix
+    return (rest, "") if rest else None
+
+
+def _decode(value) -> str | None:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def get_tiers(r, tenant_id: str, collections: list[str]) -> dict[str, str]:
+    values = await r.mget([tier_key(tenant_id, c) for c in collections])
+    return {c: _decode(v) or HOT for c, v in zip(collections, values)}
+
+
+async def set_tier(r, tenant_id: str, collection: str, tier: str) -> None:
+    if tier == HOT:
+        await r.delete(tier_key(tenant_id, collection))
+    else:
+        await r.set(tier_key(tenant_id, collection), tier)
+
+
+async def hourly_queries(r, tenant_id: str, collection: str) -> int:
+    """Queries recorded in the current and previous UTC hour."""
+    hour = int(time.time() // 3600)
+    values = await r.mget([hits_key(tenant_id, collection, h) for h in (hour, hour - 1)])
+    return sum(int(v) for v in values if v is not None)
+
+
+async def request_warmup(r, tenant_id: str, collection: str) -> bool:
+    """Queue a collection for warm-up once per TIER_WARMUP_LOCK_SEC; True if newly queued."""
+    lock = f"tenant:{tenant_id}:collection:{collection}:warming"
+    if not await r.set(lock, "1", nx=True, ex=TIER_WARMUP_LOCK_SEC):
+        return False
+    await r.lpush(WARMUP_QUEUE, json.dumps({"tenant_id": tenant_id, "collection": collection}))
+    return True
+
+
+async def finish_warmup(r, tenant_id: str, collection: str) -> None:
+    await r.delete(f"tenant:{tenant_id}:collection:{collection}:warming")
+
+
+async def check_writable(r, tenant_id: str) -> None:
+    """
+    Raise CollectionArchivedError (after queueing the warm-up) if any of the tenant's
+    collections is archived or in transit; writers defer the job and retry.
+    """
+    tiers = await get_tiers(r, tenant_id, tenant_collections(tenant_id))
+    unavailable = [c for c, tier in tiers.items() if tier in UNAVAILABLE]
+    for collection in unavailable:
+        await request_warmup(r, tenant_id, collection)
+    if unavailable:
+        raise CollectionArchivedError(f"Collections {', '.join(unavailable)} are archived; warm-up queued")
+
+
+async def is_writable(r, tenant_id: str) -> bool:
+    """check_writable as a bool (the warm-up is still queued); for the vector spool replayer."""
+    try:
+        await check_writable(r, tenant_id)
+    except CollectionArchivedError:
+        return False
+    return True
+
+
+def next_tier(tier: str, idle_sec: float, queries: int) -> str | None:
+    """Tier a settled (hot, disk) collection should move to, or None to stay."""
+    if tier == DISK and queries >= TIER_PROMOTE_QUERIES_PER_HOUR:
+        return HOT
+    if TIER_ARCHIVE_AFTER_SEC and idle_sec >= TIER_ARCHIVE_AFTER_SEC and tier in (HOT, DISK):
+        return ARCHIVED
+    if tier == HOT and idle_sec >= TIER_DISK_AFTER_SEC:
+        return DISK
+    return None
+
+
+async def _patch(qdrant_url: str, collection: str, body: dict) -> bool:
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        r = await client.patch(f"{qdrant_url.rstrip('/')}/collections/{collection}", json=body)
+    if r.status_code == 404:
+        return False
+    r.raise_for_status()
+    return True
+
+
+async def move_to_disk(qdrant_url: str, collection: str) -> bool:
+    """Vectors, HNSW graph and payload to disk; False if the collection does not exist."""
+    return await _patch(qdrant_url, collection, DISK_UPDATE_BODY)
+
+
+async def move_to_ram(qdrant_url: str, collection: str, index_profile: str | None = None) -> bool:
+    """Back to the tenant's index profile, payload in RAM; False if the collection does not exist."""
+    body = get_profile(index_profile).update_body()
+    body["params"] = {"on_disk_payload": False}
+    return await _patch(qdrant_url, collection, body)
+
+
+async def archive_collection(
+    qdrant_url: str,
+    s3,
+    bucket: str,
+    collection: str,
+    on_uploaded: Callable[[str], Awaitable[Any]] | None = None,
+) -> str:
+    """
+    Snapshot the collection, upload the snapshot to MinIO, then delete the snapshot
+    and the collection from Qdrant. on_uploaded(key) runs before the delete, so the
+    key can be recorded while the collection still exists. Returns the object key.
+    """
+    base = f"{qdrant_url.rstrip('/')}/collections/{collection}"
+    async with httpx.AsyncClient(timeout=None) as client:
+        r = await client.post(f"{base}/snapshots", params={"wait": "true"})
+        r.raise_for_status()
+        name = r.json()["result"]["name"]
+        key = f"{SNAPSHOT_PREFIX}/{collection}/{name}"
+        with tempfile.NamedTemporaryFile(suffix=".snapshot") as f:
+            async with client.stream("GET", f"{base}/snapshots/{name}") as download:
+                download.raise_for_status()
+                async for block in download.aiter_bytes(1 << 20):
+                    f.write(block)
+            f.flush()
+            await asyncio.to_thread(s3.upload_file, f.name, bucket, key)
+        if on_uploaded is not None:
+            await on_uploaded(key)
+        await client.delete(f"{base}/snapshots/{name}")
+        r = await client.delete(base)
+        r.raise_for_status()
+    return key
+
+
+async def restore_collection(qdrant_url: str, s3, bucket: str, collection: str, key: str) -> None:
+    """Recreate an archived collection from its MinIO snapshot, then delete the object."""
+    base = f"{qdrant_url.rstrip('/')}/collections/{collection}"
+    with tempfile.NamedTemporaryFile(suffix=".snapshot") as f:
+        await asyncio.to_thread(s3.download_file, bucket, key, f.name)
+        async with httpx.AsyncClient(timeout=None) as client:
+            with open(f.name, "rb") as snapshot:
+                r = await client.post(
+                    f"{base}/snapshots/upload",
+                    params={"wait": "true", "priority": "snapshot"},
+                    files={"snapshot": (key.rsplit("/", 1)[-1], snapshot)},
+                )
+            r.raise_for_status()
+    await asyncio.to_thread(s3.delete_object, Bucket=bucket, Key=key)
@@ -0,0 +1,459 @@
+"""
+Bulk import of precomputed embeddings (bring your own vectors) from Arrow IPC or Parquet.
+
+Input columns:
+  chunk_id  string (UUID, or any id: it is mapped to a UUID5 within the tenant)
+  doc_id    string (same mapping; a documents row is created when missing)
+  vector    list<float> or fixed_size_list<float, dim>; 768 (text) or 512 (CLIP)
+  payload   optional struct, map or JSON string, stored as the Qdrant payload;
+            text/content, classification, modality, page, start and end also
+            fill the chunk row
+
+The file is read one record batch at a time (Parquet row groups are read in
+slices of VECTOR_IMPORT_BATCH_ROWS; Arrow batches are sliced to that size), so
+memory is bounded by one batch regardless of file size. Each batch is checked
+on whole columns (list lengths via Arrow compute, finiteness on the float32
+matrix), then written like a multimodal job: chunk rows are COPYed into a
+staging table and upserted into chunks (image_embeddings for 512-d vectors) in
+one transaction whose last step is the Qdrant bulk upsert. Batches commit
+independently; a rejected batch stops the import and the error reports how many
+rows were already imported. Re-importing the same ids overwrites them.
+
+Like the embedding worker, the import writes one point per text document to
+tenant_{id}_docs, the mean of the document's imported chunk vectors, so two-stage
+search finds imported documents. A document's running mean is carried across
+batches and its centroid rewritten after each batch that adds to it.
+
+pyarrow is optional (pip install 'frostbyte-pipeline[arrow]'); without it
+import_vectors raises VectorImportUnavailableError.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Iterator
+
+import numpy as np
+
+from . import metrics
+from . import vector_store
+from . import vectors as vec
+from .vector_store import IMAGE_DIM, TEXT_DIM, VectorStoreError
+
+logger = logging.getLogger(__name__)
+
+VECTOR_IMPORT_BATCH_ROWS = int(os.getenv("VECTOR_IMPORT_BATCH_ROWS", "4096"))
+VECTOR_IMPORT_WRITE_POSTGRES = os.getenv("VECTOR_IMPORT_WRITE_POSTGRES", "true").lower() in ("1", "true", "yes")
+
+# UUID5 namespace for ids that are not UUIDs (names are "{tenant_id}/{id}")
+ID_NAMESPACE = uuid.UUID("5b0c4f0e-3f51-4f7e-9a39-0c7b7c1f4a21")
+REQUIRED_COLUMNS = ("chunk_id", "doc_id", "vector")
+# chunks.modality values allowed per vector kind; the first is the default
+CHUNK_MODALITIES = {
+    "text": ("text", "image_text", "audio_transcript", "video_frame_text", "video_transcript"),
+    "images": ("image_embedding", "video_frame_embedding"),
+}
+
+metrics.describe("frostbyte_vector_import_points_total", "counter", "Vectors written by bulk import.")
+
+
+class VectorImportError(Exception):
+    """Raised when an import file cannot be read or a batch fails validation."""
+
+    def __init__(self, message: str, rows_imported: int = 0) -> None:
+        super().__init__(message)
+        self.rows_imported = rows_imported
+
+
+class VectorImportUnavailableError(VectorImportError):
+    """Raised when pyarrow is not installed."""
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError as e:
+        raise VectorImportUnavailableError(
+            "Vector import needs pyarrow (pip install 'frostbyte-pipeline[arrow]')"
+        ) from e
+    return pa, pc
+
+
+def detect_format(head: bytes) -> str:
+    """parquet, arrow_file (IPC file / Feather v2) or arrow_stream, from the first bytes."""
+    if head[:4] == b"PAR1":
+        return "parquet"
+    if head[:6] == b"ARROW1":
+        return "arrow_file"
+    if head[:4] == b"\xff\xff\xff\xff":
+        return "arrow_stream"
+    raise VectorImportError("Not a Parquet, Arrow IPC file or Arrow IPC stream")
+
+
+def _check_schema(schema) -> None:
+    pa, _ = _arrow()
+    missing = [c for c in REQUIRED_COLUMNS if c not in schema.names]
+    if missing:
+        raise VectorImportError(f"Missing column(s): {', '.join(missing)}")
+    t = schema.field("vector").type
+    if not (pa.types.is_list(t) or pa.types.is_large_list(t) or pa.types.is_fixed_size_list(t)):
+        raise VectorImportError(f"vector must be a list of floats, got {t}")
+    if not pa.types.is_floating(t.value_type):
+        raise VectorImportError(f"vector values must be floats, got {t.value_type}")
+
+
+def iter_batches(source: BinaryIO, batch_rows: int = VECTOR_IMPORT_BATCH_ROWS) -> Iterator[Any]:
+    """Record batches of at most batch_rows rows from a seekable Parquet or Arrow IPC file."""
+    pa, _ = _arrow()
+    head = source.read(8)
+    source.seek(0)
+    fmt = detect_format(head)
+    try:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            pf = pq.ParquetFile(source)
+            _check_schema(pf.schema_arrow)
+            columns = [c for c in (*REQUIRED_COLUMNS, "payload") if c in pf.schema_arrow.names]
+            yield from pf.iter_batches(batch_size=batch_rows, columns=columns)
+            return
+        reader = pa.ipc.open_file(source) if fmt == "arrow_file" else pa.ipc.open_stream(source)
+        _check_schema(reader.schema)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches)) if fmt == "arrow_file" else reader
+        for batch in batches:
+            for offset in range(0, batch.num_rows, batch_rows):
+                yield batch.slice(offset, batch_rows)
+    except (pa.ArrowInvalid, OSError) as e:
+        raise VectorImportError(f"Unreadable {fmt.replace('_', ' ')}: {e}") from e
+
+
+def _as_uuid(tenant_id: str, value: str) -> str:
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return str(uuid.uuid5(ID_NAMESPACE, f"{tenant_id}/{value}"))
+
+
+def _ids(batch, column: str) -> list[str]:
+    pa, _ = _arrow()
+    ids = batch.column(column)
+    if ids.null_count:
+        raise VectorImportError(f"{ids.null_count} rows have no {column}")
+    return ids.cast(pa.string()).to_pylist()
+
+
+def _payloads(batch) -> list[dict[str, Any]]:
+    pa, _ = _arrow()
+    if "payload" not in batch.schema.names:
+        return [{} for _ in range(batch.num_rows)]
+    column = batch.column("payload")
+    t = column.type
+    if pa.types.is_struct(t):
+        return [{k: v for k, v in p.items() if v is not None} if p else {} for p in column.to_pylist()]
+    if pa.types.is_map(t):
+        return [dict(p) if p else {} for p in column.to_pylist()]
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        try:
+            payloads = [json.loads(p) if p else {} for p in column.to_pylist()]
+        except json.JSONDecodeError as e:
+            raise VectorImportError(f"payload is not valid JSON: {e}") from e
+        if not all(isinstance(p, dict) for p in payloads):
+            raise VectorImportError("payload JSON must be an object")
+        return payloads
+    raise VectorImportError(f"payload must be a struct, map or JSON string, got {t}")
+
+
+def _matrix(batch) -> np.ndarray:
+    """(n, dim) float32 vectors of a batch, with the dimension checked on the whole column."""
+    pa, pc = _arrow()
+    column = batch.column("vector")
+    if column.null_count:
+        raise VectorImportError(f"{column.null_count} rows have no vector")
+    if pa.types.is_fixed_size_list(column.type):
+        dim = column.type.list_size
+    else:
+        bounds = pc.min_max(pc.list_value_length(column))
+        lo, hi = bounds["min"].as_py(), bounds["max"].as_py()
+        if lo != hi:
+            raise VectorImportError(f"Vectors have {lo} to {hi} dims; all rows must have the same")
+        dim = lo
+    if dim not in (TEXT_DIM, IMAGE_DIM):
+        raise VectorImportError(f"Vectors have {dim} dims, expected {TEXT_DIM} (text) or {IMAGE_DIM} (images)")
+    values = column.flatten()  # honours the slice offset
+    if values.null_count:
+        raise VectorImportError(f"{values.null_count} null vector elements")
+    m = vec.as_matrix(values.to_numpy(zero_copy_only=False).reshape(len(column), dim), dim)
+    if not np.isfinite(m).all():
+        raise VectorImportError("Vectors contain NaN or infinite values")
+    return m
+
+
+@dataclass
+class ImportBatch:
+    """One validated record batch: ids mapped to UUIDs, vectors as a float32 matrix."""
+
+    tenant_id: str
+    chunk_ids: list[str]
+    doc_ids: list[str]
+    vectors: np.ndarray
+    payloads: list[dict[str, Any]]
+    # Per row, the original id when it stays the chunk's id in Qdrant (chunks.source_chunk_id)
+    source_chunk_ids: list[str | None] = field(default_factory=list)
+
+    @property
+    def kind(self) -> str:
+        return "images" if self.vectors.shape[1] == IMAGE_DIM else "text"
+
+    def chunk_records(self) -> list[tuple]:
+        """Staging rows in CHUNK_COLUMNS order."""
+        records = []
+        sources = self.source_chunk_ids or [None] * len(self.chunk_ids)
+        for i, (chunk_id, doc_id, p) in enumerate(zip(self.chunk_ids, self.doc_ids, self.payloads)):
+            content = p.get("text", p.get("content"))
+            classification = p.get("classification")
+            page = p.get("page")
+            records.append((
+                uuid.UUID(chunk_id),
+                uuid.UUID(doc_id),
+                self.tenant_id,
+                content if isinstance(content, str) else None,
+                self.vectors[i] if self.kind == "text" else None,
+                p["modality"],
+                _float(p.get("start")),
+                _float(p.get("end")),
+                page if isinstance(page, int) and not isinstance(page, bool) else None,
+                classification if isinstance(classification, str) else None,
+                sources[i],
+            ))
+        return records
+
+    def points(self) -> list[tuple[str, np.ndarray, dict[str, Any]]]:
+        return [
+            (chunk_id, self.vectors[i], {**p, "document_id": doc_id, "doc_id": doc_id})
+            for i, (chunk_id, doc_id, p) in enumerate(zip(self.chunk_ids, self.doc_ids, self.payloads))
+        ]
+
+
+def _float(value: Any) -> float | None:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def decode_batch(batch, tenant_id: str) -> ImportBatch:
+    """Validate a record batch and map it to chunk rows / Qdrant points. Raises VectorImportError."""
+    vectors = _matrix(batch)
+    return chunk_batch(tenant_id, _ids(batch, "chunk_id"), _ids(batch, "doc_id"), vectors, _payloads(batch))
+
+
+def chunk_batch(
+    tenant_id: str,
+    chunk_ids: list[str],
+    doc_ids: list[str],
+    vectors: np.ndarray,
+    payloads: list[dict[str, Any]],
+    *,
+    keep_ids: bool = False,
+) -> ImportBatch:
+    """
+    An ImportBatch for already-validated vectors; ids that are not UUIDs are mapped (uuid5).
+    keep_ids: the caller's Qdrant points keep the original chunk ids, so mapped rows
+    record them in chunks.source_chunk_id for the pgvector backend to return.
+    """
+    chunk_uuids, doc_uuids = [_as_uuid(tenant_id, c) for c in chunk_ids], [_as_uuid(tenant_id, d) for d in doc_ids]
+    if len(set(chunk_uuids)) != len(chunk_uuids):
+        raise VectorImportError("Duplicate chunk_id within one batch")
+    allowed = CHUNK_MODALITIES["images" if vectors.shape[1] == IMAGE_DIM else "text"]
+    for p, chunk_id, doc_id, chunk_uuid, doc_uuid in zip(payloads, chunk_ids, doc_ids, chunk_uuids, doc_uuids):
+        if p.get("modality") not in allowed:
+            p["modality"] = allowed[0]
+        # Ids that had to be mapped stay filterable under their original value
+        if chunk_uuid != chunk_id:
+            p["external_chunk_id"] = chunk_id
+        if doc_uuid != doc_id:
+            p["external_doc_id"] = doc_id
+    sources = [c if keep_ids and u != c else None for c, u in zip(chunk_ids, chunk_uuids)]
+    return ImportBatch(
+        tenant_id=tenant_id,
+        chunk_ids=chunk_uuids,
+        doc_ids=doc_uuids,
+        vectors=vectors,
+        payloads=payloads,
+        source_chunk_ids=sources,
+    )
+
+
+CHUNK_COLUMNS = [
+    "chunk_id", "document_id", "tenant_id", "content", "embedding",
+    "modality", "start_sec", "end_sec", "page_number", "classification", "source_chunk_id",
+]
+_UPSERT_CHUNKS = f"""
+    INSERT INTO chunks ({", ".join(CHUNK_COLUMNS)})
+    SELECT {", ".join(CHUNK_COLUMNS)} FROM import_chunks
+    ON CONFLICT (chunk_id) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in CHUNK_COLUMNS[1:] if c != "tenant_id")}
+    WHERE chunks.tenant_id = EXCLUDED.tenant_id
+"""
+
+
+async def write_postgres(conn, batch: ImportBatch, filename: str) -> None:
+    """Documents, chunks and image embeddings of a batch; run inside the caller's transaction."""
+    doc_ids = [uuid.UUID(d) for d in dict.fromkeys(batch.doc_ids)]
+    if await conn.fetchval(
+        "SELECT count(*) FROM documents WHERE id = ANY($1::uuid[]) AND tenant_id <> $2", doc_ids, batch.tenant_id
+    ):
+        raise VectorImportError("doc_id belongs to another tenant")
+    await conn.execute(
+        """
+        INSERT INTO documents (id, tenant_id, filename, status, modality)
+        SELECT unnest($1::uuid[]), $2, $3, 'completed', $4
+        ON CONFLICT (id) DO NOTHING
+        """,
+        doc_ids,
+        batch.tenant_id,
+        filename,
+        "image" if batch.kind == "images" else "text",
+    )
+    await conn.execute("CREATE TEMP TABLE import_chunks (LIKE chunks INCLUDING DEFAULTS) ON COMMIT DROP")
+    await conn.copy_records_to_table("import_chunks", records=batch.chunk_records(), columns=CHUNK_COLUMNS)
+    status = await conn.execute(_UPSERT_CHUNKS)
+    if int(status.split()[-1]) != len(batch.chunk_ids):
+        raise VectorImportError("chunk_id belongs to another tenant")
+    if batch.kind == "images":
+        chunk_ids = [uuid.UUID(c) for c in batch.chunk_ids]
+        await conn.execute("DELETE FROM image_embeddings WHERE chunk_id = ANY($1::uuid[])", chunk_ids)
+        await conn.copy_records_to_table(
+            "image_embeddings",
+            records=zip(chunk_ids, batch.vectors),
+            columns=["chunk_id", "embedding"],
+        )
+
+
+async def _store(batch: ImportBatch) -> list[str]:
+    try:
+        return await vector_store.store_embeddings(tenant_id=batch.tenant_id, points=batch.points())
+    except Exception as e:
+        raise VectorStoreError(f"Qdrant upsert failed: {e}") from e
+
+
+async def _store_with_rows(pool, batch: ImportBatch, filename: str) -> list[str]:
+    """Postgres rows and Qdrant points of a batch in one transaction."""
+    import asyncpg
+
+    try:
+        async with pool.acquire() as conn, conn.transaction():
+            await write_postgres(conn, batch, filename)
+            # Qdrant last, so a failed upsert rolls the batch's rows back
+            return await _store(batch)
+    except (VectorImportError, VectorStoreError):
+        raise
+    except (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError) as e:
+        raise VectorImportError(f"Postgres rejected the batch: {e}") from e
+    except Exception as e:
+        raise VectorStoreError(f"Postgres write failed: {e}") from e
+
+
+@dataclass
+class DocCentroids:
+    """Running per-document sums of imported text vectors (one 768-d row per document)."""
+
+    sums: dict[str, np.ndarray] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+    classifications: dict[str, set[str]] = field(default_factory=dict)
+
+    def add(self, batch: ImportBatch) -> list[tuple[str, np.ndarray, dict[str, Any]]]:
+        """Fold a text batch in; returns (doc_id, centroid, payload) for every document it touched."""
+        for i, (doc_id, p) in enumerate(zip(batch.doc_ids, batch.payloads)):
+            if doc_id not in self.sums:
+                self.sums[doc_id] = np.zeros(TEXT_DIM, dtype=np.float64)
+                self.counts[doc_id] = 0
+                self.classifications[doc_id] = set()
+            self.sums[doc_id] += batch.vectors[i]
+            self.counts[doc_id] += 1
+            if isinstance(p.get("classification"), str):
+                self.classifications[doc_id].add(p["classification"])
+        return [
+            (
+                doc_id,
+                vec.centroid(self.sums[doc_id][None, :] / self.counts[doc_id]),
+                {"classification": sorted(self.classifications[doc_id]), "chunk_count": self.counts[doc_id]},
+            )
+            for doc_id in dict.fromkeys(batch.doc_ids)
+        ]
+
+
+async def _store_centroids(tenant_id: str, docs: list[tuple[str, np.ndarray, dict[str, Any]]]) -> list[str]:
+    try:
+        return await vector_store.store_document_vectors(tenant_id=tenant_id, docs=docs)
+    except Exception as e:
+        raise VectorStoreError(f"Qdrant upsert of document centroids failed: {e}") from e
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    batches: int = 0
+    collections: set[str] = field(default_factory=set)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"rows": self.rows, "batches": self.batches, "collections": sorted(self.collections)}
+
+
+async def import_vectors(
+    source: BinaryIO,
+    *,
+    tenant_id: str,
+    filename: str = "vector-import",
+    batch_rows: int = VECTOR_IMPORT_BATCH_ROWS,
+    postgres: bool = VECTOR_IMPORT_WRITE_POSTGRES,
+    r=None,
+) -> ImportResult:
+    """
+    Stream a seekable Parquet / Arrow IPC file into the tenant's Qdrant collections
+    (and Postgres unless postgres=False), one batch per transaction, plus the text
+    documents' centroids. Raises VectorImportError (with rows_imported) on bad input,
+    VectorStoreError if Qdrant or Postgres is unavailable or rejects a batch, and
+    storage.tiering.CollectionArchivedError if the tenant's collections are archived
+    (warm-up is queued).
+    """
+    from .serving.cache import _get_redis, bump_collection_versions
+    from .storage.tiering import check_writable
+
+    r = r or _get_redis()
+    await check_writable(r, tenant_id)
+    pool = None
+    if postgres:
+        from .pgvector_store import _get_pool
+
+        try:
+            pool = await _get_pool()
+        except Exception as e:
+            raise VectorStoreError(f"Postgres unavailable: {e}") from e
+    result = ImportResult()
+    centroids = DocCentroids()
+    batches = iter_batches(source, batch_rows)
+    try:
+        # Reading and decompressing a batch is blocking; writes of the previous one are not
+        while (record_batch := await asyncio.to_thread(next, batches, None)) is not None:
+            if not record_batch.num_rows:
+                continue
+            batch = decode_batch(record_batch, tenant_id)
+            if pool is None:
+                collections = await _store(batch)
+            else:
+                collections = await _store_with_rows(pool, batch, filename)
+            if batch.kind == "text":
+                collections += await _store_centroids(tenant_id, centroids.add(batch))
+            await bump_collection_versions(r, tenant_id, collections)
+            result.rows += len(batch.chunk_ids)
+            result.batches += 1
+            result.collections.update(collections)
+            metrics.inc("frostbyte_vector_import_points_total", len(batch.chunk_ids), kind=batch.kind)
+            logger.info("Imported %d vectors for %s (%d so far)", len(batch.chunk_ids), tenant_id, result.rows)
+    except VectorImportError as e:
+        e.rows_imported = result.rows
+        raise
+    return result
@@ -0,0 +1,446 @@
+"""
+Write-behind spool for Qdrant upserts: vectors that cannot be written now are kept
+on local disk and replayed when Qdrant is back.
+
+Workers call vector_spool.store_embeddings / store_document_vectors instead of the
+vector_store functions. If the upsert fails because Qdrant is unavailable
+(transport error, timeout, 5xx or 429; see transient) the batch is appended to
+the worker's spool and the job completes; the embedding work is not lost and
+throughput no longer depends on Qdrant being up. Any other error (4xx, bad
+vectors) is raised to the caller. While a tenant has records spooled, its new
+batches are appended too, so replay never overwrites a newer vector with an
+older one. A background replayer (run_replayer) drains the spool in bulk
+upserts once Qdrant accepts writes again.
+
+Replay skips tenants whose collections are archived or in transit (writable
+callback; their records move to the newest segment and wait for the warm-up).
+A record Qdrant rejects outright (4xx) is moved to {name}/quarantine/ with
+frostbyte_vector_spool_quarantined_points_total, so one bad batch cannot block
+the records behind it.
+
+Layout: {FROSTBYTE_VECTOR_SPOOL_DIR}/{name}/, one directory per worker (locked
+with flock, so two processes never share one), holding append-only segment files
+{seq:012d}.seg rotated at VECTOR_SPOOL_SEGMENT_BYTES. Each record is
+
+  b"FBV1" | body length u32 | CRC32(body) u32 | body
+  body = meta length u32 | meta JSON | float32 vectors (n x dim, little-endian)
+  meta = {"t": tenant_id, "s": collection suffix or null, "ids": [...], "p": [payloads],
+          "d": dim, "ts": time appended}
+
+all little-endian. A record is fsynced before the job is acknowledged
+(VECTOR_SPOOL_FSYNC). A torn or corrupt record fails its CRC and is skipped
+(reading resumes at the next magic). A segment is deleted once every record in
+it is replayed; upserts are idempotent, so a crash or pause mid-replay only
+re-sends. A tenant stays pending until every segment holding its records is
+deleted, so such a re-send can never land on a newer vector.
+
+Spool depth (records, points, bytes) and the age of the oldest record are
+gauges in pipeline.metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator
+
+import httpx
+import numpy as np
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+
+from . import metrics
+from . import vector_store
+from . import vectors as vec
+from .storage.qdrant_provisioner import get_collection_name
+
+logger = logging.getLogger(__name__)
+
+VECTOR_SPOOL_ENABLED = os.getenv("FROSTBYTE_VECTOR_SPOOL_ENABLED", "true").lower() in ("1", "true", "yes")
+VECTOR_SPOOL_DIR = Path(os.getenv("FROSTBYTE_VECTOR_SPOOL_DIR", ".spool/vectors"))
+VECTOR_SPOOL_SEGMENT_BYTES = int(os.getenv("FROSTBYTE_VECTOR_SPOOL_SEGMENT_BYTES", str(64 << 20)))
+VECTOR_SPOOL_FSYNC = os.getenv("FROSTBYTE_VECTOR_SPOOL_FSYNC", "true").lower() in ("1", "true", "yes")
+VECTOR_SPOOL_REPLAY_INTERVAL_SEC = float(os.getenv("FROSTBYTE_VECTOR_SPOOL_REPLAY_INTERVAL_SEC", "5"))
+VECTOR_SPOOL_REPLAY_BATCH_POINTS = int(os.getenv("FROSTBYTE_VECTOR_SPOOL_REPLAY_BATCH_POINTS", "2048"))
+
+MAGIC = b"FBV1"
+_HEADER = struct.Struct("<4sII")
+_META_LEN = struct.Struct("<I")
+
+metrics.describe("frostbyte_vector_spool_records", "gauge", "Vector batches waiting in the write-behind spool.")
+metrics.describe("frostbyte_vector_spool_points", "gauge", "Vectors waiting in the write-behind spool.")
+metrics.describe("frostbyte_vector_spool_bytes", "gauge", "Size of the spool's segment files.")
+metrics.describe("frostbyte_vector_spool_oldest_age_seconds", "gauge", "Age of the oldest spooled vector batch.")
+metrics.describe("frostbyte_vector_spool_appended_points_total", "counter", "Vectors spooled because Qdrant rejected or missed the upsert.")
+metrics.describe("frostbyte_vector_spool_replayed_points_total", "counter", "Spooled vectors written to Qdrant by the replayer.")
+metrics.describe("frostbyte_vector_spool_corrupt_records_total", "counter", "Spool records skipped on a bad checksum or torn write.")
+metrics.describe("frostbyte_vector_spool_quarantined_points_total", "counter", "Spooled vectors Qdrant rejected on replay (moved to quarantine/).")
+
+
+def transient(e: BaseException) -> bool:
+    """
+    True if an upsert failed because Qdrant is unavailable (unreachable, timing out,
+    5xx, 429) and is worth spooling; other errors would fail on every replay.
+    """
+    if isinstance(e, UnexpectedResponse):
+        return e.status_code is None or e.status_code == 429 or e.status_code >= 500
+    if isinstance(e, ResponseHandlingException):
+        return transient(e.source)
+    return isinstance(e, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+@dataclass
+class SpoolRecord:
+    tenant_id: str
+    suffix: str | None
+    chunk_ids: list[str]
+    payloads: list[dict[str, Any]]
+    vectors: np.ndarray
+    appended_at: float
+
+    def points(self) -> list[tuple[str, np.ndarray, dict[str, Any]]]:
+        return list(zip(self.chunk_ids, self.vectors, self.payloads))
+
+
+def encode_record(record: SpoolRecord) -> bytes:
+    meta = json.dumps(
+        {
+            "t": record.tenant_id,
+            "s": record.suffix,
+            "ids": record.chunk_ids,
+            "p": record.payloads,
+            "d": int(record.vectors.shape[1]),
+            "ts": record.appended_at,
+        },
+        separators=(",", ":"),
+    ).encode()
+    body = _META_LEN.pack(len(meta)) + meta + np.ascontiguousarray(record.vectors, dtype="<f4").tobytes()
+    return _HEADER.pack(MAGIC, len(body), zlib.crc32(body)) + body
+
+
+def decode_body(body: bytes) -> SpoolRecord:
+    (meta_len,) = _META_LEN.unpack_from(body)
+    meta = json.loads(body[_META_LEN.size:_META_LEN.size + meta_len])
+    matrix = np.frombuffer(body, dtype="<f4", offset=_META_LEN.size + meta_len)
+    return SpoolRecord(
+        tenant_id=meta["t"],
+        suffix=meta["s"],
+        chunk_ids=meta["ids"],
+        payloads=meta["p"],
+        vectors=matrix.reshape(len(meta["ids"]), meta["d"]).astype(np.float32),
+        appended_at=meta["ts"],
+    )
+
+
+def read_records(data: bytes) -> Iterator[tuple[int, SpoolRecord | None]]:
+    """
+    (end offset, record) for each record in a segment's bytes; None marks a corrupt
+    stretch, after which reading resumes at the next magic. A torn tail ends the scan.
+    """
+    pos = 0
+    while pos + _HEADER.size <= len(data):
+        magic, length, crc = _HEADER.unpack_from(data, pos)
+        body = data[pos + _HEADER.size:pos + _HEADER.size + length]
+        if magic == MAGIC and len(body) == length and zlib.crc32(body) == crc:
+            pos += _HEADER.size + length
+            yield pos, decode_body(body)
+            continue
+        following = data.find(MAGIC, pos + 1)
+        pos = len(data) if following < 0 else following
+        yield pos, None
+
+
+class VectorSpool:
+    """Segment-file log of vector batches for one worker (directory locked to this process)."""
+
+    def __init__(self, directory: Path, segment_bytes: int = VECTOR_SPOOL_SEGMENT_BYTES, fsync: bool = VECTOR_SPOOL_FSYNC):
+        self.directory = Path(directory)
+        self.name = self.directory.name
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = open(self.directory / "LOCK", "w")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"Vector spool {self.directory} is in use by another process") from None
+        # Per segment: [records, points, oldest appended_at]
+        self._segments: dict[Path, list[float]] = {}
+        # Spooled records per tenant: their new writes queue behind them
+        self._tenants: dict[str, int] = {}
+        for path in sorted(self.directory.glob("*.seg")):
+            stats = [0, 0, time.time()]
+            for _, record in read_records(path.read_bytes()):
+                if record is not None:
+                    stats[0] += 1
+                    stats[1] += len(record.chunk_ids)
+                    stats[2] = min(stats[2], record.appended_at)
+                    self._tenants[record.tenant_id] = self._tenants.get(record.tenant_id, 0) + 1
+            if stats[0]:
+                self._segments[path] = stats
+            else:
+                path.unlink()
+        self._active: Path | None = None
+        self._file = None
+        self.update_metrics()
+
+    def pending(self, tenant_id: str | None = None) -> bool:
+        """Anything spooled (for tenant_id, if given)."""
+        if tenant_id is not None:
+            return self._tenants.get(tenant_id, 0) > 0
+        return bool(self._segments)
+
+    def _open_segment(self) -> None:
+        last = max((int(p.stem) for p in self.directory.glob("*.seg")), default=0)
+        self._active = self.directory / f"{last + 1:012d}.seg"
+        self._file = open(self._active, "ab")
+
+    def seal(self) -> None:
+        """Close the active segment; the next append starts a new one."""
+        if self._file is not None:
+            self._file.close()
+        self._file = self._active = None
+
+    def append(self, tenant_id: str, points: list[tuple[str, Any, dict[str, Any]]], suffix: str | None = None) -> int:
+        """Append points (one record per vector size) durably; returns points spooled."""
+        by_dim: dict[int, list[tuple[str, np.ndarray, dict[str, Any]]]] = {}
+        for chunk_id, embedding, payload in points:
+            v = vec.as_vector(embedding)
+            by_dim.setdefault(len(v), []).append((chunk_id, v, payload))
+        now = time.time()
+        for rows in by_dim.values():
+            self._write(SpoolRecord(
+                tenant_id=tenant_id,
+                suffix=suffix,
+                chunk_ids=[c for c, _, _ in rows],
+                payloads=[p for _, _, p in rows],
+                vectors=np.stack([v for _, v, _ in rows]),
+                appended_at=now,
+            ))
+        metrics.inc("frostbyte_vector_spool_appended_points_total", len(points), spool=self.name)
+        self.update_metrics()
+        return len(points)
+
+    def _write(self, record: SpoolRecord) -> None:
+        if self._file is None or self._file.tell() >= self.segment_bytes:
+            self.seal()
+            self._open_segment()
+        self._file.write(encode_record(record))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        stats = self._segments.setdefault(self._active, [0, 0, record.appended_at])
+        stats[0] += 1
+        stats[1] += len(record.chunk_ids)
+        stats[2] = min(stats[2], record.appended_at)
+        self._tenants[record.tenant_id] = self._tenants.get(record.tenant_id, 0) + 1
+
+    def _done(self, records: list[SpoolRecord]) -> None:
+        """Records written to Qdrant, quarantined or moved: no longer pending for their tenant."""
+        for record in records:
+            left = self._tenants.get(record.tenant_id, 0) - 1
+            if left > 0:
+                self._tenants[record.tenant_id] = left
+            else:
+                self._tenants.pop(record.tenant_id, None)
+
+    def _quarantine(self, source: Path, record: SpoolRecord, error: Exception) -> None:
+        directory = self.directory / "quarantine"
+        directory.mkdir(exist_ok=True)
+        with open(directory / source.name, "ab") as f:
+            f.write(encode_record(record))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        metrics.inc("frostbyte_vector_spool_quarantined_points_total", len(record.chunk_ids), spool=self.name)
+        logger.error(
+            "Qdrant rejected %d spooled vectors for tenant %s; moved to %s: %s",
+            len(record.chunk_ids), record.tenant_id, directory / source.name, error,
+        )
+
+    def stats(self) -> dict[str, float]:
+        records = sum(s[0] for s in self._segments.values())
+        points = sum(s[1] for s in self._segments.values())
+        size = sum(p.stat().st_size for p in self._segments if p.exists())
+        oldest = min((s[2] for s in self._segments.values()), default=None)
+        return {
+            "segments": len(self._segments),
+            "records": records,
+            "points": points,
+            "bytes": size,
+            "oldest_age_seconds": time.time() - oldest if oldest is not None else 0.0,
+        }
+
+    def update_metrics(self) -> None:
+        for key, value in self.stats().items():
+            if key != "segments":
+                metrics.set_gauge(f"frostbyte_vector_spool_{key}", value, spool=self.name)
+
+    async def replay(
+        self,
+        store: Callable[..., Awaitable[list[str]]] | None = None,
+        batch_points: int = VECTOR_SPOOL_REPLAY_BATCH_POINTS,
+        on_replayed: Callable[[str, list[str]], Awaitable[None]] | None = None,
+        writable: Callable[[str], Awaitable[bool]] | None = None,
+    ) -> int:
+        """
+        Write spooled records to Qdrant, oldest first, merging consecutive records of the
+        same tenant, collection and size into upserts of up to batch_points. Records of
+        tenants for which writable() is False (archived collections) are moved to the
+        newest segment; records Qdrant rejects are quarantined. Stops at the first
+        transient failure (the rest stays spooled). Returns points replayed.
+        """
+        store = store or vector_store.store_embeddings
+        self.seal()
+        replayed = 0
+        blocked: dict[str, bool] = {}
+        # Written or quarantined in the current segment; pending until it is deleted
+        finished: list[SpoolRecord] = []
+
+        async def flush(path: Path, batch: list[SpoolRecord]) -> None:
+            nonlocal replayed
+            if not batch:
+                return
+            first = batch[0]
+            points = [p for r in batch for p in r.points()]
+            try:
+                collections = await store(tenant_id=first.tenant_id, points=points, collection_suffix=first.suffix)
+            except Exception as e:
+                if transient(e):
+                    raise
+                if len(batch) == 1:
+                    self._quarantine(path, first, e)
+                    finished.extend(batch)
+                    return
+                # Find the rejected record(s); the others still go through
+                for record in batch:
+                    await flush(path, [record])
+                return
+            replayed += len(points)
+            finished.extend(batch)
+            metrics.inc("frostbyte_vector_spool_replayed_points_total", len(points), spool=self.name)
+            if on_replayed is not None:
+                await on_replayed(first.tenant_id, collections)
+
+        for path in sorted(self._segments):
+            batch: list[SpoolRecord] = []
+            deferred: list[SpoolRecord] = []
+            finished.clear()
+            seen = corrupt = 0
+            try:
+                for _, record in read_records(path.read_bytes()):
+                    if record is None:
+                        metrics.inc("frostbyte_vector_spool_corrupt_records_total", spool=self.name)
+                        logger.error("Skipped a corrupt record in %s", path)
+                        corrupt += 1
+                        continue
+                    seen += 1
+                    if writable is not None and record.tenant_id not in blocked:
+                        blocked[record.tenant_id] = not await writable(record.tenant_id)
+                    if blocked.get(record.tenant_id):
+                        deferred.append(record)
+                        continue
+                    head = batch[0] if batch else None
+                    if head is not None and (
+                        (record.tenant_id, record.suffix, record.vectors.shape[1])
+                        != (head.tenant_id, head.suffix, head.vectors.shape[1])
+                        or sum(len(r.chunk_ids) for r in batch) + len(record.chunk_ids) > batch_points
+                    ):
+                        await flush(path, batch)
+                        batch = []
+                    batch.append(record)
+                await flush(path, batch)
+            except Exception as e:
+                logger.warning("Spool replay paused at %s: %s", path.name, e)
+                self.update_metrics()
+                return replayed
+            if deferred and len(deferred) == seen and not corrupt:
+                continue  # nothing else in it: leave the segment as it is
+            for record in deferred:
+                self._done([record])
+                self._write(record)
+            path.unlink()
+            del self._segments[path]
+            self._done(finished)
+        if any(blocked.values()):
+            logger.info("Spooled vectors held for archived tenants: %s", sorted(t for t, b in blocked.items() if b))
+        self.update_metrics()
+        return replayed
+
+    async def run_replayer(
+        self,
+        on_replayed: Callable[[str, list[str]], Awaitable[None]] | None = None,
+        interval: float = VECTOR_SPOOL_REPLAY_INTERVAL_SEC,
+        writable: Callable[[str], Awaitable[bool]] | None = None,
+    ) -> None:
+        """Drain the spool whenever it is non-empty; keep the depth and age gauges current."""
+        while True:
+            if self.pending():
+                replayed = await self.replay(on_replayed=on_replayed, writable=writable)
+                if replayed:
+                    logger.info("Replayed %d spooled vectors to Qdrant (%s)", replayed, self.stats())
+                    if self.pending():
+                        continue
+            self.update_metrics()
+            await asyncio.sleep(interval)
+
+
+_spools: dict[str, VectorSpool] = {}
+
+
+def get_spool(name: str) -> VectorSpool | None:
+    """The named worker spool under VECTOR_SPOOL_DIR (None when spooling is disabled)."""
+    if not VECTOR_SPOOL_ENABLED:
+        return None
+    if name not in _spools:
+        _spools[name] = VectorSpool(VECTOR_SPOOL_DIR / name)
+    return _spools[name]
+
+
+async def store_embeddings(
+    *,
+    tenant_id: str,
+    points: list[tuple[str, np.ndarray | list[float], dict[str, Any]]],
+    collection_suffix: str | None = None,
+    spool: VectorSpool | None = None,
+) -> list[str]:
+    """
+    vector_store.store_embeddings, spooling the batch if Qdrant is unavailable (or the
+    spool still holds older batches of the tenant). Returns the logical collection names
+    either way. Errors that are not transient (Qdrant rejected the batch) are raised.
+    """
+    if spool is not None and not spool.pending(tenant_id):
+        try:
+            return await vector_store.store_embeddings(
+                tenant_id=tenant_id, points=points, collection_suffix=collection_suffix
+            )
+        except Exception as e:
+            if not transient(e):
+                raise
+            logger.warning("Qdrant upsert failed for tenant %s, spooling %d vectors: %s", tenant_id, len(points), e)
+    elif spool is None:
+        return await vector_store.store_embeddings(tenant_id=tenant_id, points=points, collection_suffix=collection_suffix)
+    spool.append(tenant_id, points, suffix=collection_suffix)
+    suffixes = {vector_store._suffix_for(len(vec.as_vector(v)), collection_suffix) for _, v, _ in points}
+    return [f"{get_collection_name(tenant_id)}{suffix}" for suffix in sorted(suffixes)]
+
+
+async def store_document_vectors(
+    *,
+    tenant_id: str,
+    docs: list[tuple[str, np.ndarray, dict[str, Any]]],
+    spool: VectorSpool | None = None,
+) -> list[str]:
+    """vector_store.store_document_vectors through the spool."""
+    return await store_embeddings(
+        tenant_id=tenant_id,
+        points=[(doc_id, v, {**payload, "doc_id": doc_id}) for doc_id, v, payload in docs],
+        collection_suffix=vector_store.DOCS_SUFFIX,
+        spool=spool,
+    )
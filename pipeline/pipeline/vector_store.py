@@ -2,6 +2,15 @@
 Vector store abstraction for multimodal pipeline.
 Stores embeddings in Qdrant. Supports 768d (text) and 512d (CLIP) collections.
 Reference: Enhancement #9 PRD.
+
+Vectors are float32 NumPy arrays (pipeline.vectors); lists are accepted too.
+
+Writes use the synchronous client; searches use AsyncQdrantClient so the event
+loop is not blocked. Lazily created collections get the default index profile
+(storage.index_profiles). Tenant-facing reads and writes go through the tenant's
+placement (storage.placement): dedicated tenant_{id}* collections or the shared
+pool. Collections get payload indexes on the filterable fields (PAYLOAD_INDEXES)
+when they are created, so filters are evaluated inside Qdrant.
 """
 from __future__ import annotations
 
@@ -9,14 +18,48 @@ import hashlib
 import os
 from typing import Any
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    KeywordIndexParams,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+    PointIdsList,
+    Range,
+    ScoredPoint,
+    SearchParams,
+)
+
+from . import vectors as vec
+from .storage.index_profiles import get_profile
+from .storage.placement import Placement, PlacementUnavailableError, get_placement
+from .storage.qdrant_provisioner import (
+    PAYLOAD_INDEXES,
+    SHARED_HNSW,
+    TENANT_COLLECTIONS,
+    TENANT_KEY,
+    get_collection_name,
+    verify_tenant_access,
+)
 
 QDRANT_URL = os.getenv("QDRANT_URL", os.getenv("FROSTBYTE_QDRANT_URL", "http://localhost:6333"))
 TEXT_DIM = 768
 IMAGE_DIM = 512
+# Document-level (chunk centroid) collection used by two-stage search: tenant_{id}_docs
+DOCS_SUFFIX = "_docs"
 
 _client: QdrantClient | None = None
+_async_client: AsyncQdrantClient | None = None
+_known_collections: set[str] = set()
+
+
+class VectorStoreError(Exception):
+    """Raised when Qdrant cannot serve a search (unreachable, bad request)."""
 
 
 def _get_client() -> QdrantClient:
@@ -26,78 +69,346 @@ def _get_client() -> QdrantClient:
     return _client
 
 
+def _get_async_client() -> AsyncQdrantClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncQdrantClient(url=QDRANT_URL)
+    return _async_client
+
+
 def _point_id_from_chunk(chunk_id: str) -> int:
     """Derive numeric ID for Qdrant from chunk_id string."""
     return int(hashlib.sha256(chunk_id.encode()).hexdigest()[:15], 16) % (2**63)
 
 
+def _suffix_for(dim: int, collection_suffix: str | None) -> str:
+    if collection_suffix is None:
+        return "_images" if dim == IMAGE_DIM else ""
+    return collection_suffix
+
+
+def _ensure_collection(
+    client: QdrantClient,
+    coll: str,
+    dim: int,
+    shared: bool = False,
+    index_profile: str | None = None,
+) -> None:
+    if coll in _known_collections:
+        return
+    try:
+        client.get_collection(coll)
+    except Exception:
+        vec_size = IMAGE_DIM if dim == IMAGE_DIM else TEXT_DIM
+        # Provisioned tenants already have their collections with the tenant's profile
+        kwargs = get_profile(index_profile).collection_kwargs(vec_size)
+        if shared:
+            kwargs["hnsw_config"] = kwargs["hnsw_config"].model_copy(update=SHARED_HNSW)
+        client.create_collection(collection_name=coll, **kwargs)
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            client.create_payload_index(
+                collection_name=coll,
+                field_name=field_name,
+                field_schema=PayloadSchemaType(schema),
+            )
+        if shared:
+            client.create_payload_index(
+                collection_name=coll,
+                field_name=TENANT_KEY,
+                field_schema=KeywordIndexParams(type="keyword", is_tenant=True),
+            )
+    _known_collections.add(coll)
+
+
 async def store_embedding(
     *,
     tenant_id: str,
     chunk_id: str,
-    embedding: list[float],
+    embedding: np.ndarray | list[float],
     payload: dict[str, Any],
     collection_suffix: str | None = None,
 ) -> None:
     """
     Store embedding in Qdrant. Uses tenant_{id} for text (768d) or tenant_{id}_images for CLIP (512d).
     """
+    await store_embeddings(
+        tenant_id=tenant_id,
+        points=[(chunk_id, embedding, payload)],
+        collection_suffix=collection_suffix,
+    )
+
+
+async def store_embeddings(
+    *,
+    tenant_id: str,
+    points: list[tuple[str, np.ndarray | list[float], dict[str, Any]]],
+    collection_suffix: str | None = None,
+) -> list[str]:
+    """
+    Store many (chunk_id, embedding, payload) points with one upsert per target collection.
+    Collection routing is the same as store_embedding (by vector size unless a suffix is given),
+    in the tenant's dedicated collections or the shared pool (storage.placement).
+    Each collection's vectors are stacked into one float32 matrix for the uploader.
+    Returns the tenant's logical collection names written (tenant_{id}{suffix}, whatever the
+    placement), so callers can invalidate cached query results.
+    """
+    if not points:
+        return []
     client = _get_client()
-    dim = len(embedding)
-    if collection_suffix is None:
-        collection_suffix = "_images" if dim == IMAGE_DIM else ""
-    coll = f"tenant_{tenant_id}{collection_suffix}"
+    placement = await get_placement(tenant_id)
+    by_suffix: dict[str, tuple[list[int], list[np.ndarray], list[dict[str, Any]]]] = {}
+    for chunk_id, embedding, payload in points:
+        v = vec.as_vector(embedding)
+        suffix = _suffix_for(len(v), collection_suffix)
+        _ensure_collection(client, placement.collection(suffix), len(v), shared=placement.shared)
+        payload["chunk_id"] = chunk_id
+        payload["tenant_id"] = tenant_id
+        ids, rows, payloads = by_suffix.setdefault(suffix, ([], [], []))
+        ids.append(_point_id_from_chunk(placement.point_key(chunk_id)))
+        rows.append(v)
+        payloads.append(payload)
+    for suffix, (ids, rows, payloads) in by_suffix.items():
+        client.upload_collection(
+            collection_name=placement.collection(suffix),
+            vectors=np.stack(rows),
+            payload=payloads,
+            ids=ids,
+            batch_size=len(ids),
+            wait=True,
+        )
+    return [f"{get_collection_name(tenant_id)}{suffix}" for suffix in by_suffix]
+
 
+async def store_document_vectors(
+    *,
+    tenant_id: str,
+    docs: list[tuple[str, np.ndarray, dict[str, Any]]],
+) -> list[str]:
+    """One (doc_id, vector, payload) point per document in tenant_{id}_docs; replaces earlier versions."""
+    return await store_embeddings(
+        tenant_id=tenant_id,
+        points=[(doc_id, v, {**payload, "doc_id": doc_id}) for doc_id, v, payload in docs],
+        collection_suffix=DOCS_SUFFIX,
+    )
+
+
+async def fetch_vectors(
+    *,
+    tenant_id: str,
+    chunk_ids: list[str],
+    collection_suffix: str = "",
+) -> dict[str, np.ndarray]:
+    """Stored vectors of the given chunks as float32 arrays (missing chunks are left out)."""
+    if not chunk_ids:
+        return {}
+    placement = await get_placement(tenant_id)
+    ids = {_point_id_from_chunk(placement.point_key(c)): c for c in chunk_ids}
     try:
-        client.get_collection(coll)
+        records = _get_client().retrieve(
+            collection_name=placement.collection(collection_suffix),
+            ids=list(ids),
+            with_vectors=True,
+            with_payload=False,
+        )
     except Exception:
-        vec_size = IMAGE_DIM if dim == IMAGE_DIM else TEXT_DIM
-        client.create_collection(
-            collection_name=coll,
-            vectors_config=VectorParams(size=vec_size, distance=Distance.COSINE),
+        return {}
+    return {ids[rec.id]: vec.as_vector(rec.vector) for rec in records if rec.vector is not None}
+
+
+def _match(key: str, value: str | list[str]) -> FieldCondition:
+    if isinstance(value, list):
+        return FieldCondition(key=key, match=MatchAny(any=value))
+    return FieldCondition(key=key, match=MatchValue(value=value))
+
+
+def payload_filter(
+    *,
+    doc_ids: list[str] | None = None,
+    classification: str | list[str] | None = None,
+    modality: str | list[str] | None = None,
+    page_from: int | None = None,
+    page_to: int | None = None,
+) -> Filter | None:
+    """Qdrant filter over the indexed payload fields; None when nothing is restricted."""
+    must: list[FieldCondition] = []
+    if doc_ids:
+        must.append(_match("doc_id", list(doc_ids)))
+    if classification:
+        must.append(_match("classification", classification))
+    if modality:
+        must.append(_match("modality", modality))
+    if page_from is not None or page_to is not None:
+        must.append(FieldCondition(key="page", range=Range(gte=page_from, lte=page_to)))
+    return Filter(must=must) if must else None
+
+
+async def search_points(
+    *,
+    collection: str,
+    vector: np.ndarray | list[float],
+    top_k: int = 10,
+    query_filter: Filter | None = None,
+    payload_fields: list[str] | bool = True,
+    exact: bool = False,
+    search_params: SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    ANN search with the filter evaluated inside Qdrant, returning only payload_fields.
+    search_params carries the tenant's index profile (hnsw_ef, quantization rescoring);
+    exact=True bypasses the HNSW index (brute force; ground truth for benchmarks).
+    A collection that does not exist yet has no hits; other failures raise VectorStoreError.
+    """
+    try:
+        response = await _get_async_client().query_points(
+            collection_name=collection,
+            query=vec.as_vector(vector).tolist(),
+            query_filter=query_filter,
+            limit=top_k,
+            with_payload=payload_fields,
+            search_params=SearchParams(exact=True) if exact else search_params,
         )
+    except UnexpectedResponse as e:
+        if e.status_code == 404:
+            return []
+        raise VectorStoreError(f"Search on {collection} failed: {e}") from e
+    except Exception as e:
+        raise VectorStoreError(f"Search on {collection} failed: {e}") from e
+    return response.points
 
-    point_id = _point_id_from_chunk(chunk_id)
-    payload["chunk_id"] = chunk_id
-    payload["tenant_id"] = tenant_id
 
-    client.upsert(
-        collection_name=coll,
-        points=[PointStruct(id=point_id, vector=embedding, payload=payload)],
-    )
+def result_dict(payload: dict[str, Any], score: float) -> dict[str, Any]:
+    """Query API result shape (openapi QueryResponse) for one hit's payload and score."""
+    return {
+        "chunk_id": payload.get("chunk_id"),
+        "score": score,
+        "document_id": payload.get("document_id", payload.get("doc_id")),
+        "content": payload.get("content", ""),
+        **{k: v for k, v in payload.items() if k not in ("chunk_id", "document_id", "content")},
+    }
 
 
 async def search_qdrant(
     *,
     tenant_id: str,
-    vector: list[float],
+    vector: np.ndarray | list[float],
     top_k: int = 10,
     collection_suffix: str | None = None,
+    query_filter: Filter | None = None,
 ) -> list[dict[str, Any]]:
     """
     Search Qdrant by vector. Uses tenant_{id} or tenant_{id}_images for 512d.
+    Raises VectorStoreError if Qdrant cannot serve the search.
     """
-    client = _get_client()
-    dim = len(vector)
-    if collection_suffix is None:
-        collection_suffix = "_images" if dim == IMAGE_DIM else ""
-    coll = f"tenant_{tenant_id}{collection_suffix}"
+    vector = vec.as_vector(vector)
+    hits = await search_tenant(
+        tenant_id=tenant_id,
+        suffix=_suffix_for(len(vector), collection_suffix),
+        vector=vector,
+        top_k=top_k,
+        query_filter=query_filter,
+    )
+    return [result_dict(h.payload or {}, h.score) for h in hits]
+
 
+async def search_tenant(
+    *,
+    tenant_id: str,
+    suffix: str,
+    vector: np.ndarray | list[float],
+    top_k: int = 10,
+    query_filter: Filter | None = None,
+    payload_fields: list[str] | bool = True,
+    exact: bool = False,
+    search_params: SearchParams | None = None,
+) -> list[ScoredPoint]:
+    """
+    search_points on one of a tenant's collections (suffix "", "_images", "_docs") wherever
+    it is placed; in the shared pool the filter is pinned to the tenant, and the access
+    check (verify_tenant_access) runs on the collection and filter actually sent.
+    """
     try:
-        results, _ = client.search(
-            collection_name=coll,
-            query_vector=vector,
-            limit=top_k,
+        placement = await get_placement(tenant_id)
+    except PlacementUnavailableError as e:
+        raise VectorStoreError(str(e)) from e
+    collection = placement.collection(suffix)
+    query_filter = placement.scope(query_filter)
+    verify_tenant_access(tenant_id, collection, query_filter)
+    return await search_points(
+        collection=collection,
+        vector=vector,
+        top_k=top_k,
+        query_filter=query_filter,
+        payload_fields=payload_fields,
+        exact=exact,
+        search_params=search_params,
+    )
+
+
+async def count_tenant_points(placement: Placement, suffix: str = "") -> int:
+    """Approximate number of the tenant's points in one of its collections."""
+    try:
+        result = _get_client().count(
+            collection_name=placement.collection(suffix),
+            count_filter=placement.scope(),
+            exact=False,
         )
-        return [
-            {
-                "chunk_id": h.payload.get("chunk_id"),
-                "score": h.score,
-                "document_id": h.payload.get("document_id"),
-                "content": h.payload.get("content", ""),
-                **{k: v for k, v in h.payload.items() if k not in ("chunk_id", "document_id", "content")},
-            }
-            for h in results
-        ]
     except Exception:
-        return []
+        return 0
+    return result.count
+
+
+async def copy_tenant_points(
+    source: Placement,
+    target: Placement,
+    index_profile: str | None = None,
+    copied_ids: dict[str, list] | None = None,
+) -> int:
+    """
+    Copy a tenant's points (all collection suffixes) between placements; idempotent upserts.
+    The source point IDs copied are added to copied_ids[suffix], if given.
+    """
+    client = _get_client()
+    copied = 0
+    for suffix, size in TENANT_COLLECTIONS.items():
+        src = source.collection(suffix)
+        if not client.collection_exists(src):
+            continue
+        dst = target.collection(suffix)
+        _ensure_collection(client, dst, size, shared=target.shared, index_profile=index_profile)
+        offset = None
+        while True:
+            records, offset = client.scroll(
+                collection_name=src,
+                scroll_filter=source.scope(),
+                limit=256,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if records:
+                client.upload_collection(
+                    collection_name=dst,
+                    vectors=vec.as_matrix([r.vector for r in records]),
+                    payload=[r.payload for r in records],
+                    ids=[_point_id_from_chunk(target.point_key(r.payload["chunk_id"])) for r in records],
+                    batch_size=len(records),
+                    wait=True,
+                )
+                copied += len(records)
+                if copied_ids is not None:
+                    copied_ids.setdefault(suffix, []).extend(r.id for r in records)
+            if offset is None:
+                break
+    return copied
+
+
+async def delete_tenant_points(placement: Placement, point_ids: dict[str, list] | None = None) -> None:
+    """Remove a tenant's points from the shared pool (after promotion); only point_ids[suffix], if given."""
+    client = _get_client()
+    for suffix in TENANT_COLLECTIONS:
+        coll = placement.collection(suffix)
+        if point_ids is not None:
+            if point_ids.get(suffix):
+                client.delete(collection_name=coll, points_selector=PointIdsList(points=point_ids[suffix]), wait=True)
+        elif client.collection_exists(coll):
+            client.delete(collection_name=coll, points_selector=FilterSelector(filter=placement.scope()), wait=True)
@@ -0,0 +1,88 @@
+"""
+Float32 vector buffers shared by the embedding, vector-store and pgvector paths.
+Reference: TECH_DECISIONS (768d), EMBEDDING_INDEXING_PLAN Section 4.
+
+Embeddings travel as C-contiguous float32 NumPy matrices of shape (n, dim), one
+row per text, instead of list[float] (about 30 bytes and one Python object per
+element). Rows are views into the matrix. Dimension checks are a shape
+comparison, normalization is one vectorized pass, pgvector's binary codec reads
+the buffer directly, and Qdrant's uploader takes the matrix as is.
+"""
+from __future__ import annotations
+
+import base64
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+DTYPE = np.float32
+
+
+def zeros(n: int, dim: int) -> np.ndarray:
+    return np.zeros((n, dim), dtype=DTYPE)
+
+
+def as_matrix(vectors: Any, dim: int | None = None) -> np.ndarray:
+    """
+    (n, dim) float32 matrix from an ndarray (no copy when it already is one) or a
+    sequence of equal-length vectors. Raises ValueError on ragged input or a
+    dimension other than dim.
+    """
+    if isinstance(vectors, np.ndarray):
+        m = np.ascontiguousarray(vectors, dtype=DTYPE)
+    elif len(vectors) == 0:
+        m = zeros(0, dim or 0)
+    else:
+        try:
+            m = np.asarray(vectors, dtype=DTYPE)
+        except ValueError as e:
+            raise ValueError(f"Ragged vectors: {e}") from e
+    if m.ndim == 1:
+        m = m.reshape(1, -1)
+    if m.ndim != 2:
+        raise ValueError(f"Expected a 2-D batch of vectors, got shape {m.shape}")
+    if dim is not None and len(m) and m.shape[1] != dim:
+        raise ValueError(f"Vectors have {m.shape[1]} dims, expected {dim}")
+    return m
+
+
+def as_vector(vector: Any, dim: int | None = None) -> np.ndarray:
+    """One vector as a 1-D float32 array."""
+    v = np.asarray(vector, dtype=DTYPE).reshape(-1)
+    if dim is not None and v.shape[0] != dim:
+        raise ValueError(f"Vector has {v.shape[0]} dims, expected {dim}")
+    return v
+
+
+def normalize(m: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place (all-zero rows are left as they are) and return m."""
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    np.divide(m, norms, out=m, where=norms > 0)
+    return m
+
+
+def centroid(m: np.ndarray) -> np.ndarray:
+    """Unit-length mean of the rows of m (mean pooling, e.g. a document from its chunks)."""
+    return normalize(as_matrix(m).mean(axis=0, dtype=DTYPE, keepdims=True))[0]
+
+
+def decode_embeddings(data: Sequence[dict[str, Any]], dim: int | None = None) -> np.ndarray:
+    """
+    Matrix from the "data" items of an OpenAI-compatible /embeddings response,
+    ordered by "index". Embeddings may be float lists or base64 little-endian
+    float32 (encoding_format=base64), which is decoded without building floats.
+    """
+    items = sorted(data, key=lambda d: d.get("index", 0))
+    if not items:
+        return zeros(0, dim or 0)
+    first = items[0].get("embedding")
+    if isinstance(first, str):
+        buf = b"".join(base64.b64decode(d["embedding"]) for d in items)
+        # One copy: frombuffer views are read-only and normalize() writes in place
+        m = np.frombuffer(buf, dtype="<f4").reshape(len(items), -1).astype(DTYPE)
+    else:
+        m = as_matrix([d.get("embedding", []) for d in items])
+    if dim is not None and m.shape[1] != dim:
+        raise ValueError(f"Vectors have {m.shape[1]} dims, expected {dim}")
+    return m
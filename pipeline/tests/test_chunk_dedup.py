@@ -0,0 +1,178 @@
+"""
+Near-duplicate chunk detection: MinHash similarity, LSH banding and the per-tenant index.
+"""
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from pipeline.chunk_dedup import (
+    CHUNK_DEDUP_THRESHOLD,
+    NearDuplicateIndex,
+    band_keys,
+    jaccard,
+    minhash,
+    shingles,
+)
+
+DISCLAIMER = (
+    "This message and any attachments are confidential and intended solely for the addressee. "
+    "If you have received it in error please notify the sender and delete it from your system. "
+    "Any unauthorised use, disclosure or copying is strictly prohibited."
+)
+OTHER = "Payment is due within thirty days of the invoice date under the master services agreement terms."
+
+
+class _FakeRedis:
+    """The sets, hashes, SET NX and pipeline surface used by NearDuplicateIndex."""
+
+    def __init__(self) -> None:
+        self.sets: dict[str, set[str]] = {}
+        self.hashes: dict[str, dict[str, bytes]] = {}
+        self.strings: dict[str, str] = {}
+
+    def pipeline(self, transaction: bool = True):
+        return _FakePipeline(self)
+
+    async def smembers(self, key):
+        return {m.encode() for m in self.sets.get(key, set())}
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {k: v if isinstance(v, bytes) else str(v).encode() for k, v in mapping.items()}
+        )
+
+    async def hdel(self, key, *fields):
+        for f in fields:
+            self.hashes.get(key, {}).pop(f, None)
+
+    async def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(f) for f in fields]
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def delete(self, key):
+        self.strings.pop(key, None)
+
+
+class _FakePipeline:
+    def __init__(self, r: _FakeRedis) -> None:
+        self.r = r
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append(getattr(self.r, name)(*args, **kwargs))
+
+    async def execute(self):
+        return [await c for c in self.calls]
+
+
+class TestMinHash:
+    def test_shingles_ignore_case_and_punctuation(self) -> None:
+        assert shingles("The Quick, brown FOX!") == shingles("the quick brown fox")
+
+    def test_one_word_edits_stay_above_threshold(self) -> None:
+        for edited in (
+            DISCLAIMER.replace("strictly prohibited", "prohibited") + " Acme Corp.",
+            DISCLAIMER.replace("sender", "company"),
+            DISCLAIMER.replace("addressee", "recipient"),
+        ):
+            assert jaccard(minhash(DISCLAIMER), minhash(edited)) >= CHUNK_DEDUP_THRESHOLD
+
+    def test_unrelated_text_is_dissimilar(self) -> None:
+        assert jaccard(minhash(DISCLAIMER), minhash(OTHER)) < 0.2
+
+    def test_identical_text_shares_every_band(self) -> None:
+        a, b = minhash(DISCLAIMER), minhash(DISCLAIMER.upper())
+        assert band_keys("t1", a) == band_keys("t1", b)
+        assert all(k.startswith("tenant:t1:dedup:band:") for k in band_keys("t1", a))
+
+    def test_empty_text_has_no_signature(self) -> None:
+        assert minhash("  ...  ") is None
+
+
+class TestNearDuplicateIndex:
+    async def test_committed_chunk_is_canonical_for_later_documents(self) -> None:
+        r = _FakeRedis()
+        index = NearDuplicateIndex(r, "t1")
+        first = await index.classify(["a1", "a2"], [DISCLAIMER, OTHER])
+        assert first.canonical == [None, None] and first.claimed == ["a1", "a2"]
+        await index.commit(first, "doc-a")
+        assert not r.hashes["tenant:t1:dedup:pending"]
+
+        edited = DISCLAIMER.replace("sender", "company")
+        second = await index.classify(["b1", "b2", "b3"], [edited, "Too short to index.", edited])
+        assert second.canonical == ["a1", None, "a1"] and second.duplicates == 2
+        assert second.claimed == []
+        await index.commit(second, "doc-b")
+        ref = json.loads(r.hashes["tenant:t1:dedup:refs"]["b1"])
+        assert ref["canonical"] == "a1" and ref["doc_id"] == "doc-b"
+        assert ref["similarity"] >= CHUNK_DEDUP_THRESHOLD
+
+        # Re-indexing a document does not match its own chunks
+        again = await index.classify(["a1"], [DISCLAIMER])
+        assert again.canonical == [None] and again.claimed == []
+
+    async def test_reference_and_reuse_modes(self) -> None:
+        index = NearDuplicateIndex(_FakeRedis(), "t1")
+        await index.commit(await index.classify(["a1"], [DISCLAIMER]), "doc-a")
+        plan = await index.classify(["b1", "b2", "b3"], [DISCLAIMER, OTHER, OTHER.upper()])
+        assert plan.canonical == ["a1", None, "b2"] and plan.external_canonicals() == ["a1"]
+
+        # reference: only canonical chunks are embedded
+        assert plan.to_embed("reference") == [1]
+        # reuse: the stored canonical vector is copied, an in-batch one is shared
+        stored = {"a1": np.full(4, 7, dtype=np.float32)}
+        assert plan.to_embed("reuse", stored) == [1]
+        vectors = {1: np.ones(4, dtype=np.float32)}
+        plan.reuse_vectors(vectors, stored)
+        assert sorted(vectors) == [0, 1, 2]
+        assert vectors[0][0] == 7 and vectors[2][0] == 1
+
+    async def test_missing_canonical_is_embedded_in_reuse_mode(self) -> None:
+        index = NearDuplicateIndex(_FakeRedis(), "t1")
+        await index.commit(await index.classify(["a1"], [DISCLAIMER]), "doc-a")
+        plan = await index.classify(["b1"], [DISCLAIMER])
+        # a1's vector is gone from Qdrant
+        assert plan.to_embed("reuse", {}) == [0]
+        vectors = {0: np.ones(4, dtype=np.float32)}
+        plan.reuse_vectors(vectors, {})
+        assert list(vectors) == [0]
+
+    async def test_concurrent_jobs_embed_shared_text_once(self) -> None:
+        r = _FakeRedis()
+        job_a, job_b = NearDuplicateIndex(r, "t1"), NearDuplicateIndex(r, "t1")
+        plan_a = await job_a.classify(["a1"], [DISCLAIMER])
+        # B classifies before A has stored or committed anything
+        plan_b = await job_b.classify(["b1"], [DISCLAIMER])
+        assert plan_a.canonical == [None] and plan_b.canonical == ["a1"]
+        assert "tenant:t1:dedup:lock" not in r.strings
+
+        # A fails: its claim is dropped and the next job embeds the text itself
+        await job_a.release(plan_a)
+        plan_c = await job_b.classify(["c1"], [DISCLAIMER])
+        assert plan_c.canonical == [None] and plan_c.claimed == ["c1"]
+
+    async def test_stale_claim_is_ignored(self, monkeypatch) -> None:
+        import pipeline.chunk_dedup as chunk_dedup
+
+        r = _FakeRedis()
+        index = NearDuplicateIndex(r, "t1")
+        await index.classify(["a1"], [DISCLAIMER])  # worker crashed before commit or release
+        monkeypatch.setattr(chunk_dedup, "CHUNK_DEDUP_CLAIM_TTL_SEC", -1.0)
+        plan = await index.classify(["b1"], [DISCLAIMER])
+        assert plan.canonical == [None]
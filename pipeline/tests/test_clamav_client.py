@@ -0,0 +1,75 @@
+"""
+ClamAV client unit tests. Reply parsing, block streaming and verdict cache; no clamd needed.
+"""
+from __future__ import annotations
+
+import pytest
+
+from pipeline import clamav_client
+from pipeline.clamav_client import ClamdError, _parse_reply, _VerdictCache, iter_blocks
+
+
+class TestClamavClient:
+    def test_parse_reply_clean(self) -> None:
+        assert _parse_reply("stream: OK") == ("clean", None)
+
+    def test_parse_reply_infected(self) -> None:
+        assert _parse_reply("stream: Win.Test.EICAR_HDB-1 FOUND") == ("infected", "Win.Test.EICAR_HDB-1")
+
+    def test_parse_reply_error(self) -> None:
+        with pytest.raises(ClamdError, match="size limit"):
+            _parse_reply("INSTREAM size limit exceeded. ERROR")
+
+    def test_iter_blocks_covers_content(self) -> None:
+        content = bytes(range(256)) * 10
+        blocks = list(iter_blocks(content, block_size=1000))
+        assert [len(b) for b in blocks] == [1000, 1000, 560]
+        assert b"".join(blocks) == content
+
+    def test_verdict_cache_evicts_lru(self) -> None:
+        cache = _VerdictCache(max_size=2)
+        cache.put(("a", "1"), ("clean", None))
+        cache.put(("b", "1"), ("clean", None))
+        cache.get(("a", "1"))
+        cache.put(("c", "1"), ("infected", "X"))
+        assert cache.get(("b", "1")) is None
+        assert cache.get(("a", "1")) == ("clean", None)
+        assert cache.get(("c", "1")) == ("infected", "X")
+
+    def test_unavailable_returns_clean(self, monkeypatch) -> None:
+        monkeypatch.setattr(clamav_client, "_get_pool", lambda: None)
+        assert clamav_client.scan_bytes(b"payload") == ("clean", None)
+
+    def test_verdicts_are_cached_only_under_a_fresh_version(self, monkeypatch) -> None:
+        version: list[str | Exception] = [ClamdError("VERSION failed")]
+
+        class Conn:
+            def command(self, name):
+                if isinstance(version[0], Exception):
+                    raise version[0]
+                return version[0]
+
+            def instream(self, blocks):
+                list(blocks)
+                return "stream: OK"
+
+        class Pool:
+            def run(self, fn, retry=True):
+                return fn(Conn())
+
+        monkeypatch.setattr(clamav_client, "_get_pool", lambda: Pool())
+        monkeypatch.setattr(clamav_client, "_verdicts", _VerdictCache(max_size=10))
+        monkeypatch.setattr(clamav_client, "_db_version", None)
+        monkeypatch.setattr(clamav_client, "_db_version_checked", 0.0)
+
+        # Version unknown: scanned, not cached
+        assert clamav_client.scan_bytes(b"payload", sha256="ab") == ("clean", None)
+        assert clamav_client._verdicts.get(("ab", "")) is None
+        assert clamav_client.cached_verdict("ab") is None
+
+        version[0] = "ClamAV 1.0.5/27210/Mon Oct 19 2026"
+        clamav_client.scan_bytes(b"payload", sha256="ab")
+        assert clamav_client.cached_verdict("AB") == ("clean", None)
+        # Stale version: a miss until a scan refreshes it
+        monkeypatch.setattr(clamav_client, "_db_version_checked", clamav_client._db_version_checked - clamav_client._VERSION_TTL_SEC - 1)
+        assert clamav_client.cached_verdict("ab") is None
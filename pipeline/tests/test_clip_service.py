@@ -0,0 +1,39 @@
+"""
+CLIP encoding service unit tests. Micro-batching with a stub encoder; no model download.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from pipeline.multimodal import clip_service
+from pipeline.multimodal.clip_service import ClipEncoder
+
+
+class TestClipEncoder:
+    async def test_concurrent_requests_share_one_batch(self, monkeypatch) -> None:
+        calls: list[list] = []
+
+        def fake_encode(items):
+            calls.append(list(items))
+            return np.arange(len(items), dtype=np.float32)[:, None] * np.ones((1, 4), dtype=np.float32)
+
+        monkeypatch.setattr(clip_service, "_encode", fake_encode)
+        enc = ClipEncoder(batch_size=8, window_ms=50)
+        a, b = await asyncio.gather(enc.encode_images(["i0", "i1"]), enc.encode_image("i2"))
+        assert calls == [["i0", "i1", "i2"]]
+        assert a.shape == (2, 4) and a[1, 0] == 1.0
+        assert b.shape == (4,) and b[0] == 2.0
+
+    async def test_images_and_texts_dispatch_separately(self, monkeypatch) -> None:
+        calls: list[list] = []
+
+        def fake_encode(items):
+            calls.append(list(items))
+            return np.zeros((len(items), 4), dtype=np.float32)
+
+        monkeypatch.setattr(clip_service, "_encode", fake_encode)
+        enc = ClipEncoder(batch_size=8, window_ms=50)
+        await asyncio.gather(enc.encode_image("img"), enc.encode_texts(["a photo"]))
+        assert sorted(calls) == [["a photo"], ["img"]]
@@ -0,0 +1,167 @@
+"""
+Embedding service unit tests: backend selection, batched calls with stub backends,
+cross-caller micro-batching, and HTTP endpoint routing / circuit breaker.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import pipeline.embedding as embedding
+from pipeline.embedding import EMBEDDING_DIM, EmbeddingUnavailableError, get_text_embeddings
+from pipeline.embedding.batcher import EmbeddingBatcher
+from pipeline.embedding.http_backend import EndpointRouter
+
+
+async def _no_events(*args, **kwargs) -> None:
+    return None
+
+
+class TestBackendSelection:
+    def test_offline_mode_selects_local(self, monkeypatch) -> None:
+        monkeypatch.setattr(embedding, "_backend", None)
+        monkeypatch.setattr(embedding, "EMBEDDING_BACKEND", "auto")
+        monkeypatch.setenv("FROSTBYTE_MODE", "offline")
+        assert embedding.get_backend() == "local"
+
+    def test_online_mode_selects_http(self, monkeypatch) -> None:
+        monkeypatch.setattr(embedding, "_backend", None)
+        monkeypatch.setattr(embedding, "EMBEDDING_BACKEND", "auto")
+        monkeypatch.setenv("FROSTBYTE_MODE", "online")
+        monkeypatch.setenv("FROSTBYTE_EMBEDDING_ENDPOINT", "http://embed.local/v1/embeddings")
+        assert embedding.get_backend() == "http"
+
+
+class TestGetTextEmbeddings:
+    async def test_one_backend_call_and_empty_texts_skipped(self, monkeypatch) -> None:
+        calls: list[tuple[list[str], str]] = []
+
+        async def fake_embed(texts, dim, input_type="document"):
+            calls.append((list(texts), input_type))
+            return np.eye(len(texts) + 1, dim, k=1, dtype=np.float32)[: len(texts)] * 3.0
+
+        monkeypatch.setattr(embedding, "_backend", "local")
+        monkeypatch.setattr(embedding.local_backend, "embed", fake_embed)
+        monkeypatch.setattr("pipeline.events.publish_async", _no_events)
+        vectors = await get_text_embeddings(["alpha", "  ", "beta"], input_type="query")
+        assert calls == [(["alpha", "beta"], "query")]
+        assert vectors.dtype == np.float32 and vectors.shape == (3, EMBEDDING_DIM)
+        # Input order kept, empty text left as a zero row, rows normalized once
+        assert vectors[0, 1] == 1.0 and vectors[2, 2] == 1.0
+        assert not vectors[1].any()
+
+    async def test_wrong_dimension_raises(self, monkeypatch) -> None:
+        async def short_embed(texts, dim, input_type="document"):
+            return np.ones((len(texts), 512), dtype=np.float32)
+
+        monkeypatch.setattr(embedding, "_backend", "local")
+        monkeypatch.setattr(embedding.local_backend, "embed", short_embed)
+        monkeypatch.setattr("pipeline.events.publish_async", _no_events)
+        with pytest.raises(ValueError):
+            await get_text_embeddings(["alpha"])
+
+    async def test_backend_failure_raises_unavailable(self, monkeypatch) -> None:
+        async def failing_embed(texts, dim, input_type="document"):
+            raise RuntimeError("model not loaded")
+
+        monkeypatch.setattr(embedding, "_backend", "local")
+        monkeypatch.setattr(embedding.local_backend, "embed", failing_embed)
+        monkeypatch.setattr("pipeline.events.publish_async", _no_events)
+        with pytest.raises(EmbeddingUnavailableError):
+            await get_text_embeddings(["alpha"])
+
+    async def test_permanent_errors_are_not_rewrapped(self, monkeypatch) -> None:
+        failure: Exception = RuntimeError()
+
+        async def failing_embed(texts, dim):
+            raise failure
+
+        monkeypatch.setattr(embedding, "_backend", "http")
+        monkeypatch.setattr(embedding.http_backend, "embed", failing_embed)
+        monkeypatch.setattr("pipeline.events.publish_async", _no_events)
+        request = httpx.Request("POST", "http://embed.test/v1/embeddings")
+        for status, expected in ((401, httpx.HTTPStatusError), (429, EmbeddingUnavailableError)):
+            failure = httpx.HTTPStatusError("", request=request, response=httpx.Response(status, request=request))
+            with pytest.raises(expected):
+                await get_text_embeddings(["alpha"])
+        failure = ValueError("EMBEDDING_LOCAL_ENGINE must be 'torch' or 'onnx'")
+        with pytest.raises(ValueError, match="EMBEDDING_LOCAL_ENGINE"):
+            await get_text_embeddings(["alpha"])
+
+
+class TestEmbeddingBatcher:
+    async def test_concurrent_callers_share_one_call(self) -> None:
+        calls: list[tuple[list[str], str]] = []
+
+        async def fake_embed(texts, input_type):
+            calls.append((list(texts), input_type))
+            return [[float(len(t))] for t in texts]
+
+        batcher = EmbeddingBatcher(fake_embed, window_ms=20)
+        a, b, q = await asyncio.gather(
+            batcher.embed(["x", "yy"]),
+            batcher.embed(["zzz"]),
+            batcher.embed(["qqqq"], "query"),
+        )
+        assert a == [[1.0], [2.0]] and b == [[3.0]] and q == [[4.0]]
+        assert sorted(calls) == [(["qqqq"], "query"), (["x", "yy", "zzz"], "document")]
+
+    async def test_item_budget_splits_batches(self) -> None:
+        calls: list[int] = []
+
+        async def fake_embed(texts, input_type):
+            calls.append(len(texts))
+            return [[0.0] for _ in texts]
+
+        batcher = EmbeddingBatcher(fake_embed, window_ms=50, max_items=2)
+        await asyncio.gather(*(batcher.embed([str(i)]) for i in range(4)))
+        assert calls == [2, 2]
+
+    async def test_large_request_is_split_and_reassembled(self) -> None:
+        calls: list[list[str]] = []
+
+        async def fake_embed(texts, input_type):
+            calls.append(list(texts))
+            return np.array([[float(len(t))] for t in texts], dtype=np.float32)
+
+        batcher = EmbeddingBatcher(fake_embed, window_ms=5, max_items=2, max_tokens=3)
+        vectors = await batcher.embed(["a", "bb", "c", "dd", "e" * 20])
+        assert vectors[:, 0].tolist() == [1.0, 2.0, 1.0, 2.0, 20.0]
+        # max_items=2 caps each call; the text over the token budget goes alone
+        assert [len(c) for c in calls] == [2, 2, 1]
+
+
+class TestEndpointRouter:
+    def _router(self, clock: list[float]) -> EndpointRouter:
+        return EndpointRouter(["http://a", "http://b"], failure_threshold=2, cooldown_sec=30, clock=lambda: clock[0])
+
+    def test_prefers_lowest_latency(self) -> None:
+        router = self._router([0.0])
+        a, b = router.endpoints
+        router.record_success(a, 0.5)
+        router.record_success(b, 0.1)
+        assert [e.url for e in router.candidates()] == ["http://b", "http://a"]
+
+    def test_breaker_opens_then_half_opens_after_cooldown(self) -> None:
+        clock = [0.0]
+        router = self._router(clock)
+        a, _b = router.endpoints
+        router.record_failure(a)
+        assert a in router.candidates()
+        router.record_failure(a)
+        assert a not in router.candidates()
+
+        clock[0] = 31.0
+        assert router.candidates()[-1] is a  # one probe, after the healthy endpoints
+        router.begin(a)
+        assert a not in router.candidates()  # no second concurrent probe
+        router.record_failure(a)
+        assert a not in router.candidates()  # failed probe re-opens
+
+        clock[0] = 62.0
+        router.begin(a)
+        router.record_success(a, 0.2)
+        assert not a.is_open and a.failures == 0
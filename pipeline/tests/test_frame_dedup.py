@@ -0,0 +1,46 @@
+"""
+Frame dedup unit tests. dHash and run collapsing on synthetic frames.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from pipeline.multimodal.frame_dedup import collapse_runs, dhash, hamming
+
+
+@dataclass(frozen=True)
+class _Frame:
+    timestamp: float
+    image: np.ndarray
+
+
+def _gradient(horizontal: bool) -> np.ndarray:
+    ramp = np.linspace(0, 255, 64, dtype=np.uint8)
+    img = np.tile(ramp, (64, 1)) if horizontal else np.tile(ramp[:, None], (1, 64))
+    return np.stack([img] * 3, axis=-1)
+
+
+def _checker() -> np.ndarray:
+    img = ((np.indices((64, 64)).sum(axis=0) // 8) % 2 * 255).astype(np.uint8)
+    return np.stack([img] * 3, axis=-1)
+
+
+class TestFrameDedup:
+    def test_identical_frames_same_hash(self) -> None:
+        assert dhash(_gradient(True)) == dhash(_gradient(True).copy())
+
+    def test_different_frames_far_apart(self) -> None:
+        assert hamming(dhash(_gradient(True)), dhash(_checker())) > 5
+
+    def test_collapse_runs_keeps_time_range(self) -> None:
+        a, b = _gradient(True), _checker()
+        frames = [_Frame(0.0, a), _Frame(1.0, a), _Frame(2.0, a), _Frame(3.0, b), _Frame(4.0, a)]
+        runs = list(collapse_runs(frames, max_distance=5, enabled=True))
+        assert [(r.start, r.end, r.frame_count) for r in runs] == [(0.0, 2.0, 3), (3.0, 3.0, 1), (4.0, 4.0, 1)]
+
+    def test_collapse_disabled_keeps_every_frame(self) -> None:
+        a = _gradient(True)
+        frames = [_Frame(float(i), a) for i in range(3)]
+        assert len(list(collapse_runs(frames, enabled=False))) == 3
@@ -0,0 +1,133 @@
+"""
+Frame sampling unit tests: which frames each policy reads, on a stub capture (no video files).
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+import pipeline.multimodal.frame_sampler as frame_sampler  # noqa: E402
+from pipeline.multimodal.frame_sampler import sample_frames  # noqa: E402
+
+
+class _StubCapture:
+    """cv2.VideoCapture over numbered frames; each frame's pixels hold its index."""
+
+    def __init__(self, fps: float, frame_count: int) -> None:
+        self.fps = fps
+        self.frame_count = frame_count
+        self.pos = 0
+        self.seeks: list[float] = []
+        self.grabs = 0
+        self.retrieved: list[int] = []
+        self.released = False
+
+    def _frame(self, index: int) -> np.ndarray:
+        return np.full((2, 2, 3), index, dtype=np.uint16)
+
+    def get(self, prop):
+        return {
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.frame_count,
+            cv2.CAP_PROP_POS_FRAMES: self.pos,
+        }[prop]
+
+    def set(self, prop, value) -> None:
+        assert prop == cv2.CAP_PROP_POS_MSEC
+        self.seeks.append(value / 1000.0)
+        self.pos = round(value / 1000.0 * (self.fps or 30))
+
+    def read(self):
+        if self.pos >= self.frame_count:
+            return False, None
+        self.pos += 1
+        return True, self._frame(self.pos - 1)
+
+    def grab(self) -> bool:
+        if self.pos >= self.frame_count:
+            return False
+        self.grabs += 1
+        self.pos += 1
+        return True
+
+    def retrieve(self):
+        self.retrieved.append(self.pos - 1)
+        return True, self._frame(self.pos - 1)
+
+    def release(self) -> None:
+        self.released = True
+
+
+@pytest.fixture
+def capture(monkeypatch):
+    cap = _StubCapture(fps=30.0, frame_count=300)  # 10 s
+    monkeypatch.setattr(cv2, "VideoCapture", lambda path: cap)
+    return cap
+
+
+def _probe(times: list[float], calls: list[tuple]):
+    def probe(target, **kwargs):
+        calls.append((target, kwargs))
+        return {"frames": [{"pts_time": str(t)} for t in times]}
+
+    return probe
+
+
+class TestFixedRate:
+    def test_dense_rate_grabs_and_retrieves_only_kept_frames(self, capture) -> None:
+        frames = list(sample_frames("v.mp4", policy="fps", fps=5.0))
+        assert capture.retrieved == list(range(0, 300, 6))
+        assert capture.grabs == 300 and capture.seeks == []
+        assert [f.timestamp for f in frames[:3]] == [0.0, 0.2, 0.4]
+        assert int(frames[1].image[0, 0, 0]) == 6
+        assert capture.released
+
+    def test_default_rate_seeks_at_the_threshold(self, capture, monkeypatch) -> None:
+        monkeypatch.setattr(frame_sampler, "FRAME_SEEK_MIN_INTERVAL_SEC", 1.0)
+        frames = list(sample_frames("v.mp4", policy="fps", fps=1.0))
+        assert capture.seeks == [float(t) for t in range(10)] and capture.grabs == 0
+        assert [int(f.image[0, 0, 0]) for f in frames] == list(range(0, 300, 30))
+
+    def test_interval_below_threshold_steps_through_frames(self, capture, monkeypatch) -> None:
+        monkeypatch.setattr(frame_sampler, "FRAME_SEEK_MIN_INTERVAL_SEC", 2.0)
+        frames = list(sample_frames("v.mp4", policy="fps", fps=1.0))
+        assert capture.seeks == [] and capture.retrieved == list(range(0, 300, 30))
+        assert [f.timestamp for f in frames] == [float(t) for t in range(10)]
+
+    def test_window_stays_on_the_global_grid(self, capture) -> None:
+        frames = list(sample_frames("v.mp4", policy="fps", fps=1.0, start=2.5, end=5.0))
+        assert [f.timestamp for f in frames] == [3.0, 4.0]
+
+    def test_unknown_frame_rate_seeks_until_reads_fail(self, monkeypatch) -> None:
+        cap = _StubCapture(fps=0.0, frame_count=90)
+        monkeypatch.setattr(cv2, "VideoCapture", lambda path: cap)
+        frames = list(sample_frames("v.mp4", policy="fps", fps=1.0))
+        assert [f.timestamp for f in frames] == [0.0, 1.0, 2.0]
+
+    def test_max_samples_caps_the_output(self, capture) -> None:
+        assert len(list(sample_frames("v.mp4", policy="fps", fps=5.0, max_samples=4))) == 4
+
+
+class TestProbedPolicies:
+    def test_keyframes_are_probed_without_decoding_and_read_by_seeking(self, capture, monkeypatch) -> None:
+        calls: list[tuple] = []
+        monkeypatch.setattr(frame_sampler.ffmpeg, "probe", _probe([0.0, 2.0, 4.0, 6.0], calls))
+        frames = list(sample_frames("v.mp4", policy="keyframes", start=1.0, end=6.0))
+        assert [f.timestamp for f in frames] == [2.0, 4.0]
+        assert capture.seeks == [2.0, 4.0] and capture.grabs == 0
+        target, kwargs = calls[0]
+        assert target == "v.mp4" and kwargs["skip_frame"] == "nokey" and kwargs["read_intervals"] == "1.0%6.0"
+
+    def test_scene_changes_keep_the_window_start(self, capture, monkeypatch) -> None:
+        calls: list[tuple] = []
+        monkeypatch.setattr(frame_sampler.ffmpeg, "probe", _probe([3.5, 7.25], calls))
+        frames = list(sample_frames("v.mp4", policy="scene", scene_threshold=0.4, start=2.0))
+        assert [f.timestamp for f in frames] == [2.0, 3.5, 7.25]
+        graph, kwargs = calls[0]
+        assert graph == "movie=v.mp4:seek_point=2.0,select=gt(scene\\,0.4)" and kwargs["f"] == "lavfi"
+
+    def test_unknown_policy(self) -> None:
+        with pytest.raises(ValueError, match="Unknown frame sampling policy"):
+            list(sample_frames("v.mp4", policy="every"))
@@ -0,0 +1,56 @@
+"""
+OCR subsystem unit tests: page normalization, banding and multi-page TIFF handling (no tesseract).
+"""
+from __future__ import annotations
+
+from PIL import Image
+
+import pipeline.multimodal.ocr as ocr
+from pipeline.multimodal.ocr import _join_bands, band_boxes, normalize_page, ocr_page, page_count
+
+
+class TestNormalizePage:
+    def test_600dpi_scan_downscaled_to_target_grayscale(self) -> None:
+        image = Image.new("RGB", (5100, 6600), "white")
+        image.info["dpi"] = (600, 600)
+        out = normalize_page(image, target_dpi=300)
+        assert out.mode == "L"
+        assert out.size == (2550, 3300)
+
+    def test_low_dpi_left_at_native_size(self) -> None:
+        image = Image.new("RGB", (800, 600), "white")
+        image.info["dpi"] = (150, 150)
+        assert normalize_page(image, target_dpi=300).size == (800, 600)
+
+
+class TestBands:
+    def test_bands_cover_page_with_overlap(self) -> None:
+        boxes = band_boxes(1000, 5000, band_height=2048, overlap=64)
+        assert boxes[0] == (0, 0, 1000, 2048)
+        assert boxes[-1][3] == 5000
+        for a, b in zip(boxes, boxes[1:]):
+            assert b[1] == a[3] - 64
+
+    def test_line_repeated_across_overlap_dropped(self) -> None:
+        assert _join_bands(["one\ntwo\n", "two\nthree"]) == "one\ntwo\nthree"
+
+
+class TestMultiPageTiff:
+    def test_every_page_counted(self, tmp_path) -> None:
+        path = tmp_path / "scan.tif"
+        pages = [Image.new("L", (100, 100), v) for v in (0, 128, 255)]
+        pages[0].save(path, save_all=True, append_images=pages[1:])
+        assert page_count(str(path)) == 3
+
+    def test_oversized_later_page_rejected_undecoded(self, tmp_path, monkeypatch) -> None:
+        path = tmp_path / "scan.tif"
+        Image.new("L", (10, 10)).save(path, save_all=True, append_images=[Image.new("L", (100, 100))])
+        monkeypatch.setattr(ocr, "OCR_MAX_PAGE_PIXELS", 1000)
+        assert ocr_page(str(path), 1) is None
+
+    def test_decompression_bomb_rejected_not_raised(self, tmp_path, monkeypatch) -> None:
+        path = tmp_path / "scan.png"
+        Image.new("L", (100, 100)).save(path)
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+        assert page_count(str(path)) == 1
+        assert ocr_page(str(path), 0) is None
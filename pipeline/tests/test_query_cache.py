@@ -0,0 +1,122 @@
+"""
+Serving query cache: key normalization, semantic-tier entries and matching, metrics,
+and invalidation by collection version against a fake Redis.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+import pipeline.serving.cache as cache
+from pipeline import metrics
+from pipeline.serving.cache import (
+    QueryCache,
+    best_match,
+    bump_collection_versions,
+    normalize_query,
+    pack_entry,
+    unpack_entry,
+)
+
+
+class _FakeRedis:
+    """Strings, lists and pipelines: the surface QueryCache and bump_collection_versions use."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    async def mget(self, keys):
+        return [await self.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+    async def lpush(self, key, value):
+        self.data.setdefault(key, []).insert(0, value)
+
+    async def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start:end + 1]
+
+    async def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    async def expire(self, key, seconds):
+        return True
+
+
+class _FakePipeline:
+    def __init__(self, r: _FakeRedis) -> None:
+        self.r = r
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append(getattr(self.r, name)(*args, **kwargs))
+
+    async def execute(self):
+        return [await c for c in self.calls]
+
+
+def test_normalized_queries_share_a_key() -> None:
+    assert normalize_query("  Payment\tTERMS\n") == normalize_query("payment terms")
+    assert normalize_query("ﬁnance") == "finance"  # NFKC folds the ligature
+
+
+def test_entry_round_trip() -> None:
+    v = np.arange(4, dtype=np.float32)
+    stored, result = unpack_entry(pack_entry(v, [{"chunk_id": "c1"}]))
+    np.testing.assert_array_equal(stored, v)
+    assert result == b'[{"chunk_id": "c1"}]'
+
+
+def test_best_match_respects_threshold() -> None:
+    stored = np.eye(3, dtype=np.float32)
+    assert best_match(np.array([0.1, 1.0, 0.0]), stored, threshold=0.99) == 1
+    assert best_match(np.array([1.0, 1.0, 0.0]), stored, threshold=0.99) is None
+    assert best_match(np.ones(3), np.zeros((0, 3), dtype=np.float32), threshold=0.5) is None
+
+
+def test_metrics_render_prometheus_text() -> None:
+    metrics.describe("frostbyte_test_total", "counter", "Test counter.")
+    metrics.inc("frostbyte_test_total", result="hit")
+    metrics.inc("frostbyte_test_total", 2, result="hit")
+    text = metrics.render()
+    assert "# TYPE frostbyte_test_total counter" in text
+    assert 'frostbyte_test_total{result="hit"} 3' in text
+
+
+class TestQueryCache:
+    def _cache(self, r: _FakeRedis) -> QueryCache:
+        return QueryCache("t1", collections=["tenant_t1"], filters={"modality": None}, top_k=5, r=r)
+
+    async def test_version_bump_turns_exact_hit_into_miss(self) -> None:
+        r, result = _FakeRedis(), [{"chunk_id": "c1"}]
+        await self._cache(r).put("Payment terms", None, result)
+        hit = self._cache(r)
+        assert await hit.get_exact("  payment TERMS ") == result and hit.outcome == "exact"
+
+        await bump_collection_versions(r, "t1", ["tenant_t1"])
+        miss = self._cache(r)
+        assert await miss.get_exact("payment terms") is None and miss.outcome == "miss"
+
+    async def test_version_bump_turns_semantic_hit_into_miss(self, monkeypatch) -> None:
+        monkeypatch.setattr(cache, "QUERY_CACHE_SEMANTIC_ENABLED", True)
+        r, result = _FakeRedis(), [{"chunk_id": "c1"}]
+        v = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        await self._cache(r).put("payment terms", v, result)
+        near = np.array([1.0, 0.01, 0.0], dtype=np.float32)
+        hit = self._cache(r)
+        assert await hit.get_exact("when is payment due") is None
+        assert await hit.get_semantic("when is payment due", near) == result and hit.outcome == "semantic"
+
+        await bump_collection_versions(r, "t1", ["tenant_t1"])
+        miss = self._cache(r)
+        assert await miss.get_semantic("when is payment due", near) is None and miss.outcome == "miss"
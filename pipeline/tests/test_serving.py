@@ -0,0 +1,132 @@
+"""
+Serving layer search: filter pushdown, payload projection and multi-collection
+fusion against an in-process Qdrant (qdrant-client local mode), plus the search route.
+"""
+from __future__ import annotations
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import Distance, PointStruct, ScoredPoint, VectorParams
+
+import pipeline.vector_store as vector_store
+from pipeline.serving import fusion, routes
+from pipeline.serving.two_stage import two_stage_search
+from pipeline.vector_store import payload_filter, search_points
+
+DIM = 8
+
+
+@pytest.fixture
+async def qdrant(monkeypatch) -> AsyncQdrantClient:
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection("tenant_t1", vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+    rng = np.random.default_rng(0)
+    await client.upsert(
+        "tenant_t1",
+        points=[
+            PointStruct(
+                id=i,
+                vector=rng.random(DIM).tolist(),
+                payload={
+                    "chunk_id": f"c{i}",
+                    "doc_id": f"d{i % 3}",
+                    "page": i,
+                    "classification": "contract" if i % 2 else "invoice",
+                    "modality": "text",
+                    "content": "x" * 1000,
+                },
+            )
+            for i in range(12)
+        ],
+    )
+    monkeypatch.setattr(vector_store, "_async_client", client)
+    return client
+
+
+async def test_filters_are_pushed_down(qdrant) -> None:
+    hits = await search_points(
+        collection="tenant_t1",
+        vector=np.ones(DIM, dtype=np.float32),
+        top_k=12,
+        query_filter=payload_filter(doc_ids=["d1"], classification="contract", page_from=2, page_to=9),
+        payload_fields=["chunk_id", "page"],
+    )
+    assert sorted(h.payload["page"] for h in hits) == [7]  # d1 pages 1,4,7,10; contract = odd
+    assert set(hits[0].payload) == {"chunk_id", "page"}
+
+
+def test_no_filters_means_no_filter() -> None:
+    assert payload_filter() is None
+    assert payload_filter(doc_ids=[]) is None
+
+
+async def test_search_route_returns_projected_proof(qdrant, monkeypatch) -> None:
+    async def fake_embedding(text, document_id=None, tenant_id=None, input_type="document"):
+        assert input_type == "query"
+        return np.ones(DIM, dtype=np.float32)
+
+    async def no_limit(*args, **kwargs) -> None:
+        return None
+
+    monkeypatch.setenv("FROSTBYTE_AUTH_BYPASS", "true")
+    monkeypatch.setattr(fusion, "get_text_embedding", fake_embedding)
+    monkeypatch.setattr(routes.ratelimit, "check_rate_limit", no_limit)
+    app = FastAPI()
+    app.include_router(routes.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.post(
+            "/api/v1/query/t1/search",
+            json={"query_text": "payment terms", "top_k": 3, "filters": {"classification": "invoice"}},
+        )
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["chunks"]) == 3
+    assert all(c["classification"] == "invoice" and "content" not in c for c in body["chunks"])
+
+
+def _hits(*chunk_ids: str) -> list[ScoredPoint]:
+    return [
+        ScoredPoint(id=i, version=0, score=1.0 - i / 10, payload={"chunk_id": c})
+        for i, c in enumerate(chunk_ids)
+    ]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    fused = fusion.reciprocal_rank_fusion({"text": _hits("a", "b", "c"), "images": _hits("c", "d")}, k=60)
+    assert [h.key for h in fused] == ["c", "a", "b", "d"]
+    assert fused[0].fusion_score == pytest.approx(1 / 63 + 1 / 61)
+    assert fused[0].sources == {"text": (3, pytest.approx(0.8)), "images": (1, 1.0)}
+    assert len(fusion.reciprocal_rank_fusion({"text": _hits("a", "b", "c")}, top_k=2)) == 2
+
+
+async def test_fan_out_searches_both_collections(qdrant) -> None:
+    await qdrant.create_collection("tenant_t1_images", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    await qdrant.upsert(
+        "tenant_t1_images",
+        points=[
+            PointStruct(id=100, vector=[1.0, 0.0, 0.0, 0.0], payload={"chunk_id": "img", "modality": "image"}),
+            PointStruct(id=101, vector=[0.0, 1.0, 0.0, 0.0], payload={"chunk_id": "frame", "modality": "video_frame"}),
+        ],
+    )
+    fused = await fusion.fan_out(
+        "t1",
+        {"text": np.ones(DIM, dtype=np.float32), "images": np.array([1, 0, 0, 0], dtype=np.float32)},
+        top_k=4,
+    )
+    assert len(fused) == 4
+    # Both branch leaders tie on 1/(k+1); the text leader was seen first
+    assert list(fused[0].sources) == ["text"] and fused[1].key == "img"
+    assert {kind for h in fused for kind in h.sources} == {"text", "images"}
+
+
+async def test_two_stage_restricts_chunks_to_candidate_documents(qdrant) -> None:
+    await qdrant.create_collection("tenant_t1_docs", vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+    await qdrant.upsert(
+        "tenant_t1_docs",
+        points=[PointStruct(id=i, vector=np.eye(DIM)[i].tolist(), payload={"doc_id": f"d{i}"}) for i in range(3)],
+    )
+    hits = await two_stage_search("t1", np.eye(DIM, dtype=np.float32)[1], top_k=10, doc_candidates=1)
+    assert hits and {h.payload["doc_id"] for h in hits} == {"d1"}
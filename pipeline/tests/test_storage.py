@@ -3,12 +3,68 @@ Storage layer unit tests. Verifies provisioning logic without Docker.
 """
 from __future__ import annotations
 
+import asyncio
+import json
+
 import pytest
 
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import FieldCondition, Filter, MatchValue, UpdateCollection
+
+import pipeline.storage.placement as placement
+import pipeline.vector_store as vector_store
+import pipeline.pgvector_store as pgvector_store
+from pipeline.pgvector_store import UnsupportedFilterError, _conditions, search_pgvector, search_sql
+from pipeline.retry_queue import RETRY_BACKOFF_SEC, defer
+from pipeline.serving.access import record_access
+from pipeline.storage.index_profiles import PROFILES, get_profile, profile_for_config
+from pipeline.storage.pgvector_indexes import VECTOR_COLUMNS, create_index_sql
+from pipeline.storage.placement import Placement, PlacementUnavailableError
 from pipeline.storage.qdrant_provisioner import (
     get_collection_name,
     verify_tenant_access,
 )
+from pipeline.storage.tiering import (
+    ARCHIVED,
+    DISK,
+    DISK_UPDATE_BODY,
+    HOT,
+    TIER_ARCHIVE_AFTER_SEC,
+    TIER_DISK_AFTER_SEC,
+    WARMUP_BACKOFF_SEC,
+    next_tier,
+    split_collection_name,
+)
+from pipeline.vector_import import CHUNK_COLUMNS, chunk_batch
+from pipeline.vector_store import payload_filter
+
+
+class _FakePgPool:
+    """acquire() / transaction() / execute / fetch surface used by search_pgvector; fetch returns rows."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.sql: list[str] = []
+
+    def acquire(self):
+        return self
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql):
+        self.sql.append(sql)
+
+    async def fetch(self, sql, *params):
+        self.sql.append(sql)
+        return self.rows
 
 
 class TestQdrantProvisioner:
@@ -22,3 +78,225 @@ class TestQdrantProvisioner:
     def test_verify_tenant_access_denied(self) -> None:
         with pytest.raises(PermissionError, match="cannot access"):
             verify_tenant_access("abc", "tenant_other")
+
+    def test_shared_pool_requires_tenant_filter(self) -> None:
+        mine, other = Placement("abc", shared=True), Placement("xyz", shared=True)
+        verify_tenant_access("abc", mine.collection(), mine.scope())
+        with pytest.raises(PermissionError, match="without a tenant filter"):
+            verify_tenant_access("abc", mine.collection())
+        with pytest.raises(PermissionError, match="without a tenant filter"):
+            verify_tenant_access("abc", other.collection("_docs"), other.scope())
+
+
+class TestIndexProfiles:
+    def test_tenant_config_selects_profile(self) -> None:
+        assert profile_for_config({"index_profile": "memory"}).vectors_on_disk
+        assert profile_for_config({}) is get_profile()
+        with pytest.raises(ValueError, match="Unknown index profile"):
+            get_profile("fastest")
+
+    def test_bodies_match_qdrant_schema(self) -> None:
+        for profile in PROFILES.values():
+            body = profile.create_body(768)
+            assert body["hnsw_config"]["m"] == profile.hnsw_m
+            assert body["vectors"] == {"size": 768, "distance": "Cosine", "on_disk": profile.vectors_on_disk}
+            update = UpdateCollection.model_validate(profile.update_body())
+            assert update.hnsw_config.ef_construct == profile.ef_construct
+            assert update.vectors[""].on_disk is profile.vectors_on_disk
+
+    def test_quantized_profiles_rescore(self) -> None:
+        params = get_profile("memory").search_params()
+        assert params.quantization.rescore and params.quantization.oversampling > 1
+
+
+class TestStorageTiering:
+    def test_split_collection_name(self) -> None:
+        assert split_collection_name("tenant_acme") == ("acme", "")
+        assert split_collection_name("tenant_acme_docs") == ("acme", "_docs")
+        assert split_collection_name("tenant_acme_images") == ("acme", "_images")
+        assert split_collection_name("tenants_shared_images") is None
+        assert split_collection_name("documents") is None
+
+    def test_idle_collections_move_down_and_traffic_brings_them_back(self) -> None:
+        assert next_tier(HOT, idle_sec=60, queries=0) is None
+        assert next_tier(HOT, idle_sec=TIER_DISK_AFTER_SEC, queries=0) == DISK
+        assert next_tier(DISK, idle_sec=TIER_DISK_AFTER_SEC, queries=0) is None
+        assert next_tier(DISK, idle_sec=TIER_ARCHIVE_AFTER_SEC, queries=0) == ARCHIVED
+        assert next_tier(DISK, idle_sec=0, queries=100) == HOT
+        assert next_tier(ARCHIVED, idle_sec=TIER_ARCHIVE_AFTER_SEC, queries=0) is None
+
+    def test_disk_body_matches_qdrant_schema(self) -> None:
+        update = UpdateCollection.model_validate(DISK_UPDATE_BODY)
+        assert update.vectors[""].on_disk and update.hnsw_config.on_disk
+        assert update.params.on_disk_payload
+
+    async def test_access_tracking_never_fails_a_query(self) -> None:
+        class Down:
+            def pipeline(self):
+                raise ConnectionError("redis down")
+
+        assert await record_access("acme", ["tenant_acme"], r=Down()) == {}
+
+    async def test_warmup_defers_do_not_spend_the_retry_budget(self) -> None:
+        class Delayed:
+            def __init__(self) -> None:
+                self.members: list[dict] = []
+
+            async def zadd(self, key, mapping):
+                self.members += [json.loads(m) for m in mapping]
+
+        r, job = Delayed(), {"doc_id": "d1", "attempts": len(RETRY_BACKOFF_SEC)}
+        assert not await defer(r, "q", job)
+        assert await defer(r, "q", job, backoff=WARMUP_BACKOFF_SEC, counter="warmups")
+        assert r.members == [{"doc_id": "d1", "attempts": len(RETRY_BACKOFF_SEC), "warmups": 1}]
+        spent = {**job, "warmups": len(WARMUP_BACKOFF_SEC)}
+        assert not await defer(r, "q", spent, backoff=WARMUP_BACKOFF_SEC, counter="warmups")
+
+
+class TestPlacement:
+    async def test_registry_error_keeps_cached_placement(self, monkeypatch) -> None:
+        async def down(tenant_id):
+            raise ConnectionError("control DB down")
+
+        monkeypatch.setattr(placement, "_load_shared", down)
+        monkeypatch.setattr(placement, "_cache", {"a": (float("-inf"), True)})
+        assert (await placement.get_placement("a")).shared
+        # Never cached: no guessing a default that readers would not see
+        with pytest.raises(PlacementUnavailableError):
+            await placement.get_placement("b")
+        assert "b" not in placement._cache
+
+
+class TestPgvector:
+    def test_index_sql(self) -> None:
+        chunks = VECTOR_COLUMNS["text"]
+        assert create_index_sql(chunks, "hnsw", halfvec=False, m=24, ef_construction=100) == (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_embedding_hnsw ON chunks "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 100)"
+        )
+        sql = create_index_sql(VECTOR_COLUMNS["images"], "ivfflat", halfvec=True, lists=50)
+        assert "((embedding::halfvec(512)) halfvec_cosine_ops) WITH (lists = 50)" in sql
+        with pytest.raises(ValueError, match="Unknown pgvector index method"):
+            create_index_sql(chunks, "flat")
+
+    def test_filters_become_sql(self) -> None:
+        params: list = ["<vector>", "acme", 10]
+        conditions = _conditions(payload_filter(doc_ids=["d1", "d2"], modality="audio_transcript", page_from=2), params)
+        assert conditions == ["c.document_id::text = ANY($4::text[])", "c.modality = $5", "c.page_number >= $6"]
+        assert params[3:] == [["d1", "d2"], "audio_transcript", 2]
+        params = []
+        assert _conditions(payload_filter(classification="legal"), params) == ["c.classification = $1"]
+        assert params == ["legal"]
+        with pytest.raises(UnsupportedFilterError, match="must-filters"):
+            _conditions(Filter(must_not=[FieldCondition(key="modality", match=MatchValue(value="text"))]), [])
+        with pytest.raises(UnsupportedFilterError, match="source"):
+            _conditions(Filter(must=[FieldCondition(key="source", match=MatchValue(value="x"))]), [])
+
+    async def test_backends_report_the_same_chunk_id(self, monkeypatch) -> None:
+        monkeypatch.setattr(vector_store, "_client", QdrantClient(location=":memory:"))
+        monkeypatch.setattr(vector_store, "_known_collections", set())
+        monkeypatch.setattr(placement, "_cache", {"acme": (float("inf"), False)})
+        doc_id = "00000000-0000-0000-0000-000000000001"
+        vector = np.random.default_rng(0).random(768).astype(np.float32)
+        # The embedding worker's text chunk: Qdrant keeps chk_<hex>, Postgres needs a UUID key
+        await vector_store.store_embeddings(tenant_id="acme", points=[("chk_0123456789ab", vector, {"doc_id": doc_id})])
+        batch = chunk_batch("acme", ["chk_0123456789ab"], [doc_id], vector[None], [{"text": "t"}], keep_ids=True)
+        assert batch.chunk_ids[0] != "chk_0123456789ab"
+        row = {**dict(zip(CHUNK_COLUMNS, batch.chunk_records()[0])), "distance": 0.0}
+
+        async def pool():
+            return _FakePgPool([row])
+
+        monkeypatch.setattr(pgvector_store, "_get_pool", pool)
+        qdrant = vector_store._client.scroll("tenant_acme", limit=1, with_payload=True)[0][0]
+        pg = (await search_pgvector(tenant_id="acme", kind="text", vector=vector))[0]
+        assert pg.payload["chunk_id"] == qdrant.payload["chunk_id"] == "chk_0123456789ab"
+        params: list = []
+        condition = _conditions(Filter(must=[FieldCondition(key="chunk_id", match=MatchValue(value="chk_0123456789ab"))]), params)
+        assert condition == ["COALESCE(c.source_chunk_id, c.chunk_id::text) = $1"]
+
+        # Imported chunks are keyed by their UUID in both stores
+        imported = chunk_batch("acme", ["c1"], [doc_id], vector[None], [{}])
+        assert imported.chunk_records()[0][-1] is None
+
+    def test_halfvec_queries_match_the_index_expression(self) -> None:
+        sql = search_sql("images", ["c.modality = $4"], halfvec=True)
+        assert "(e.embedding::halfvec(512)) <=> $1::vector(512)::halfvec(512)" in sql
+        assert "c.tenant_id = $2 AND c.modality = $4" in sql and "LIMIT $3" in sql
+
+
+async def test_shared_tenants_are_isolated_and_promotable(monkeypatch) -> None:
+    monkeypatch.setattr(vector_store, "_client", QdrantClient(location=":memory:"))
+    monkeypatch.setattr(vector_store, "_known_collections", set())
+    monkeypatch.setattr(placement, "_cache", {"a": (float("inf"), True), "b": (float("inf"), True)})
+    rng = np.random.default_rng(0)
+    for tenant, n in (("a", 5), ("b", 3)):
+        written = await vector_store.store_embeddings(
+            tenant_id=tenant,
+            # Same chunk IDs in both tenants must not overwrite each other
+            points=[(f"c{i}", rng.random(768).astype(np.float32), {"doc_id": "d"}) for i in range(n)],
+        )
+        assert written == [f"tenant_{tenant}"]
+    a, b = Placement("a", True), Placement("b", True)
+    assert (await vector_store.count_tenant_points(a), await vector_store.count_tenant_points(b)) == (5, 3)
+    assert set(await vector_store.fetch_vectors(tenant_id="b", chunk_ids=["c0", "c4"])) == {"c0"}
+
+    assert await vector_store.copy_tenant_points(a, Placement("a", False)) == 5
+    await vector_store.delete_tenant_points(a)
+    assert await vector_store.count_tenant_points(a) == 0
+    assert await vector_store.count_tenant_points(Placement("a", False)) == 5
+    assert await vector_store.count_tenant_points(b) == 3
+
+    # Promotion deletes only what it copied: a write landing after the copy stays for the next round
+    copied_ids: dict[str, list] = {}
+    assert await vector_store.copy_tenant_points(b, Placement("b", False), copied_ids=copied_ids) == 3
+    await vector_store.store_embeddings(tenant_id="b", points=[("late", rng.random(768).astype(np.float32), {})])
+    await vector_store.delete_tenant_points(b, point_ids=copied_ids)
+    assert await vector_store.count_tenant_points(b) == 1
+
+
+async def test_promotion_copies_each_point_once(monkeypatch) -> None:
+    from pipeline import db
+
+    monkeypatch.setattr(vector_store, "_client", QdrantClient(location=":memory:"))
+    monkeypatch.setattr(vector_store, "_known_collections", set())
+    monkeypatch.setattr(placement, "_cache", {"a": (float("inf"), True)})
+    monkeypatch.setattr(placement, "PLACEMENT_CACHE_TTL_SEC", 0)
+    rng = np.random.default_rng(0)
+    await vector_store.store_embeddings(
+        tenant_id="a", points=[(f"c{i}", rng.random(768).astype(np.float32), {"doc_id": "d"}) for i in range(5)]
+    )
+
+    async def update_tenant_config(tenant_id, changes):
+        pass
+
+    monkeypatch.setattr(db, "update_tenant_config", update_tenant_config)
+    copies: list[int] = []
+    copy = vector_store.copy_tenant_points
+
+    async def counting_copy(*args, **kwargs):
+        copies.append(await copy(*args, **kwargs))
+        return copies[-1]
+
+    monkeypatch.setattr(vector_store, "copy_tenant_points", counting_copy)
+    assert await placement.promote("a", index_profile="balanced") == 5
+    assert copies == [5, 0]
+    assert await vector_store.count_tenant_points(Placement("a", True)) == 0
+    assert await vector_store.count_tenant_points(Placement("a", False)) == 5
+
+
+async def test_promotion_checks_are_throttled_and_failures_logged(monkeypatch, caplog) -> None:
+    checks: list[str] = []
+
+    async def maybe_promote(r, tenant_id):
+        checks.append(tenant_id)
+        raise PlacementUnavailableError("control DB down")
+
+    monkeypatch.setattr(placement, "maybe_promote", maybe_promote)
+    monkeypatch.setattr(placement, "_promotion_checked", {})
+    for tenant_id in ("a", "a", "b"):
+        placement.schedule_promotion_check(None, tenant_id)
+    await asyncio.gather(*placement._promotion_tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert checks == ["a", "b"] and not placement._promotion_tasks
+    assert "Promotion check of tenant a failed: control DB down" in caplog.text
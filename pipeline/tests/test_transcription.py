@@ -0,0 +1,97 @@
+"""
+Transcription pool unit tests. Query-path cache, duration limit and concurrency slots with the pool stubbed out.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from pipeline.multimodal import transcription, vad
+
+
+class TestTranscribeBytesCached:
+    async def test_same_content_transcribed_once(self, monkeypatch) -> None:
+        calls: list[str] = []
+
+        async def fake_transcribe(path, timeout=None):
+            calls.append(path)
+            return {"text": "hello", "language": "en", "segments": []}
+
+        monkeypatch.setattr(transcription, "transcribe_file", fake_transcribe)
+        monkeypatch.setattr(transcription, "_cache", type(transcription._cache)())
+        a = await transcription.transcribe_bytes_cached(b"audio-bytes", "q.wav")
+        b = await transcription.transcribe_bytes_cached(b"audio-bytes", "other-name.wav")
+        c = await transcription.transcribe_bytes_cached(b"different", "q.wav")
+        assert a == b == c
+        assert len(calls) == 2
+
+
+class TestDurationLimit:
+    async def test_long_media_rejected_before_pool(self, monkeypatch) -> None:
+        monkeypatch.setattr(transcription, "media_duration", lambda path: transcription.WHISPER_MAX_DURATION_SEC + 1)
+
+        def no_pool():
+            raise AssertionError("pool must not be used")
+
+        monkeypatch.setattr(transcription, "_get_executor", no_pool)
+        with pytest.raises(transcription.TranscriptionTooLong):
+            await transcription.transcribe_file("/tmp/long.wav")
+
+
+class TestConcurrencySlots:
+    async def test_timed_out_job_holds_its_slot_until_done(self, monkeypatch) -> None:
+        release = threading.Event()
+
+        def slow_transcribe(audio):
+            release.wait(5)
+            return {"text": "late", "language": "en", "segments": []}
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(transcription, "_get_executor", lambda: executor)
+        monkeypatch.setattr(transcription, "_transcribe_in_worker", slow_transcribe)
+        monkeypatch.setattr(transcription, "WHISPER_MAX_CONCURRENCY", 1)
+        monkeypatch.setattr(transcription, "_slots", None)
+        monkeypatch.setattr(transcription, "media_duration", lambda path: 1.0)
+
+        with pytest.raises(transcription.TranscriptionError, match="timed out"):
+            await transcription.transcribe_file("/tmp/a.wav", timeout=0.05)
+        assert transcription._get_slots().locked()
+
+        release.set()
+        await asyncio.sleep(0.1)
+        assert not transcription._get_slots().locked()
+        executor.shutdown()
+
+    async def test_segments_are_sliced_only_when_a_slot_is_free(self, monkeypatch) -> None:
+        sliced: list[vad.SpeechSegment] = []
+        seen_at_run: list[int] = []
+        slice_samples = vad.slice_samples
+
+        def counting_slice(samples, segment):
+            sliced.append(segment)
+            return slice_samples(samples, segment)
+
+        def transcribe(audio):
+            seen_at_run.append(len(sliced))
+            return {"text": f"{len(audio)}", "language": "en", "segments": []}
+
+        segments = [vad.SpeechSegment(float(i), i + 0.5) for i in range(3)]
+        samples = np.zeros(4 * vad.SAMPLE_RATE, dtype=np.int16)
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(transcription, "_get_executor", lambda: executor)
+        monkeypatch.setattr(transcription, "_transcribe_in_worker", transcribe)
+        monkeypatch.setattr(transcription, "WHISPER_MAX_CONCURRENCY", 1)
+        monkeypatch.setattr(transcription, "_slots", None)
+        monkeypatch.setattr(transcription, "media_duration", lambda path: 4.0)
+        monkeypatch.setattr(vad, "decode_speech", lambda path: (samples, segments))
+        monkeypatch.setattr(vad, "slice_samples", counting_slice)
+
+        result = await transcription.transcribe_segmented("/tmp/a.wav")
+        # One slot: each segment's float32 copy exists only while its job runs
+        assert seen_at_run == [1, 2, 3]
+        assert [s["start"] for s in result["segments"]] == [0.0, 1.0, 2.0]
+        executor.shutdown()
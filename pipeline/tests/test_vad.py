@@ -0,0 +1,56 @@
+"""
+Voice activity detection unit tests on synthetic 16 kHz PCM (no ffmpeg or Whisper).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+import pipeline.multimodal.vad as vad
+from pipeline.multimodal.vad import SAMPLE_RATE, SpeechSegment, bound_segments, segment_speech, speech_regions
+
+
+def _tone(seconds: float, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+class TestSpeechSegmentation:
+    def test_silence_dropped_and_speech_located(self) -> None:
+        samples = np.concatenate([_silence(5), _tone(2), _silence(10), _tone(3), _silence(4)])
+        segs = segment_speech(samples)
+        assert len(segs) == 2
+        assert abs(segs[0].start - 5) < 0.3 and abs(segs[0].end - 7) < 0.3
+        assert abs(segs[1].start - 17) < 0.3 and abs(segs[1].end - 20) < 0.3
+
+    def test_short_pauses_merged(self) -> None:
+        flags = np.array([1] * 10 + [0] * 5 + [1] * 10, dtype=bool)  # 150 ms pause at 30 ms frames
+        regions = speech_regions(flags, frame_ms=30, pad_ms=0, min_silence_ms=500, min_speech_ms=0)
+        assert regions == [SpeechSegment(0.0, 0.75)]
+
+    def test_all_silence_yields_nothing(self) -> None:
+        assert segment_speech(_silence(3)) == []
+
+    def test_long_regions_bounded(self) -> None:
+        parts = bound_segments([SpeechSegment(10.0, 85.0)], max_sec=30)
+        assert len(parts) == 3
+        assert parts[0].start == 10.0 and abs(parts[-1].end - 85.0) < 1e-9
+        assert all(p.duration <= 30 for p in parts)
+
+    def test_streamed_decode_matches_in_memory(self, monkeypatch) -> None:
+        samples = np.concatenate([_silence(5), _tone(2), _silence(10), _tone(3), _silence(4)])
+        # Blocks that do not line up with 30 ms frames
+        blocks = [samples[i : i + 7001] for i in range(0, len(samples), 7001)]
+        monkeypatch.setattr(vad, "iter_pcm", lambda path: iter(blocks))
+        decoded, segs = vad.decode_speech("recording.wav")
+        assert segs == segment_speech(samples)
+        assert isinstance(decoded, np.memmap)
+        np.testing.assert_array_equal(vad.slice_samples(decoded, segs[1]), vad.slice_samples(samples, segs[1]))
+
+    def test_streamed_decode_of_empty_audio(self, monkeypatch) -> None:
+        monkeypatch.setattr(vad, "iter_pcm", lambda path: iter([]))
+        decoded, segs = vad.decode_speech("empty.wav")
+        assert len(decoded) == 0 and segs == []
@@ -0,0 +1,154 @@
+"""
+Bulk vector import: format detection, whole-column validation, batching, the Qdrant write
+and document centroids.
+"""
+from __future__ import annotations
+
+import io
+import json
+import uuid
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+import pipeline.storage.placement as placement
+import pipeline.vector_store as vector_store
+from pipeline.storage.placement import Placement
+from pipeline.vector_store import VectorStoreError
+from pipeline.vector_import import (
+    ID_NAMESPACE,
+    VectorImportError,
+    decode_batch,
+    detect_format,
+    import_vectors,
+    iter_batches,
+)
+
+
+class _FakeRedis:
+    """The mget / pipeline().incr surface used by check_writable and bump_collection_versions."""
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+
+    async def mget(self, keys):
+        return [None for _ in keys]
+
+    def pipeline(self):
+        return self
+
+    def incr(self, key):
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    async def execute(self):
+        return []
+
+
+def _table(n: int, dim: int = 768, fixed: bool = True):
+    pa = pytest.importorskip("pyarrow")
+    rng = np.random.default_rng(0)
+    values = pa.array(rng.random(n * dim, dtype=np.float32))
+    vectors = pa.FixedSizeListArray.from_arrays(values, dim) if fixed else pa.array(
+        [row.tolist() for row in rng.random((n, dim), dtype=np.float32)], pa.list_(pa.float32())
+    )
+    return pa.table({
+        "chunk_id": [f"c{i}" for i in range(n)],
+        "doc_id": [str(uuid.UUID(int=i // 3 + 1)) for i in range(n)],
+        "vector": vectors,
+        "payload": [json.dumps({"text": f"chunk {i}", "page": i}) for i in range(n)],
+    })
+
+
+def test_detect_format() -> None:
+    assert detect_format(b"PAR1\x15\x04") == "parquet"
+    assert detect_format(b"ARROW1\x00\x00") == "arrow_file"
+    assert detect_format(b"\xff\xff\xff\xff\x10\x00") == "arrow_stream"
+    with pytest.raises(VectorImportError):
+        detect_format(b'{"chunk_id"')
+
+
+def test_decode_batch_checks_whole_columns() -> None:
+    pa = pytest.importorskip("pyarrow")
+    batch = _table(4, fixed=False).to_batches()[0].slice(1, 3)
+    decoded = decode_batch(batch, "acme")
+    assert decoded.vectors.shape == (3, 768) and decoded.vectors.dtype == np.float32
+    assert decoded.chunk_ids[0] == str(uuid.uuid5(ID_NAMESPACE, "acme/c1"))
+    assert decoded.doc_ids[0] == str(uuid.UUID(int=1))
+    assert decoded.payloads[0] == {"text": "chunk 1", "page": 1, "modality": "text", "external_chunk_id": "c1"}
+    record = decoded.chunk_records()[0]
+    assert record[2:4] == ("acme", "chunk 1") and record[5:] == ("text", None, None, 1, None, None)
+    np.testing.assert_array_equal(record[4], batch.column("vector")[0].values.to_numpy())
+
+    ragged = pa.record_batch({
+        "chunk_id": ["a", "b"],
+        "doc_id": ["d", "d"],
+        "vector": pa.array([[0.1] * 768, [0.1] * 767], pa.list_(pa.float32())),
+    })
+    with pytest.raises(VectorImportError, match="767 to 768 dims"):
+        decode_batch(ragged, "acme")
+    odd = pa.record_batch({
+        "chunk_id": ["a"],
+        "doc_id": ["d"],
+        "vector": pa.FixedSizeListArray.from_arrays(pa.array([0.1] * 384, pa.float32()), 384),
+    })
+    with pytest.raises(VectorImportError, match="384 dims"):
+        decode_batch(odd, "acme")
+
+
+def test_parquet_and_arrow_stream_are_read_in_bounded_batches() -> None:
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    table = _table(7)
+    parquet = io.BytesIO()
+    pq.write_table(table, parquet, row_group_size=5)
+    stream = io.BytesIO()
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table, max_chunksize=5)
+    for source in (parquet, stream):
+        source.seek(0)
+        sizes = [b.num_rows for b in iter_batches(source, batch_rows=3)]
+        assert max(sizes) == 3 and sum(sizes) == 7
+
+    source = io.BytesIO()
+    pq.write_table(table.drop_columns(["vector"]), source)
+    source.seek(0)
+    with pytest.raises(VectorImportError, match="Missing column"):
+        list(iter_batches(source))
+
+
+async def test_import_writes_qdrant_points(monkeypatch) -> None:
+    pa = pytest.importorskip("pyarrow")
+    monkeypatch.setattr(vector_store, "_client", QdrantClient(location=":memory:"))
+    monkeypatch.setattr(vector_store, "_known_collections", set())
+    monkeypatch.setattr(placement, "_cache", {"acme": (float("inf"), False)})
+    r = _FakeRedis()
+    source = io.BytesIO()
+    with pa.ipc.new_file(source, _table(7).schema) as writer:
+        writer.write_table(_table(7))
+    source.seek(0)
+
+    result = await import_vectors(source, tenant_id="acme", batch_rows=4, postgres=False, r=r)
+    assert result.as_dict() == {"rows": 7, "batches": 2, "collections": ["tenant_acme", "tenant_acme_docs"]}
+    assert await vector_store.count_tenant_points(Placement("acme", False)) == 7
+    assert r.counters == {
+        "tenant:acme:collection:tenant_acme:version": 2,
+        "tenant:acme:collection:tenant_acme_docs:version": 2,
+    }
+    # One centroid per document; doc 2 (rows 3-5) spans both batches
+    docs = vector_store._client.scroll("tenant_acme_docs", limit=10, with_payload=True)[0]
+    assert sorted((p.payload["doc_id"], p.payload["chunk_count"]) for p in docs) == [
+        (str(uuid.UUID(int=1)), 3), (str(uuid.UUID(int=2)), 3), (str(uuid.UUID(int=3)), 1),
+    ]
+
+
+async def test_postgres_unavailable_is_a_vector_store_error(monkeypatch) -> None:
+    import pipeline.pgvector_store as pgvector_store
+
+    async def no_pool():
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(pgvector_store, "_get_pool", no_pool)
+    with pytest.raises(VectorStoreError, match="Postgres unavailable"):
+        await import_vectors(io.BytesIO(b"PAR1"), tenant_id="acme", postgres=True, r=_FakeRedis())
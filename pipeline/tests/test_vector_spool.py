@@ -0,0 +1,143 @@
+"""
+Write-behind vector spool: record format, corruption handling, spool-on-failure and replay.
+"""
+from __future__ import annotations
+
+import httpx
+import numpy as np
+import pytest
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+import pipeline.vector_spool as vector_spool
+from pipeline import metrics
+from pipeline.vector_spool import SpoolRecord, VectorSpool, encode_record, read_records
+
+
+def _record(tenant_id: str = "acme", n: int = 2, dim: int = 4) -> SpoolRecord:
+    return SpoolRecord(
+        tenant_id=tenant_id,
+        suffix=None,
+        chunk_ids=[f"c{i}" for i in range(n)],
+        payloads=[{"doc_id": "d1", "page": i} for i in range(n)],
+        vectors=np.arange(n * dim, dtype=np.float32).reshape(n, dim),
+        appended_at=1.0,
+    )
+
+
+def test_corrupt_records_are_skipped() -> None:
+    first, second = encode_record(_record()), encode_record(_record("other"))
+    damaged = bytearray(first)
+    damaged[-1] ^= 0xFF
+    results = list(read_records(bytes(damaged) + second + second[:10]))
+    records = [r for _, r in results if r is not None]
+    assert results[0][1] is None
+    assert [r.tenant_id for r in records] == ["other"]
+    np.testing.assert_array_equal(records[0].vectors, _record().vectors)
+    assert records[0].payloads[1] == {"doc_id": "d1", "page": 1}
+
+
+async def test_failed_upserts_are_spooled_and_replayed_in_order(tmp_path, monkeypatch) -> None:
+    written: list[tuple[str, list[str], str | None]] = []
+    qdrant_up = False
+
+    async def store_embeddings(*, tenant_id, points, collection_suffix=None):
+        if not qdrant_up:
+            raise ConnectionError("qdrant down")
+        written.append((tenant_id, [c for c, _, _ in points], collection_suffix))
+        return [f"tenant_{tenant_id}"]
+
+    monkeypatch.setattr(vector_spool.vector_store, "store_embeddings", store_embeddings)
+    spool = VectorSpool(tmp_path / "worker", fsync=False)
+    text, image = np.ones(768, dtype=np.float32), np.ones(512, dtype=np.float32)
+
+    collections = await vector_spool.store_embeddings(
+        tenant_id="acme", points=[("c1", text, {}), ("i1", image, {})], spool=spool
+    )
+    assert collections == ["tenant_acme", "tenant_acme_images"]
+    qdrant_up = True
+    # Older batches are still spooled: this one queues behind them
+    await vector_spool.store_document_vectors(tenant_id="acme", docs=[("d1", text, {})], spool=spool)
+    assert written == [] and spool.stats()["points"] == 3
+    assert metrics.value("frostbyte_vector_spool_points", spool="worker") == 3
+
+    assert await spool.replay() == 3
+    assert written == [("acme", ["c1"], None), ("acme", ["i1"], None), ("acme", ["d1"], "_docs")]
+    assert not spool.pending() and not list((tmp_path / "worker").glob("*.seg"))
+
+    await vector_spool.store_embeddings(tenant_id="acme", points=[("c2", text, {})], spool=spool)
+    assert written[-1] == ("acme", ["c2"], None)
+
+
+async def test_rejected_record_is_quarantined_and_archived_tenant_held(tmp_path, monkeypatch) -> None:
+    written: list[tuple[str, list[str]]] = []
+
+    async def store(*, tenant_id, points, collection_suffix=None):
+        if any(len(v) != 768 for _, v, _ in points):
+            raise UnexpectedResponse(400, "Bad Request", b"wrong vector size", httpx.Headers())
+        written.append((tenant_id, [c for c, _, _ in points]))
+        return [f"tenant_{tenant_id}"]
+
+    async def writable(tenant_id):
+        return tenant_id != "cold"
+
+    spool = VectorSpool(tmp_path / "worker", fsync=False)
+    spool.append("bad", [("b1", np.ones(384, dtype=np.float32), {})])
+    spool.append("acme", [("c1", np.ones(768, dtype=np.float32), {})])
+    spool.append("cold", [("k1", np.ones(768, dtype=np.float32), {})])
+    spool.append("acme", [("c2", np.ones(768, dtype=np.float32), {})])
+
+    assert await spool.replay(store=store, writable=writable) == 2
+    assert written == [("acme", ["c1", "c2"])]
+    assert (tmp_path / "worker" / "quarantine").is_dir()
+    assert metrics.value("frostbyte_vector_spool_quarantined_points_total", spool="worker") == 1
+    assert not spool.pending("acme") and not spool.pending("bad") and spool.pending("cold")
+
+    # Other tenants write directly while the cold tenant's records wait
+    monkeypatch.setattr(vector_spool.vector_store, "store_embeddings", store)
+    await vector_spool.store_embeddings(tenant_id="acme", points=[("c3", np.ones(768, dtype=np.float32), {})], spool=spool)
+    assert written[-1] == ("acme", ["c3"])
+    with pytest.raises(UnexpectedResponse):
+        await vector_spool.store_embeddings(tenant_id="acme", points=[("c4", np.ones(384, dtype=np.float32), {})], spool=spool)
+
+    assert await spool.replay(store=store) == 1
+    assert written[-1] == ("cold", ["k1"]) and not spool.pending()
+
+
+def test_spool_survives_restart_and_is_locked(tmp_path) -> None:
+    spool = VectorSpool(tmp_path / "worker", fsync=False)
+    spool.append("acme", [("c1", np.ones(4, dtype=np.float32), {"doc_id": "d1"})])
+    with pytest.raises(RuntimeError, match="in use"):
+        VectorSpool(tmp_path / "worker")
+    spool.seal()
+    spool._lock.close()
+    reopened = VectorSpool(tmp_path / "worker")
+    assert reopened.stats()["records"] == 1 and reopened.pending()
+
+
+async def test_replay_paused_mid_segment_keeps_tenants_pending(tmp_path, monkeypatch) -> None:
+    written: list[tuple[str, float]] = []
+    failing = {"beta"}
+
+    async def store(*, tenant_id, points, collection_suffix=None):
+        if tenant_id in failing:
+            raise ConnectionError("qdrant down")
+        written.extend((tenant_id, float(v[0])) for _, v, _ in points)
+        return [f"tenant_{tenant_id}"]
+
+    spool = VectorSpool(tmp_path / "worker", fsync=False)
+    spool.append("acme", [("c1", np.full(4, 1, dtype=np.float32), {})])
+    spool.append("beta", [("b1", np.full(4, 1, dtype=np.float32), {})])
+
+    assert await spool.replay(store=store) == 1
+    # The segment still holds acme's old record: acme's next write must queue behind it
+    assert spool.pending("acme") and spool.pending("beta")
+    monkeypatch.setattr(vector_spool.vector_store, "store_embeddings", store)
+    await vector_spool.store_embeddings(
+        tenant_id="acme", points=[("c1", np.full(4, 2, dtype=np.float32), {})], spool=spool
+    )
+    assert written == [("acme", 1.0)]
+
+    failing.clear()
+    assert await spool.replay(store=store) == 3
+    assert [w for w in written if w[0] == "acme"][-1] == ("acme", 2.0)
+    assert not spool.pending()
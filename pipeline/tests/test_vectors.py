@@ -0,0 +1,39 @@
+"""
+Float32 vector buffers: decoding, validation and normalization.
+"""
+from __future__ import annotations
+
+import base64
+
+import numpy as np
+import pytest
+
+from pipeline.vectors import as_matrix, centroid, decode_embeddings, normalize
+
+
+def test_decode_base64_and_float_lists_agree() -> None:
+    m = np.arange(6, dtype=np.float32).reshape(2, 3)
+    as_b64 = [{"index": i, "embedding": base64.b64encode(row.astype("<f4").tobytes()).decode()} for i, row in enumerate(m)]
+    as_lists = [{"index": 1, "embedding": m[1].tolist()}, {"index": 0, "embedding": m[0].tolist()}]
+    for data in (as_b64, as_lists):
+        out = decode_embeddings(data)
+        assert out.dtype == np.float32 and out.flags.writeable
+        np.testing.assert_array_equal(out, m)
+
+
+def test_as_matrix_rejects_ragged_and_wrong_dim() -> None:
+    with pytest.raises(ValueError):
+        as_matrix([[1.0, 2.0], [1.0]])
+    with pytest.raises(ValueError):
+        as_matrix(np.zeros((2, 4)), dim=3)
+
+
+def test_normalize_in_place_skips_zero_rows() -> None:
+    m = np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32)
+    assert normalize(m) is m
+    np.testing.assert_allclose(m, [[0.6, 0.8], [0.0, 0.0]])
+
+
+def test_centroid_is_unit_mean() -> None:
+    c = centroid(np.array([[1, 0], [0, 1]], dtype=np.float32))
+    np.testing.assert_allclose(c, [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
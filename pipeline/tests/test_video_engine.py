@@ -0,0 +1,29 @@
+"""
+Video engine unit tests: window planning and joining runs split by a window boundary.
+"""
+from __future__ import annotations
+
+from pipeline.multimodal.video_engine import join_boundary, segment_windows
+
+
+class TestSegmentWindows:
+    def test_short_or_unknown_video_is_one_window(self) -> None:
+        assert segment_windows(None, 120) == [(0.0, None)]
+        assert segment_windows(90.0, 120) == [(0.0, None)]
+
+    def test_windows_cover_video_with_open_tail(self) -> None:
+        assert segment_windows(300.0, 120) == [(0.0, 120.0), (120.0, 240.0), (240.0, None)]
+
+
+class TestJoinBoundary:
+    def test_same_picture_across_boundary_is_joined(self) -> None:
+        prev = {"timestamp": 100.0, "timestamp_end": 119.0, "frame_count": 20, "phash": 0b1111}
+        nxt = {"timestamp": 120.0, "timestamp_end": 130.0, "frame_count": 11, "phash": 0b1110}
+        assert join_boundary(prev, nxt, max_distance=2, enabled=True)
+        assert prev["timestamp_end"] == 130.0 and prev["frame_count"] == 31
+
+    def test_different_picture_kept_separate(self) -> None:
+        prev = {"timestamp": 100.0, "timestamp_end": 119.0, "frame_count": 20, "phash": 0}
+        nxt = {"timestamp": 120.0, "timestamp_end": 130.0, "frame_count": 11, "phash": (1 << 64) - 1}
+        assert not join_boundary(prev, nxt, max_distance=5, enabled=True)
+        assert prev["timestamp_end"] == 119.0
@@ -0,0 +1,377 @@
+"""
+Worker script unit tests (scripts/run_*.py) with Redis, Postgres, Qdrant and MinIO stubbed out.
+"""
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import importlib.util
+import json
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import pipeline.multimodal_enqueue as multimodal_enqueue
+import pipeline.vector_spool as vector_spool
+from pipeline.multimodal_enqueue import LEGACY_QUEUE, QUEUE_TENANTS_KEY, enqueue_multimodal, queue_key
+from pipeline.storage.tiering import ARCHIVED, ARCHIVING, HOT, snapshot_key, tier_key
+from pipeline.vector_spool import VectorSpool
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "scripts"
+
+
+def _load_script(name: str):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # Dataclasses resolve their annotations through sys.modules
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeRedis:
+    """String keys and the sorted-set add used by the tiering worker."""
+
+    def __init__(self, strings: dict[str, str] | None = None) -> None:
+        self.strings = dict(strings or {})
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def mget(self, keys):
+        return [self.strings.get(k) for k in keys]
+
+    async def set(self, key, value):
+        self.strings[key] = value
+
+    async def delete(self, key):
+        self.strings.pop(key, None)
+
+    async def zadd(self, key, mapping, nx=False):
+        pass
+
+
+class _FakeS3:
+    def __init__(self) -> None:
+        self.deleted: list[str] = []
+
+    def delete_object(self, Bucket, Key):
+        self.deleted.append(Key)
+
+
+class TestTieringWorker:
+    COLLECTION = "tenant_acme"
+
+    @pytest.fixture
+    def worker(self, monkeypatch):
+        worker = _load_script("run_tiering_worker")
+        self.collections = {self.COLLECTION}
+        self.restored: list[str] = []
+        self.s3 = _FakeS3()
+
+        async def qdrant_collections():
+            return set(self.collections)
+
+        async def restore_collection(url, s3, bucket, collection, key):
+            self.restored.append(key)
+            self.collections.add(collection)
+
+        async def move_to_ram(url, collection, profile):
+            pass
+
+        async def index_profile(tenant_id):
+            return None
+
+        monkeypatch.setattr(worker, "_qdrant_collections", qdrant_collections)
+        monkeypatch.setattr(worker, "restore_collection", restore_collection)
+        monkeypatch.setattr(worker, "move_to_ram", move_to_ram)
+        monkeypatch.setattr(worker, "_index_profile", index_profile)
+        monkeypatch.setattr(worker, "_get_s3", lambda: self.s3)
+        monkeypatch.setattr(worker, "TIER_ARCHIVE_GRACE_SEC", 0)
+        return worker
+
+    async def test_archive_records_snapshot_before_delete(self, worker, monkeypatch) -> None:
+        r = _FakeRedis()
+
+        async def archive_collection(url, s3, bucket, collection, on_uploaded=None):
+            await on_uploaded("snap/1")
+            assert r.strings[snapshot_key("acme", collection)] == "snap/1"
+            self.collections.discard(collection)
+            return "snap/1"
+
+        monkeypatch.setattr(worker, "archive_collection", archive_collection)
+        await worker.archive(r, "acme", self.COLLECTION, HOT)
+        assert r.strings[tier_key("acme", self.COLLECTION)] == ARCHIVED
+
+    async def test_failed_delete_after_upload_is_settled(self, worker, monkeypatch) -> None:
+        r = _FakeRedis()
+
+        async def archive_collection(url, s3, bucket, collection, on_uploaded=None):
+            await on_uploaded("snap/1")
+            self.collections.discard(collection)
+            raise ConnectionError("qdrant went away mid-delete")
+
+        monkeypatch.setattr(worker, "archive_collection", archive_collection)
+        with pytest.raises(ConnectionError):
+            await worker.archive(r, "acme", self.COLLECTION, HOT)
+        assert self.restored == ["snap/1"]
+        assert tier_key("acme", self.COLLECTION) not in r.strings
+        assert snapshot_key("acme", self.COLLECTION) not in r.strings
+
+    async def test_stale_archiving_restores_deleted_collection(self, worker) -> None:
+        self.collections.clear()
+        r = _FakeRedis({
+            tier_key("acme", self.COLLECTION): ARCHIVING,
+            snapshot_key("acme", self.COLLECTION): "snap/1",
+        })
+        await worker.warm_up(r, "acme", self.COLLECTION)
+        assert self.restored == ["snap/1"] and not r.strings
+
+    async def test_stale_archiving_keeps_existing_collection(self, worker) -> None:
+        r = _FakeRedis({
+            tier_key("acme", self.COLLECTION): ARCHIVING,
+            snapshot_key("acme", self.COLLECTION): "snap/1",
+        })
+        await worker.warm_up(r, "acme", self.COLLECTION)
+        assert self.restored == [] and self.s3.deleted == ["snap/1"] and not r.strings
+
+    async def test_stale_archiving_without_snapshot_reverts_to_hot(self, worker) -> None:
+        self.collections.clear()
+        r = _FakeRedis({tier_key("acme", self.COLLECTION): ARCHIVING})
+        await worker.warm_up(r, "acme", self.COLLECTION)
+        assert not r.strings and self.restored == []
+
+    async def test_archive_in_progress_is_not_stale(self, worker) -> None:
+        r = _FakeRedis({tier_key("acme", self.COLLECTION): ARCHIVING})
+        worker._archiving.add(self.COLLECTION)
+        await worker.warm_up(r, "acme", self.COLLECTION)
+        assert r.strings[tier_key("acme", self.COLLECTION)] == ARCHIVING
+
+
+class _FakeConn:
+    """asyncpg connection recording statements; a transaction keeps them only if it commits."""
+
+    def __init__(self) -> None:
+        self.committed: list[tuple[str, int]] = []
+        self.rolled_back = False
+        self._pending: list[tuple[str, int]] = []
+
+    def acquire(self):
+        return self
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.committed += self._pending
+        else:
+            self.rolled_back = True
+        self._pending = []
+        return False
+
+    async def executemany(self, sql, rows):
+        self._pending.append((sql.split()[2], len(rows)))
+
+    async def execute(self, sql, *args):
+        self._pending.append((sql.split()[1], 1))
+
+
+class TestMultimodalJobRows:
+    DOC = "00000000-0000-0000-0000-000000000001"
+
+    @pytest.fixture
+    def worker(self):
+        return _load_script("run_multimodal_worker")
+
+    def _rows(self, worker):
+        rows = worker.JobRows(tenant_id="acme", document_id=self.DOC)
+        text = np.ones(768, dtype=np.float32)
+        for i in range(3):
+            chunk_id = rows.add_chunk(f"frame {i}", "video_frame_text", text)
+            rows.add_point(chunk_id, text, {"modality": "video_frame_text"})
+        frame_id = rows.add_chunk("[frame embedding]", "video_frame_embedding")
+        rows.add_image_embedding(frame_id, np.ones(512, dtype=np.float32))
+        rows.add_video_frame(frame_id, {"timestamp": 0.0, "timestamp_end": 4.0, "frame_count": 5})
+        return rows
+
+    async def test_rows_and_points_written_in_one_transaction(self, worker, monkeypatch) -> None:
+        stored: list[tuple[str, int]] = []
+
+        async def store(*, tenant_id, points, collection_suffix=None):
+            stored.append((tenant_id, len(points)))
+            return [f"tenant_{tenant_id}"]
+
+        monkeypatch.setattr(vector_spool.vector_store, "store_embeddings", store)
+        monkeypatch.setattr(vector_spool, "get_spool", lambda name: None)
+        conn = _FakeConn()
+        assert await self._rows(worker).write(conn) == ["tenant_acme"]
+        # One executemany per table, then the document status, all committed together
+        assert conn.committed == [("chunks", 4), ("image_embeddings", 1), ("video_frames", 1), ("documents", 1)]
+        assert stored == [("acme", 3)] and not conn.rolled_back
+        rows = self._rows(worker)
+        assert all(isinstance(c[0], uuid.UUID) and str(c[1]) == self.DOC for c in rows.chunks)
+        assert rows.points[0][2] == {"document_id": self.DOC, "doc_id": self.DOC, "modality": "video_frame_text"}
+
+    async def test_rejected_points_roll_the_rows_back(self, worker, monkeypatch) -> None:
+        async def store(*, tenant_id, points, collection_suffix=None):
+            raise ValueError("wrong vector size")
+
+        monkeypatch.setattr(vector_spool.vector_store, "store_embeddings", store)
+        monkeypatch.setattr(vector_spool, "get_spool", lambda name: None)
+        conn = _FakeConn()
+        with pytest.raises(ValueError):
+            await self._rows(worker).write(conn)
+        assert conn.rolled_back and conn.committed == []
+
+    async def test_unavailable_qdrant_spools_points_and_commits(self, worker, monkeypatch, tmp_path) -> None:
+        async def store(*, tenant_id, points, collection_suffix=None):
+            raise ConnectionError("qdrant down")
+
+        spool = VectorSpool(tmp_path / "multimodal_worker", fsync=False)
+        monkeypatch.setattr(vector_spool.vector_store, "store_embeddings", store)
+        monkeypatch.setattr(vector_spool, "get_spool", lambda name: spool)
+        conn = _FakeConn()
+        assert await self._rows(worker).write(conn) == ["tenant_acme"]
+        assert not conn.rolled_back and len(conn.committed) == 4
+        assert spool.stats()["points"] == 3
+
+
+class _QueueRedis:
+    """List pops scripted in advance (then cancellation), sets, and key scans for the lanes."""
+
+    def __init__(self, pops: list | None = None, keys: list[str] | None = None) -> None:
+        self.pops = list(pops or [])
+        self.popped_with: list[list[str]] = []
+        self.lists: dict[str, list[bytes]] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.keys = keys or []
+
+    async def _pop(self, keys, timeout):
+        self.popped_with.append(list(keys) if isinstance(keys, list) else [keys])
+        if not self.pops:
+            raise asyncio.CancelledError
+        return self.pops.pop(0)
+
+    brpop = blpop = _pop
+
+    async def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    async def smembers(self, key):
+        return {m.encode() for m in self.sets.get(key, set())}
+
+    async def scan_iter(self, match, count=None):
+        for key in self.keys:
+            if fnmatch.fnmatchcase(key, match):
+                yield key.encode()
+
+
+class TestMultimodalLanes:
+    @pytest.fixture
+    def worker(self, monkeypatch):
+        worker = _load_script("run_multimodal_worker")
+
+        async def promote_due(r, keys):
+            pass
+
+        monkeypatch.setattr(worker, "promote_due", promote_due)
+        return worker
+
+    def _directory(self, worker, tenant_ids: list[str]):
+        tenants = worker._TenantDirectory()
+        tenants.tenant_ids = tenant_ids
+        tenants._refreshed = float("inf")  # no refresh during the test
+        return tenants
+
+    async def test_keys_rotate_past_the_tenant_served(self, worker, monkeypatch) -> None:
+        jobs: list[tuple[str, dict]] = []
+
+        async def run_job(r, key, data, slots):
+            jobs.append((key, data))
+            slots.release()
+
+        monkeypatch.setattr(worker, "_run_job", run_job)
+        r = _QueueRedis(pops=[
+            (queue_key("b", "image").encode(), b'{"job_id": "1"}'),
+            None,
+            (queue_key("a", "image").encode(), b'{"job_id": "2"}'),
+        ])
+        with pytest.raises(asyncio.CancelledError):
+            await worker.run_lane(r, "image", 2, self._directory(worker, ["a", "b", "c"]))
+        assert [[k.split(":")[1] for k in keys] for keys in r.popped_with] == [
+            ["a", "b", "c"],
+            ["c", "a", "b"],  # b was served: c is first
+            ["c", "a", "b"],  # nothing popped: order unchanged
+            ["b", "c", "a"],
+        ]
+        assert all(k.endswith(":image") for keys in r.popped_with for k in keys)
+        await asyncio.sleep(0)
+        assert [d["job_id"] for _, d in jobs] == ["1", "2"]
+
+    async def test_enqueue_routes_by_modality_and_registers_the_tenant(self, monkeypatch) -> None:
+        pushed: list[tuple] = []
+
+        class _Pipeline:
+            def lpush(self, key, value):
+                pushed.append(("lpush", key))
+
+            def sadd(self, key, member):
+                pushed.append(("sadd", key, member))
+
+            def execute(self):
+                pushed.append(("execute",))
+
+        class _Redis:
+            def pipeline(self):
+                return _Pipeline()
+
+        monkeypatch.setattr(multimodal_enqueue, "_get_redis", lambda: _Redis())
+        await enqueue_multimodal(document_id="d1", tenant_id="walk-in", filename="clip.mp4", modality="video", content=b"x")
+        assert pushed == [
+            ("lpush", "tenant:walk-in:queue:multimodal:video"),
+            ("sadd", QUEUE_TENANTS_KEY, "walk-in"),
+            ("execute",),
+        ]
+        with pytest.raises(ValueError, match="Not a multimodal modality"):
+            await enqueue_multimodal(document_id="d1", tenant_id="t", filename="a.pdf", modality="text", content=b"")
+
+    async def test_legacy_jobs_move_to_their_modality_lane(self, worker) -> None:
+        job = json.dumps({"tenant_id": "walk-in", "filename": "memo.MP3"}).encode()
+        r = _QueueRedis(pops=[(LEGACY_QUEUE.encode(), job)])
+        with pytest.raises(asyncio.CancelledError):
+            await worker.drain_legacy_queue(r)
+        assert r.lists == {queue_key("walk-in", "audio"): [job]}
+        assert r.sets == {QUEUE_TENANTS_KEY: {"walk-in"}}
+
+    async def test_directory_serves_tenants_outside_the_registry(self, worker, monkeypatch) -> None:
+        class _Pool:
+            async def fetch(self, sql):
+                return [{"tenant_id": "acme"}]
+
+        async def pool():
+            return _Pool()
+
+        async def no_pool():
+            raise OSError("control DB down")
+
+        r = _QueueRedis(keys=[queue_key("legacy", "video"), queue_key("acme", "image"), "tenant:acme:other"])
+        assert await worker._TenantDirectory.backfill(r) == 2
+        await r.sadd(QUEUE_TENANTS_KEY, "walk-in")
+        monkeypatch.setattr(worker, "_get_pool", pool)
+        tenants = worker._TenantDirectory()
+        assert await tenants.refresh(r) == ["acme", "default", "legacy", "walk-in"]
+
+        # Registry unreachable: the last ACTIVE list is kept
+        monkeypatch.setattr(worker, "_get_pool", no_pool)
+        tenants._refreshed = float("-inf")
+        assert await tenants.refresh(r) == ["acme", "default", "legacy", "walk-in"]
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput benchmark: docs/sec of the HTTP and local backends.
+
+Embeds the same synthetic chunk-sized documents with each backend in batches
+and reports docs/sec and per-batch latency. The local backend honours the
+EMBEDDING_LOCAL_* settings, so run it once per engine/thread/int8 combination
+to compare, e.g.:
+
+    EMBEDDING_LOCAL_THREADS=4 EMBEDDING_LOCAL_INT8=true python scripts/bench_embedding.py --backend local
+
+Run: python scripts/bench_embedding.py [--backend http|local|both] [--docs 512] [--batch 32]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+from pipeline.embedding import EMBEDDING_DIM, http_backend, local_backend
+
+_WORDS = (
+    "tenant document policy classification retention contract invoice clause "
+    "liability audit storage vector embedding index query compliance record "
+    "agreement schedule payment termination confidential party obligation"
+).split()
+
+
+def _documents(n: int, words: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(words)) for _ in range(n)]
+
+
+async def _bench(name: str, embed, docs: list[str], batch: int) -> None:
+    await embed(docs[:batch])  # warm-up: connection / model load
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(docs), batch):
+        t0 = time.perf_counter()
+        vectors = await embed(docs[i:i + batch])
+        latencies.append(time.perf_counter() - t0)
+        assert all(len(v) == EMBEDDING_DIM for v in vectors), "wrong embedding dimension"
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>6}: {len(docs) / elapsed:8.1f} docs/s  "
+        f"batch p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+        f"max {max(latencies) * 1000:7.1f} ms  ({len(docs)} docs, batch {batch})"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=("http", "local", "both"), default="both")
+    parser.add_argument("--docs", type=int, default=512)
+    parser.add_argument("--words", type=int, default=200, help="words per document (~ one chunk)")
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    docs = _documents(args.docs, args.words)
+    if args.backend in ("http", "both"):
+        try:
+            await _bench("http", lambda t: http_backend.embed(t, EMBEDDING_DIM), docs, args.batch)
+        except Exception as e:
+            print(f"  http: skipped ({e})")
+    if args.backend in ("local", "both"):
+        print(
+            f"  local engine={local_backend.EMBEDDING_LOCAL_ENGINE} "
+            f"threads={local_backend.EMBEDDING_LOCAL_THREADS or 'default'} "
+            f"int8={local_backend.EMBEDDING_LOCAL_INT8}"
+        )
+        await _bench("local", lambda t: local_backend.embed(t, EMBEDDING_DIM), docs, args.batch)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Two-stage retrieval benchmark: recall@k and latency of single-stage vs. two-stage search.
+
+For each query, ground truth is an exact (brute-force) top-k search of tenant_{id}.
+Single-stage HNSW search and two-stage search for each candidate-document count M
+(top-M centroids in tenant_{id}_docs, then their chunks) are scored against it, so
+the smallest M that keeps recall acceptable can be set as the tenant's
+retrieval_doc_candidates.
+
+Queries are lines of --queries-file (embedded as search queries) or, by default,
+stored chunk vectors with Gaussian noise. --backfill first builds tenant_{id}_docs
+from the chunks already in tenant_{id} (tenants indexed before document centroids).
+
+Run: python scripts/bench_two_stage.py --tenant acme [--m 5,10,20,50] [--top-k 10] [--queries 100]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+from pipeline import vector_store
+from pipeline.serving.two_stage import two_stage_search
+from pipeline.vector_store import search_points, store_document_vectors
+from pipeline.vectors import centroid, normalize
+
+
+async def _scroll(collection: str, with_vectors: bool, limit: int | None = None):
+    """Yield (payload, vector) for the collection's points."""
+    client = vector_store._get_async_client()
+    offset, seen = None, 0
+    while True:
+        points, offset = await client.scroll(
+            collection, limit=256, offset=offset, with_payload=["doc_id", "classification"], with_vectors=with_vectors
+        )
+        for p in points:
+            yield p.payload or {}, p.vector
+            seen += 1
+            if limit is not None and seen >= limit:
+                return
+        if offset is None:
+            return
+
+
+async def backfill(tenant_id: str) -> int:
+    """Build tenant_{id}_docs centroids from stored chunk vectors; returns documents written."""
+    by_doc: dict[str, list[np.ndarray]] = defaultdict(list)
+    classes: dict[str, set[str]] = defaultdict(set)
+    async for payload, v in _scroll(f"tenant_{tenant_id}", with_vectors=True):
+        if payload.get("doc_id") and v is not None:
+            by_doc[payload["doc_id"]].append(np.asarray(v, dtype=np.float32))
+            classes[payload["doc_id"]].add(payload.get("classification", "other"))
+    docs = [
+        (doc_id, centroid(np.stack(rows)), {"classification": sorted(classes[doc_id]), "chunk_count": len(rows)})
+        for doc_id, rows in by_doc.items()
+    ]
+    for i in range(0, len(docs), 256):
+        await store_document_vectors(tenant_id=tenant_id, docs=docs[i:i + 256])
+    return len(docs)
+
+
+async def _queries(tenant_id: str, n: int, queries_file: str | None, noise: float, seed: int) -> np.ndarray:
+    if queries_file:
+        from pipeline.embedding import get_text_embeddings
+
+        texts = [line.strip() for line in Path(queries_file).read_text().splitlines() if line.strip()][:n]
+        return await get_text_embeddings(texts, tenant_id=tenant_id, input_type="query")
+    rng = np.random.default_rng(seed)
+    stored = [v async for _, v in _scroll(f"tenant_{tenant_id}", with_vectors=True, limit=n * 20)]
+    picks = np.stack([np.asarray(stored[i], dtype=np.float32) for i in rng.choice(len(stored), size=min(n, len(stored)), replace=False)])
+    return normalize(picks + rng.normal(0, noise, picks.shape).astype(np.float32))
+
+
+def _ids(hits) -> set:
+    return {h.id for h in hits}
+
+
+async def _timed(coro) -> tuple[float, list]:
+    t0 = time.perf_counter()
+    hits = await coro
+    return time.perf_counter() - t0, hits
+
+
+def _report(name: str, latencies: list[float], recalls: list[float]) -> None:
+    q = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+    print(
+        f"{name:>14}: recall@k {statistics.mean(recalls):.3f}  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms  p95 {q[18] * 1000:7.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenant", required=True)
+    parser.add_argument("--m", default="5,10,20,50", help="comma-separated candidate document counts")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--queries-file", help="one query text per line (default: noisy stored chunk vectors)")
+    parser.add_argument("--noise", type=float, default=0.02, help="stddev of the noise added to sampled vectors")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--backfill", action="store_true", help="build tenant_{id}_docs from stored chunks first")
+    args = parser.parse_args()
+
+    if args.backfill:
+        print(f"backfilled {await backfill(args.tenant)} document centroids")
+    queries = await _queries(args.tenant, args.queries, args.queries_file, args.noise, args.seed)
+    collection = f"tenant_{args.tenant}"
+    ms = [int(m) for m in args.m.split(",") if m.strip()]
+
+    truth = [
+        _ids(await search_points(collection=collection, vector=q, top_k=args.top_k, payload_fields=False, exact=True))
+        for q in queries
+    ]
+    await search_points(collection=collection, vector=queries[0], top_k=args.top_k, payload_fields=False)  # warm-up
+
+    def recall(hits, expected: set) -> float:
+        return len(_ids(hits) & expected) / len(expected) if expected else 1.0
+
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        dt, hits = await _timed(search_points(collection=collection, vector=q, top_k=args.top_k, payload_fields=False))
+        latencies.append(dt)
+        recalls.append(recall(hits, expected))
+    print(f"{len(queries)} queries, top_k={args.top_k}, tenant {args.tenant}")
+    _report("single-stage", latencies, recalls)
+
+    for m in ms:
+        latencies, recalls = [], []
+        for q, expected in zip(queries, truth):
+            dt, hits = await _timed(two_stage_search(args.tenant, q, args.top_k, m, payload_fields=False))
+            latencies.append(dt)
+            recalls.append(recall(hits, expected))
+        _report(f"two-stage M={m}", latencies, recalls)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Vector backend benchmark: recall@k and latency of Qdrant vs. pgvector for one tenant.
+
+Each backend is scored against its own exact (brute-force) top-k, since the two
+stores need not hold identical points: Qdrant tenant_{id}[_images] with an exact
+search, pgvector with index scans disabled. pgvector is measured at every
+--ef-search value (hnsw.ef_search), with the index currently built on the table
+(scripts/pgvector_indexes.py); Qdrant with the tenant's index profile.
+
+Queries are lines of --queries-file (embedded as search queries) or, by default,
+stored chunk embeddings from Postgres with Gaussian noise. --modality adds a
+metadata filter to every search on both backends.
+
+Run: python scripts/bench_vector_backends.py --tenant acme [--kind text] [--ef-search 40,64,128]
+                                             [--top-k 10] [--queries 100] [--modality audio_transcript]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+from pipeline import pgvector_store
+from pipeline.pgvector_store import search_pgvector
+from pipeline.serving.fusion import COLLECTION_SUFFIXES
+from pipeline.storage.pgvector_indexes import VECTOR_COLUMNS
+from pipeline.vector_store import payload_filter, search_tenant
+from pipeline.vectors import normalize
+
+
+async def _queries(tenant_id: str, kind: str, n: int, queries_file: str | None, noise: float, seed: int) -> np.ndarray:
+    if queries_file:
+        from pipeline.embedding import get_text_embeddings
+
+        texts = [line.strip() for line in Path(queries_file).read_text().splitlines() if line.strip()][:n]
+        return await get_text_embeddings(texts, tenant_id=tenant_id, input_type="query")
+    col = VECTOR_COLUMNS[kind]
+    source = "chunks c" if kind == "text" else "image_embeddings e JOIN chunks c ON c.chunk_id = e.chunk_id"
+    alias = "c" if kind == "text" else "e"
+    pool = await pgvector_store._get_pool()
+    rows = await pool.fetch(
+        f"SELECT {alias}.{col.column} AS v FROM {source} "
+        f"WHERE c.tenant_id = $1 AND {alias}.{col.column} IS NOT NULL ORDER BY random() LIMIT $2",
+        tenant_id,
+        n,
+    )
+    if not rows:
+        raise SystemExit(f"No {kind} embeddings in Postgres for tenant {tenant_id}")
+    picks = np.stack([np.asarray(r["v"], dtype=np.float32) for r in rows])
+    rng = np.random.default_rng(seed)
+    return normalize(picks + rng.normal(0, noise, picks.shape).astype(np.float32))
+
+
+def _chunk_ids(hits) -> set[str]:
+    return {str((h.payload or {}).get("chunk_id", h.id)) for h in hits}
+
+
+def _report(name: str, latencies: list[float], recalls: list[float]) -> None:
+    q = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+    print(
+        f"{name:>22}: recall@k {statistics.mean(recalls):.3f}  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms  p95 {q[18] * 1000:7.2f} ms"
+    )
+
+
+async def _measure(name: str, search, queries: np.ndarray, truth: list[set[str]]) -> None:
+    await search(queries[0])  # warm-up
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        hits = await search(q)
+        latencies.append(time.perf_counter() - t0)
+        recalls.append(len(_chunk_ids(hits) & expected) / len(expected) if expected else 1.0)
+    _report(name, latencies, recalls)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenant", required=True)
+    parser.add_argument("--kind", choices=sorted(VECTOR_COLUMNS), default="text")
+    parser.add_argument("--ef-search", default="40,64,128", help="comma-separated pgvector hnsw.ef_search values")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--queries-file", help="one query text per line (default: noisy stored embeddings)")
+    parser.add_argument("--noise", type=float, default=0.02, help="stddev of the noise added to sampled vectors")
+    parser.add_argument("--modality", help="filter every search to this modality")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    queries = await _queries(args.tenant, args.kind, args.queries, args.queries_file, args.noise, args.seed)
+    query_filter = payload_filter(modality=args.modality)
+    k, tenant, kind = args.top_k, args.tenant, args.kind
+
+    def qdrant(q, exact=False):
+        return search_tenant(
+            tenant_id=tenant, suffix=COLLECTION_SUFFIXES[kind], vector=q, top_k=k,
+            query_filter=query_filter, payload_fields=["chunk_id"], exact=exact,
+        )
+
+    def pgvector(q, exact=False, ef_search=None):
+        return search_pgvector(
+            tenant_id=tenant, kind=kind, vector=q, top_k=k,
+            query_filter=query_filter, payload_fields=["chunk_id"], exact=exact, ef_search=ef_search,
+        )
+
+    print(f"{len(queries)} queries, top_k={k}, tenant {tenant}, kind {kind}, filter {args.modality or 'none'}")
+    qdrant_truth = [_chunk_ids(await qdrant(q, exact=True)) for q in queries]
+    await _measure("qdrant", qdrant, queries, qdrant_truth)
+    pg_truth = [_chunk_ids(await pgvector(q, exact=True)) for q in queries]
+    for ef in [int(e) for e in args.ef_search.split(",") if e.strip()]:
+        await _measure(f"pgvector ef_search={ef}", lambda q, ef=ef: pgvector(q, ef_search=ef), queries, pg_truth)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
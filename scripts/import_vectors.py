@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Bulk-import precomputed embeddings from Parquet or Arrow IPC files (bring your own vectors).
+
+Each file needs chunk_id, doc_id and vector columns (768-d text or 512-d CLIP)
+and may have a payload column (struct, map or JSON string); see
+pipeline.vector_import. Files are streamed in --batch-rows record batches into
+the tenant's Qdrant collections and, unless --no-postgres, the chunks table via
+COPY, so memory stays bounded by one batch. Needs pyarrow
+(pip install 'frostbyte-pipeline[arrow]').
+
+Run: python scripts/import_vectors.py --tenant acme embeddings.parquet [more.arrow ...]
+                                      [--batch-rows 4096] [--no-postgres]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("import_vectors")
+
+from pipeline.vector_import import (
+    VECTOR_IMPORT_BATCH_ROWS,
+    VECTOR_IMPORT_WRITE_POSTGRES,
+    VectorImportError,
+    import_vectors,
+)
+from pipeline.storage.tiering import CollectionArchivedError
+from pipeline.vector_store import VectorStoreError
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--tenant", required=True)
+    parser.add_argument("--batch-rows", type=int, default=VECTOR_IMPORT_BATCH_ROWS)
+    parser.add_argument("--no-postgres", action="store_true", default=not VECTOR_IMPORT_WRITE_POSTGRES,
+                        help="write Qdrant only")
+    args = parser.parse_args()
+
+    for path in args.files:
+        t0 = time.perf_counter()
+        with path.open("rb") as f:
+            try:
+                result = await import_vectors(
+                    f, tenant_id=args.tenant, filename=path.name,
+                    batch_rows=args.batch_rows, postgres=not args.no_postgres,
+                )
+            except VectorImportError as e:
+                raise SystemExit(f"{path}: {e} ({e.rows_imported} rows imported before the error)")
+            except (CollectionArchivedError, VectorStoreError) as e:
+                raise SystemExit(f"{path}: {e}")
+        elapsed = time.perf_counter() - t0
+        logger.info(
+            "%s: %d vectors in %d batches into %s (%.0f vectors/s)",
+            path, result.rows, result.batches, ", ".join(sorted(result.collections)) or "-",
+            result.rows / elapsed if elapsed else 0,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
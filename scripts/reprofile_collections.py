@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Apply index profiles (pipeline.storage.index_profiles) to existing Qdrant collections.
+
+For each tenant, the profile is --profile if given, else the tenant config's
+index_profile, else FROSTBYTE_INDEX_PROFILE. Every collection the tenant owns
+(tenant_{id}, tenant_{id}_images, tenant_{id}_docs) is PATCHed to the profile's
+HNSW, quantization, on-disk and optimizer settings; Qdrant re-indexes in the
+background and keeps serving meanwhile. --save also writes index_profile into
+the tenant config so later provisioning and query-time settings match.
+
+Run: python scripts/reprofile_collections.py [--tenant acme ...] [--profile memory] [--save] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("reprofile_collections")
+
+from pipeline.storage.index_profiles import PROFILES, get_profile
+from pipeline.storage.qdrant_provisioner import TENANT_COLLECTIONS, apply_index_profile, get_collection_name
+
+QDRANT_URL = os.getenv("QDRANT_URL", os.getenv("FROSTBYTE_QDRANT_URL", "http://localhost:6333"))
+
+
+async def _tenant_configs(tenant_ids: list[str]) -> dict[str, dict]:
+    """Config of the given (or all ACTIVE) tenants; {} per tenant when the DB is unavailable."""
+    try:
+        from pipeline import db
+        from pipeline.config import PlatformConfig
+
+        await db.init_db(PlatformConfig.from_env().control_db_url)
+        pool = db._get_pool()
+        if tenant_ids:
+            rows = await pool.fetch("SELECT tenant_id, config FROM tenants WHERE tenant_id = ANY($1::text[])", tenant_ids)
+        else:
+            rows = await pool.fetch("SELECT tenant_id, config FROM tenants WHERE state = 'ACTIVE'")
+        # jsonb comes back as text without a type codec on the pool
+        configs = {
+            r["tenant_id"]: json.loads(r["config"]) if isinstance(r["config"], str) else dict(r["config"] or {})
+            for r in rows
+        }
+    except Exception as e:
+        logger.warning("Could not load tenant configs: %s", e)
+        configs = {}
+    return {t: configs.get(t, {}) for t in tenant_ids} if tenant_ids else (configs or {"default": {}})
+
+
+async def _save_profile(tenant_id: str, profile: str) -> None:
+    from pipeline import db
+
+    await db.update_tenant_config(tenant_id, {"index_profile": profile})
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenant", action="append", default=[], help="tenant to reprofile (repeatable; default all ACTIVE)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="override the tenant config's index_profile")
+    parser.add_argument("--save", action="store_true", help="store --profile in the tenant config")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    for tenant_id, config in (await _tenant_configs(args.tenant)).items():
+        name = args.profile or config.get("index_profile")
+        try:
+            profile = get_profile(name)
+        except ValueError as e:
+            logger.error("Tenant %s: %s", tenant_id, e)
+            continue
+        for suffix in TENANT_COLLECTIONS:
+            coll = f"{get_collection_name(tenant_id)}{suffix}"
+            if args.dry_run:
+                logger.info("%s -> %s: %s", coll, profile.name, json.dumps(profile.update_body()))
+            elif await apply_index_profile(QDRANT_URL, coll, profile.name):
+                logger.info("%s -> %s", coll, profile.name)
+            else:
+                logger.info("%s does not exist, skipped", coll)
+        if args.save and args.profile and not args.dry_run:
+            await _save_profile(tenant_id, args.profile)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
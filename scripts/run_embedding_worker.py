@@ -9,14 +9,47 @@ floats) so documents can be searched by similarity. This worker receives policy-
 (from the policy worker), calls an embedding API (OpenRouter or local Nomic per TECH_DECISIONS),
 and writes to the vector store (Qdrant). The "three-store" design (EMBEDDING_INDEXING_PLAN) is:
   1. Object store (MinIO) – canonical JSON already written by parse; we only verify it exists.
-  2. Relational DB (PostgreSQL) – chunk metadata; can be added later for searchable index.
+  2. Relational DB (PostgreSQL) – chunk rows with their embeddings (chunks), so tenants on the
+     pgvector search backend see text documents too; EMBEDDING_WRITE_CHUNKS=false turns it off.
   3. Vector store (Qdrant) – embeddings for similarity search; we write here.
 
 We enforce 768 dimensions everywhere (TECH_DECISIONS lock). If the API returns wrong dims we
 do not write and log an error.
 
+If no embedding endpoint can serve (circuit breakers open), the job is not written with
+placeholder vectors: it is deferred to tenant:{id}:queue:embedding:delayed and retried with
+backoff (10s, 60s, 300s). After the last retry it goes to the :dlq list, the document is
+marked failed, and an EMBEDDING_FAILED audit event is emitted (EMBEDDING_INDEXING_PLAN
+Section 8). Dimension mismatches are configuration errors and are not retried.
+
+Near-duplicate chunks (boilerplate repeated across a tenant's documents) are detected with the
+MinHash/LSH index in pipeline.chunk_dedup before embedding; they are either stored as a reference
+to their canonical chunk or given a copy of its vector (CHUNK_DEDUP_MODE), never re-embedded.
+
+Each document also gets one point in tenant_{id}_docs, the mean of its chunk vectors, which
+two-stage search uses to pick candidate documents before searching their chunks.
+
+Small tenants may live in the shared collection pool (pipeline.storage.placement); after a
+write, a shared tenant past FROSTBYTE_SHARED_PROMOTE_POINTS is promoted to its own collections.
+
+A job for a tenant whose collections are archived (pipeline.storage.tiering) is deferred
+while the tiering worker restores them, every FROSTBYTE_TIER_WARMUP_DEFER_SEC for up to
+FROSTBYTE_TIER_WARMUP_MAX_WAIT_SEC; those waits do not use up the retry budget above.
+
+If Qdrant cannot take an upsert, the vectors are appended to a local write-behind spool
+(pipeline.vector_spool, .spool/vectors/embedding_worker) and the job completes; a background
+replayer writes them to Qdrant in bulk once it is back. Spool depth and age are exported on
+EMBEDDING_WORKER_METRICS_PORT.
+
+After each upsert the collection's version counter is incremented, which invalidates the
+serving layer's cached query results for it (pipeline.serving.cache).
+
+Up to EMBEDDING_WORKER_CONCURRENCY jobs run at once; their chunk texts meet in the shared
+embedding micro-batcher, so several small documents go out as one backend request and a large
+one is split into requests within EMBEDDING_BATCH_MAX_ITEMS / EMBEDDING_BATCH_MAX_TOKENS.
+
 Flow: Policy Worker → [Redis tenant:{id}:queue:embedding] → Embedding Worker (this script)
-                                                                  → Qdrant (and optionally PG/MinIO check)
+                                                                  → Qdrant + PG chunks
 
 Run: python scripts/run_embedding_worker.py
 """
@@ -38,26 +71,41 @@ sys.path.insert(0, str(ROOT / "pipeline"))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("embedding_worker")
 
+import numpy as np
 import redis.asyncio as redis
 
-from pipeline.embedding import get_text_embedding
+from pipeline import metrics, pgvector_store
+from pipeline.chunk_dedup import CHUNK_DEDUP_ENABLED, CHUNK_DEDUP_MODE, DedupPlan, NearDuplicateIndex
+from pipeline.embedding import EmbeddingUnavailableError, get_text_embeddings
 from pipeline.events import publish_async as publish_event
-from pipeline.vector_store import store_embedding
+from pipeline.retry_queue import RETRY_BACKOFF_SEC, dead_letter, defer, promote_due
+from pipeline.serving.cache import bump_collection_versions
+from pipeline.storage.placement import schedule_promotion_check
+from pipeline.storage.tiering import WARMUP_BACKOFF_SEC, CollectionArchivedError, check_writable, is_writable
+from pipeline.vector_import import chunk_batch, write_postgres
+from pipeline.vector_spool import get_spool, store_document_vectors, store_embeddings
+from pipeline.vector_store import fetch_vectors
+from pipeline.vectors import centroid
 
 REDIS_URL = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 BRPOP_TIMEOUT = 5
 TENANT_REFRESH_INTERVAL = 60
+WORKER_CONCURRENCY = max(1, int(os.getenv("EMBEDDING_WORKER_CONCURRENCY", "4")))
+# Prometheus text (spool depth and age) on this port; 0 = off
+METRICS_PORT = int(os.getenv("EMBEDDING_WORKER_METRICS_PORT", "0"))
+SPOOL_NAME = "embedding_worker"
+# Text chunks are also written to Postgres chunks (pgvector search backend)
+EMBEDDING_WRITE_CHUNKS = os.getenv("EMBEDDING_WRITE_CHUNKS", "true").lower() in ("1", "true", "yes")
 EMBEDDING_DIM = 768
 
 
-def _assert_dimensions(vectors: list[list[float]], expected: int = EMBEDDING_DIM) -> None:
+def _assert_dimensions(vectors: np.ndarray, expected: int = EMBEDDING_DIM) -> None:
     """
     Per EMBEDDING_INDEXING_PLAN Section 4: assert every vector has exactly 768 dimensions.
     Configuration errors (wrong model/endpoint) must not write to the vector store.
     """
-    for i, v in enumerate(vectors):
-        if len(v) != expected:
-            raise ValueError(f"Vector {i} has {len(v)} dims, expected {expected}")
+    if vectors.ndim != 2 or (len(vectors) and vectors.shape[1] != expected):
+        raise ValueError(f"Vectors have shape {vectors.shape}, expected (n, {expected})")
 
 
 async def _load_tenant_ids():
@@ -75,10 +123,113 @@ async def _load_tenant_ids():
         return ["default"]
 
 
-async def process_job(payload: dict) -> bool:
+async def _write_chunks(payload: dict, points: list, texts: dict[str, str]) -> None:
+    """Upsert the document's text chunks (and its documents row) into Postgres in one transaction."""
+    tenant_id, doc_id = payload["tenant_id"], payload["doc_id"]
+    batch = chunk_batch(
+        tenant_id,
+        [chunk_id for chunk_id, _, _ in points],
+        [doc_id] * len(points),
+        np.stack([v for _, v, _ in points]),
+        [{**p, "text": texts[chunk_id]} for chunk_id, _, p in points],
+        keep_ids=True,
+    )
+    pool = await pgvector_store._get_pool()
+    async with pool.acquire() as conn, conn.transaction():
+        await write_postgres(conn, batch, payload.get("filename") or doc_id)
+
+
+async def _mark_embed_failed(payload: dict, reason: str) -> None:
+    """Retries exhausted: flag the document and record EMBEDDING_FAILED in the audit trail."""
+    doc_id = payload.get("doc_id", "")
+    tenant_id = payload.get("tenant_id", "")
+    await publish_event("EMBED", f"Embedding failed after retries: {reason[:100]}", "error", document_id=doc_id, tenant_id=tenant_id)
+    try:
+        from pipeline import db
+        pool = db._get_pool()
+        await pool.execute(
+            "UPDATE documents SET status = 'failed', updated_at = now() WHERE id::text = $1",
+            doc_id,
+        )
+        await db.emit_audit_event(
+            event_id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            event_type="EMBEDDING_FAILED",
+            resource_type="document",
+            resource_id=doc_id,
+            details={"reason": reason, "attempts": payload.get("attempts", 0)},
+        )
+    except Exception as e:
+        logger.warning("Could not record embedding failure for %s: %s", doc_id, e)
+
+
+async def _embed_and_store(payload: dict, texts: list[str], plan: DedupPlan | None, r: redis.Redis | None) -> list | None:
+    """Embed what the dedup plan leaves to embed and write the points; None on a dimension mismatch."""
+    doc_id, tenant_id, chunks = payload["doc_id"], payload["tenant_id"], payload["chunks"]
+    chunk_ids = [c.get("chunk_id", "") for c in chunks]
+    canonical = plan.canonical if plan is not None else [None] * len(chunks)
+    stored: dict[str, np.ndarray] = {}
+    if CHUNK_DEDUP_MODE == "reuse" and plan is not None and plan.external_canonicals():
+        stored = await fetch_vectors(tenant_id=tenant_id, chunk_ids=plan.external_canonicals())
+    # Duplicates are not embedded, unless (reuse mode) their canonical vector is gone from Qdrant
+    todo = plan.to_embed(CHUNK_DEDUP_MODE, stored) if plan is not None else list(range(len(chunks)))
+
+    # The micro-batcher merges these texts with other jobs' and splits them to the per-request
+    # item/token budget (HTTP endpoint or local model)
+    embedded = await get_text_embeddings([texts[i] for i in todo], document_id=doc_id, tenant_id=tenant_id)
+    vectors: dict[int, np.ndarray] = dict(zip(todo, embedded))
+
+    try:
+        _assert_dimensions(embedded)
+    except ValueError as e:
+        logger.error("Dimension mismatch: %s", e)
+        await publish_event("EMBED", f"Dimension mismatch: {e}", "error", document_id=doc_id, tenant_id=tenant_id)
+        return None
+
+    if CHUNK_DEDUP_MODE == "reuse" and plan is not None:
+        plan.reuse_vectors(vectors, stored)
+
+    # Write the chunks to Qdrant in one upsert, then their rows to Postgres (three-store)
+    points = []
+    for i in sorted(vectors):
+        chunk = chunks[i]
+        payload_q = {
+            "doc_id": doc_id,
+            "classification": chunk.get("metadata", {}).get("classification", "other"),
+            "page": chunk.get("offsets", {}).get("page", 0),
+            "modality": "text",
+        }
+        if canonical[i] is not None:
+            payload_q["duplicate_of"] = canonical[i]
+        points.append((chunk_ids[i], vectors[i], payload_q))
+    # Qdrant unavailable: the vectors are spooled to local disk and replayed later
+    spool = get_spool(SPOOL_NAME)
+    collections = await store_embeddings(tenant_id=tenant_id, points=points, spool=spool)
+    if EMBEDDING_WRITE_CHUNKS and points:
+        await _write_chunks(payload, points, dict(zip(chunk_ids, texts)))
+    if vectors:
+        # Document centroid for two-stage search (tenant_{id}_docs)
+        doc_payload = {
+            "classification": sorted({p["classification"] for _, _, p in points}),
+            "chunk_count": len(chunks),
+        }
+        collections += await store_document_vectors(
+            tenant_id=tenant_id,
+            docs=[(doc_id, centroid(np.stack([vectors[i] for i in sorted(vectors)])), doc_payload)],
+            spool=spool,
+        )
+    if r is not None:
+        await bump_collection_versions(r, tenant_id, collections)
+        # Shared-pool tenant past the size threshold: move it to dedicated collections
+        schedule_promotion_check(r, tenant_id)
+    return points
+
+
+async def process_job(payload: dict, r: redis.Redis | None = None) -> bool:
     """
     Process one embedding job: for each chunk, get 768d embedding, write to Qdrant.
     Chunks are policy-enriched (chunk_id, doc_id, tenant_id, text, metadata, offsets, etc.).
+    With a Redis client, near-duplicate chunks are resolved against the tenant's LSH index.
     """
     doc_id = payload["doc_id"]
     tenant_id = payload["tenant_id"]
@@ -87,54 +238,83 @@ async def process_job(payload: dict) -> bool:
     if not chunks:
         logger.warning("Empty chunks for doc %s", doc_id)
         return True
+    if r is not None:
+        # Archived collections (storage tiering) are restored before anything is written
+        await check_writable(r, tenant_id)
 
     await publish_event("EMBED", f"Embedding {len(chunks)} chunks for document {doc_id}", "info", document_id=doc_id, tenant_id=tenant_id)
 
-    vectors = []
     texts = [c.get("text", "") or "" for c in chunks]
-    # Call embedding API (batch would be better; here we do one-by-one for simplicity)
-    for i, text in enumerate(texts):
-        emb = await get_text_embedding(text)
-        if len(emb) != EMBEDDING_DIM:
-            # get_text_embedding returns zero vector on API failure; we still enforce dims
-            emb = (emb + [0.0] * EMBEDDING_DIM)[:EMBEDDING_DIM]
-        vectors.append(emb)
-
+    chunk_ids = [c.get("chunk_id", "") for c in chunks]
+    index = NearDuplicateIndex(r, tenant_id) if r is not None and CHUNK_DEDUP_ENABLED else None
+    plan = await index.classify(chunk_ids, texts) if index is not None else None
+    if plan is not None and plan.duplicates:
+        await publish_event("EMBED", f"{plan.duplicates} near-duplicate chunk(s) in {doc_id} not re-embedded", "info", document_id=doc_id, tenant_id=tenant_id)
     try:
-        _assert_dimensions(vectors)
-    except ValueError as e:
-        logger.error("Dimension mismatch: %s", e)
-        await publish_event("EMBED", f"Dimension mismatch: {e}", "error", document_id=doc_id, tenant_id=tenant_id)
+        points = await _embed_and_store(payload, texts, plan, r)
+    except Exception:
+        # Let other jobs embed the chunks this one claimed as canonical
+        if index is not None and plan is not None:
+            await index.release(plan)
+        raise
+    if points is None:
+        if index is not None and plan is not None:
+            await index.release(plan)
         return False
-
-    # Write each chunk to Qdrant (three-store: we do vector store; object store verification and PG optional)
-    for chunk, vector in zip(chunks, vectors):
-        chunk_id = chunk.get("chunk_id", "")
-        payload_q = {
-            "doc_id": doc_id,
-            "classification": chunk.get("metadata", {}).get("classification", "other"),
-            "page": chunk.get("offsets", {}).get("page", 0),
-        }
-        await store_embedding(
-            tenant_id=tenant_id,
-            chunk_id=chunk_id,
-            embedding=vector,
-            payload=payload_q,
-        )
-    await publish_event("EMBED", f"Stored {len(chunks)} vectors in Qdrant for {doc_id}", "success", document_id=doc_id, tenant_id=tenant_id)
+    if index is not None and plan is not None:
+        await index.commit(plan, doc_id)
+    await publish_event("EMBED", f"Stored {len(points)} vectors in Qdrant for {doc_id}", "success", document_id=doc_id, tenant_id=tenant_id)
     await publish_event("VECTOR", f"Document indexed in collection tenant_{tenant_id}", "success", document_id=doc_id, tenant_id=tenant_id)
     await publish_event("METADATA", f"Chunk metadata written for document {doc_id[:8]}...", "success", document_id=doc_id, tenant_id=tenant_id)
     logger.info("Embedding done for %s: %d chunks → Qdrant", doc_id, len(chunks))
     return True
 
 
+async def _run_job(r: redis.Redis, key: str, payload: dict, slots: asyncio.Semaphore) -> None:
+    try:
+        await process_job(payload, r)
+    except (EmbeddingUnavailableError, CollectionArchivedError) as e:
+        # Waiting out a warm-up has its own budget; it is not a failed attempt
+        backoff, counter = (WARMUP_BACKOFF_SEC, "warmups") if isinstance(e, CollectionArchivedError) else (RETRY_BACKOFF_SEC, "attempts")
+        if await defer(r, key, payload, backoff=backoff, counter=counter):
+            logger.warning("Deferred doc %s: %s", payload.get("doc_id"), e)
+        else:
+            await dead_letter(r, key, payload, str(e))
+            await _mark_embed_failed(payload, str(e))
+    except Exception as e:
+        logger.exception("Embedding job failed: %s", e)
+        await publish_event(
+            "EMBED",
+            f"Job failed: {str(e)[:100]}",
+            "error",
+            document_id=payload.get("doc_id", ""),
+            tenant_id=payload.get("tenant_id", ""),
+        )
+    finally:
+        slots.release()
+
+
 async def main():
-    """Main loop: BRPOP embedding queues, process jobs."""
+    """Main loop: BRPOP embedding queues, process up to WORKER_CONCURRENCY jobs at once."""
     r = redis.from_url(REDIS_URL)
     last_tenant_refresh = 0.0
     tenant_ids = ["default"]
+    slots = asyncio.Semaphore(WORKER_CONCURRENCY)
+    spool = get_spool(SPOOL_NAME)
+    if spool is not None:
+        if spool.pending():
+            logger.info("Vector spool holds %s from an earlier run", spool.stats())
+        # Replayed vectors become searchable: invalidate cached results for their collections.
+        # Tenants with archived collections are held back until their warm-up finishes.
+        asyncio.create_task(spool.run_replayer(
+            on_replayed=lambda t, colls: bump_collection_versions(r, t, colls),
+            writable=lambda t: is_writable(r, t),
+        ))
+    if METRICS_PORT:
+        await metrics.serve(METRICS_PORT)
 
     while True:
+        await slots.acquire()
         now = time.monotonic()
         if now - last_tenant_refresh > TENANT_REFRESH_INTERVAL:
             tenant_ids = await _load_tenant_ids()
@@ -142,31 +322,26 @@ async def main():
 
         keys = [f"tenant:{t}:queue:embedding" for t in tenant_ids]
         if not keys:
+            slots.release()
             await asyncio.sleep(5)
             continue
 
+        await promote_due(r, keys)
         result = await r.brpop(keys, timeout=BRPOP_TIMEOUT)
         if result is None:
+            slots.release()
             continue
 
-        _key, value = result
+        key, value = result
+        key = key.decode() if isinstance(key, bytes) else key
         try:
             payload = json.loads(value)
         except json.JSONDecodeError as e:
             logger.error("Invalid job JSON: %s", e)
+            slots.release()
             continue
 
-        try:
-            await process_job(payload)
-        except Exception as e:
-            logger.exception("Embedding job failed: %s", e)
-            await publish_event(
-                "EMBED",
-                f"Job failed: {str(e)[:100]}",
-                "error",
-                document_id=payload.get("doc_id", ""),
-                tenant_id=payload.get("tenant_id", ""),
-            )
+        asyncio.create_task(_run_job(r, key, payload, slots))
 
 
 if __name__ == "__main__":
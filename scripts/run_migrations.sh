@@ -29,7 +29,7 @@ fi
 echo "Running migrations from $MIGRATIONS_DIR"
 echo "Target: $PGUSER@$PGHOST:$PGPORT/$PGDATABASE"
 
-for f in 001_tenant_registry.sql 002_audit_events.sql 005_intake_receipts.sql 006_tenant_schemas.sql 007_add_multimodal_support.sql; do
+for f in 001_tenant_registry.sql 002_audit_events.sql 005_intake_receipts.sql 006_tenant_schemas.sql 007_add_multimodal_support.sql 008_deferred_malware_scan.sql 009_video_frame_runs.sql 010_transcript_segments.sql 011_chunk_page_numbers.sql 012_pgvector_search.sql 013_chunk_classification.sql 014_chunk_source_ids.sql; do
   path="$MIGRATIONS_DIR/$f"
   if [[ -f "$path" ]]; then
     echo "  Applying $f"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Scan worker: the deferred malware-scan stage (CLAMAV_DEFER_SCAN=true).
+
+Intake stores the raw file with scan_result 'pending' and pushes a job to
+tenant:{id}:queue:scan instead of scanning inside the HTTP request. This worker
+streams the object out of MinIO straight into clamd INSTREAM (no full-file
+buffer), settles the receipt and then either enqueues parse (clean/skipped) or
+moves the object to quarantine/ (infected).
+
+Flow: Intake → [Redis tenant:{id}:queue:scan] → Scan Worker (this script) → [tenant:{id}:queue:parse]
+
+Run: python scripts/run_scan_worker.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add pipeline to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+import boto3
+import redis.asyncio as redis
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("scan_worker")
+
+from pipeline.clamav_client import CLAMAV_POOL_SIZE, CLAMAV_STREAM_BLOCK_SIZE, scan_stream
+from pipeline.events import publish_async as publish_event
+from pipeline.intake import receipt_store
+from pipeline.parse_enqueue import enqueue_parse
+
+BUCKET = os.getenv("BUCKET", "frostbyte-docs")
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://localhost:9000")
+MINIO_ACCESS = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
+MINIO_SECRET = os.getenv("MINIO_SECRET_KEY", "minioadmin")
+REDIS_URL = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+BRPOP_TIMEOUT = 5
+TENANT_REFRESH_INTERVAL = 60
+
+_s3 = None
+
+
+def _get_s3():
+    global _s3
+    if _s3 is None:
+        _s3 = boto3.client(
+            "s3",
+            endpoint_url=MINIO_ENDPOINT,
+            aws_access_key_id=MINIO_ACCESS,
+            aws_secret_access_key=MINIO_SECRET,
+            region_name="us-east-1",
+        )
+    return _s3
+
+
+async def _load_tenant_ids():
+    """Load ACTIVE tenant IDs from control-plane DB."""
+    try:
+        from pipeline import db
+        from pipeline.config import PlatformConfig
+        cfg = PlatformConfig.from_env()
+        await db.init_db(cfg.control_db_url)
+        pool = db._get_pool()
+        rows = await pool.fetch("SELECT tenant_id FROM tenants WHERE state = 'ACTIVE'")
+        return [r["tenant_id"] for r in rows]
+    except Exception as e:
+        logger.warning("Could not load tenants from DB: %s. Using default tenant.", e)
+        return ["default"]
+
+
+async def _emit_audit(tenant_id: str, event_type: str, resource_id: str, details: dict) -> None:
+    try:
+        from pipeline import db
+        await db.emit_audit_event(
+            event_id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            event_type=event_type,
+            resource_type="document",
+            resource_id=resource_id,
+            details=details,
+        )
+    except Exception as e:
+        logger.warning("Audit emit failed: %s", e)
+
+
+def _scan_object(storage_path: str, sha256: str) -> tuple[str, str | None]:
+    """Stream the stored object from MinIO into clamd in INSTREAM-sized blocks."""
+    body = _get_s3().get_object(Bucket=BUCKET, Key=storage_path)["Body"]
+    try:
+        return scan_stream(body.iter_chunks(CLAMAV_STREAM_BLOCK_SIZE), sha256=sha256)
+    finally:
+        body.close()
+
+
+def _quarantine_object(storage_path: str, tenant_id: str, file_id: str, sha256: str) -> str:
+    s3 = _get_s3()
+    quarantine_path = f"quarantine/{tenant_id}/{file_id}/{sha256}"
+    s3.copy_object(Bucket=BUCKET, Key=quarantine_path, CopySource={"Bucket": BUCKET, "Key": storage_path})
+    s3.delete_object(Bucket=BUCKET, Key=storage_path)
+    return quarantine_path
+
+
+async def process_job(payload: dict) -> None:
+    tenant_id = payload["tenant_id"]
+    file_id = payload["file_id"]
+    sha256 = payload["sha256"]
+    storage_path = payload["storage_path"]
+    loop = asyncio.get_running_loop()
+
+    scan_result, threat = await loop.run_in_executor(None, _scan_object, storage_path, sha256)
+
+    if scan_result == "infected":
+        quarantine_path = await loop.run_in_executor(
+            None, _quarantine_object, storage_path, tenant_id, file_id, sha256
+        )
+        await receipt_store.update_scan_result(tenant_id, payload["receipt_id"], "quarantined", "quarantined")
+        await _emit_audit(
+            tenant_id=tenant_id,
+            event_type="DOCUMENT_QUARANTINED",
+            resource_id=file_id,
+            details={
+                "scan_engine": "clamav",
+                "threat_name": threat,
+                "storage_path": quarantine_path,
+                "component": "scan-worker",
+            },
+        )
+        await publish_event("INTAKE", f"Quarantined {file_id}: {threat}", "warn", tenant_id=tenant_id)
+        return
+
+    await receipt_store.update_scan_result(tenant_id, payload["receipt_id"], scan_result, "accepted")
+    await _emit_audit(
+        tenant_id=tenant_id,
+        event_type="DOCUMENT_INGESTED",
+        resource_id=file_id,
+        details={
+            "sha256": sha256,
+            "mime_type": payload.get("mime_type"),
+            "storage_path": storage_path,
+            "scan_result": scan_result,
+            "component": "scan-worker",
+        },
+    )
+    await enqueue_parse(
+        file_id=file_id,
+        batch_id=payload["batch_id"],
+        sha256=sha256,
+        storage_path=storage_path,
+        tenant_id=tenant_id,
+        mime_type=payload.get("mime_type"),
+    )
+    await publish_event("INTAKE", f"Scan {scan_result}: {file_id} queued for parse", "info", tenant_id=tenant_id)
+
+
+async def _run_job(payload: dict, slots: asyncio.Semaphore) -> None:
+    try:
+        await process_job(payload)
+    except Exception as e:
+        logger.exception("Scan job failed: %s", e)
+        await publish_event(
+            "INTAKE",
+            f"Scan job failed: {str(e)[:100]}",
+            "error",
+            tenant_id=payload.get("tenant_id", ""),
+        )
+    finally:
+        slots.release()
+
+
+async def main():
+    """Main loop: BRPOP scan queues; up to CLAMAV_POOL_SIZE scans in flight."""
+    r = redis.from_url(REDIS_URL)
+    slots = asyncio.Semaphore(CLAMAV_POOL_SIZE)
+    last_tenant_refresh = 0.0
+    tenant_ids = ["default"]
+
+    while True:
+        now = time.monotonic()
+        if now - last_tenant_refresh > TENANT_REFRESH_INTERVAL:
+            tenant_ids = await _load_tenant_ids()
+            last_tenant_refresh = now
+
+        keys = [f"tenant:{t}:queue:scan" for t in tenant_ids]
+        if not keys:
+            await asyncio.sleep(5)
+            continue
+
+        await slots.acquire()
+        result = await r.brpop(keys, timeout=BRPOP_TIMEOUT)
+        if result is None:
+            slots.release()
+            continue
+
+        _key, value = result
+        try:
+            payload = json.loads(value)
+        except json.JSONDecodeError as e:
+            logger.error("Invalid job JSON: %s", e)
+            slots.release()
+            continue
+
+        asyncio.create_task(_run_job(payload, slots))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Tiering worker: moves dedicated tenant collections between RAM, disk and MinIO by query traffic.
+
+Node memory should follow the tenants that are actually queried, not every tenant ever
+indexed. The serving layer records per-collection query times and hourly counts
+(pipeline.serving.access); this worker acts on them (pipeline.storage.tiering):
+
+  sweep (every TIER_SWEEP_INTERVAL_SEC)
+    hot -> disk       idle for FROSTBYTE_TIER_DISK_AFTER_SEC: vectors, graph, payload to disk
+    * -> archived     idle for FROSTBYTE_TIER_ARCHIVE_AFTER_SEC: snapshot to the tenant's
+                      MinIO bucket, collection deleted from Qdrant
+    disk -> hot       back at FROSTBYTE_TIER_PROMOTE_QUERIES_PER_HOUR
+  warm-up (qdrant:tiering:warmup, pushed by queries and writers)
+    archived -> hot   snapshot restored from MinIO, then the tenant's index profile
+    disk -> hot       the tenant's index profile (in-RAM settings) re-applied
+    archiving -> hot  an archive that failed or was cut off by a restart: restored
+                      from its snapshot if the collection is gone, else kept as is
+
+Collections never queried get one idle period from when the worker first sees them.
+Shared pool collections are not tiered.
+
+Run: python scripts/run_tiering_worker.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pipeline"))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("tiering_worker")
+
+import boto3
+import httpx
+import redis.asyncio as redis
+
+from pipeline.storage.minio_provisioner import _bucket_name
+from pipeline.storage.tiering import (
+    ARCHIVED,
+    ARCHIVING,
+    DISK,
+    HOT,
+    LAST_ACCESS_KEY,
+    RESTORING,
+    TIER_ARCHIVE_GRACE_SEC,
+    UNAVAILABLE,
+    WARMUP_QUEUE,
+    archive_collection,
+    finish_warmup,
+    get_tiers,
+    hourly_queries,
+    move_to_disk,
+    move_to_ram,
+    next_tier,
+    restore_collection,
+    set_tier,
+    snapshot_key,
+    split_collection_name,
+)
+
+QDRANT_URL = os.getenv("QDRANT_URL", os.getenv("FROSTBYTE_QDRANT_URL", "http://localhost:6333"))
+REDIS_URL = os.getenv("FROSTBYTE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://localhost:9000")
+MINIO_ACCESS = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
+MINIO_SECRET = os.getenv("MINIO_SECRET_KEY", "minioadmin")
+TIER_SWEEP_INTERVAL_SEC = int(os.getenv("FROSTBYTE_TIER_SWEEP_INTERVAL_SEC", "300"))
+BRPOP_TIMEOUT = 5
+
+_s3 = None
+# Collections this process is archiving right now (ARCHIVING is not stale for them)
+_archiving: set[str] = set()
+
+
+def _get_s3():
+    global _s3
+    if _s3 is None:
+        _s3 = boto3.client(
+            "s3",
+            endpoint_url=MINIO_ENDPOINT,
+            aws_access_key_id=MINIO_ACCESS,
+            aws_secret_access_key=MINIO_SECRET,
+            region_name="us-east-1",
+        )
+    return _s3
+
+
+async def _index_profile(tenant_id: str) -> str | None:
+    """Tenant config index_profile; the default profile when the DB is unavailable."""
+    try:
+        from pipeline import db
+
+        return (await db.load_tenant_config(tenant_id))["config"].get("index_profile")
+    except Exception:
+        return None
+
+
+async def _init_db() -> None:
+    try:
+        from pipeline import db
+        from pipeline.config import PlatformConfig
+
+        await db.init_db(PlatformConfig.from_env().control_db_url)
+    except Exception as e:
+        logger.warning("Control-plane DB unavailable, using the default index profile: %s", e)
+
+
+async def _qdrant_collections() -> set[str]:
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        r = await client.get(f"{QDRANT_URL.rstrip('/')}/collections")
+        r.raise_for_status()
+    return {c["name"] for c in r.json()["result"]["collections"]}
+
+
+async def _resume_archiving(r: redis.Redis, tenant_id: str, collection: str) -> str:
+    """
+    Settle an archive that did not finish. The snapshot key is recorded before the
+    collection is deleted: with the collection still there the snapshot is dropped
+    (ARCHIVING, warmed in place); without it the snapshot is restored (ARCHIVED).
+    """
+    key = await r.get(snapshot_key(tenant_id, collection))
+    key = key.decode() if isinstance(key, bytes) else key
+    if collection in await _qdrant_collections():
+        if key is not None:
+            await asyncio.to_thread(_get_s3().delete_object, Bucket=_bucket_name(tenant_id), Key=key)
+            await r.delete(snapshot_key(tenant_id, collection))
+        return ARCHIVING
+    if key is not None:
+        return ARCHIVED
+    # Nothing to restore: writers recreate the collection
+    logger.error("%s was being archived and has neither a collection nor a snapshot", collection)
+    await set_tier(r, tenant_id, collection, HOT)
+    return HOT
+
+
+async def warm_up(r: redis.Redis, tenant_id: str, collection: str) -> None:
+    """Bring one collection back to the hot tier (restoring it from MinIO if archived)."""
+    tier = (await get_tiers(r, tenant_id, [collection]))[collection]
+    if tier == ARCHIVING:
+        if collection in _archiving:
+            return
+        tier = await _resume_archiving(r, tenant_id, collection)
+    if tier in (ARCHIVED, RESTORING):
+        key = await r.get(snapshot_key(tenant_id, collection))
+        if key is None:
+            logger.error("%s is %s but has no snapshot key; leaving it", collection, tier)
+            return
+        key = key.decode() if isinstance(key, bytes) else key
+        await set_tier(r, tenant_id, collection, RESTORING)
+        await restore_collection(QDRANT_URL, _get_s3(), _bucket_name(tenant_id), collection, key)
+        await r.delete(snapshot_key(tenant_id, collection))
+        logger.info("%s restored from %s", collection, key)
+    elif tier not in (DISK, ARCHIVING):
+        return
+    await move_to_ram(QDRANT_URL, collection, await _index_profile(tenant_id))
+    await set_tier(r, tenant_id, collection, HOT)
+    # A restored collection starts a fresh idle period
+    await r.zadd(LAST_ACCESS_KEY, {collection: time.time()})
+    logger.info("%s %s -> hot", collection, tier)
+
+
+async def archive(r: redis.Redis, tenant_id: str, collection: str, tier: str) -> None:
+    recorded = False
+
+    async def record_snapshot(key: str) -> None:
+        nonlocal recorded
+        # Before the collection is deleted, so an interrupted archive can be settled
+        await r.set(snapshot_key(tenant_id, collection), key)
+        recorded = True
+
+    _archiving.add(collection)
+    try:
+        await set_tier(r, tenant_id, collection, ARCHIVING)
+        # Writers that passed check_writable before the tier flip finish first
+        await asyncio.sleep(TIER_ARCHIVE_GRACE_SEC)
+        key = await archive_collection(
+            QDRANT_URL, _get_s3(), _bucket_name(tenant_id), collection, on_uploaded=record_snapshot
+        )
+    except Exception:
+        _archiving.discard(collection)
+        if recorded:
+            # The delete may or may not have happened
+            await warm_up(r, tenant_id, collection)
+        else:
+            await set_tier(r, tenant_id, collection, tier)
+        raise
+    finally:
+        _archiving.discard(collection)
+    await set_tier(r, tenant_id, collection, ARCHIVED)
+    logger.info("%s %s -> archived (%s)", collection, tier, key)
+
+
+async def sweep(r: redis.Redis) -> Counter:
+    """One pass over the dedicated tenant collections; returns collections per tier after it."""
+    existing = {c for c in await _qdrant_collections() if split_collection_name(c)}
+    now = time.time()
+    if existing:
+        await r.zadd(LAST_ACCESS_KEY, {c: now for c in existing}, nx=True)
+    last_access = {
+        (m.decode() if isinstance(m, bytes) else m): score
+        for m, score in await r.zrange(LAST_ACCESS_KEY, 0, -1, withscores=True)
+    }
+    tiers: Counter = Counter()
+    for collection, last in sorted(last_access.items()):
+        parts = split_collection_name(collection)
+        if parts is None:
+            await r.zrem(LAST_ACCESS_KEY, collection)
+            continue
+        tenant_id = parts[0]
+        tier = (await get_tiers(r, tenant_id, [collection]))[collection]
+        if collection not in existing and tier not in UNAVAILABLE:
+            # Deprovisioned, shared-pool tenant, or never created
+            await r.zrem(LAST_ACCESS_KEY, collection)
+            continue
+        if tier in UNAVAILABLE:
+            tiers[tier] += 1
+            continue
+        target = next_tier(tier, now - last, await hourly_queries(r, tenant_id, collection))
+        try:
+            if target == DISK:
+                await move_to_disk(QDRANT_URL, collection)
+                await set_tier(r, tenant_id, collection, DISK)
+                logger.info("%s hot -> disk (idle %.0fs)", collection, now - last)
+            elif target == HOT:
+                await warm_up(r, tenant_id, collection)
+            elif target == ARCHIVED:
+                await archive(r, tenant_id, collection, tier)
+            tier = target or tier
+        except Exception as e:
+            logger.warning("Tiering %s -> %s failed: %s", collection, target, e)
+        tiers[tier] += 1
+    return tiers
+
+
+async def run_warmups(r: redis.Redis) -> None:
+    while True:
+        try:
+            result = await r.brpop([WARMUP_QUEUE], timeout=BRPOP_TIMEOUT)
+            if result is None:
+                continue
+            request = json.loads(result[1])
+            tenant_id, collection = request["tenant_id"], request["collection"]
+            try:
+                await warm_up(r, tenant_id, collection)
+            finally:
+                await finish_warmup(r, tenant_id, collection)
+        except Exception as e:
+            logger.exception("Warm-up failed: %s", e)
+
+
+async def run_sweeps(r: redis.Redis) -> None:
+    while True:
+        try:
+            tiers = await sweep(r)
+            logger.info("Collections by tier: %s", dict(tiers))
+        except Exception as e:
+            logger.exception("Tiering sweep failed: %s", e)
+        await asyncio.sleep(TIER_SWEEP_INTERVAL_SEC)
+
+
+async def main() -> None:
+    r = redis.from_url(REDIS_URL)
+    await _init_db()
+    await asyncio.gather(run_warmups(r), run_sweeps(r))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())